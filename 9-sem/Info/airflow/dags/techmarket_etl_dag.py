@@ -5,6 +5,20 @@ Apache Airflow DAG для TechMarket ETL Pipeline.
 з OLTP баз даних у DWH.
 
 Розклад: Запуск щодня о 02:00 UTC
+
+Кожна таблиця завантажується трьома task'ами extract_*, transform_*, load_*.
+Дані між ними передаються Arrow IPC файлами у спільному каталозі
+(ETL_HANDOFF_DIR), через XCom - лише маніфести файлів. Тому невдала стадія
+повторюється без повторення попередніх, а витягування однієї таблиці
+виконується одночасно із завантаженням іншої. Файли успішного запуску
+видаляє task collect_results; файли невдалого лишаються для повторних спроб.
+
+DAG techmarket_etl_backfill (запуск вручну) перезавантажує fact_sales за
+період: період розбивається на вікна (день або тиждень), які виконуються
+паралельно динамічно розгорнутими task'ами в межах пулу etl_backfill:
+    airflow pools set etl_backfill 4 "Паралельні вікна backfill ETL"
+    airflow dags trigger techmarket_etl_backfill \
+        --conf '{"start_date": "2024-01-01", "end_date": "2024-12-31", "granularity": "week"}'
 Автор: Yaroslav Kischuk
 """
 
@@ -16,6 +30,7 @@ from airflow.operators.python import PythonOperator
 from airflow.operators.bash import BashOperator
 from airflow.utils.dates import days_ago
 from airflow.models import Variable
+from airflow.models.param import Param
 
 # Імпорт ETL модулів (припускаємо що etl пакет доступний)
 try:
@@ -44,6 +59,21 @@ DEFAULT_ARGS = {
 # airflow variables set etl_incremental true
 # airflow variables set etl_batch_size 1000
 
+# Пул, що обмежує кількість одночасних вікон backfill (кількість слотів
+# задається в UI або через airflow pools set)
+BACKFILL_POOL = 'etl_backfill'
+
+# Таблиці щоденного завантаження та таблиці, що мають бути завантажені раніше
+# (виміри посилаються на region_key/category_key, факти - на всі виміри)
+DAILY_TABLES = {
+    'dim_region': (),
+    'dim_category': (),
+    'dim_product': ('dim_category',),
+    'dim_customer': ('dim_region',),
+    'dim_employee': ('dim_region',),
+    'fact_sales': ('dim_region', 'dim_category', 'dim_product', 'dim_customer', 'dim_employee'),
+}
+
 
 def check_source_databases(**context: Any) -> None:
     """Перевіряє доступність джерельних баз даних.
@@ -135,55 +165,225 @@ def run_etl_full_load(**context: Any) -> dict[str, int]:
     config = ETLConfig.from_env()
     pipeline = ETLPipeline(config)
     
-    results = pipeline.run_full_load()
+    # Повторна спроба task продовжує перерваний запуск з контрольних точок
+    results = pipeline.run_full_load(resume=context['task_instance'].try_number > 1)
     
     # Зберігаємо результати в XCom для наступних task
     context['task_instance'].xcom_push(key='etl_results', value=results)
+    context['task_instance'].xcom_push(key='etl_metrics', value=results.metrics.to_dict())
     
     return results
 
 
-def run_etl_incremental_load(**context: Any) -> dict[str, int]:
-    """Виконує інкрементальне завантаження ETL.
+def extract_table(table: str, **context: Any) -> dict[str, Any]:
+    """Витягує зміни таблиці у файли передачі.
+    
+    Виміри витягуються від watermark, fact_sales - за день execution_date.
     
     Args:
+        table: Таблиця DWH
         context: Airflow context
-        
+    
     Returns:
-        Статистика завантаження
+        Маніфест файлів (XCom для transform_<table>)
     """
     from etl.config import ETLConfig
     from etl.pipeline import ETLPipeline
     
-    # Отримуємо дати з execution_date
     execution_date = context['execution_date']
     start_date = execution_date
     end_date = execution_date + timedelta(days=1)
     
+    pipeline = ETLPipeline(ETLConfig.from_env())
+    manifest = pipeline.extract_stage(table, pipeline.handoff(context['run_id']), start_date, end_date)
+    print(f"{table}: витягнуто {manifest.rows:,} рядків у {len(manifest.files)} файлів")
+    return manifest.to_dict()
+
+
+def transform_table(table: str, **context: Any) -> dict[str, Any]:
+    """Трансформує витягнуті дані таблиці у нові файли передачі.
+    
+    Args:
+        table: Таблиця DWH
+        context: Airflow context
+    
+    Returns:
+        Маніфест файлів (XCom для load_<table>)
+    """
+    from etl.config import ETLConfig
+    from etl.handoff import HandoffManifest
+    from etl.pipeline import ETLPipeline
+    
+    extracted = HandoffManifest.from_dict(context['task_instance'].xcom_pull(task_ids=f'extract_{table}'))
+    
+    pipeline = ETLPipeline(ETLConfig.from_env())
+    manifest = pipeline.transform_stage(extracted, pipeline.handoff(context['run_id']))
+    print(f"{table}: трансформовано {manifest.rows:,} рядків")
+    return manifest.to_dict()
+
+
+def load_table(table: str, **context: Any) -> int:
+    """Завантажує трансформовані дані таблиці в DWH.
+    
+    Args:
+        table: Таблиця DWH
+        context: Airflow context
+    
+    Returns:
+        Кількість вставлених та оновлених записів
+    """
+    from etl.config import ETLConfig
+    from etl.handoff import HandoffManifest
+    from etl.pipeline import ETLPipeline
+    
+    transformed = HandoffManifest.from_dict(context['task_instance'].xcom_pull(task_ids=f'transform_{table}'))
+    
+    pipeline = ETLPipeline(ETLConfig.from_env())
+    count = pipeline.load_stage(transformed)
+    print(f"{table}: завантажено {count:,} записів")
+    return count
+
+
+def collect_results(**context: Any) -> dict[str, int]:
+    """Зводить результати завантаження таблиць та видаляє файли передачі запуску.
+    
+    Args:
+        context: Airflow context
+    
+    Returns:
+        Статистика завантаження
+    """
+    from etl.config import ETLConfig
+    from etl.pipeline import ETLPipeline
+    
+    ti = context['task_instance']
+    results = {table: ti.xcom_pull(task_ids=f'load_{table}') for table in DAILY_TABLES}
+    
+    pipeline = ETLPipeline(ETLConfig.from_env())
+    try:
+        pipeline.handoff(context['run_id']).cleanup()
+    finally:
+        pipeline.loader.close()
+    
+    ti.xcom_push(key='etl_results', value=results)
+    return results
+
+
+def plan_backfill(**context: Any) -> list[dict[str, str]]:
+    """Розбиває період backfill на вікна та готує DWH до їх паралельного завантаження.
+    
+    Період та гранулярність беруться з параметрів запуску DAG.
+    
+    Args:
+        context: Airflow context
+    
+    Returns:
+        op_kwargs розгорнутих task'ів run_backfill_window (по одному на вікно)
+    """
+    from etl.backfill import backfill_windows
+    from etl.config import ETLConfig
+    from etl.pipeline import ETLPipeline
+    
+    params = context['params']
+    windows = backfill_windows(
+        datetime.fromisoformat(params['start_date']),
+        datetime.fromisoformat(params['end_date']),
+        params['granularity']
+    )
+    
     print("=" * 60)
-    print(f"Запуск інкрементального ETL завантаження")
-    print(f"Період: {start_date} - {end_date}")
+    print(f"Backfill: {params['start_date']} - {params['end_date']}, {len(windows)} вікон ({params['granularity']})")
     print("=" * 60)
     
-    config = ETLConfig.from_env()
-    pipeline = ETLPipeline(config)
+    pipeline = ETLPipeline(ETLConfig.from_env())
+    try:
+        pipeline.prepare_backfill(windows)
+    finally:
+        pipeline.loader.close()
+    
+    return [window.to_dict() for window in windows]
+
+
+def refresh_backfill_dimensions(**context: Any) -> dict[str, int]:
+    """Оновлює виміри один раз перед паралельними вікнами backfill.
     
-    results = pipeline.run_incremental_load(start_date, end_date)
+    Args:
+        context: Airflow context
     
-    # Зберігаємо результати в XCom
-    context['task_instance'].xcom_push(key='etl_results', value=results)
+    Returns:
+        Статистика завантаження вимірів
+    """
+    from etl.config import ETLConfig
+    from etl.pipeline import ETLPipeline, INCREMENTAL_DIMENSIONS
     
-    return results
+    pipeline = ETLPipeline(ETLConfig.from_env())
+    results = pipeline.run_incremental_load(
+        stages=INCREMENTAL_DIMENSIONS,
+        resume=context['task_instance'].try_number > 1
+    )
+    return dict(results)
+
+
+def run_backfill_window(start_date: str, end_date: str, **context: Any) -> dict[str, int]:
+    """Завантажує fact_sales за одне вікно backfill.
+    
+    Args:
+        start_date: Початок вікна (ISO формат)
+        end_date: Кінець вікна (ISO формат, включно)
+        context: Airflow context
+    
+    Returns:
+        Статистика завантаження вікна
+    """
+    from etl.backfill import BackfillWindow
+    from etl.config import ETLConfig
+    from etl.pipeline import ETLPipeline
+    
+    window = BackfillWindow.from_dict({'start_date': start_date, 'end_date': end_date})
+    print(f"Вікно backfill: {window.start_date} - {window.end_date}")
+    
+    pipeline = ETLPipeline(ETLConfig.from_env())
+    results = pipeline.run_incremental_load(
+        window.start_date, window.end_date,
+        resume=context['task_instance'].try_number > 1,
+        stages=('fact_sales',)
+    )
+    
+    context['task_instance'].xcom_push(key='etl_metrics', value=results.metrics.to_dict())
+    return dict(results)
+
+
+def merge_backfill_results(**context: Any) -> dict[str, int]:
+    """Зводить результати вимірів та всіх вікон backfill у підсумок.
+    
+    Args:
+        context: Airflow context
+    
+    Returns:
+        Сумарна статистика backfill
+    """
+    from etl.backfill import merge_results
+    
+    ti = context['task_instance']
+    window_results = list(ti.xcom_pull(task_ids='run_backfill_window') or [])
+    dimension_results = ti.xcom_pull(task_ids='refresh_dimensions')
+    
+    summary = merge_results([dimension_results, *window_results])
+    print(f"Backfill: завантажено {len(window_results)} вікон")
+    
+    ti.xcom_push(key='etl_results', value=summary)
+    return summary
 
 
-def send_success_notification(**context: Any) -> None:
+def send_success_notification(results_task_id: str = 'run_etl', **context: Any) -> None:
     """Надсилає повідомлення про успішне завершення.
     
     Args:
+        results_task_id: Task, що зберіг результати в XCom (etl_results)
         context: Airflow context
     """
     ti = context['task_instance']
-    results = ti.xcom_pull(task_ids='run_etl', key='etl_results')
+    results = ti.xcom_pull(task_ids=results_task_id, key='etl_results')
     
     execution_date = context['execution_date']
     
@@ -244,22 +444,52 @@ with DAG(
         doc_md="Перевіряє доступність DWH",
     )
     
-    # Task 3: Запуск інкрементального ETL
-    run_etl = PythonOperator(
-        task_id='run_etl',
-        python_callable=run_etl_incremental_load if ETL_AVAILABLE else lambda: {},
-        doc_md="Виконує інкрементальне завантаження даних",
+    # Task 3: extract -> transform -> load кожної таблиці через файли передачі
+    stage_tasks = {}
+    for table in DAILY_TABLES:
+        extract = PythonOperator(
+            task_id=f'extract_{table}',
+            python_callable=extract_table if ETL_AVAILABLE else lambda **kwargs: {},
+            op_kwargs={'table': table},
+            doc_md=f"Витягує зміни {table} у файли передачі",
+        )
+        transform = PythonOperator(
+            task_id=f'transform_{table}',
+            python_callable=transform_table if ETL_AVAILABLE else lambda **kwargs: {},
+            op_kwargs={'table': table},
+            doc_md=f"Трансформує {table} у файли передачі",
+        )
+        load = PythonOperator(
+            task_id=f'load_{table}',
+            python_callable=load_table if ETL_AVAILABLE else lambda **kwargs: 0,
+            op_kwargs={'table': table},
+            doc_md=f"Завантажує {table} в DWH",
+        )
+        [check_sources, check_dwh] >> extract >> transform >> load
+        stage_tasks[table] = (extract, transform, load)
+    
+    # Завантаження чекає на таблиці, на ключі яких посилається
+    for table, depends_on in DAILY_TABLES.items():
+        for dependency in depends_on:
+            stage_tasks[dependency][2] >> stage_tasks[table][2]
+    
+    # Task 4: Підсумок запуску та видалення файлів передачі
+    collect = PythonOperator(
+        task_id='collect_results',
+        python_callable=collect_results if ETL_AVAILABLE else lambda **kwargs: {},
+        doc_md="Зводить результати таблиць у XCom etl_results та видаляє файли передачі",
     )
     
-    # Task 4: Відправка повідомлення про успіх
+    # Task 5: Відправка повідомлення про успіх
     notify_success = PythonOperator(
         task_id='notify_success',
         python_callable=send_success_notification,
+        op_kwargs={'results_task_id': 'collect_results'},
         doc_md="Надсилає повідомлення про успішне завершення",
         trigger_rule='all_success',
     )
     
-    # Task 5: Обробка помилок
+    # Task 6: Обробка помилок
     notify_failure = PythonOperator(
         task_id='notify_failure',
         python_callable=handle_failure,
@@ -268,8 +498,9 @@ with DAG(
     )
     
     # Визначення залежностей
-    [check_sources, check_dwh] >> run_etl >> notify_success
-    run_etl >> notify_failure
+    load_tasks = [tasks[2] for tasks in stage_tasks.values()]
+    load_tasks >> collect >> notify_success
+    [task for tasks in stage_tasks.values() for task in tasks] >> notify_failure
 
 
 # DAG для щотижневого повного завантаження
@@ -314,3 +545,74 @@ with DAG(
     
     [check_sources_weekly, check_dwh_weekly] >> run_etl_weekly >> notify_success_weekly
     run_etl_weekly >> notify_failure_weekly
+
+
+# DAG для паралельного backfill fact_sales за період (запуск вручну)
+with DAG(
+    dag_id='techmarket_etl_backfill',
+    default_args=DEFAULT_ARGS,
+    description='Паралельний backfill fact_sales за вікнами дат',
+    schedule_interval=None,
+    start_date=days_ago(1),
+    catchup=False,
+    tags=['etl', 'techmarket', 'dwh', 'backfill'],
+    max_active_runs=1,
+    params={
+        'start_date': Param(type='string', format='date', description='Перший день періоду (YYYY-MM-DD)'),
+        'end_date': Param(type='string', format='date', description='Останній день періоду (YYYY-MM-DD)'),
+        'granularity': Param('day', enum=['day', 'week'], description='Розмір вікна'),
+    },
+) as dag_backfill:
+    
+    check_sources_backfill = PythonOperator(
+        task_id='check_source_databases',
+        python_callable=check_source_databases if ETL_AVAILABLE else lambda: None,
+    )
+    
+    check_dwh_backfill = PythonOperator(
+        task_id='check_dwh_database',
+        python_callable=check_dwh_database if ETL_AVAILABLE else lambda: None,
+    )
+    
+    plan_backfill_windows = PythonOperator(
+        task_id='plan_backfill',
+        python_callable=plan_backfill if ETL_AVAILABLE else lambda: [],
+        doc_md="Розбиває період на вікна та створює партиції fact_sales періоду",
+    )
+    
+    refresh_dimensions = PythonOperator(
+        task_id='refresh_dimensions',
+        python_callable=refresh_backfill_dimensions if ETL_AVAILABLE else lambda: {},
+        doc_md="Оновлює виміри один раз для всіх вікон",
+    )
+    
+    # По одному task на вікно; одночасно виконується не більше слотів пулу
+    run_windows = PythonOperator.partial(
+        task_id='run_backfill_window',
+        python_callable=run_backfill_window if ETL_AVAILABLE else lambda **kwargs: {},
+        pool=BACKFILL_POOL,
+        doc_md="Завантажує fact_sales за вікно backfill",
+    ).expand(op_kwargs=plan_backfill_windows.output)
+    
+    merge_results_backfill = PythonOperator(
+        task_id='merge_results',
+        python_callable=merge_backfill_results,
+        doc_md="Зводить результати вікон у підсумок XCom",
+    )
+    
+    notify_success_backfill = PythonOperator(
+        task_id='notify_success',
+        python_callable=send_success_notification,
+        op_kwargs={'results_task_id': 'merge_results'},
+        trigger_rule='all_success',
+    )
+    
+    notify_failure_backfill = PythonOperator(
+        task_id='notify_failure',
+        python_callable=handle_failure,
+        trigger_rule='one_failed',
+    )
+    
+    [check_sources_backfill, check_dwh_backfill] >> plan_backfill_windows >> refresh_dimensions
+    refresh_dimensions >> run_windows >> merge_results_backfill >> notify_success_backfill
+    [plan_backfill_windows, refresh_dimensions, run_windows, merge_results_backfill] >> notify_failure_backfill
@@ -6,29 +6,50 @@ TechMarket Test Data Generator
 - Catalog DB: категорії, товари
 - Orders DB: регіони, клієнти, менеджери, замовлення
 - Payments DB: платежі
-- DWH: не наповнюється тут (ETL процес)
+- DWH: імітація ETL (можна пропустити через --skip-dwh)
 
-Вимоги:
+Вимоги (мінімум, досягається вже з --scale 1):
 - менеджерів: 5+
 - покупців: 20+
 - товарів: 20+
 - продажі: 500+
+
+Обсяги множаться на --scale (1 - 600 замовлень, ~55000 - ~100M позицій
+замовлень). Рядки генеруються векторизовано пакетами по --batch-size
+замовлень і записуються executemany (multi-row INSERT) або
+LOAD DATA LOCAL INFILE (--method infile). Чотири OLTP бази наповнюються
+паралельними процесами; діапазони замовлень та платежів діляться між
+процесами.
+
+Процеси не обмінюються даними: id детерміновано виводяться з (seed, тип,
+номер), а значення - з генераторів з seed (seed, потік, пакет). Тому
+Payments DB отримує ті самі id та суми замовлень, що й Orders DB, а
+однаковий --seed (та --end-date) дає однаковий набір даних.
+
+Використання:
+    python3 database/data/generate_test_data.py
+    python3 database/data/generate_test_data.py --scale 55000 --workers 16 --method infile --skip-dwh
 """
 
-import uuid
-import random
+import argparse
+import csv
 import hashlib
-from datetime import datetime, timedelta
-from typing import List, Dict
-from decimal import Decimal
+import io
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
 import mysql.connector
+import numpy as np
 import psycopg2
 from faker import Faker
 
-fake = Faker(['uk_UA', 'en_US'])
-Faker.seed(42)
-random.seed(42)
-
 # ============================================
 # Database Connections Configuration
 # ============================================
@@ -64,460 +85,745 @@ DB_CONFIGS = {
     }
 }
 
+DWH_CONFIG = {
+    'host': 'localhost',
+    'port': 5432,
+    'user': 'dwh_user',
+    'password': 'dwh_pass',
+    'database': 'dwh_db'
+}
+
+# Таблиці, що очищуються перед генерацією
+TABLES = {
+    'auth': ['auth_tokens', 'user_roles', 'auth_credentials', 'auth_users', 'roles'],
+    'catalog': ['products', 'categories'],
+    'orders': ['order_items', 'orders', 'customers', 'employees', 'regions'],
+    'payments': ['payments'],
+}
+
 # ============================================
-# Helper Functions
+# Data Volumes and Reference Data
 # ============================================
 
-def generate_uuid() -> str:
-    """Генерує UUID як строку"""
-    return str(uuid.uuid4())
+# Обсяги при --scale 1 (множаться на scale, але не менше мінімуму)
+BASE_VOLUMES = {
+    'products': 25,
+    'employees': 10,
+    'customers': 50,
+    'orders': 600,
+    'tokens': 20,
+}
+
+MIN_VOLUMES = {
+    'products': 25,
+    'employees': 10,
+    'customers': 20,
+    'orders': 500,
+    'tokens': 1,
+}
+
+MAIN_CATEGORIES = [
+    'Ноутбуки та комп\'ютери',
+    'Смартфони та планшети',
+    'Периферія',
+    'Аксесуари',
+    'Аудіо та відео',
+    'Мережеве обладнання'
+]
+
+SUBCATEGORIES = [
+    ('Ноутбуки', 'Ноутбуки та комп\'ютери'),
+    ('Настільні ПК', 'Ноутбуки та комп\'ютери'),
+    ('Моноблоки', 'Ноутбуки та комп\'ютери'),
+    ('Смартфони', 'Смартфони та планшети'),
+    ('Планшети', 'Смартфони та планшети'),
+    ('Миші', 'Периферія'),
+    ('Клавіатури', 'Периферія'),
+    ('Монітори', 'Периферія'),
+]
+
+# Базові товари: назва, артикул, категорія, ціна, собівартість.
+# При scale > 1 решта товарів - їх варіанти з новими артикулами.
+PRODUCTS = [
+    # Ноутбуки
+    ('MacBook Pro 16"', 'LAPTOP-001', 'Ноутбуки', 89999, 75000),
+    ('Dell XPS 15', 'LAPTOP-002', 'Ноутбуки', 67999, 55000),
+    ('Lenovo ThinkPad X1', 'LAPTOP-003', 'Ноутбуки', 54999, 45000),
+    ('ASUS ROG Zephyrus', 'LAPTOP-004', 'Ноутбуки', 72999, 60000),
+    ('HP Pavilion 15', 'LAPTOP-005', 'Ноутбуки', 32999, 27000),
+    
+    # Настільні ПК
+    ('Custom Gaming PC', 'PC-001', 'Настільні ПК', 45999, 38000),
+    ('Dell Optiplex 7090', 'PC-002', 'Настільні ПК', 38999, 32000),
+    
+    # Смартфони
+    ('iPhone 15 Pro', 'PHONE-001', 'Смартфони', 44999, 38000),
+    ('Samsung Galaxy S24', 'PHONE-002', 'Смартфони', 38999, 32000),
+    ('Google Pixel 8', 'PHONE-003', 'Смартфони', 32999, 27000),
+    ('OnePlus 12', 'PHONE-004', 'Смартфони', 28999, 24000),
+    ('Xiaomi 14', 'PHONE-005', 'Смартфони', 24999, 21000),
+    
+    # Планшети
+    ('iPad Pro 12.9"', 'TAB-001', 'Планшети', 42999, 36000),
+    ('Samsung Galaxy Tab S9', 'TAB-002', 'Планшети', 34999, 29000),
+    
+    # Периферія
+    ('Logitech MX Master 3S', 'MOUSE-001', 'Миші', 3499, 2800),
+    ('Razer DeathAdder V3', 'MOUSE-002', 'Миші', 2799, 2200),
+    ('Keychron K2', 'KB-001', 'Клавіатури', 4299, 3500),
+    ('Corsair K70 RGB', 'KB-002', 'Клавіатури', 5999, 4800),
+    ('Dell UltraSharp U2723DE', 'MON-001', 'Монітори', 18999, 15000),
+    ('LG 27UP850', 'MON-002', 'Монітори', 16999, 14000),
+    
+    # Додаткові товари
+    ('Sony WH-1000XM5', 'AUDIO-001', 'Аудіо та відео', 12999, 10500),
+    ('AirPods Pro 2', 'AUDIO-002', 'Аудіо та відео', 9999, 8200),
+    ('TP-Link Archer AX73', 'NET-001', 'Мережеве обладнання', 4299, 3500),
+    ('USB-C Hub 7-in-1', 'ACC-001', 'Аксесуари', 1299, 900),
+    ('Laptop Backpack', 'ACC-002', 'Аксесуари', 1899, 1400),
+]
+
+REGIONS = [
+    ('Київська область', 'KV'),
+    ('Львівська область', 'LV'),
+    ('Одеська область', 'OD'),
+    ('Харківська область', 'KH'),
+    ('Дніпропетровська область', 'DP'),
+]
+
+ROLES = [
+    ('ADMIN', 'Адміністратор системи'),
+    ('SALES', 'Менеджер продажів'),
+    ('CUSTOMER', 'Клієнт'),
+    ('BI_VIEWER', 'Аналітик BI'),
+]
+
+ORDER_STATUSES = np.array(['new', 'paid', 'shipped', 'cancelled'])
+STATUS_WEIGHTS = [0.05, 0.70, 0.20, 0.05]  # 70% paid, 20% shipped
+PAYABLE_STATUSES = ['paid', 'shipped']
+PAYMENT_METHODS = np.array(['card', 'paypal', 'bank_transfer', 'cash'])
+DISCOUNT_RATES = np.array([0.0, 0.05, 0.1])  # 0%, 5%, 10% знижка
+
+ORDERS_START_DATE = datetime(2024, 1, 1)
+
+# Номери типів сутностей для детермінованих id (друга група UUID)
+ID_KINDS = {
+    'role': 1,
+    'category': 2,
+    'product': 3,
+    'region': 4,
+    'employee': 5,
+    'customer': 6,
+    'order': 7,
+    'order_item': 8,
+    'user': 9,
+    'credential': 10,
+    'token': 11,
+    'payment': 12,
+}
+
+# Номери потоків випадкових чисел (незалежні послідовності з одного seed)
+STREAMS = {
+    'catalog': 1,
+    'people': 2,
+    'orders': 3,
+    'tokens': 4,
+}
+
+# Кількість рядків в одному INSERT / LOAD DATA для вимірів
+ROWS_PER_WRITE = 50_000
+
+# ============================================
+# Helper Functions
+# ============================================
 
 def hash_password(password: str) -> str:
     """Створює простий хеш пароля"""
     return hashlib.sha256(password.encode()).hexdigest()
 
-def random_date(start_date: datetime, end_date: datetime) -> datetime:
-    """Генерує випадкову дату між двома датами"""
-    delta = end_date - start_date
-    random_days = random.randint(0, delta.days)
-    return start_date + timedelta(days=random_days)
+def deterministic_ids(seed: int, kind: str, numbers: Iterable[int]) -> List[str]:
+    """Генерує UUID-подібні id (char(36)) для номерів сутностей.
+    
+    Id залежить лише від (seed, kind, номер), тож процеси різних баз
+    отримують однакові посилання без обміну даними.
+    """
+    prefix = f'{seed & 0xffffffff:08x}-{ID_KINDS[kind]:04x}-4000-8000-'
+    return [f'{prefix}{number:012x}' for number in numbers]
+
+def rng_for(seed: int, stream: str, part: int = 0) -> np.random.Generator:
+    """Повертає генератор випадкових чисел для потоку та пакета."""
+    return np.random.default_rng([seed, STREAMS[stream], part])
+
+def scaled(name: str, scale: float) -> int:
+    """Повертає обсяг сутності для масштабу."""
+    return max(MIN_VOLUMES[name], round(BASE_VOLUMES[name] * scale))
+
+@lru_cache(maxsize=None)
+def name_pools(seed: int) -> Dict[str, np.ndarray]:
+    """Пули імен, телефонів та user agent'ів з Faker (один раз на процес).
+    
+    Faker занадто повільний для мільйонів рядків, тому значення
+    генеруються один раз і далі вибираються векторизовано.
+    """
+    fake = Faker(['uk_UA', 'en_US'])
+    fake.seed_instance(seed)
+    return {
+        'first_names': np.array([fake.first_name() for _ in range(500)], dtype=object),
+        'last_names': np.array([fake.last_name() for _ in range(500)], dtype=object),
+        'phones': np.array([fake.phone_number() for _ in range(500)], dtype=object),
+        'user_agents': np.array([fake.user_agent() for _ in range(50)], dtype=object),
+    }
+
+def to_python(values) -> list:
+    """Перетворює колонку (numpy масив або список) на значення драйвера БД."""
+    if isinstance(values, np.ndarray):
+        if np.issubdtype(values.dtype, np.datetime64):
+            return values.astype('datetime64[us]').tolist()
+        return values.tolist()
+    return list(values)
 
 # ============================================
-# Auth Database Population
+# Generation Plan
 # ============================================
 
-def populate_auth_db(customer_ids: List[str], employee_ids: List[str]):
-    """Наповнює Auth DB користувачами та ролями"""
-    print(" Populating Auth DB...")
-    
-    conn = mysql.connector.connect(**DB_CONFIGS['auth'])
-    cursor = conn.cursor()
-    
-    # Очищення існуючих даних
-    print("   - Clearing existing auth data...")
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
-    cursor.execute("DELETE FROM auth_tokens")
-    cursor.execute("DELETE FROM auth_users")
-    cursor.execute("DELETE FROM roles")
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
-    conn.commit()
-    
-    # Створення ролей
-    roles = [
-        (generate_uuid(), 'ADMIN', 'Адміністратор системи'),
-        (generate_uuid(), 'SALES', 'Менеджер продажів'),
-        (generate_uuid(), 'CUSTOMER', 'Клієнт'),
-        (generate_uuid(), 'BI_VIEWER', 'Аналітик BI')
-    ]
-    
-    role_ids = {}
-    for role_id, name, comment in roles:
-        cursor.execute(
-            "INSERT INTO roles (id, name, comment) VALUES (%s, %s, %s)",
-            (role_id, name, comment)
-        )
-        role_ids[name] = role_id
-    
-    # Створення користувачів для співробітників
-    user_ids = []
-    for emp_id in employee_ids:
-        user_id = generate_uuid()
-        email = fake.email()
-        cursor.execute(
-            """INSERT INTO auth_users (id, email, status, created_at, updated_at, employee_id)
-               VALUES (%s, %s, %s, %s, %s, %s)""",
-            (user_id, email, 'active', datetime.now(), datetime.now(), emp_id)
-        )
-        
-        # Credentials
-        cursor.execute(
-            """INSERT INTO auth_credentials (id, user_id, password_hash, algo, password_updated_at, updated_at)
-               VALUES (%s, %s, %s, %s, %s, %s)""",
-            (generate_uuid(), user_id, hash_password('password123'), 'sha256', datetime.now(), datetime.now())
-        )
-        
-        # Роль SALES
-        cursor.execute(
-            "INSERT INTO user_roles (user_id, role_id) VALUES (%s, %s)",
-            (user_id, role_ids['SALES'])
-        )
-        user_ids.append(user_id)
-    
-    # Створення користувачів для клієнтів
-    for cust_id in customer_ids:
-        user_id = generate_uuid()
-        email = fake.email()
-        cursor.execute(
-            """INSERT INTO auth_users (id, email, status, created_at, updated_at, customer_id)
-               VALUES (%s, %s, %s, %s, %s, %s)""",
-            (user_id, email, 'active', datetime.now(), datetime.now(), cust_id)
-        )
-        
-        # Credentials
-        cursor.execute(
-            """INSERT INTO auth_credentials (id, user_id, password_hash, algo, password_updated_at, updated_at)
-               VALUES (%s, %s, %s, %s, %s, %s)""",
-            (generate_uuid(), user_id, hash_password('password123'), 'sha256', datetime.now(), datetime.now())
-        )
-        
-        # Роль CUSTOMER
-        cursor.execute(
-            "INSERT INTO user_roles (user_id, role_id) VALUES (%s, %s)",
-            (user_id, role_ids['CUSTOMER'])
-        )
-        user_ids.append(user_id)
-    
-    # Створення адмін користувача
-    admin_id = generate_uuid()
-    cursor.execute(
-        """INSERT INTO auth_users (id, email, status, created_at, updated_at)
-           VALUES (%s, %s, %s, %s, %s)""",
-        (admin_id, 'admin@techmarket.com', 'active', datetime.now(), datetime.now())
-    )
-    cursor.execute(
-        """INSERT INTO auth_credentials (id, user_id, password_hash, algo, password_updated_at, updated_at)
-           VALUES (%s, %s, %s, %s, %s, %s)""",
-        (generate_uuid(), admin_id, hash_password('admin123'), 'sha256', datetime.now(), datetime.now())
-    )
-    cursor.execute(
-        "INSERT INTO user_roles (user_id, role_id) VALUES (%s, %s)",
-        (admin_id, role_ids['ADMIN'])
-    )
+@dataclass(frozen=True)
+class GenerationPlan:
+    """Параметри генерації, спільні для всіх процесів.
     
-    # Генерація токенів для деяких користувачів
-    for _ in range(20):
-        user_id = random.choice(user_ids)
-        token_hash = hashlib.sha256(str(uuid.uuid4()).encode()).hexdigest()
-        issued = datetime.now() - timedelta(days=random.randint(0, 30))
-        expires = issued + timedelta(days=30)
-        
-        cursor.execute(
-            """INSERT INTO auth_tokens (id, user_id, token_hash, issued_at, expires_at, 
-               revoked, last_used_at, user_agent, ip, scopes)
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-            (generate_uuid(), user_id, token_hash, issued, expires, False,
-             datetime.now(), fake.user_agent(), fake.ipv4(), 'read,write')
-        )
+    Attributes:
+        scale: Множник обсягів (1 - базові обсяги)
+        seed: Seed генераторів
+        batch_size: Замовлень в одному пакеті генерації та запису
+        end_date: Остання дата замовлень; також created_at записів
+        method: Спосіб запису в MySQL ('executemany' або 'infile')
+    """
+    scale: float
+    seed: int
+    batch_size: int
+    end_date: datetime
+    method: str = 'executemany'
+    
+    @property
+    def n_products(self) -> int:
+        return scaled('products', self.scale)
+    
+    @property
+    def n_employees(self) -> int:
+        return scaled('employees', self.scale)
+    
+    @property
+    def n_customers(self) -> int:
+        return scaled('customers', self.scale)
     
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print(" Auth DB populated")
+    @property
+    def n_orders(self) -> int:
+        return scaled('orders', self.scale)
+    
+    @property
+    def n_tokens(self) -> int:
+        return scaled('tokens', self.scale)
+    
+    @property
+    def n_batches(self) -> int:
+        return math.ceil(self.n_orders / self.batch_size)
+    
+    def ids(self, kind: str, start: int, stop: int) -> List[str]:
+        """Id сутностей з номерами [start, stop)."""
+        return deterministic_ids(self.seed, kind, range(start, stop))
+    
+    def ids_at(self, kind: str, numbers: np.ndarray) -> List[str]:
+        """Id сутностей з довільними номерами (посилання на інші таблиці)."""
+        return deterministic_ids(self.seed, kind, numbers.tolist())
 
 # ============================================
-# Catalog Database Population
+# Row Generators (vectorized)
 # ============================================
 
-def populate_catalog_db() -> Dict[str, List[str]]:
-    """Наповнює Catalog DB категоріями та товарами"""
-    print(" Populating Catalog DB...")
-    
-    conn = mysql.connector.connect(**DB_CONFIGS['catalog'])
-    cursor = conn.cursor()
-    
-    # Очищення існуючих даних
-    print("   - Clearing existing catalog data...")
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
-    cursor.execute("DELETE FROM products")
-    cursor.execute("DELETE FROM categories")
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
-    conn.commit()
-    
-    # Створення категорій верхнього рівня
-    main_categories = [
-        'Ноутбуки та комп\'ютери',
-        'Смартфони та планшети',
-        'Периферія',
-        'Аксесуари',
-        'Аудіо та відео',
-        'Мережеве обладнання'
-    ]
-    
-    category_ids = {}
-    for cat_name in main_categories:
-        cat_id = generate_uuid()
-        cursor.execute(
-            "INSERT INTO categories (id, name, parent_category_id) VALUES (%s, %s, NULL)",
-            (cat_id, cat_name)
-        )
-        category_ids[cat_name] = cat_id
-    
-    # Підкатегорії
-    subcategories = [
-        ('Ноутбуки', category_ids['Ноутбуки та комп\'ютери']),
-        ('Настільні ПК', category_ids['Ноутбуки та комп\'ютери']),
-        ('Моноблоки', category_ids['Ноутбуки та комп\'ютери']),
-        ('Смартфони', category_ids['Смартфони та планшети']),
-        ('Планшети', category_ids['Смартфони та планшети']),
-        ('Миші', category_ids['Периферія']),
-        ('Клавіатури', category_ids['Периферія']),
-        ('Монітори', category_ids['Периферія']),
-    ]
-    
-    for subcat_name, parent_id in subcategories:
-        subcat_id = generate_uuid()
-        cursor.execute(
-            "INSERT INTO categories (id, name, parent_category_id) VALUES (%s, %s, %s)",
-            (subcat_id, subcat_name, parent_id)
-        )
-        category_ids[subcat_name] = subcat_id
-    
-    # Створення товарів (20+)
-    products = [
-        # Ноутбуки
-        ('MacBook Pro 16"', 'LAPTOP-001', 'Ноутбуки', 89999, 75000),
-        ('Dell XPS 15', 'LAPTOP-002', 'Ноутбуки', 67999, 55000),
-        ('Lenovo ThinkPad X1', 'LAPTOP-003', 'Ноутбуки', 54999, 45000),
-        ('ASUS ROG Zephyrus', 'LAPTOP-004', 'Ноутбуки', 72999, 60000),
-        ('HP Pavilion 15', 'LAPTOP-005', 'Ноутбуки', 32999, 27000),
-        
-        # Настільні ПК
-        ('Custom Gaming PC', 'PC-001', 'Настільні ПК', 45999, 38000),
-        ('Dell Optiplex 7090', 'PC-002', 'Настільні ПК', 38999, 32000),
-        
-        # Смартфони
-        ('iPhone 15 Pro', 'PHONE-001', 'Смартфони', 44999, 38000),
-        ('Samsung Galaxy S24', 'PHONE-002', 'Смартфони', 38999, 32000),
-        ('Google Pixel 8', 'PHONE-003', 'Смартфони', 32999, 27000),
-        ('OnePlus 12', 'PHONE-004', 'Смартфони', 28999, 24000),
-        ('Xiaomi 14', 'PHONE-005', 'Смартфони', 24999, 21000),
-        
-        # Планшети
-        ('iPad Pro 12.9"', 'TAB-001', 'Планшети', 42999, 36000),
-        ('Samsung Galaxy Tab S9', 'TAB-002', 'Планшети', 34999, 29000),
-        
-        # Периферія
-        ('Logitech MX Master 3S', 'MOUSE-001', 'Миші', 3499, 2800),
-        ('Razer DeathAdder V3', 'MOUSE-002', 'Миші', 2799, 2200),
-        ('Keychron K2', 'KB-001', 'Клавіатури', 4299, 3500),
-        ('Corsair K70 RGB', 'KB-002', 'Клавіатури', 5999, 4800),
-        ('Dell UltraSharp U2723DE', 'MON-001', 'Монітори', 18999, 15000),
-        ('LG 27UP850', 'MON-002', 'Монітори', 16999, 14000),
-        
-        # Додаткові товари
-        ('Sony WH-1000XM5', 'AUDIO-001', 'Аудіо та відео', 12999, 10500),
-        ('AirPods Pro 2', 'AUDIO-002', 'Аудіо та відео', 9999, 8200),
-        ('TP-Link Archer AX73', 'NET-001', 'Мережеве обладнання', 4299, 3500),
-        ('USB-C Hub 7-in-1', 'ACC-001', 'Аксесуари', 1299, 900),
-        ('Laptop Backpack', 'ACC-002', 'Аксесуари', 1899, 1400),
-    ]
-    
-    product_ids = []
-    for name, sku, cat_name, price, cost in products:
-        product_id = generate_uuid()
-        cursor.execute(
-            """INSERT INTO products (id, name, sku, category_id, price, cost, status, created_at, updated_at)
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-            (product_id, name, sku, category_ids[cat_name], price, cost, 'active', datetime.now(), datetime.now())
-        )
-        product_ids.append(product_id)
+def category_rows(plan: GenerationPlan) -> Dict[str, list]:
+    """Категорії: 6 головних та 8 підкатегорій."""
+    names = MAIN_CATEGORIES + [name for name, _ in SUBCATEGORIES]
+    ids = plan.ids('category', 0, len(names))
+    by_name = dict(zip(names, ids))
+    parents = [None] * len(MAIN_CATEGORIES) + [by_name[parent] for _, parent in SUBCATEGORIES]
+    return {'id': ids, 'name': names, 'parent_category_id': parents}
+
+def product_rows(plan: GenerationPlan, start: int, stop: int) -> Dict[str, list]:
+    """Товари [start, stop): базові, далі - їх варіанти з новими артикулами.
     
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print(f" Catalog DB populated: {len(category_ids)} categories, {len(product_ids)} products")
+    Ціни залежать лише від номера товару, тож Orders DB обчислює ті самі
+    ціни, не звертаючись до Catalog DB (див. product_prices).
+    """
+    numbers = np.arange(start, stop)
+    base = numbers % len(PRODUCTS)
+    variant = numbers // len(PRODUCTS)
+    category_ids = dict(zip(
+        MAIN_CATEGORIES + [name for name, _ in SUBCATEGORIES],
+        plan.ids('category', 0, len(MAIN_CATEGORIES) + len(SUBCATEGORIES))
+    ))
+    prices = product_prices(plan)[start:stop]
+    costs = np.array([PRODUCTS[i][4] / PRODUCTS[i][3] for i in range(len(PRODUCTS))])[base]
+    created = plan.end_date
     
-    return {'product_ids': product_ids}
+    return {
+        'id': plan.ids('product', start, stop),
+        'name': [
+            PRODUCTS[b][0] if v == 0 else f'{PRODUCTS[b][0]} #{v}'
+            for b, v in zip(base.tolist(), variant.tolist())
+        ],
+        'sku': [
+            PRODUCTS[b][1] if v == 0 else f'{PRODUCTS[b][1]}-{v:06d}'
+            for b, v in zip(base.tolist(), variant.tolist())
+        ],
+        'category_id': [category_ids[PRODUCTS[b][2]] for b in base.tolist()],
+        'price': prices,
+        'cost': np.round(prices * costs, 2),
+        'status': ['active'] * len(numbers),
+        'created_at': [created] * len(numbers),
+        'updated_at': [created] * len(numbers),
+    }
+
+@lru_cache(maxsize=4)
+def product_prices(plan: GenerationPlan) -> np.ndarray:
+    """Ціни всіх товарів: базові ціни, варіанти - з відхиленням до ±20%."""
+    base = np.array([price for _, _, _, price, _ in PRODUCTS], dtype=float)
+    numbers = np.arange(plan.n_products)
+    factors = rng_for(plan.seed, 'catalog').uniform(0.8, 1.2, plan.n_products)
+    factors[:len(PRODUCTS)] = 1.0
+    return np.round(base[numbers % len(PRODUCTS)] * factors, 2)
+
+def employee_rows(plan: GenerationPlan) -> Dict[str, list]:
+    """Співробітники: перша половина - менеджери."""
+    pools = name_pools(plan.seed)
+    rng = rng_for(plan.seed, 'people', 0)
+    n = plan.n_employees
+    hired = np.datetime64(date(2020, 1, 1)) + rng.integers(0, (date(2024, 1, 1) - date(2020, 1, 1)).days, n)
+    region_ids = np.array(plan.ids('region', 0, len(REGIONS)), dtype=object)
+    return {
+        'id': plan.ids('employee', 0, n),
+        'first_name': rng.choice(pools['first_names'], n),
+        'last_name': rng.choice(pools['last_names'], n),
+        'email': [f'employee{i}@techmarket.com' for i in range(n)],
+        'hired_at': hired.astype('datetime64[D]').tolist(),
+        'is_manager': np.arange(n) < max(5, n // 2),
+        'region_id': rng.choice(region_ids, n),
+    }
+
+def customer_rows(plan: GenerationPlan, start: int, stop: int) -> Dict[str, list]:
+    """Клієнти [start, stop)."""
+    pools = name_pools(plan.seed)
+    rng = rng_for(plan.seed, 'people', 1 + start // ROWS_PER_WRITE)
+    n = stop - start
+    created = plan.end_date
+    return {
+        'id': plan.ids('customer', start, stop),
+        'first_name': rng.choice(pools['first_names'], n),
+        'last_name': rng.choice(pools['last_names'], n),
+        'email': [f'customer{i}@example.com' for i in range(start, stop)],
+        'phone': rng.choice(pools['phones'], n),
+        'created_at': [created] * n,
+        'updated_at': [created] * n,
+    }
+
+def order_batch(plan: GenerationPlan, batch: int) -> Dict[str, Dict[str, list]]:
+    """Генерує пакет замовлень з позиціями та платежами.
+    
+    Позиції та платежі одного пакета виводяться з одного генератора, тож
+    Orders DB та Payments DB, генеруючи пакет незалежно, отримують
+    узгоджені суми.
+    
+    Returns:
+        Словник таблиця -> колонки ('orders', 'order_items', 'payments')
+    """
+    first = batch * plan.batch_size
+    last = min(first + plan.batch_size, plan.n_orders)
+    n = last - first
+    rng = rng_for(plan.seed, 'orders', batch)
+    
+    days = (plan.end_date - ORDERS_START_DATE).days
+    order_dates = np.datetime64(ORDERS_START_DATE, 's') + (rng.integers(0, days + 1, n) * 86400).astype('timedelta64[s]')
+    statuses = rng.choice(ORDER_STATUSES, n, p=STATUS_WEIGHTS)
+    customers = rng.integers(0, plan.n_customers, n)
+    employees = rng.integers(0, plan.n_employees, n)
+    regions = rng.integers(0, len(REGIONS), n)
+    
+    # Замовлення має 1-5 різних товарів (послідовні номери від випадкового)
+    items_per_order = rng.integers(1, 6, n)
+    n_items = int(items_per_order.sum())
+    item_order = np.repeat(np.arange(n), items_per_order)
+    position = np.arange(n_items) - np.repeat(np.cumsum(items_per_order) - items_per_order, items_per_order)
+    products = (rng.integers(0, plan.n_products, n)[item_order] + position) % plan.n_products
+    unit_price = product_prices(plan)[products]
+    quantity = rng.integers(1, 4, n_items)
+    discount = np.round(unit_price * DISCOUNT_RATES[rng.integers(0, len(DISCOUNT_RATES), n_items)], 2)
+    totals = np.round(np.bincount(item_order, weights=unit_price * quantity - discount, minlength=n), 2)
+    
+    order_ids = np.array(plan.ids('order', first, last), dtype=object)
+    item_first = first * 5  # Не більше 5 позицій на замовлення
+    
+    payable = np.isin(statuses, PAYABLE_STATUSES)
+    paid_minutes = rng.integers(5, 121, n)
+    methods = rng.choice(PAYMENT_METHODS, n)
+    
+    return {
+        'orders': {
+            'id': order_ids,
+            'customer_id': plan.ids_at('customer', customers),
+            'employee_id': plan.ids_at('employee', employees),
+            'region_id': np.array(plan.ids('region', 0, len(REGIONS)), dtype=object)[regions],
+            'order_date': order_dates,
+            'status': statuses,
+            'total_amount': totals,
+            'created_at': order_dates,
+            'updated_at': order_dates,
+        },
+        'order_items': {
+            'id': plan.ids('order_item', item_first, item_first + n_items),
+            'order_id': order_ids[item_order],
+            'product_id': plan.ids_at('product', products),
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'discount': discount,
+        },
+        'payments': {
+            'id': plan.ids_at('payment', first + np.flatnonzero(payable)),
+            'order_id': order_ids[payable],
+            'method': methods[payable],
+            'paid_at': (order_dates + (paid_minutes * 60).astype('timedelta64[s]'))[payable],
+            'amount': totals[payable],
+        },
+    }
+
+def auth_user_rows(plan: GenerationPlan, start: int, stop: int) -> Dict[str, Dict[str, list]]:
+    """Користувачі [start, stop) з обліковими даними та ролями.
+    
+    Номери користувачів: спочатку співробітники (роль SALES), далі клієнти
+    (CUSTOMER), останній - адміністратор (ADMIN).
+    """
+    numbers = np.arange(start, stop)
+    n_employees, n_customers = plan.n_employees, plan.n_customers
+    is_employee = numbers < n_employees
+    is_customer = (numbers >= n_employees) & (numbers < n_employees + n_customers)
+    role_ids = dict(zip([name for name, _ in ROLES], plan.ids('role', 0, len(ROLES))))
+    user_ids = plan.ids('user', start, stop)
+    created = plan.end_date
+    n = len(numbers)
+    
+    emails = []
+    employee_refs = []
+    customer_refs = []
+    roles = []
+    for number, employee, customer in zip(numbers.tolist(), is_employee.tolist(), is_customer.tolist()):
+        if employee:
+            emails.append(f'employee{number}@techmarket.com')
+            employee_refs.append(number)
+            roles.append(role_ids['SALES'])
+        elif customer:
+            emails.append(f'customer{number - n_employees}@example.com')
+            customer_refs.append(number - n_employees)
+            roles.append(role_ids['CUSTOMER'])
+        else:
+            emails.append('admin@techmarket.com')
+            roles.append(role_ids['ADMIN'])
+    
+    employee_ids = iter(plan.ids_at('employee', np.array(employee_refs, dtype=np.int64)))
+    customer_ids = iter(plan.ids_at('customer', np.array(customer_refs, dtype=np.int64)))
+    password_hash = hash_password('password123')
+    
+    return {
+        'auth_users': {
+            'id': user_ids,
+            'email': emails,
+            'status': ['active'] * n,
+            'created_at': [created] * n,
+            'updated_at': [created] * n,
+            'employee_id': [next(employee_ids) if flag else None for flag in is_employee.tolist()],
+            'customer_id': [next(customer_ids) if flag else None for flag in is_customer.tolist()],
+        },
+        'auth_credentials': {
+            'id': plan.ids('credential', start, stop),
+            'user_id': user_ids,
+            'password_hash': [
+                password_hash if employee or customer else hash_password('admin123')
+                for employee, customer in zip(is_employee.tolist(), is_customer.tolist())
+            ],
+            'algo': ['sha256'] * n,
+            'password_updated_at': [created] * n,
+            'updated_at': [created] * n,
+        },
+        'user_roles': {
+            'user_id': user_ids,
+            'role_id': roles,
+        },
+    }
+
+def token_rows(plan: GenerationPlan) -> Dict[str, list]:
+    """Токени доступу випадкових користувачів."""
+    pools = name_pools(plan.seed)
+    rng = rng_for(plan.seed, 'tokens')
+    n = plan.n_tokens
+    token_ids = plan.ids('token', 0, n)
+    n_users = plan.n_employees + plan.n_customers + 1
+    issued = np.datetime64(plan.end_date, 's') - (rng.integers(0, 31, n) * 86400).astype('timedelta64[s]')
+    ips = rng.integers(1, 255, (n, 4))
+    return {
+        'id': token_ids,
+        'user_id': plan.ids_at('user', rng.integers(0, n_users, n)),
+        'token_hash': [hashlib.sha256(token_id.encode()).hexdigest() for token_id in token_ids],
+        'issued_at': issued,
+        'expires_at': issued + np.timedelta64(30, 'D'),
+        'revoked': [False] * n,
+        'last_used_at': [plan.end_date] * n,
+        'user_agent': rng.choice(pools['user_agents'], n),
+        'ip': ['.'.join(map(str, ip)) for ip in ips.tolist()],
+        'scopes': ['read,write'] * n,
+    }
 
 # ============================================
-# Orders Database Population
+# Bulk Writer
 # ============================================
 
-def populate_orders_db(product_ids: List[str]) -> Dict[str, List[str]]:
-    """Наповнює Orders DB регіонами, клієнтами, менеджерами та замовленнями"""
-    print(" Populating Orders DB...")
-    
-    conn = mysql.connector.connect(**DB_CONFIGS['orders'])
-    cursor = conn.cursor()
-    
-    # Очищення існуючих даних
-    print("   - Clearing existing orders data...")
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
-    cursor.execute("DELETE FROM order_items")
-    cursor.execute("DELETE FROM orders")
-    cursor.execute("DELETE FROM customers")
-    cursor.execute("DELETE FROM employees")
-    cursor.execute("DELETE FROM regions")
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
-    conn.commit()
-    
-    # Регіони
-    regions = [
-        ('Київська область', 'KV'),
-        ('Львівська область', 'LV'),
-        ('Одеська область', 'OD'),
-        ('Харківська область', 'KH'),
-        ('Дніпропетровська область', 'DP'),
-    ]
-    
-    region_ids = []
-    for name, code in regions:
-        region_id = generate_uuid()
-        cursor.execute(
-            "INSERT INTO regions (id, name, code) VALUES (%s, %s, %s)",
-            (region_id, name, code)
-        )
-        region_ids.append(region_id)
-    
-    # Співробітники (менеджери) - мінімум 5
-    employee_ids = []
-    for i in range(10):  # Створюємо 10 менеджерів
-        emp_id = generate_uuid()
-        is_manager = i < 5  # Перші 5 - менеджери
-        hired_date = random_date(datetime(2020, 1, 1), datetime(2024, 1, 1))
-        
-        cursor.execute(
-            """INSERT INTO employees (id, first_name, last_name, email, hired_at, is_manager, region_id)
-               VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-            (emp_id, fake.first_name(), fake.last_name(), fake.email(), 
-             hired_date.date(), is_manager, random.choice(region_ids))
-        )
-        employee_ids.append(emp_id)
-    
-    # Клієнти - мінімум 20
-    customer_ids = []
-    for _ in range(50):  # Створюємо 50 клієнтів
-        cust_id = generate_uuid()
-        cursor.execute(
-            """INSERT INTO customers (id, first_name, last_name, email, phone, created_at, updated_at)
-               VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-            (cust_id, fake.first_name(), fake.last_name(), fake.email(), 
-             fake.phone_number(), datetime.now(), datetime.now())
-        )
-        customer_ids.append(cust_id)
-    
-    # Замовлення - мінімум 500
-    order_ids = []
-    start_date = datetime(2024, 1, 1)
-    end_date = datetime.now()
+class BulkWriter:
+    """Пакетний запис у MySQL базу: executemany або LOAD DATA LOCAL INFILE."""
     
-    statuses = ['new', 'paid', 'shipped', 'cancelled']
-    status_weights = [0.05, 0.70, 0.20, 0.05]  # 70% paid, 20% shipped
+    def __init__(self, database: str, method: str = 'executemany'):
+        self.database = database
+        self.method = method
+        self.conn = mysql.connector.connect(
+            **DB_CONFIGS[database],
+            allow_local_infile=method == 'infile'
+        )
+        self.cursor = self.conn.cursor()
+        # Дані узгоджені за побудовою, а таблиці різних процесів пишуться
+        # паралельно й у довільному порядку
+        self.cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        self.cursor.execute("SET UNIQUE_CHECKS = 0")
     
-    for _ in range(600):  # Створюємо 600 замовлень
-        order_id = generate_uuid()
-        order_date = random_date(start_date, end_date)
-        status = random.choices(statuses, weights=status_weights)[0]
+    def write(self, table: str, columns: Dict[str, list]) -> int:
+        """Записує колонки в таблицю однією транзакцією.
         
-        # Замовлення має 1-5 товарів
-        num_items = random.randint(1, 5)
-        total_amount = 0
-        
-        # Спочатку створюємо замовлення
-        cursor.execute(
-            """INSERT INTO orders (id, customer_id, employee_id, region_id, order_date, status, total_amount, created_at, updated_at)
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-            (order_id, random.choice(customer_ids), random.choice(employee_ids),
-             random.choice(region_ids), order_date, status, 0, order_date, order_date)
-        )
+        Returns:
+            Кількість записаних рядків
+        """
+        names = list(columns)
+        rows = list(zip(*(to_python(values) for values in columns.values())))
+        if not rows:
+            return 0
         
-        # Створюємо позиції замовлення
-        selected_products = random.sample(product_ids, min(num_items, len(product_ids)))
-        for product_id in selected_products:
-            # Отримуємо ціну товару з Catalog DB
-            catalog_conn = mysql.connector.connect(**DB_CONFIGS['catalog'])
-            catalog_cursor = catalog_conn.cursor()
-            catalog_cursor.execute("SELECT price FROM products WHERE id = %s", (product_id,))
-            result = catalog_cursor.fetchone()
-            catalog_cursor.close()
-            catalog_conn.close()
-            
-            unit_price = Decimal(str(result[0])) if result else Decimal('10000')
-            quantity = random.randint(1, 3)
-            discount = random.choice([Decimal('0'), unit_price * Decimal('0.05'), unit_price * Decimal('0.1')])  # 0%, 5%, 10% знижка
-            
-            item_total = unit_price * quantity - discount
-            total_amount += item_total
-            
-            cursor.execute(
-                """INSERT INTO order_items (id, order_id, product_id, quantity, unit_price, discount)
-                   VALUES (%s, %s, %s, %s, %s, %s)""",
-                (generate_uuid(), order_id, product_id, quantity, unit_price, discount)
+        for start in range(0, len(rows), ROWS_PER_WRITE):
+            chunk = rows[start:start + ROWS_PER_WRITE]
+            if self.method == 'infile':
+                self._load_infile(table, names, chunk)
+            else:
+                placeholders = ', '.join(['%s'] * len(names))
+                self.cursor.executemany(
+                    f"INSERT INTO {table} ({', '.join(names)}) VALUES ({placeholders})",
+                    chunk
+                )
+        self.conn.commit()
+        return len(rows)
+    
+    def _load_infile(self, table: str, names: List[str], rows: List[tuple]) -> None:
+        """Записує рядки через тимчасовий CSV та LOAD DATA LOCAL INFILE."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8', delete=False) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            for row in rows:
+                writer.writerow([_csv_value(value) for value in row])
+            path = f.name
+        try:
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                f"LINES TERMINATED BY '\\n' ({', '.join(names)})"
             )
-        
-        # Оновлюємо загальну суму замовлення
-        cursor.execute(
-            "UPDATE orders SET total_amount = %s WHERE id = %s",
-            (total_amount, order_id)
-        )
-        
-        order_ids.append((order_id, order_date, status, total_amount))
+        finally:
+            os.unlink(path)
     
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print(f" Orders DB populated: {len(region_ids)} regions, {len(employee_ids)} employees, {len(customer_ids)} customers, {len(order_ids)} orders")
+    def truncate(self, tables: List[str]) -> None:
+        """Очищує таблиці (TRUNCATE замість DELETE - без пострічкового видалення)."""
+        for table in tables:
+            self.cursor.execute(f"TRUNCATE TABLE {table}")
+        self.conn.commit()
     
-    return {
-        'customer_ids': customer_ids,
-        'employee_ids': employee_ids,
-        'order_ids': order_ids
-    }
+    def close(self) -> None:
+        self.cursor.execute("SET UNIQUE_CHECKS = 1")
+        self.cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        self.cursor.close()
+        self.conn.close()
+
+def _csv_value(value):
+    """Значення для LOAD DATA: NULL для None, 0/1 для boolean."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return int(value)
+    return value
 
 # ============================================
-# Payments Database Population
+# Generation Tasks (run in worker processes)
 # ============================================
 
-def populate_payments_db(order_ids: List[tuple]):
-    """Наповнює Payments DB платежами"""
-    print(" Populating Payments DB...")
-    
-    conn = mysql.connector.connect(**DB_CONFIGS['payments'])
-    cursor = conn.cursor()
-    
-    # Очищення існуючих даних
-    print("   - Clearing existing payments data...")
-    cursor.execute("DELETE FROM payments")
-    conn.commit()
-    
-    payment_methods = ['card', 'paypal', 'bank_transfer', 'cash']
-    
-    # Створюємо платежі тільки для paid та shipped замовлень
-    payment_count = 0
-    for order_id, order_date, status, amount in order_ids:
-        if status in ['paid', 'shipped']:
-            payment_id = generate_uuid()
-            paid_at = order_date + timedelta(minutes=random.randint(5, 120))
-            
-            cursor.execute(
-                """INSERT INTO payments (id, order_id, method, paid_at, amount)
-                   VALUES (%s, %s, %s, %s, %s)""",
-                (payment_id, order_id, random.choice(payment_methods), paid_at, amount)
-            )
-            payment_count += 1
+def clear_database(database: str, plan: GenerationPlan) -> Dict[str, int]:
+    """Очищує таблиці бази."""
+    writer = BulkWriter(database, plan.method)
+    try:
+        writer.truncate(TABLES[database])
+    finally:
+        writer.close()
+    return {}
+
+def load_catalog(plan: GenerationPlan) -> Dict[str, int]:
+    """Наповнює Catalog DB категоріями та товарами."""
+    writer = BulkWriter('catalog', plan.method)
+    try:
+        counts = {'categories': writer.write('categories', category_rows(plan)), 'products': 0}
+        for start in range(0, plan.n_products, ROWS_PER_WRITE):
+            stop = min(start + ROWS_PER_WRITE, plan.n_products)
+            counts['products'] += writer.write('products', product_rows(plan, start, stop))
+    finally:
+        writer.close()
+    return counts
+
+def load_orders_dimensions(plan: GenerationPlan) -> Dict[str, int]:
+    """Наповнює Orders DB регіонами, співробітниками та клієнтами."""
+    writer = BulkWriter('orders', plan.method)
+    try:
+        counts = {
+            'regions': writer.write('regions', {
+                'id': plan.ids('region', 0, len(REGIONS)),
+                'name': [name for name, _ in REGIONS],
+                'code': [code for _, code in REGIONS],
+            }),
+            'employees': writer.write('employees', employee_rows(plan)),
+            'customers': 0,
+        }
+        for start in range(0, plan.n_customers, ROWS_PER_WRITE):
+            stop = min(start + ROWS_PER_WRITE, plan.n_customers)
+            counts['customers'] += writer.write('customers', customer_rows(plan, start, stop))
+    finally:
+        writer.close()
+    return counts
+
+def load_orders_range(plan: GenerationPlan, first_batch: int, last_batch: int) -> Dict[str, int]:
+    """Наповнює Orders DB замовленнями пакетів [first_batch, last_batch)."""
+    writer = BulkWriter('orders', plan.method)
+    counts = {'orders': 0, 'order_items': 0}
+    try:
+        for batch in range(first_batch, last_batch):
+            tables = order_batch(plan, batch)
+            counts['orders'] += writer.write('orders', tables['orders'])
+            counts['order_items'] += writer.write('order_items', tables['order_items'])
+    finally:
+        writer.close()
+    return counts
+
+def load_payments_range(plan: GenerationPlan, first_batch: int, last_batch: int) -> Dict[str, int]:
+    """Наповнює Payments DB платежами замовлень пакетів [first_batch, last_batch).
+    
+    Пакети генеруються повторно (тим самим seed), а не читаються з Orders DB.
+    """
+    writer = BulkWriter('payments', plan.method)
+    counts = {'payments': 0}
+    try:
+        for batch in range(first_batch, last_batch):
+            counts['payments'] += writer.write('payments', order_batch(plan, batch)['payments'])
+    finally:
+        writer.close()
+    return counts
+
+def load_auth(plan: GenerationPlan) -> Dict[str, int]:
+    """Наповнює Auth DB ролями, користувачами та токенами."""
+    writer = BulkWriter('auth', plan.method)
+    counts = {'roles': 0, 'auth_users': 0, 'auth_credentials': 0, 'user_roles': 0, 'auth_tokens': 0}
+    n_users = plan.n_employees + plan.n_customers + 1
+    try:
+        counts['roles'] = writer.write('roles', {
+            'id': plan.ids('role', 0, len(ROLES)),
+            'name': [name for name, _ in ROLES],
+            'comment': [comment for _, comment in ROLES],
+        })
+        for start in range(0, n_users, ROWS_PER_WRITE):
+            tables = auth_user_rows(plan, start, min(start + ROWS_PER_WRITE, n_users))
+            for table, columns in tables.items():
+                counts[table] += writer.write(table, columns)
+        counts['auth_tokens'] = writer.write('auth_tokens', token_rows(plan))
+    finally:
+        writer.close()
+    return counts
+
+def batch_ranges(n_batches: int, parts: int) -> List[tuple]:
+    """Ділить пакети на суцільні діапазони для процесів."""
+    size = max(1, math.ceil(n_batches / max(1, parts)))
+    return [(first, min(first + size, n_batches)) for first in range(0, n_batches, size)]
+
+def populate_oltp(plan: GenerationPlan, workers: int) -> Dict[str, int]:
+    """Паралельно наповнює чотири OLTP бази.
+    
+    Спочатку очищуються всі бази, потім виміри, замовлення та платежі
+    генеруються незалежними процесами.
     
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print(f" Payments DB populated: {payment_count} payments")
+    Returns:
+        Кількість записаних рядків за таблицями
+    """
+    totals: Dict[str, int] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        print(" Clearing existing OLTP data...")
+        for future in [executor.submit(clear_database, database, plan) for database in TABLES]:
+            future.result()
+        
+        # Діапазони дрібніші за кількість процесів, щоб вирівняти навантаження
+        ranges = batch_ranges(plan.n_batches, workers * 2)
+        tasks = {
+            executor.submit(load_catalog, plan): 'Catalog DB',
+            executor.submit(load_orders_dimensions, plan): 'Orders DB (dimensions)',
+            executor.submit(load_auth, plan): 'Auth DB',
+        }
+        for first, last in ranges:
+            tasks[executor.submit(load_orders_range, plan, first, last)] = f'Orders DB (batches {first}-{last - 1})'
+            tasks[executor.submit(load_payments_range, plan, first, last)] = f'Payments DB (batches {first}-{last - 1})'
+        
+        for future in as_completed(tasks):
+            counts = future.result()
+            for table, count in counts.items():
+                totals[table] = totals.get(table, 0) + count
+            print(f" {tasks[future]} populated: " + ', '.join(f'{count} {table}' for table, count in counts.items()))
+    return totals
 
 # ============================================
 # DWH Database Population (ETL Simulation)
 # ============================================
 
-def populate_dwh_db(catalog_data: Dict, orders_data: Dict):
-    """Наповнює DWH (імітація ETL процесу)"""
+def copy_rows(cursor, table: str, columns: List[str], rows: Iterable[Sequence]) -> int:
+    """Записує рядки в таблицю PostgreSQL через COPY FROM STDIN (CSV)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    return count
+
+def key_mapping(cursor, table: str, id_column: str, key_column: str) -> Dict[str, int]:
+    """Повертає відповідність id джерела -> сурогатний ключ виміру."""
+    cursor.execute(f"SELECT {id_column}, {key_column} FROM {table}")
+    return dict(cursor.fetchall())
+
+def populate_dwh_db(batch_size: int):
+    """Наповнює DWH (імітація ETL процесу) через COPY"""
     print(" Populating DWH DB (ETL simulation)...")
     
     # Підключення до DWH
-    dwh_conn = psycopg2.connect(
-        host='localhost',
-        port=5432,
-        user='dwh_user',
-        password='dwh_pass',
-        database='dwh_db'
-    )
+    dwh_conn = psycopg2.connect(**DWH_CONFIG)
     dwh_cursor = dwh_conn.cursor()
     
     # Очищення існуючих даних у DWH
     print("   - Clearing existing DWH data...")
-    dwh_cursor.execute("TRUNCATE TABLE fact_sales CASCADE")
-    dwh_cursor.execute("TRUNCATE TABLE dim_employee CASCADE")
-    dwh_cursor.execute("TRUNCATE TABLE dim_customer CASCADE")
-    dwh_cursor.execute("TRUNCATE TABLE dim_product CASCADE")
-    dwh_cursor.execute("TRUNCATE TABLE dim_category CASCADE")
-    dwh_cursor.execute("TRUNCATE TABLE dim_region CASCADE")
-    dwh_cursor.execute("TRUNCATE TABLE dim_date CASCADE")
+    dwh_cursor.execute(
+        "TRUNCATE TABLE fact_sales, dim_employee, dim_customer, dim_product, "
+        "dim_category, dim_region, dim_date CASCADE"
+    )
     dwh_conn.commit()
     
     # Підключення до OLTP баз
@@ -527,184 +833,143 @@ def populate_dwh_db(catalog_data: Dict, orders_data: Dict):
     orders_conn = mysql.connector.connect(**DB_CONFIGS['orders'])
     orders_cursor = orders_conn.cursor(dictionary=True, buffered=True)
     
+    now = datetime.now()
+    
     try:
         # 1. Populate dim_date (останні 2 роки)
         print("   - Building dim_date...")
         start_date = datetime.now() - timedelta(days=730)
-        for i in range(730):
-            current_date = start_date + timedelta(days=i)
-            date_key = int(current_date.strftime('%Y%m%d'))
-            dwh_cursor.execute("""
-                INSERT INTO dim_date (date_key, date, year, quarter, month, day, day_of_week, is_weekend)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (date_key) DO NOTHING
-            """, (
-                date_key,
-                current_date.date(),
-                current_date.year,
-                (current_date.month - 1) // 3 + 1,
-                current_date.month,
-                current_date.day,
-                current_date.weekday() + 1,
-                current_date.weekday() >= 5
-            ))
+        dates = [start_date + timedelta(days=i) for i in range(730)]
+        date_keys = {int(d.strftime('%Y%m%d')) for d in dates}
+        copy_rows(dwh_cursor, 'dim_date', [
+            'date_key', 'date', 'year', 'quarter', 'month', 'day', 'day_of_week', 'is_weekend'
+        ], (
+            (int(d.strftime('%Y%m%d')), d.date(), d.year, (d.month - 1) // 3 + 1,
+             d.month, d.day, d.weekday() + 1, d.weekday() >= 5)
+            for d in dates
+        ))
         
         # 2. Populate dim_region
         print("   - Building dim_region...")
         orders_cursor.execute("SELECT * FROM regions")
         regions = orders_cursor.fetchall()
-        region_mapping = {}
-        for region in regions:
-            dwh_cursor.execute("""
-                INSERT INTO dim_region (region_id, name, code, updated_at)
-                VALUES (%s, %s, %s, %s)
-                RETURNING region_key
-            """, (region['id'], region['name'], region['code'], datetime.now()))
-            region_mapping[region['id']] = dwh_cursor.fetchone()[0]
+        copy_rows(dwh_cursor, 'dim_region', ['region_id', 'name', 'code', 'updated_at'],
+                  ((r['id'], r['name'], r['code'], now) for r in regions))
+        region_mapping = key_mapping(dwh_cursor, 'dim_region', 'region_id', 'region_key')
         
-        # 3. Populate dim_category
+        # 3. Populate dim_category (батьківські категорії раніше за дочірні)
         print("   - Building dim_category...")
         catalog_cursor.execute("SELECT * FROM categories ORDER BY parent_category_id IS NULL DESC, parent_category_id")
         categories = catalog_cursor.fetchall()
-        category_mapping = {}
-        for category in categories:
-            parent_key = category_mapping.get(category['parent_category_id']) if category['parent_category_id'] else None
-            dwh_cursor.execute("""
-                INSERT INTO dim_category (category_id, name, parent_category_key, updated_at)
-                VALUES (%s, %s, %s, %s)
-                RETURNING category_key
-            """, (category['id'], category['name'], parent_key, datetime.now()))
-            category_mapping[category['id']] = dwh_cursor.fetchone()[0]
+        roots = [c for c in categories if not c['parent_category_id']]
+        children = [c for c in categories if c['parent_category_id']]
+        copy_rows(dwh_cursor, 'dim_category', ['category_id', 'name', 'parent_category_key', 'updated_at'],
+                  ((c['id'], c['name'], None, now) for c in roots))
+        category_mapping = key_mapping(dwh_cursor, 'dim_category', 'category_id', 'category_key')
+        copy_rows(dwh_cursor, 'dim_category', ['category_id', 'name', 'parent_category_key', 'updated_at'],
+                  ((c['id'], c['name'], category_mapping.get(c['parent_category_id']), now) for c in children))
+        category_mapping = key_mapping(dwh_cursor, 'dim_category', 'category_id', 'category_key')
         
         # 4. Populate dim_product
         print("   - Building dim_product...")
-        catalog_cursor.execute("SELECT * FROM products")
+        catalog_cursor.execute("SELECT id, name, sku, category_id FROM products")
         products = catalog_cursor.fetchall()
-        product_mapping = {}
-        for product in products:
-            dwh_cursor.execute("""
-                INSERT INTO dim_product (product_id, name, sku, category_key, updated_at)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING product_key
-            """, (
-                product['id'],
-                product['name'],
-                product['sku'],
-                category_mapping.get(product['category_id']),
-                datetime.now()
-            ))
-            product_mapping[product['id']] = dwh_cursor.fetchone()[0]
+        copy_rows(dwh_cursor, 'dim_product', ['product_id', 'name', 'sku', 'category_key', 'updated_at'],
+                  ((p['id'], p['name'], p['sku'], category_mapping.get(p['category_id']), now) for p in products))
+        product_mapping = key_mapping(dwh_cursor, 'dim_product', 'product_id', 'product_key')
         
-        # 5. Populate dim_customer
+        # 5. Populate dim_customer (регіон клієнта - за одним з його замовлень, одним запитом)
         print("   - Building dim_customer...")
-        orders_cursor.execute("SELECT * FROM customers")
+        orders_cursor.execute("SELECT customer_id, MIN(region_id) AS region_id FROM orders GROUP BY customer_id")
+        customer_regions = {row['customer_id']: row['region_id'] for row in orders_cursor.fetchall()}
+        orders_cursor.execute("SELECT id, first_name, last_name, email FROM customers")
         customers = orders_cursor.fetchall()
-        customer_mapping = {}
-        for customer in customers:
-            # Get customer's region from their first order (customers don't have direct region)
-            region_cursor = orders_conn.cursor(dictionary=True, buffered=True)
-            region_cursor.execute("""
-                SELECT region_id FROM orders WHERE customer_id = %s LIMIT 1
-            """, (customer['id'],))
-            order_region = region_cursor.fetchone()
-            region_cursor.close()
-            customer_region_key = region_mapping.get(order_region['region_id']) if order_region else None
-            
-            dwh_cursor.execute("""
-                INSERT INTO dim_customer (customer_id, first_name, last_name, email, region_key, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING customer_key
-            """, (
-                customer['id'],
-                customer['first_name'],
-                customer['last_name'],
-                customer['email'],
-                customer_region_key,
-                datetime.now()
-            ))
-            customer_mapping[customer['id']] = dwh_cursor.fetchone()[0]
+        copy_rows(dwh_cursor, 'dim_customer', [
+            'customer_id', 'first_name', 'last_name', 'email', 'region_key', 'updated_at'
+        ], (
+            (c['id'], c['first_name'], c['last_name'], c['email'],
+             region_mapping.get(customer_regions.get(c['id'])), now)
+            for c in customers
+        ))
+        customer_mapping = key_mapping(dwh_cursor, 'dim_customer', 'customer_id', 'customer_key')
         
         # 6. Populate dim_employee
         print("   - Building dim_employee...")
         orders_cursor.execute("SELECT * FROM employees")
         employees = orders_cursor.fetchall()
-        employee_mapping = {}
-        for employee in employees:
-            dwh_cursor.execute("""
-                INSERT INTO dim_employee (employee_id, first_name, last_name, email, region_key, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING employee_key
-            """, (
-                employee['id'],
-                employee['first_name'],
-                employee['last_name'],
-                employee['email'],
-                region_mapping.get(employee['region_id']),
-                datetime.now()
-            ))
-            employee_mapping[employee['id']] = dwh_cursor.fetchone()[0]
+        copy_rows(dwh_cursor, 'dim_employee', [
+            'employee_id', 'first_name', 'last_name', 'email', 'region_key', 'updated_at'
+        ], (
+            (e['id'], e['first_name'], e['last_name'], e['email'], region_mapping.get(e['region_id']), now)
+            for e in employees
+        ))
+        employee_mapping = key_mapping(dwh_cursor, 'dim_employee', 'employee_id', 'employee_key')
         
-        # 7. Populate fact_sales
+        # 7. Populate fact_sales (потоком пакетів, без буферизації всього результату)
         print("   - Building fact_sales...")
-        orders_cursor.execute("""
+        sales_cursor = orders_conn.cursor(dictionary=True, buffered=False)
+        sales_cursor.execute("""
             SELECT o.id as order_id, o.order_date, o.customer_id, o.employee_id,
                    o.region_id,
-                   oi.id as order_item_id, oi.product_id, oi.quantity, 
+                   oi.id as order_item_id, oi.product_id, oi.quantity,
                    oi.unit_price, oi.discount
             FROM orders o
             JOIN order_items oi ON o.id = oi.order_id
             WHERE o.status IN ('paid', 'shipped', 'delivered')
         """)
         
-        sales_count = 0
-        for sale in orders_cursor:
-            order_date = sale['order_date']
-            date_key = int(order_date.strftime('%Y%m%d'))
-            
-            # Перевірка чи існує date_key у dim_date
-            dwh_cursor.execute("SELECT 1 FROM dim_date WHERE date_key = %s", (date_key,))
-            if not dwh_cursor.fetchone():
+        def fact_rows(sales):
+            for sale in sales:
+                date_key = int(sale['order_date'].strftime('%Y%m%d'))
                 # Якщо дати немає в dim_date - пропускаємо цей запис
-                continue
-            
-            revenue = float(sale['unit_price']) * sale['quantity']
-            discount_amount = float(sale['discount']) if sale['discount'] else 0.0
-            cost = revenue * 0.6  # Припускаємо собівартість 60% від ціни
-            margin = revenue - discount_amount - cost
-            
-            dwh_cursor.execute("""
-                INSERT INTO fact_sales (
-                    order_id, order_item_id, date_key, product_key, customer_key,
-                    employee_key, region_key, quantity, revenue, discount_amount,
-                    cost, margin
+                if date_key not in date_keys:
+                    continue
+                
+                revenue = float(sale['unit_price']) * sale['quantity']
+                discount_amount = float(sale['discount']) if sale['discount'] else 0.0
+                cost = revenue * 0.6  # Припускаємо собівартість 60% від ціни
+                margin = revenue - discount_amount - cost
+                
+                yield (
+                    sale['order_id'],
+                    sale['order_item_id'],
+                    date_key,
+                    product_mapping.get(sale['product_id']),
+                    customer_mapping.get(sale['customer_id']),
+                    employee_mapping.get(sale['employee_id']),
+                    region_mapping.get(sale['region_id']),
+                    sale['quantity'],
+                    round(revenue, 2),
+                    round(discount_amount, 2),
+                    round(cost, 2),
+                    round(margin, 2)
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                sale['order_id'],
-                sale['order_item_id'],
-                date_key,
-                product_mapping.get(sale['product_id']),
-                customer_mapping.get(sale['customer_id']),
-                employee_mapping.get(sale['employee_id']),
-                region_mapping.get(sale['region_id']),
-                sale['quantity'],
-                revenue,
-                discount_amount,
-                cost,
-                margin
-            ))
-            sales_count += 1
+        
+        fact_columns = [
+            'order_id', 'order_item_id', 'date_key', 'product_key', 'customer_key',
+            'employee_key', 'region_key', 'quantity', 'revenue', 'discount_amount',
+            'cost', 'margin'
+        ]
+        sales_count = 0
+        try:
+            while True:
+                sales = sales_cursor.fetchmany(batch_size)
+                if not sales:
+                    break
+                sales_count += copy_rows(dwh_cursor, 'fact_sales', fact_columns, fact_rows(sales))
+        finally:
+            sales_cursor.close()
         
         dwh_conn.commit()
         print(f"   - DWH tables populated:")
-        print(f"     * dim_date: 730 days")
+        print(f"     * dim_date: {len(dates)} days")
         print(f"     * dim_region: {len(regions)}")
         print(f"     * dim_category: {len(categories)}")
         print(f"     * dim_product: {len(products)}")
         print(f"     * dim_customer: {len(customers)}")
         print(f"     * dim_employee: {len(employees)}")
         print(f"     * fact_sales: {sales_count}")
-        
+    
     finally:
         catalog_cursor.close()
         catalog_conn.close()
@@ -717,36 +982,61 @@ def populate_dwh_db(catalog_data: Dict, orders_data: Dict):
 # Main Execution
 # ============================================
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Розбирає аргументи командного рядка."""
+    parser = argparse.ArgumentParser(description='TechMarket Test Data Generator')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Множник обсягів (1 - 600 замовлень; ~55000 - ~100M позицій замовлень)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed для відтворюваності')
+    parser.add_argument('--batch-size', type=int, default=10_000,
+                        help='Замовлень в одному пакеті генерації та запису')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4,
+                        help='Кількість паралельних процесів')
+    parser.add_argument('--method', choices=('executemany', 'infile'), default='executemany',
+                        help='Запис у MySQL: executemany або LOAD DATA LOCAL INFILE '
+                             '(потрібен local_infile=ON на сервері)')
+    parser.add_argument('--end-date', type=date.fromisoformat,
+                        help='Остання дата замовлень, YYYY-MM-DD (за замовчуванням - сьогодні)')
+    parser.add_argument('--skip-dwh', action='store_true',
+                        help='Не наповнювати DWH (його наповнить ETL)')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
     """Головна функція для запуску генерації даних"""
+    args = parse_args(argv)
+    end_date = datetime.combine(args.end_date or date.today(), datetime.min.time())
+    plan = GenerationPlan(
+        scale=args.scale,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        end_date=end_date,
+        method=args.method
+    )
+    
     print("=" * 60)
     print(" TechMarket Test Data Generator")
+    print(f" scale={plan.scale}, seed={plan.seed}, workers={args.workers}, method={plan.method}")
     print("=" * 60)
     
+    started = time.perf_counter()
     try:
-        # 1. Catalog DB (незалежне)
-        catalog_data = populate_catalog_db()
+        totals = populate_oltp(plan, args.workers)
         
-        # 2. Orders DB (потребує product_ids)
-        orders_data = populate_orders_db(catalog_data['product_ids'])
-        
-        # 3. Auth DB (потребує customer_ids та employee_ids)
-        populate_auth_db(orders_data['customer_ids'], orders_data['employee_ids'])
-        
-        # 4. Payments DB (потребує order_ids)
-        populate_payments_db(orders_data['order_ids'])
-        
-        # 5. DWH DB (ETL імітація - потребує даних з Catalog та Orders)
-        populate_dwh_db(catalog_data, orders_data)
+        # DWH DB (ETL імітація - потребує даних з Catalog та Orders)
+        if not args.skip_dwh:
+            populate_dwh_db(args.batch_size)
         
+        elapsed = time.perf_counter() - started
         print("=" * 60)
-        print(" All databases populated successfully!")
+        print(f" All databases populated successfully in {elapsed:.1f}s!")
         print("=" * 60)
         print("\n Summary:")
-        print(f"  - Products: {len(catalog_data['product_ids'])}")
-        print(f"  - Customers: {len(orders_data['customer_ids'])}")
-        print(f"  - Employees: {len(orders_data['employee_ids'])}")
-        print(f"  - Orders: {len(orders_data['order_ids'])}")
+        print(f"  - Products: {totals.get('products', 0)}")
+        print(f"  - Customers: {totals.get('customers', 0)}")
+        print(f"  - Employees: {totals.get('employees', 0)}")
+        print(f"  - Orders: {totals.get('orders', 0)}")
+        print(f"  - Order items: {totals.get('order_items', 0)} ({totals.get('order_items', 0) / elapsed:,.0f} rows/s)")
+        print(f"  - Payments: {totals.get('payments', 0)}")
         print(f"\n Database connections:")
         print(f"  - Auth DB: localhost:3306")
         print(f"  - Catalog DB: localhost:3307")
@@ -754,7 +1044,7 @@ def main():
         print(f"  - Payments DB: localhost:3309")
         print(f"  - DWH DB: localhost:5432")
         print(f"\n Adminer: http://localhost:8080")
-        
+    
     except Exception as e:
         print(f" Error: {e}")
         import traceback
@@ -18,7 +18,8 @@ CREATE TABLE "dim_region" (
   "region_id" char(36),
   "name" varchar(100),
   "code" varchar(10),
-  "updated_at" timestamp
+  "updated_at" timestamp,
+  "row_hash" bigint
 );
 
 CREATE TABLE "dim_category" (
@@ -26,7 +27,8 @@ CREATE TABLE "dim_category" (
   "category_id" char(36),
   "name" varchar(255),
   "parent_category_key" int,
-  "updated_at" timestamp
+  "updated_at" timestamp,
+  "row_hash" bigint
 );
 
 CREATE TABLE "dim_product" (
@@ -35,7 +37,8 @@ CREATE TABLE "dim_product" (
   "name" varchar(255),
   "sku" varchar(100),
   "category_key" int,
-  "updated_at" timestamp
+  "updated_at" timestamp,
+  "row_hash" bigint
 );
 
 CREATE TABLE "dim_customer" (
@@ -45,7 +48,8 @@ CREATE TABLE "dim_customer" (
   "last_name" varchar(100),
   "email" varchar(255),
   "region_key" int,
-  "updated_at" timestamp
+  "updated_at" timestamp,
+  "row_hash" bigint
 );
 
 CREATE TABLE "dim_employee" (
@@ -55,14 +59,15 @@ CREATE TABLE "dim_employee" (
   "last_name" varchar(100),
   "email" varchar(255),
   "region_key" int,
-  "updated_at" timestamp
+  "updated_at" timestamp,
+  "row_hash" bigint
 );
 
 CREATE TABLE "fact_sales" (
-  "sales_key" BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  "sales_key" BIGINT GENERATED BY DEFAULT AS IDENTITY,
   "order_id" char(36),
   "order_item_id" char(36),
-  "date_key" int,
+  "date_key" int NOT NULL,
   "product_key" int,
   "customer_key" int,
   "employee_key" int,
@@ -71,13 +76,74 @@ CREATE TABLE "fact_sales" (
   "revenue" decimal(10,2),
   "discount_amount" decimal(10,2),
   "cost" decimal(10,2),
-  "margin" decimal(10,2)
+  "margin" decimal(10,2),
+  PRIMARY KEY ("sales_key", "date_key")
+) PARTITION BY RANGE ("date_key");
+
+-- Місячні партиції fact_sales_pYYYYMM створює ETL (etl.partitions)
+CREATE TABLE "fact_sales_default" PARTITION OF "fact_sales" DEFAULT;
+
+CREATE TABLE "agg_sales_daily" (
+  "date_key" int NOT NULL,
+  "region_key" int,
+  "orders_count" int NOT NULL,
+  "total_quantity" bigint,
+  "total_revenue" decimal(14,2),
+  "total_discount" decimal(14,2),
+  "total_margin" decimal(14,2)
+);
+
+CREATE TABLE "agg_sales_product" (
+  "date_key" int NOT NULL,
+  "product_key" int,
+  "region_key" int,
+  "orders_count" int NOT NULL,
+  "total_quantity" bigint,
+  "total_revenue" decimal(14,2),
+  "total_discount" decimal(14,2),
+  "total_margin" decimal(14,2)
+);
+
+CREATE TABLE "agg_sales_employee" (
+  "date_key" int NOT NULL,
+  "employee_key" int,
+  "orders_count" int NOT NULL,
+  "total_quantity" bigint,
+  "total_revenue" decimal(14,2),
+  "total_discount" decimal(14,2),
+  "total_margin" decimal(14,2)
+);
+
+CREATE TABLE "agg_sales_weekly" (
+  "period_start" date NOT NULL,
+  "region_key" int,
+  "orders_count" int NOT NULL,
+  "total_quantity" bigint,
+  "total_revenue" decimal(14,2),
+  "total_discount" decimal(14,2),
+  "total_margin" decimal(14,2)
+);
+
+CREATE TABLE "agg_sales_monthly" (
+  "period_start" date NOT NULL,
+  "region_key" int,
+  "orders_count" int NOT NULL,
+  "total_quantity" bigint,
+  "total_revenue" decimal(14,2),
+  "total_discount" decimal(14,2),
+  "total_margin" decimal(14,2)
 );
 
 CREATE UNIQUE INDEX ON "dim_region" ("code");
 
+CREATE UNIQUE INDEX ON "dim_region" ("region_id");
+
+CREATE UNIQUE INDEX ON "dim_category" ("category_id");
+
 CREATE UNIQUE INDEX ON "dim_product" ("sku");
 
+CREATE UNIQUE INDEX ON "dim_product" ("product_id");
+
 CREATE UNIQUE INDEX ON "dim_customer" ("customer_id");
 
 CREATE UNIQUE INDEX ON "dim_employee" ("employee_id");
@@ -92,12 +158,32 @@ CREATE INDEX ON "fact_sales" ("employee_key");
 
 CREATE INDEX ON "fact_sales" ("region_key");
 
+CREATE INDEX ON "agg_sales_daily" ("date_key");
+
+CREATE INDEX ON "agg_sales_product" ("date_key");
+
+CREATE INDEX ON "agg_sales_employee" ("date_key");
+
+CREATE INDEX ON "agg_sales_weekly" ("period_start");
+
+CREATE INDEX ON "agg_sales_monthly" ("period_start");
+
 COMMENT ON COLUMN "dim_date"."date_key" IS 'Формат YYYYMMDD';
 
 COMMENT ON COLUMN "dim_region"."region_id" IS 'Business key з OLTP';
 
 COMMENT ON COLUMN "dim_category"."parent_category_key" IS 'Nullable';
 
+COMMENT ON COLUMN "agg_sales_daily"."orders_count" IS 'COUNT(DISTINCT order_id)';
+
+COMMENT ON COLUMN "agg_sales_product"."orders_count" IS 'COUNT(DISTINCT order_id)';
+
+COMMENT ON COLUMN "agg_sales_employee"."orders_count" IS 'COUNT(DISTINCT order_id)';
+
+COMMENT ON COLUMN "agg_sales_weekly"."orders_count" IS 'COUNT(DISTINCT order_id)';
+
+COMMENT ON COLUMN "agg_sales_monthly"."orders_count" IS 'COUNT(DISTINCT order_id)';
+
 ALTER TABLE "dim_category" ADD FOREIGN KEY ("parent_category_key") REFERENCES "dim_category" ("category_key");
 
 ALTER TABLE "dim_product" ADD FOREIGN KEY ("category_key") REFERENCES "dim_category" ("category_key");
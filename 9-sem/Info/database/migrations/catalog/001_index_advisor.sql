@@ -0,0 +1,9 @@
+-- Міграція Catalog DB: індекси для запитів витягування ETL
+-- Згенеровано etl.index_advisor: ключ - колонки рівності, потім діапазону;
+-- покривні індекси містять усі колонки, які запит читає з таблиці.
+--
+-- Застосування:
+--   mysql -h localhost -P 3307 -u catalog_user -p catalog_db < database/migrations/catalog/001_index_advisor.sql
+
+-- extract_products
+CREATE INDEX `products_updated_at_idx` ON `products` (`updated_at`);
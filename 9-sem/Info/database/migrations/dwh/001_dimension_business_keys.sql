@@ -0,0 +1,12 @@
+-- Міграція DWH: унікальні індекси на business key вимірів
+-- Потрібні для Loader.upsert_dimension (INSERT ... ON CONFLICT (business key)).
+-- Нові інсталяції отримують ці індекси з database/init/05_dwh_schema.sql.
+--
+-- Застосування:
+--   psql -h localhost -U dwh_user -d dwh_db -f database/migrations/dwh/001_dimension_business_keys.sql
+
+CREATE UNIQUE INDEX IF NOT EXISTS "dim_region_region_id_idx" ON "dim_region" ("region_id");
+
+CREATE UNIQUE INDEX IF NOT EXISTS "dim_category_category_id_idx" ON "dim_category" ("category_id");
+
+CREATE UNIQUE INDEX IF NOT EXISTS "dim_product_product_id_idx" ON "dim_product" ("product_id");
@@ -0,0 +1,11 @@
+-- Міграція DWH: контрольна таблиця watermark'ів інкрементального ETL
+-- Таблицю також створює etl.watermark.WatermarkStore при першому зверненні.
+--
+-- Застосування:
+--   psql -h localhost -U dwh_user -d dwh_db -f database/migrations/dwh/002_etl_watermarks.sql
+
+CREATE TABLE IF NOT EXISTS "etl_watermarks" (
+  "source" varchar(100) PRIMARY KEY,
+  "watermark" timestamp NOT NULL,
+  "updated_at" timestamp NOT NULL DEFAULT now()
+);
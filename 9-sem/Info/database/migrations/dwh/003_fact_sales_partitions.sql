@@ -0,0 +1,89 @@
+-- Міграція DWH: партиціонування fact_sales за місяцями (RANGE по date_key)
+-- Повне завантаження ETL будує місячні партиції fact_sales_pYYYYMM у shadow
+-- таблицях і підміняє їх (etl.partitions.FactPartitionManager).
+-- Нові інсталяції отримують партиціоновану таблицю з database/init/05_dwh_schema.sql.
+--
+-- Застосування:
+--   psql -h localhost -U dwh_user -d dwh_db -f database/migrations/dwh/003_fact_sales_partitions.sql
+
+BEGIN;
+
+ALTER TABLE "fact_sales" RENAME TO "fact_sales_unpartitioned";
+
+CREATE TABLE "fact_sales" (
+  "sales_key" BIGINT GENERATED BY DEFAULT AS IDENTITY,
+  "order_id" char(36),
+  "order_item_id" char(36),
+  "date_key" int NOT NULL,
+  "product_key" int,
+  "customer_key" int,
+  "employee_key" int,
+  "region_key" int,
+  "quantity" int,
+  "revenue" decimal(10,2),
+  "discount_amount" decimal(10,2),
+  "cost" decimal(10,2),
+  "margin" decimal(10,2),
+  PRIMARY KEY ("sales_key", "date_key")
+) PARTITION BY RANGE ("date_key");
+
+CREATE TABLE "fact_sales_default" PARTITION OF "fact_sales" DEFAULT;
+
+-- Партиції для місяців, що вже є в даних
+DO $$
+DECLARE
+  month_start int;
+BEGIN
+  FOR month_start IN
+    SELECT DISTINCT "date_key" / 100 FROM "fact_sales_unpartitioned" WHERE "date_key" IS NOT NULL
+  LOOP
+    EXECUTE format(
+      'CREATE TABLE %I PARTITION OF "fact_sales" FOR VALUES FROM (%s) TO (%s)',
+      'fact_sales_p' || month_start,
+      month_start * 100,
+      CASE WHEN month_start % 100 = 12
+        THEN (month_start / 100 + 1) * 10000 + 100
+        ELSE (month_start + 1) * 100
+      END
+    );
+  END LOOP;
+END $$;
+
+INSERT INTO "fact_sales" (
+  "sales_key", "order_id", "order_item_id", "date_key", "product_key", "customer_key",
+  "employee_key", "region_key", "quantity", "revenue", "discount_amount", "cost", "margin"
+)
+SELECT
+  "sales_key", "order_id", "order_item_id", "date_key", "product_key", "customer_key",
+  "employee_key", "region_key", "quantity", "revenue", "discount_amount", "cost", "margin"
+FROM "fact_sales_unpartitioned"
+WHERE "date_key" IS NOT NULL;
+
+SELECT setval(
+  pg_get_serial_sequence('"fact_sales"', 'sales_key'),
+  GREATEST((SELECT max("sales_key") FROM "fact_sales"), 1)
+);
+
+DROP TABLE "fact_sales_unpartitioned";
+
+CREATE INDEX ON "fact_sales" ("date_key");
+
+CREATE INDEX ON "fact_sales" ("product_key");
+
+CREATE INDEX ON "fact_sales" ("customer_key");
+
+CREATE INDEX ON "fact_sales" ("employee_key");
+
+CREATE INDEX ON "fact_sales" ("region_key");
+
+ALTER TABLE "fact_sales" ADD FOREIGN KEY ("date_key") REFERENCES "dim_date" ("date_key");
+
+ALTER TABLE "fact_sales" ADD FOREIGN KEY ("product_key") REFERENCES "dim_product" ("product_key");
+
+ALTER TABLE "fact_sales" ADD FOREIGN KEY ("customer_key") REFERENCES "dim_customer" ("customer_key");
+
+ALTER TABLE "fact_sales" ADD FOREIGN KEY ("employee_key") REFERENCES "dim_employee" ("employee_key");
+
+ALTER TABLE "fact_sales" ADD FOREIGN KEY ("region_key") REFERENCES "dim_region" ("region_key");
+
+COMMIT;
@@ -0,0 +1,23 @@
+-- Міграція DWH: таблиця метрик кроків ETL запусків
+-- Таблицю також створює etl.metrics.MetricsStore при першому збереженні.
+--
+-- Застосування:
+--   psql -h localhost -U dwh_user -d dwh_db -f database/migrations/dwh/004_etl_run_metrics.sql
+
+CREATE TABLE IF NOT EXISTS "etl_run_metrics" (
+  "id" bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  "run_id" varchar(32) NOT NULL,
+  "run_type" varchar(20) NOT NULL,
+  "started_at" timestamp NOT NULL,
+  "stage" varchar(100) NOT NULL,
+  "step" varchar(50) NOT NULL,
+  "wall_seconds" double precision NOT NULL,
+  "rows" bigint NOT NULL,
+  "rows_per_sec" double precision NOT NULL,
+  "bytes" bigint NOT NULL,
+  "peak_rss_bytes" bigint NOT NULL,
+  "db_round_trips" integer NOT NULL,
+  "recorded_at" timestamp NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS "etl_run_metrics_run_id_idx" ON "etl_run_metrics" ("run_id");
@@ -0,0 +1,63 @@
+-- Міграція DWH: зведені таблиці продажів для дашбордів Metabase
+-- Таблиці також створює etl.aggregates.SalesAggregates при першому оновленні.
+-- Після міграції заповніть їх повним завантаженням ETL (run_etl.py --mode full).
+--
+-- Застосування:
+--   psql -h localhost -U dwh_user -d dwh_db -f database/migrations/dwh/005_sales_aggregates.sql
+
+CREATE TABLE IF NOT EXISTS "agg_sales_daily" (
+  "date_key" int NOT NULL,
+  "region_key" int,
+  "orders_count" int NOT NULL,
+  "total_quantity" bigint,
+  "total_revenue" decimal(14,2),
+  "total_discount" decimal(14,2),
+  "total_margin" decimal(14,2)
+);
+
+CREATE TABLE IF NOT EXISTS "agg_sales_product" (
+  "date_key" int NOT NULL,
+  "product_key" int,
+  "region_key" int,
+  "orders_count" int NOT NULL,
+  "total_quantity" bigint,
+  "total_revenue" decimal(14,2),
+  "total_discount" decimal(14,2),
+  "total_margin" decimal(14,2)
+);
+
+CREATE TABLE IF NOT EXISTS "agg_sales_employee" (
+  "date_key" int NOT NULL,
+  "employee_key" int,
+  "orders_count" int NOT NULL,
+  "total_quantity" bigint,
+  "total_revenue" decimal(14,2),
+  "total_discount" decimal(14,2),
+  "total_margin" decimal(14,2)
+);
+
+CREATE TABLE IF NOT EXISTS "agg_sales_weekly" (
+  "period_start" date NOT NULL,
+  "region_key" int,
+  "orders_count" int NOT NULL,
+  "total_quantity" bigint,
+  "total_revenue" decimal(14,2),
+  "total_discount" decimal(14,2),
+  "total_margin" decimal(14,2)
+);
+
+CREATE TABLE IF NOT EXISTS "agg_sales_monthly" (
+  "period_start" date NOT NULL,
+  "region_key" int,
+  "orders_count" int NOT NULL,
+  "total_quantity" bigint,
+  "total_revenue" decimal(14,2),
+  "total_discount" decimal(14,2),
+  "total_margin" decimal(14,2)
+);
+
+CREATE INDEX IF NOT EXISTS "agg_sales_daily_date_key_idx" ON "agg_sales_daily" ("date_key");
+CREATE INDEX IF NOT EXISTS "agg_sales_product_date_key_idx" ON "agg_sales_product" ("date_key");
+CREATE INDEX IF NOT EXISTS "agg_sales_employee_date_key_idx" ON "agg_sales_employee" ("date_key");
+CREATE INDEX IF NOT EXISTS "agg_sales_weekly_period_start_idx" ON "agg_sales_weekly" ("period_start");
+CREATE INDEX IF NOT EXISTS "agg_sales_monthly_period_start_idx" ON "agg_sales_monthly" ("period_start");
@@ -0,0 +1,17 @@
+-- Міграція DWH: контрольні точки запусків ETL (run_etl.py --resume)
+-- Таблицю також створює etl.checkpoints.CheckpointStore при першому запуску.
+--
+-- Застосування:
+--   psql -h localhost -U dwh_user -d dwh_db -f database/migrations/dwh/006_etl_checkpoints.sql
+
+CREATE TABLE IF NOT EXISTS "etl_checkpoints" (
+  "run_type" varchar(20) NOT NULL,
+  "stage" varchar(100) NOT NULL,
+  "chunk" int NOT NULL,
+  "rows" bigint NOT NULL DEFAULT 0,
+  "first_date_key" int,
+  "last_date_key" int,
+  "watermark" timestamp,
+  "completed_at" timestamp NOT NULL DEFAULT now(),
+  PRIMARY KEY ("run_type", "stage", "chunk")
+);
@@ -0,0 +1,12 @@
+-- Міграція DWH: хеш вмісту рядків вимірів (Loader.sync_dimension)
+-- Loader не змінює схему під час запуску: міграцію треба застосувати до першої синхронізації.
+-- Рядки з порожнім хешем вважаються зміненими й перезаписуються один раз.
+--
+-- Застосування:
+--   psql -h localhost -U dwh_user -d dwh_db -f database/migrations/dwh/007_dimension_row_hash.sql
+
+ALTER TABLE "dim_region" ADD COLUMN IF NOT EXISTS "row_hash" bigint;
+ALTER TABLE "dim_category" ADD COLUMN IF NOT EXISTS "row_hash" bigint;
+ALTER TABLE "dim_product" ADD COLUMN IF NOT EXISTS "row_hash" bigint;
+ALTER TABLE "dim_customer" ADD COLUMN IF NOT EXISTS "row_hash" bigint;
+ALTER TABLE "dim_employee" ADD COLUMN IF NOT EXISTS "row_hash" bigint;
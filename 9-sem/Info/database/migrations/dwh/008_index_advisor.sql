@@ -0,0 +1,15 @@
+-- Міграція DWH: індекси для запитів дашбордів Metabase
+-- Згенеровано etl.index_advisor: ключ - колонки рівності, потім діапазону;
+-- покривні індекси містять усі колонки, які запит читає з таблиці.
+--
+-- Застосування:
+--   psql -h localhost -U dwh_user -d dwh_db -f database/migrations/dwh/008_index_advisor.sql
+
+-- Revenue by Month, Orders by Region, Average Order Value, Margin Percentage
+CREATE INDEX IF NOT EXISTS "agg_sales_daily_date_key_cov_idx" ON "agg_sales_daily" ("date_key") INCLUDE ("total_revenue", "total_discount", "total_margin", "region_key", "orders_count");
+
+-- Top Products by Revenue
+CREATE INDEX IF NOT EXISTS "agg_sales_product_date_key_cov_idx" ON "agg_sales_product" ("date_key") INCLUDE ("total_revenue", "total_quantity", "total_margin", "product_key", "region_key");
+
+-- Revenue by Month, Average Order Value, Margin Percentage, Top Products by Revenue, Orders by Region
+CREATE INDEX IF NOT EXISTS "dim_date_date_cov_idx" ON "dim_date" ("date") INCLUDE ("year", "month", "date_key");
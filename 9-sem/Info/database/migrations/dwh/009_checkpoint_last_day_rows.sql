@@ -0,0 +1,8 @@
+-- Міграція DWH: рядки останнього дня чанку в контрольних точках (run_etl.py --resume)
+-- Продовження витягує день останнього чанку заново; без цієї кількості його рядки
+-- враховувались у кількості записів двічі. Контрольні точки до міграції (NULL) не віднімаються.
+--
+-- Застосування:
+--   psql -h localhost -U dwh_user -d dwh_db -f database/migrations/dwh/009_checkpoint_last_day_rows.sql
+
+ALTER TABLE "etl_checkpoints" ADD COLUMN IF NOT EXISTS "last_day_rows" bigint;
@@ -0,0 +1,18 @@
+-- Міграція Orders DB: індекси для запитів витягування ETL
+-- Згенеровано etl.index_advisor: ключ - колонки рівності, потім діапазону;
+-- покривні індекси містять усі колонки, які запит читає з таблиці.
+--
+-- Застосування:
+--   mysql -h localhost -P 3308 -u orders_user -p orders_db < database/migrations/orders/001_index_advisor.sql
+
+-- extract_customers
+CREATE INDEX `customers_updated_at_idx` ON `customers` (`updated_at`);
+
+-- extract_orders, extract_orders_stream, extract_orders_since
+CREATE INDEX `order_items_order_id_product_id_quantity_unit_pric_f37b352b_idx` ON `order_items` (`order_id`, `product_id`, `quantity`, `unit_price`, `discount`);
+
+-- extract_orders, extract_orders_stream
+CREATE INDEX `orders_status_order_date_idx` ON `orders` (`status`, `order_date`);
+
+-- extract_orders_since
+CREATE INDEX `orders_status_updated_at_idx` ON `orders` (`status`, `updated_at`);
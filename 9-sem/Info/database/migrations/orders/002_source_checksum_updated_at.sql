@@ -0,0 +1,8 @@
+-- Міграція Orders DB: індекс updated_at для маркерів змін staging кешу (Extractor.source_checksum)
+-- MAX(updated_at) без фільтра не може взяти індекс (status, updated_at) з 001_index_advisor.sql
+-- і обходив увесь індекс orders на кожній перевірці кешу; з індексом за updated_at це один пошук.
+--
+-- Застосування:
+--   mysql -h localhost -P 3308 -u orders_user -p orders_db < database/migrations/orders/002_source_checksum_updated_at.sql
+
+CREATE INDEX `orders_updated_at_idx` ON `orders` (`updated_at`);
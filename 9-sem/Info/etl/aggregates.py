@@ -0,0 +1,250 @@
+"""
+Модуль агрегатів продажів у DWH.
+
+Підтримує зведені таблиці продажів (за днем, тижнем, місяцем, товаром та
+співробітником), щоб дашборди Metabase читали невеликі агрегати замість
+сканування fact_sales.
+
+Усі зведення мають денну гранулярність або збираються з денного агрегату,
+тож інкрементальне завантаження перераховує лише дні, яких торкнувся пакет.
+День перераховується повністю з fact_sales, тому COUNT(DISTINCT order_id)
+лишається точним, а замінені (не лише нові) рядки фактів враховуються
+без віднімання старих значень.
+"""
+
+import logging
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from .load import Loader
+
+logger = logging.getLogger(__name__)
+
+FACT_TABLE = 'fact_sales'
+
+# Зведення з денною гранулярністю: таблиця -> колонки групування, крім date_key
+DAILY_AGGREGATES = {
+    'agg_sales_daily': ('region_key',),
+    'agg_sales_product': ('product_key', 'region_key'),
+    'agg_sales_employee': ('employee_key',),
+}
+
+# Зведення, що збираються з agg_sales_daily: таблиця -> період date_trunc
+PERIOD_AGGREGATES = {
+    'agg_sales_weekly': 'week',
+    'agg_sales_monthly': 'month',
+}
+
+# Міри зведень: колонка -> вираз над fact_sales
+MEASURES = {
+    'orders_count': 'COUNT(DISTINCT f."order_id")',
+    'total_quantity': 'SUM(f."quantity")',
+    'total_revenue': 'SUM(f."revenue")',
+    'total_discount': 'SUM(f."discount_amount")',
+    'total_margin': 'SUM(f."margin")',
+}
+
+# Ключ advisory lock перерахунку зведень: паралельні вікна backfill
+# перераховують спільні тижні та місяці по черзі
+REFRESH_LOCK_KEY = 7_305_001
+
+MEASURE_TYPES = {
+    'orders_count': 'int NOT NULL',
+    'total_quantity': 'bigint',
+    'total_revenue': 'decimal(14,2)',
+    'total_discount': 'decimal(14,2)',
+    'total_margin': 'decimal(14,2)',
+}
+
+
+def affected_days(date_keys: Iterable) -> list[int]:
+    """Повертає відсортовані date_key (YYYYMMDD), яких торкається пакет."""
+    keys = pd.to_numeric(pd.Series(date_keys, dtype=object), errors='coerce').dropna()
+    return sorted(int(key) for key in np.unique(keys.astype(np.int64).to_numpy()))
+
+
+def period_starts(days: list[int], period: str) -> list[pd.Timestamp]:
+    """Повертає початки тижнів (понеділок) або місяців для date_key.
+    
+    Args:
+        days: date_key у форматі YYYYMMDD
+        period: 'week' або 'month' (як у date_trunc PostgreSQL)
+    
+    Returns:
+        Відсортовані унікальні дати початку періодів
+    """
+    dates = pd.to_datetime(pd.Series(days, dtype='int64').astype(str), format='%Y%m%d')
+    if period == 'week':
+        starts = dates - pd.to_timedelta(dates.dt.weekday, unit='D')
+    elif period == 'month':
+        starts = dates.dt.to_period('M').dt.to_timestamp()
+    else:
+        raise ValueError(f"Невідомий період агрегації: {period}")
+    return sorted(starts.unique())
+
+
+def _date_key(value: pd.Timestamp) -> int:
+    """Перетворює дату на date_key (YYYYMMDD)."""
+    return value.year * 10000 + value.month * 100 + value.day
+
+
+class SalesAggregates:
+    """Підтримує зведені таблиці продажів у DWH.
+    
+    Attributes:
+        loader: Лоадер з підключенням до DWH
+    """
+    
+    def __init__(self, loader: Loader):
+        """Ініціалізує менеджер агрегатів.
+        
+        Args:
+            loader: Лоадер з підключенням до DWH
+        """
+        self.loader = loader
+        self._tables_ready = False
+    
+    def _ensure_tables(self, conn: Connection) -> None:
+        """Створює зведені таблиці, якщо їх ще немає."""
+        if self._tables_ready:
+            return
+        measures = ', '.join(f'"{column}" {sql_type}' for column, sql_type in MEASURE_TYPES.items())
+        for table, group_columns in DAILY_AGGREGATES.items():
+            groups = ''.join(f'"{column}" int, ' for column in group_columns)
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ("date_key" int NOT NULL, {groups}{measures})'
+            ))
+            conn.execute(text(f'CREATE INDEX IF NOT EXISTS "{table}_date_key_idx" ON "{table}" ("date_key")'))
+        for table in PERIOD_AGGREGATES:
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{table}" '
+                f'("period_start" date NOT NULL, "region_key" int, {measures})'
+            ))
+            conn.execute(text(
+                f'CREATE INDEX IF NOT EXISTS "{table}_period_start_idx" ON "{table}" ("period_start")'
+            ))
+        self._tables_ready = True
+    
+    def refresh(self, date_keys: Iterable) -> int:
+        """Перераховує зведення для днів пакета фактів.
+        
+        Викликається після запису пакета в fact_sales. Дата факту не
+        змінюється (див. Loader.replace_fact_rows), тож зачеплені дні
+        визначаються date_key самого пакета.
+        
+        Args:
+            date_keys: Колонка date_key записаних фактів
+        
+        Returns:
+            Кількість перерахованих днів
+        """
+        days = affected_days(date_keys)
+        if not days:
+            return 0
+        
+        self._rebuild(days)
+        logger.info(f"Агрегати продажів оновлено для {len(days)} днів ({days[0]} - {days[-1]})")
+        return len(days)
+    
+    def rebuild(self) -> None:
+        """Повністю перебудовує зведення з fact_sales (після повного завантаження)."""
+        self._rebuild(None)
+        logger.info("Агрегати продажів перебудовано повністю")
+    
+    def _rebuild(self, days: Optional[list[int]]) -> None:
+        """Перебудовує зведення для днів (None - для всієї fact_sales) в одній транзакції."""
+        try:
+            with self.loader.engine.begin() as conn:
+                conn.execute(text('SELECT pg_advisory_xact_lock(:key)'), {"key": REFRESH_LOCK_KEY})
+                self._ensure_tables(conn)
+                for table, group_columns in DAILY_AGGREGATES.items():
+                    self._refresh_daily(conn, table, group_columns, days)
+                for table, period in PERIOD_AGGREGATES.items():
+                    self._refresh_period(conn, table, period, days)
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка оновлення агрегатів продажів: {e}")
+            raise
+    
+    @staticmethod
+    def _refresh_daily(
+        conn: Connection,
+        table: str,
+        group_columns: tuple[str, ...],
+        days: Optional[list[int]]
+    ) -> None:
+        """Замінює рядки денного зведення для днів перерахунком з fact_sales."""
+        columns = ['date_key', *group_columns]
+        column_list = ', '.join(f'"{column}"' for column in [*columns, *MEASURES])
+        select_list = ', '.join(
+            [f'f."{column}"' for column in columns]
+            + list(MEASURES.values())
+        )
+        group_by = ', '.join(f'f."{column}"' for column in columns)
+        params = {}
+        
+        if days is None:
+            conn.execute(text(f'TRUNCATE TABLE "{table}"'))
+            where = ''
+        else:
+            params['days'] = days
+            conn.execute(text(f'DELETE FROM "{table}" WHERE "date_key" = ANY(:days)'), params)
+            where = ' WHERE f."date_key" = ANY(:days)'
+        
+        conn.execute(
+            text(
+                f'INSERT INTO "{table}" ({column_list}) '
+                f'SELECT {select_list} FROM "{FACT_TABLE}" f{where} GROUP BY {group_by}'
+            ),
+            params
+        )
+    
+    @staticmethod
+    def _refresh_period(
+        conn: Connection,
+        table: str,
+        period: str,
+        days: Optional[list[int]]
+    ) -> None:
+        """Замінює рядки тижневого/місячного зведення сумами денного.
+        
+        Усі рядки замовлення мають одну дату, тож кількість замовлень
+        періоду - це сума денних кількостей.
+        """
+        start = f"date_trunc('{period}', to_date(d.\"date_key\"::text, 'YYYYMMDD'))::date"
+        column_list = ', '.join(f'"{column}"' for column in ['period_start', 'region_key', *MEASURES])
+        sums = ', '.join(f'SUM(d."{column}")' for column in MEASURES)
+        params = {}
+        
+        if days is None:
+            conn.execute(text(f'TRUNCATE TABLE "{table}"'))
+            where = ''
+        else:
+            starts = period_starts(days, period)
+            offset = pd.DateOffset(weeks=1) if period == 'week' else pd.DateOffset(months=1)
+            params = {
+                'periods': [value.date() for value in starts],
+                'lower': _date_key(starts[0]),
+                'upper': _date_key(starts[-1] + offset),
+            }
+            conn.execute(
+                text(f'DELETE FROM "{table}" WHERE "period_start" = ANY(:periods)'),
+                {'periods': params['periods']}
+            )
+            # Діапазон date_key дає змогу використати індекс денного зведення
+            where = (
+                ' WHERE d."date_key" >= :lower AND d."date_key" < :upper '
+                f'AND {start} = ANY(:periods)'
+            )
+        
+        conn.execute(
+            text(
+                f'INSERT INTO "{table}" ({column_list}) '
+                f'SELECT {start}, d."region_key", {sums} FROM "agg_sales_daily" d{where} GROUP BY 1, 2'
+            ),
+            params
+        )
@@ -0,0 +1,111 @@
+"""
+Модуль планування backfill інкрементального завантаження.
+
+Період розбивається на непересічні вікна (день або тиждень), кожне з яких
+завантажується окремим викликом ETLPipeline.run_incremental_load. В Airflow
+(DAG techmarket_etl_backfill) вікна - динамічно розгорнуті task'и, що
+виконуються паралельно в межах пулу, а їх результати зводяться в один
+підсумок (merge_results).
+
+Вікна не перетинаються навіть на межі: кінець вікна - остання мікросекунда
+перед початком наступного, тож паралельні task'и не замінюють одні й ті ж
+рядки fact_sales.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Mapping, Optional
+
+import pandas as pd
+
+# Гранулярність вікон backfill
+GRANULARITIES = ('day', 'week')
+
+
+@dataclass(frozen=True)
+class BackfillWindow:
+    """Вікно backfill: замовлення з order_date від start_date до end_date включно.
+    
+    Attributes:
+        start_date: Початок вікна (північ першого дня)
+        end_date: Кінець вікна (остання мікросекунда останнього дня)
+    """
+    start_date: datetime
+    end_date: datetime
+    
+    @property
+    def key(self) -> str:
+        """Ідентифікатор вікна (YYYYMMDD-YYYYMMDD), наприклад для контрольних точок."""
+        return f"{self.start_date:%Y%m%d}-{self.end_date:%Y%m%d}"
+    
+    def date_keys(self) -> list[int]:
+        """Усі date_key вікна."""
+        days = pd.date_range(self.start_date.date(), self.end_date.date())
+        return [int(day.strftime('%Y%m%d')) for day in days]
+    
+    def to_dict(self) -> dict[str, str]:
+        """Серіалізує вікно для XCom (op_kwargs розгорнутого task)."""
+        return {'start_date': self.start_date.isoformat(), 'end_date': self.end_date.isoformat()}
+    
+    @classmethod
+    def from_dict(cls, data: Mapping[str, str]) -> 'BackfillWindow':
+        """Відновлює вікно з результату to_dict."""
+        return cls(datetime.fromisoformat(data['start_date']), datetime.fromisoformat(data['end_date']))
+
+
+def backfill_windows(
+    start_date: datetime,
+    end_date: datetime,
+    granularity: str = 'day'
+) -> list[BackfillWindow]:
+    """Розбиває період на вікна backfill.
+    
+    Тижневі вікна вирівнюються по понеділку (як agg_sales_weekly), тож
+    перше та останнє вікна можуть бути коротшими за тиждень.
+    
+    Args:
+        start_date: Перший день періоду
+        end_date: Останній день періоду (включно)
+        granularity: 'day' або 'week'
+    
+    Returns:
+        Вікна в хронологічному порядку
+    
+    Raises:
+        ValueError: Якщо гранулярність невідома або період порожній
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Невідома гранулярність backfill: {granularity} (очікується {GRANULARITIES})")
+    
+    first = datetime.combine(start_date.date(), datetime.min.time())
+    stop = datetime.combine(end_date.date(), datetime.min.time()) + timedelta(days=1)
+    if first >= stop:
+        raise ValueError("Початкова дата backfill не може бути пізніше кінцевої")
+    
+    windows = []
+    current = first
+    while current < stop:
+        if granularity == 'week':
+            following = current + timedelta(days=7 - current.weekday())
+        else:
+            following = current + timedelta(days=1)
+        following = min(following, stop)
+        windows.append(BackfillWindow(current, following - timedelta(microseconds=1)))
+        current = following
+    return windows
+
+
+def merge_results(results: Iterable[Optional[Mapping[str, int]]]) -> dict[str, int]:
+    """Зводить кількості записів вікон у підсумок за таблицями.
+    
+    Args:
+        results: Результати вікон (None - вікно без результату)
+    
+    Returns:
+        Сума записів для кожної таблиці
+    """
+    summary: dict[str, int] = {}
+    for result in results:
+        for table, count in (result or {}).items():
+            summary[table] = summary.get(table, 0) + int(count)
+    return summary
@@ -0,0 +1,10 @@
+"""
+Бенчмарки продуктивності ETL.
+
+Скрипти запускаються як модулі, наприклад:
+    python -m etl.benchmarks.load_methods --rows 1000000
+    python -m etl.benchmarks.pipeline --scale 100000 1000000 --mode both
+
+Синтетичні джерела OLTP для бенчмарків - у модулі synthetic, їх запис в
+одноразові MySQL бази - у модулі mysql_source.
+"""
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк рушіїв трансформації: pandas проти Polars та DuckDB.
+
+Трансформує синтетичні замовлення (SyntheticSource) кожним встановленим
+рушієм, вимірює найкращий час кожного кроку та перевіряє, що результат
+збігається з pandas. Рушії, пакетів яких немає, пропускаються.
+
+Використання:
+    python -m etl.benchmarks.frame_engines --rows 5000000 --repeat 3
+"""
+
+import argparse
+import logging
+import sys
+import time
+from typing import Any, Callable
+
+import pandas as pd
+
+from etl.benchmarks.synthetic import SyntheticSource
+from etl.frame_engines import FRAME_ENGINES
+from etl.transform import DataTransformer
+
+logger = logging.getLogger(__name__)
+
+
+def transform_steps(transformer: DataTransformer) -> dict[str, Callable[[pd.DataFrame], pd.DataFrame]]:
+    """Повертає кроки трансформації, що вимірюються (крок -> функція від замовлень)."""
+    return {
+        'remove_duplicates': lambda df: transformer.cleaner.remove_duplicates(df, subset=['order_id', 'product_id']),
+        'handle_missing_values': lambda df: transformer.cleaner.handle_missing_values(df, strategy='drop'),
+        'transform_orders': transformer.transform_orders,
+        'aggregate_sales_by_period': lambda df: transformer.aggregate_sales_by_period(df.copy(deep=False), 'W'),
+        'aggregate_sales_by_product': transformer.aggregate_sales_by_product,
+        'aggregate_sales_by_employee': transformer.aggregate_sales_by_employee,
+    }
+
+
+def run_engine(name: str, orders: pd.DataFrame, transformed: pd.DataFrame, repeat: int) -> dict[str, Any]:
+    """Виконує кроки трансформації рушієм і вимірює найкращий час.
+    
+    Args:
+        name: Назва рушія
+        orders: Витягнуті замовлення
+        transformed: Замовлення після transform_orders (вхід агрегацій)
+        repeat: Кількість повторів кожного кроку
+    
+    Returns:
+        Словник {'seconds': {крок: с}, 'results': {крок: DataFrame}}
+    """
+    transformer = DataTransformer(frame_engine=name)
+    seconds, results = {}, {}
+    for step, function in transform_steps(transformer).items():
+        source = transformed if step.startswith('aggregate') else orders
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results[step] = function(source)
+            timings.append(time.perf_counter() - started)
+        seconds[step] = min(timings)
+        logger.info(f"{name} {step}: {seconds[step]:.3f} с")
+    return {'seconds': seconds, 'results': results}
+
+
+def mismatches(results: dict[str, pd.DataFrame], expected: dict[str, pd.DataFrame]) -> list[str]:
+    """Повертає кроки, результат яких відрізняється від pandas."""
+    failed = []
+    for step, frame in results.items():
+        try:
+            pd.testing.assert_frame_equal(frame, expected[step], check_exact=False)
+        except AssertionError as e:
+            logger.error(f"{step}: результат відрізняється від pandas: {e}")
+            failed.append(step)
+    return failed
+
+
+def main() -> int:
+    """Головна функція.
+    
+    Returns:
+        Код виходу (0 - успіх, 1 - результат рушія відрізняється від pandas)
+    """
+    parser = argparse.ArgumentParser(description='Бенчмарк рушіїв трансформації')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Кількість позицій замовлень')
+    parser.add_argument('--repeat', type=int, default=3, help='Кількість повторів')
+    parser.add_argument('--seed', type=int, default=42, help='Seed генератора')
+    parser.add_argument('--engines', nargs='+', choices=FRAME_ENGINES, default=list(FRAME_ENGINES),
+                        help='Рушії для порівняння')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    source = SyntheticSource(args.rows, seed=args.seed)
+    orders = source.order_items(0, source.scale)
+    transformed = DataTransformer().transform_orders(orders)
+    
+    engines = {}
+    for name in dict.fromkeys(['pandas', *args.engines]):
+        try:
+            engines[name] = run_engine(name, orders, transformed, args.repeat)
+        except ImportError as e:
+            logger.warning(f"Рушій {name} пропущено: {e}")
+    
+    failed = False
+    print(f"Позицій замовлень: {len(orders):,}")
+    for step in engines['pandas']['seconds']:
+        baseline = engines['pandas']['seconds'][step]
+        timings = ', '.join(
+            f"{name} {result['seconds'][step]:.3f} с (x{baseline / max(result['seconds'][step], 1e-9):.1f})"
+            for name, result in engines.items()
+        )
+        print(f"  {step:>28}: {timings}")
+    for name, result in engines.items():
+        if name != 'pandas' and mismatches(result['results'], engines['pandas']['results']):
+            failed = True
+            print(f"  РОЗБІЖНІСТЬ {name}: результат відрізняється від pandas")
+    
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
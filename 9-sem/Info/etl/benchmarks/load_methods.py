@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк способів запису в DWH: multi-row INSERT проти COPY FROM STDIN.
+
+Генерує синтетичні рядки fact_sales та завантажує їх у тимчасову таблицю
+DWH кожним способом, вимірюючи пропускну здатність.
+
+Використання:
+    python -m etl.benchmarks.load_methods --rows 1000000 --repeat 3
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from etl.config import ETLConfig
+from etl.load import Loader, LOAD_METHODS
+
+logger = logging.getLogger(__name__)
+
+BENCH_TABLE = 'bench_fact_sales'
+
+
+def generate_fact_rows(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Генерує синтетичні рядки fact_sales.
+    
+    Args:
+        rows: Кількість рядків
+        seed: Seed генератора для відтворюваності
+        
+    Returns:
+        DataFrame з колонками fact_sales
+    """
+    rng = np.random.default_rng(seed)
+    quantity = rng.integers(1, 10, rows)
+    revenue = np.round(rng.uniform(10, 5000, rows), 2)
+    discount = np.round(revenue * rng.choice([0, 0.05, 0.1], rows), 2)
+    cost = np.round(revenue * 0.6, 2)
+    
+    return pd.DataFrame({
+        'order_id': [f'{i:036d}' for i in rng.integers(0, rows // 3 + 1, rows)],
+        'order_item_id': [f'{i:036d}' for i in range(rows)],
+        'date_key': 20240101 + rng.integers(0, 28, rows),
+        'product_key': rng.integers(1, 1000, rows),
+        'customer_key': rng.integers(1, 10000, rows),
+        'employee_key': rng.integers(1, 50, rows),
+        'region_key': rng.integers(1, 10, rows),
+        'quantity': quantity,
+        'revenue': revenue,
+        'discount_amount': discount,
+        'cost': cost,
+        'margin': np.round(revenue - discount - cost, 2)
+    })
+
+
+def run_benchmark(loader: Loader, df: pd.DataFrame, repeat: int) -> dict[str, float]:
+    """Завантажує DataFrame кожним способом і вимірює найкращий час.
+    
+    Args:
+        loader: Лоадер з підключенням до DWH
+        df: Дані для завантаження
+        repeat: Кількість повторів для кожного способу
+        
+    Returns:
+        Словник (спосіб: рядків за секунду)
+    """
+    results = {}
+    for method in LOAD_METHODS:
+        loader.load_method = method
+        timings = []
+        for _ in range(repeat):
+            with loader.engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+            # Створюємо порожню таблицю, щоб не вимірювати DDL
+            df.head(0).to_sql(BENCH_TABLE, loader.engine, index=False)
+            
+            started = time.perf_counter()
+            loader.load_dimension(df, BENCH_TABLE, if_exists='append')
+            timings.append(time.perf_counter() - started)
+        
+        best = min(timings)
+        results[method] = len(df) / best
+        logger.info(f"{method}: {best:.2f} с, {results[method]:,.0f} рядків/с")
+    
+    with loader.engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+    return results
+
+
+def main() -> int:
+    """Головна функція.
+    
+    Returns:
+        Код виходу (0 - успіх)
+    """
+    parser = argparse.ArgumentParser(description='Бенчмарк INSERT vs COPY для DWH')
+    parser.add_argument('--rows', type=int, default=100_000, help='Кількість рядків')
+    parser.add_argument('--repeat', type=int, default=3, help='Кількість повторів')
+    parser.add_argument('--seed', type=int, default=42, help='Seed генератора')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    config = ETLConfig.from_env()
+    loader = Loader(config.dwh_db)
+    
+    try:
+        df = generate_fact_rows(args.rows, args.seed)
+        results = run_benchmark(loader, df, args.repeat)
+    finally:
+        loader.close()
+    
+    speedup = results['copy'] / results['insert']
+    print(f"Рядків: {args.rows:,}")
+    for method, rate in results.items():
+        print(f"  {method:>6}: {rate:>12,.0f} рядків/с")
+    print(f"  COPY швидше в {speedup:.1f} раз(и)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Одноразові MySQL бази-замінники OLTP для бенчмарку ETL.
+
+SyntheticSource записується в Orders DB та Catalog DB зі схемою репозиторію
+(database/init та міграції, зокрема індекси index advisor), тож бенчмарк
+вимірює справжній шлях читання: SQL екстракторів, server-side курсори
+(stream_results/fetchmany), шардування та pushdown.
+
+Бази перезаписуються повністю, тому назва кожної має містити BENCH_MARKER.
+"""
+
+import logging
+import re
+from datetime import datetime
+from typing import Any
+
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from etl.benchmarks.synthetic import SyntheticSource
+from etl.config import DatabaseConfig
+from etl.index_advisor import REPO_ROOT, SOURCE_DATABASES
+
+logger = logging.getLogger(__name__)
+
+# Обов'язкова частина назви бази, яку бенчмарк може перезаписати
+BENCH_MARKER = 'bench'
+
+# Колонки, які читають екстрактори, але яких немає в DDL database/init
+EXTRA_COLUMNS: dict[str, dict[str, str]] = {
+    'employees': {'phone': 'varchar(50)', 'created_at': 'datetime'},
+    'categories': {'created_at': 'datetime'},
+    'products': {'description': 'text', 'stock_quantity': 'integer'},
+}
+
+# Колонка синтетичного DataFrame -> колонка таблиці OLTP
+REGION_COLUMNS = {'region_id': 'id', 'region_name': 'name', 'region_code': 'code'}
+CUSTOMER_COLUMNS = {
+    'customer_id': 'id', 'first_name': 'first_name', 'last_name': 'last_name',
+    'email': 'email', 'phone': 'phone', 'created_at': 'created_at', 'updated_at': 'updated_at',
+}
+EMPLOYEE_COLUMNS = {
+    'employee_id': 'id', 'first_name': 'first_name', 'last_name': 'last_name', 'email': 'email',
+    'phone': 'phone', 'is_manager': 'is_manager', 'region_id': 'region_id', 'created_at': 'created_at',
+}
+CATEGORY_COLUMNS = {
+    'category_id': 'id', 'category_name': 'name', 'parent_category_id': 'parent_category_id',
+    'created_at': 'created_at',
+}
+PRODUCT_COLUMNS = {
+    'product_id': 'id', 'product_name': 'name', 'sku': 'sku', 'description': 'description',
+    'price': 'price', 'stock_quantity': 'stock_quantity', 'category_id': 'category_id',
+    'created_at': 'created_at', 'updated_at': 'updated_at',
+}
+ORDER_COLUMNS = {
+    'order_id': 'id', 'customer_id': 'customer_id', 'employee_id': 'employee_id',
+    'region_id': 'region_id', 'order_date': 'order_date', 'status': 'status',
+    'total_amount': 'total_amount', 'created_at': 'created_at', 'updated_at': 'updated_at',
+}
+ORDER_ITEM_COLUMNS = {
+    'order_item_id': 'id', 'order_id': 'order_id', 'product_id': 'product_id',
+    'quantity': 'quantity', 'unit_price': 'unit_price', 'discount': 'discount',
+}
+
+# Рядків в одному multi-row INSERT
+INSERT_ROWS = 5000
+
+
+def check_disposable(config: DatabaseConfig) -> None:
+    """Перевіряє, що базу можна перезаписати бенчмарком.
+    
+    Args:
+        config: Конфігурація бази
+    
+    Raises:
+        ValueError: Якщо назва бази не містить BENCH_MARKER
+    """
+    if BENCH_MARKER not in config.database.lower():
+        raise ValueError(
+            f"База {config.database} на {config.host}:{config.port} не схожа на одноразову: "
+            f"бенчмарк перезаписує її, тож назва має містити '{BENCH_MARKER}'"
+        )
+
+
+def split_statements(sql: str) -> list[str]:
+    """Ділить SQL скрипт на інструкції.
+    
+    Інструкція закінчується ';' в кінці рядка (у COMMENT колонок ';'
+    трапляється всередині рядка), рядки-коментарі '--' відкидаються.
+    
+    Args:
+        sql: Текст SQL файлу
+    
+    Returns:
+        Непорожні інструкції без завершальної ';'
+    """
+    lines = [line for line in sql.splitlines() if not line.lstrip().startswith('--')]
+    statements = re.split(r';[ \t]*$', '\n'.join(lines), flags=re.MULTILINE)
+    return [statement.strip() for statement in statements if statement.strip()]
+
+
+def schema_statements(database: str) -> list[str]:
+    """Повертає DDL бази з репозиторію: схема database/init, потім міграції.
+    
+    Args:
+        database: Ключ SOURCE_DATABASES ('orders_db' або 'catalog_db')
+    
+    Returns:
+        Інструкції в порядку застосування
+    """
+    source = SOURCE_DATABASES[database]
+    paths = [REPO_ROOT / 'database' / 'init' / source.schema_file]
+    paths += sorted((REPO_ROOT / 'database' / 'migrations' / source.migrations).glob('*.sql'))
+    return [statement for path in paths for statement in split_statements(path.read_text(encoding='utf-8'))]
+
+
+def table_rows(df: pd.DataFrame, columns: dict[str, str]) -> list[dict[str, Any]]:
+    """Перетворює DataFrame на рядки таблиці OLTP для executemany.
+    
+    Колонки перейменовуються за columns, значення - Python типи драйвера
+    (numpy скаляри та Timestamp pymysql не екранує як числа й дати).
+    
+    Args:
+        df: Синтетичний DataFrame
+        columns: Колонка DataFrame -> колонка таблиці
+    
+    Returns:
+        Словники колонка таблиці -> значення
+    """
+    values = {}
+    for source_column, column in columns.items():
+        series = df[source_column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values[column] = [None if pd.isna(value) else value.to_pydatetime() for value in series]
+        else:
+            values[column] = [None if pd.isna(value) else value for value in series.tolist()]
+    return [dict(zip(values, row)) for row in zip(*values.values())]
+
+
+def _insert(
+    conn: Connection,
+    table: str,
+    df: pd.DataFrame,
+    columns: dict[str, str],
+    upsert: bool = False
+) -> None:
+    """Записує DataFrame у таблицю multi-row INSERT'ами по INSERT_ROWS рядків.
+    
+    Args:
+        conn: З'єднання з відкритою транзакцією
+        table: Назва таблиці
+        df: Синтетичний DataFrame
+        columns: Колонка DataFrame -> колонка таблиці
+        upsert: Оновлювати існуючі рядки (ON DUPLICATE KEY UPDATE)
+    """
+    names = list(columns.values())
+    query = (
+        f"INSERT INTO `{table}` ({', '.join(f'`{name}`' for name in names)}) "
+        f"VALUES ({', '.join(f':{name}' for name in names)})"
+    )
+    if upsert:
+        query += " ON DUPLICATE KEY UPDATE " + ', '.join(f"`{name}` = VALUES(`{name}`)" for name in names)
+    rows = table_rows(df, columns)
+    for start in range(0, len(rows), INSERT_ROWS):
+        conn.execute(text(query), rows[start:start + INSERT_ROWS])
+
+
+def reset_database(engine: Engine, database: str) -> None:
+    """Видаляє всі таблиці бази та створює схему репозиторію.
+    
+    Args:
+        engine: Engine одноразової бази
+        database: Ключ SOURCE_DATABASES
+    """
+    with engine.begin() as conn:
+        conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 0")
+        for table in inspect(conn).get_table_names():
+            conn.exec_driver_sql(f"DROP TABLE `{table}`")
+        conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 1")
+        
+        for statement in schema_statements(database):
+            conn.exec_driver_sql(statement)
+        
+        inspector = inspect(conn)
+        tables = set(inspector.get_table_names())
+        for table, extra in EXTRA_COLUMNS.items():
+            if table not in tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table)}
+            for column, column_type in extra.items():
+                if column not in existing:
+                    conn.exec_driver_sql(f"ALTER TABLE `{table}` ADD COLUMN `{column}` {column_type}")
+
+
+def _write_orders(conn: Connection, chunk: pd.DataFrame, upsert: bool = False) -> None:
+    """Записує чанк позицій замовлень у orders та order_items."""
+    _insert(conn, 'orders', chunk.drop_duplicates('order_id'), ORDER_COLUMNS, upsert)
+    _insert(conn, 'order_items', chunk, ORDER_ITEM_COLUMNS, upsert)
+
+
+def write_source(source: SyntheticSource, orders_db: DatabaseConfig, catalog_db: DatabaseConfig) -> None:
+    """Перезаписує Orders DB та Catalog DB даними синтетичного джерела.
+    
+    Args:
+        source: Синтетичне джерело (без дельти)
+        orders_db: Конфігурація одноразової Orders DB
+        catalog_db: Конфігурація одноразової Catalog DB
+    
+    Raises:
+        ValueError: Якщо база не одноразова (див. check_disposable)
+    """
+    check_disposable(orders_db)
+    check_disposable(catalog_db)
+    started = datetime.now()
+    
+    catalog_engine = create_engine(catalog_db.connection_string)
+    orders_engine = create_engine(orders_db.connection_string)
+    try:
+        reset_database(catalog_engine, 'catalog_db')
+        with catalog_engine.begin() as conn:
+            # Кореневі категорії йдуть першими, тож FK parent_category_id виконується
+            _insert(conn, 'categories', source.categories(), CATEGORY_COLUMNS)
+            _insert(conn, 'products', source.products(), PRODUCT_COLUMNS)
+        
+        reset_database(orders_engine, 'orders_db')
+        with orders_engine.begin() as conn:
+            _insert(conn, 'regions', source.regions(), REGION_COLUMNS)
+            _insert(conn, 'customers', source.customers(), CUSTOMER_COLUMNS)
+            _insert(conn, 'employees', source.employees(), EMPLOYEE_COLUMNS)
+        for chunk in source.order_chunks():
+            with orders_engine.begin() as conn:
+                _write_orders(conn, chunk)
+    finally:
+        catalog_engine.dispose()
+        orders_engine.dispose()
+    
+    seconds = (datetime.now() - started).total_seconds()
+    logger.info(f"MySQL джерела заповнено: {source.scale:,} позицій за {seconds:.1f} с")
+
+
+def write_delta(source: SyntheticSource, orders_db: DatabaseConfig) -> int:
+    """Записує дельту синтетичного джерела в заповнену write_source Orders DB.
+    
+    Змінені позиції оновлюються на місці (нова кількість, updated_at
+    замовлення - час зміни), нові замовлення додаються.
+    
+    Args:
+        source: Синтетичне джерело з дельтою (див. SyntheticSource.with_delta)
+        orders_db: Конфігурація одноразової Orders DB
+    
+    Returns:
+        Кількість записаних позицій
+    
+    Raises:
+        ValueError: Якщо база не одноразова (див. check_disposable)
+    """
+    check_disposable(orders_db)
+    engine = create_engine(orders_db.connection_string)
+    rows = 0
+    try:
+        for chunk in source.order_chunks(since=source.changed_at):
+            with engine.begin() as conn:
+                _write_orders(conn, chunk, upsert=True)
+            rows += len(chunk)
+    finally:
+        engine.dispose()
+    return rows
+
@@ -0,0 +1,366 @@
+"""
+Синтетичні OLTP дані для бенчмарків ETL.
+
+SyntheticSource детерміновано генерує регіони, категорії, товари, клієнтів,
+співробітників та позиції замовлень у форматі, який повертають екстрактори
+(ті самі колонки, що й SQL запити extract.py). Позиції замовлень
+генеруються чанками, тож масштаб до десятків мільйонів рядків не потребує
+пам'яті під увесь набір у потоковому режимі.
+
+Значення залежать лише від (scale, seed); дати відраховуються від дня
+створення джерела, щоб потрапляти в календар dim_date, який будує ETL.
+"""
+
+from datetime import datetime, timedelta
+from typing import Generator, Optional
+
+import numpy as np
+import pandas as pd
+
+from etl.config import MySQLConfig
+from etl.extract import CatalogExtractor, OrdersExtractor
+
+# Позицій у кожному замовленні (фіксовано, щоб чанк містив цілі замовлення)
+ITEMS_PER_ORDER = 3
+
+# Період історичних замовлень до дня створення джерела
+HISTORY_DAYS = 360
+
+# Позицій у блоці генерації (див. SyntheticSource.order_items)
+BLOCK_ITEMS = ITEMS_PER_ORDER * 4096
+
+STATUSES = np.array(['paid', 'shipped', 'delivered'])
+
+
+def synthetic_ids(kind: int, start: int, stop: int) -> np.ndarray:
+    """Повертає детерміновані UUID-подібні id (char(36)) для діапазону номерів.
+    
+    Args:
+        kind: Номер типу сутності (перша група UUID)
+        start: Перший номер (включно)
+        stop: Останній номер (не включно)
+    
+    Returns:
+        Масив рядків id
+    """
+    prefix = f'{kind:08x}-0000-4000-8000-'
+    return np.array([f'{prefix}{number:012d}' for number in range(start, stop)], dtype=object)
+
+
+class SyntheticSource:
+    """Детерміноване джерело синтетичних OLTP даних.
+    
+    Attributes:
+        scale: Кількість позицій замовлень в історичних даних
+        seed: Seed генератора
+        chunk_rows: Розмір чанку позицій (кратний ITEMS_PER_ORDER)
+        anchor: День, від якого відраховуються дати замовлень
+        delta_rows: Кількість позицій у дельті інкрементального завантаження
+        changed_at: Час зміни дельти (None - дельти немає)
+    """
+    
+    def __init__(
+        self,
+        scale: int,
+        seed: int = 42,
+        chunk_rows: int = 100_002,
+        anchor: Optional[datetime] = None
+    ):
+        """Ініціалізує джерело та генерує виміри.
+        
+        Args:
+            scale: Кількість позицій замовлень
+            seed: Seed генератора
+            chunk_rows: Бажаний розмір чанку позицій
+            anchor: День відліку дат (за замовчуванням - сьогодні)
+        """
+        self.scale = scale - scale % ITEMS_PER_ORDER
+        self.seed = seed
+        self.chunk_rows = max(ITEMS_PER_ORDER, chunk_rows - chunk_rows % ITEMS_PER_ORDER)
+        self.anchor = anchor or datetime.combine(datetime.now().date(), datetime.min.time())
+        self.delta_rows = 0
+        self.changed_at: Optional[datetime] = None
+        self._last_block: Optional[tuple[int, pd.DataFrame]] = None
+        
+        self.n_regions = 10
+        self.n_categories = 50
+        self.n_products = max(100, scale // 100)
+        self.n_customers = max(100, scale // 20)
+        self.n_employees = max(20, scale // 2000)
+        
+        rng = np.random.default_rng([seed, 0])
+        self.product_prices = np.round(rng.uniform(5, 2000, self.n_products), 2)
+        self.product_categories = rng.integers(10, self.n_categories, self.n_products)
+        self.employee_regions = rng.integers(0, self.n_regions, self.n_employees)
+        self.customer_regions = rng.integers(0, self.n_regions, self.n_customers)
+        
+        self._region_ids = synthetic_ids(1, 0, self.n_regions)
+        self._product_ids = synthetic_ids(3, 0, self.n_products)
+        self._customer_ids = synthetic_ids(4, 0, self.n_customers)
+        self._employee_ids = synthetic_ids(5, 0, self.n_employees)
+    
+    @property
+    def created_at(self) -> datetime:
+        """Час створення записів вимірів."""
+        return self.anchor - timedelta(days=HISTORY_DAYS + 1)
+    
+    def with_delta(self, fraction: float, changed_at: Optional[datetime] = None) -> "SyntheticSource":
+        """Додає дельту для інкрементального завантаження.
+        
+        Половина дельти - змінені останні позиції історії (нова кількість),
+        половина - нові замовлення дня відліку. Витягування з watermark
+        не пізніше changed_at повертає лише дельту.
+        
+        Args:
+            fraction: Частка дельти від scale
+            changed_at: Час зміни (за замовчуванням - зараз)
+        
+        Returns:
+            Це ж джерело
+        """
+        rows = int(self.scale * fraction)
+        self.delta_rows = max(2 * ITEMS_PER_ORDER, rows - rows % (2 * ITEMS_PER_ORDER))
+        self.changed_at = changed_at or datetime.now()
+        return self
+    
+    def regions(self) -> pd.DataFrame:
+        """Регіони у форматі OrdersExtractor.extract_regions."""
+        numbers = np.arange(self.n_regions)
+        return pd.DataFrame({
+            'region_id': synthetic_ids(1, 0, self.n_regions),
+            'region_name': [f'Регіон {i:02d}' for i in numbers],
+            'region_code': [f'R{i:02d}' for i in numbers],
+        })
+    
+    def categories(self) -> pd.DataFrame:
+        """Категорії (10 кореневих, решта - дочірні) у форматі extract_categories."""
+        ids = synthetic_ids(2, 0, self.n_categories)
+        parents = [None] * 10 + [ids[i % 10] for i in range(10, self.n_categories)]
+        return pd.DataFrame({
+            'category_id': ids,
+            'category_name': [f'Категорія {i:03d}' for i in range(self.n_categories)],
+            'parent_category_id': parents,
+            'created_at': self.created_at,
+        })
+    
+    def products(self) -> pd.DataFrame:
+        """Товари у форматі extract_products."""
+        category_ids = synthetic_ids(2, 0, self.n_categories)
+        categories = self.product_categories
+        return pd.DataFrame({
+            'product_id': synthetic_ids(3, 0, self.n_products),
+            'product_name': [f'Товар {i:07d}' for i in range(self.n_products)],
+            'sku': [f'SKU-{i:07d}' for i in range(self.n_products)],
+            'description': None,
+            'price': self.product_prices,
+            'stock_quantity': 100,
+            'category_id': category_ids[categories],
+            'category_name': [f'Категорія {i:03d}' for i in categories],
+            'parent_category_id': category_ids[categories % 10],
+            'created_at': self.created_at,
+            'updated_at': self.created_at,
+        })
+    
+    def customers(self) -> pd.DataFrame:
+        """Клієнти у форматі extract_customers."""
+        numbers = np.arange(self.n_customers)
+        return pd.DataFrame({
+            'customer_id': synthetic_ids(4, 0, self.n_customers),
+            'first_name': 'Клієнт',
+            'last_name': [f'{i:08d}' for i in numbers],
+            'email': [f'customer{i}@example.com' for i in numbers],
+            'phone': None,
+            'created_at': self.created_at,
+            'updated_at': self.created_at,
+        })
+    
+    def employees(self) -> pd.DataFrame:
+        """Співробітники у форматі extract_employees."""
+        numbers = np.arange(self.n_employees)
+        region_ids = synthetic_ids(1, 0, self.n_regions)
+        return pd.DataFrame({
+            'employee_id': synthetic_ids(5, 0, self.n_employees),
+            'first_name': 'Менеджер',
+            'last_name': [f'{i:06d}' for i in numbers],
+            'email': [f'employee{i}@example.com' for i in numbers],
+            'phone': None,
+            'is_manager': numbers % 10 == 0,
+            'region_id': region_ids[self.employee_regions],
+            'region_name': [f'Регіон {i:02d}' for i in self.employee_regions],
+            'created_at': self.created_at,
+        })
+    
+    def order_items(self, start: int, stop: int, updated: bool = False) -> pd.DataFrame:
+        """Генерує позиції замовлень з номерами [start, stop).
+        
+        Позиції генеруються блоками фіксованого розміру з seed блоку, тож
+        значення не залежать від розміру чанку, яким їх запитують.
+        
+        Args:
+            start: Перший номер позиції (кратний ITEMS_PER_ORDER)
+            stop: Останній номер позиції (не включно)
+            updated: Позиції змінені після повного завантаження (для дельти)
+        
+        Returns:
+            DataFrame у форматі OrdersExtractor.extract_orders
+        """
+        first, last = start // BLOCK_ITEMS, -(-stop // BLOCK_ITEMS)
+        blocks = [self._cached_block(block) for block in range(first, max(last, first + 1))]
+        offset = start - first * BLOCK_ITEMS
+        df = pd.concat(blocks, ignore_index=True).iloc[offset:offset + max(0, stop - start)]
+        df = df.reset_index(drop=True)
+        
+        if updated:
+            # Існуючі позиції отримують нову кількість, нові - лише час зміни
+            existing = np.arange(start, start + len(df)) < self.scale
+            df['quantity'] = df['quantity'] + existing
+            df['updated_at'] = pd.Timestamp(self.changed_at)
+        return df
+    
+    def _cached_block(self, block: int) -> pd.DataFrame:
+        """Повертає блок позицій, пам'ятаючи останній (сусідні чанки часто ділять блок)."""
+        if self._last_block is None or self._last_block[0] != block:
+            self._last_block = (block, self._order_block(block))
+        return self._last_block[1]
+    
+    def _order_block(self, block: int) -> pd.DataFrame:
+        """Генерує блок з BLOCK_ITEMS позицій замовлень."""
+        items = np.arange(block * BLOCK_ITEMS, (block + 1) * BLOCK_ITEMS)
+        orders = items[::ITEMS_PER_ORDER] // ITEMS_PER_ORDER
+        rng = np.random.default_rng([self.seed, 1, block])
+        n_orders, n_items = len(orders), len(items)
+        
+        # Історичні замовлення рівномірно розподілені по HISTORY_DAYS, нові - в день відліку
+        total_orders = max(1, self.scale // ITEMS_PER_ORDER)
+        day = np.minimum(orders * HISTORY_DAYS // total_orders, HISTORY_DAYS)
+        order_date = (
+            np.datetime64(self.anchor - timedelta(days=HISTORY_DAYS), 's')
+            + day.astype('timedelta64[D]')
+            + rng.integers(8 * 3600, 20 * 3600, n_orders).astype('timedelta64[s]')
+        )
+        customers = np.repeat(rng.integers(0, self.n_customers, n_orders), ITEMS_PER_ORDER)
+        employees = np.repeat(rng.integers(0, self.n_employees, n_orders), ITEMS_PER_ORDER)
+        statuses = np.repeat(rng.integers(0, len(STATUSES), n_orders), ITEMS_PER_ORDER)
+        order_date = np.repeat(order_date, ITEMS_PER_ORDER).astype('datetime64[ns]')
+        products = rng.integers(0, self.n_products, n_items)
+        quantity = rng.integers(1, 6, n_items)
+        unit_price = self.product_prices[products]
+        discount = np.round(unit_price * quantity * rng.choice([0, 0.05, 0.1], n_items), 2)
+        line_total = (unit_price * quantity - discount).reshape(-1, ITEMS_PER_ORDER).sum(axis=1)
+        
+        return pd.DataFrame({
+            'order_id': np.repeat(synthetic_ids(6, int(orders[0]), int(orders[-1]) + 1), ITEMS_PER_ORDER),
+            'customer_id': self._customer_ids[customers],
+            'employee_id': self._employee_ids[employees],
+            'region_id': self._region_ids[self.customer_regions[customers]],
+            'order_date': order_date,
+            'status': STATUSES[statuses],
+            'total_amount': np.round(np.repeat(line_total, ITEMS_PER_ORDER), 2),
+            'created_at': order_date,
+            'updated_at': order_date + np.timedelta64(1, 'h'),
+            'order_item_id': synthetic_ids(7, int(items[0]), int(items[-1]) + 1),
+            'product_id': self._product_ids[products],
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'discount': discount,
+        })
+    
+    def order_chunks(
+        self,
+        since: Optional[datetime] = None,
+        chunk_rows: Optional[int] = None
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Генерує позиції замовлень чанками.
+        
+        Args:
+            since: Watermark: повертаються лише змінені від нього позиції дельти
+            chunk_rows: Розмір чанку (за замовчуванням - self.chunk_rows)
+        
+        Yields:
+            DataFrame'и позицій у форматі extract_orders
+        """
+        size = chunk_rows or self.chunk_rows
+        size = max(ITEMS_PER_ORDER, size - size % ITEMS_PER_ORDER)
+        
+        if since is None:
+            ranges = [(start, min(start + size, self.scale), False) for start in range(0, self.scale, size)]
+        elif self.changed_at is None or since > self.changed_at:
+            ranges = []
+        else:
+            half = self.delta_rows // 2
+            ranges = [
+                (start, min(start + size, self.scale), True)
+                for start in range(self.scale - half, self.scale, size)
+            ] + [
+                (start, min(start + size, self.scale + half), True)
+                for start in range(self.scale, self.scale + half, size)
+            ]
+        
+        for start, stop, updated in ranges:
+            yield self.order_items(start, stop, updated)
+
+
+def _since_filter(df: pd.DataFrame, column: str, since: Optional[datetime]) -> pd.DataFrame:
+    """Фільтрує записи вимірів за watermark, як WHERE column >= :since."""
+    return df if since is None else df[df[column] >= since].reset_index(drop=True)
+
+
+def _dummy_config(database: str) -> MySQLConfig:
+    """Конфігурація-заглушка: синтетичні екстрактори не підключаються до MySQL."""
+    return MySQLConfig(host='synthetic', port=0, database=database, user='', password='')
+
+
+class SyntheticOrdersExtractor(OrdersExtractor):
+    """OrdersExtractor, що читає SyntheticSource замість Orders DB."""
+    
+    def __init__(self, source: SyntheticSource):
+        super().__init__(_dummy_config('orders_db'))
+        self.source = source
+    
+    def extract_orders(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        chunksize: Optional[int] = None,
+        since: Optional[datetime] = None,
+        ordered: bool = True
+    ) -> pd.DataFrame | Generator[pd.DataFrame, None, None]:
+        # Чанки джерела завжди впорядковані за order_date, тож ordered не впливає
+        def chunks():
+            for chunk in self.source.order_chunks(since, chunksize):
+                if start_date:
+                    chunk = chunk[chunk['order_date'] >= start_date]
+                if end_date:
+                    chunk = chunk[chunk['order_date'] <= end_date]
+                if len(chunk):
+                    yield chunk.reset_index(drop=True)
+        
+        if chunksize:
+            return chunks()
+        frames = list(chunks())
+        if not frames:
+            return self.source.order_items(0, ITEMS_PER_ORDER).head(0)
+        return pd.concat(frames, ignore_index=True)
+    
+    def extract_customers(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        return _since_filter(self.source.customers(), 'updated_at', since)
+    
+    def extract_employees(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        return _since_filter(self.source.employees(), 'created_at', since)
+    
+    def extract_regions(self) -> pd.DataFrame:
+        return self.source.regions()
+
+
+class SyntheticCatalogExtractor(CatalogExtractor):
+    """CatalogExtractor, що читає SyntheticSource замість Catalog DB."""
+    
+    def __init__(self, source: SyntheticSource):
+        super().__init__(_dummy_config('catalog_db'))
+        self.source = source
+    
+    def extract_products(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        return _since_filter(self.source.products(), 'updated_at', since)
+    
+    def extract_categories(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        return _since_filter(self.source.categories(), 'created_at', since)
@@ -0,0 +1,300 @@
+"""
+Модуль контрольних точок (checkpoint) запусків ETL.
+
+Зберігає в DWH завершені стадії запуску та завершені чанки потокових
+стадій, щоб перерваний запуск можна було продовжити (run_etl.py --resume):
+завершені стадії пропускаються, а потокове завантаження fact_sales
+продовжується з дня останнього записаного чанку.
+
+Чанки fact_sales витягуються впорядкованими за order_date, тож позиція
+чанку - це його останній date_key. Під час продовження факти з date_key
+не меншим за цю позицію видаляються і завантажуються заново: так не
+дублюються ні рядки незавершеного замовлення на межі чанку, ні рядки
+чанку, записаного без контрольної точки.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .load import Loader
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_TABLE = 'etl_checkpoints'
+
+# Службовий запис з часом початку запуску
+RUN_MARKER = '_run'
+
+
+@dataclass(frozen=True)
+class ChunkProgress:
+    """Прогрес потокової стадії за записаними чанками.
+    
+    Attributes:
+        chunks: Кількість записаних чанків
+        rows: Кількість записаних рядків
+        first_date_key: Найменший date_key записаних чанків
+        last_date_key: Позиція продовження - найбільший date_key записаних чанків
+        watermark: Найбільший watermark записаних чанків (None - не відстежується)
+        resume_day_rows: Скільки з записаних рядків припадає на день last_date_key
+    """
+    chunks: int
+    rows: int
+    first_date_key: int
+    last_date_key: int
+    watermark: Optional[datetime] = None
+    resume_day_rows: int = 0
+    
+    @property
+    def resume_date(self) -> datetime:
+        """Початок дня, з якого продовжується витягування."""
+        return datetime.strptime(str(self.last_date_key), '%Y%m%d')
+    
+    @property
+    def rows_before_resume(self) -> int:
+        """Записані рядки днів до позиції продовження (день продовження витягується заново)."""
+        return self.rows - self.resume_day_rows
+    
+    def days(self) -> list[int]:
+        """Усі date_key від першого до позиції продовження (для перерахунку агрегатів)."""
+        first = datetime.strptime(str(self.first_date_key), '%Y%m%d')
+        return [int(day.strftime('%Y%m%d')) for day in pd.date_range(first, self.resume_date)]
+
+
+class CheckpointStore:
+    """Контрольні точки запусків у таблиці DWH.
+    
+    Запуск кожного типу ('full', 'incremental') має не більше одного
+    незавершеного набору контрольних точок; успішний запуск його видаляє.
+    
+    Attributes:
+        loader: Лоадер з підключенням до DWH
+    """
+    
+    def __init__(self, loader: Loader):
+        """Ініціалізує сховище.
+        
+        Args:
+            loader: Лоадер з підключенням до DWH
+        """
+        self.loader = loader
+        self._table_ready = False
+    
+    def _ensure_table(self) -> None:
+        """Створює контрольну таблицю, якщо її ще немає."""
+        if self._table_ready:
+            return
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{CHECKPOINT_TABLE}" ('
+                '"run_type" varchar(20) NOT NULL, '
+                '"stage" varchar(100) NOT NULL, '
+                '"chunk" int NOT NULL, '
+                '"rows" bigint NOT NULL DEFAULT 0, '
+                '"first_date_key" int, '
+                '"last_date_key" int, '
+                '"watermark" timestamp, '
+                '"last_day_rows" bigint, '
+                '"completed_at" timestamp NOT NULL DEFAULT now(), '
+                'PRIMARY KEY ("run_type", "stage", "chunk"))'
+            ))
+        self._table_ready = True
+    
+    def start_run(self, run_type: str, resume: bool = False) -> datetime:
+        """Починає запуск або продовжує незавершений.
+        
+        Args:
+            run_type: Тип запуску ('full' або 'incremental')
+            resume: Продовжити незавершений запуск, якщо він є
+        
+        Returns:
+            Час початку запуску (для продовження - початок першої спроби)
+        """
+        try:
+            self._ensure_table()
+            with self.loader.engine.begin() as conn:
+                if resume:
+                    started_at = conn.execute(
+                        text(
+                            f'SELECT "watermark" FROM "{CHECKPOINT_TABLE}" '
+                            'WHERE "run_type" = :run_type AND "stage" = :stage'
+                        ),
+                        {"run_type": run_type, "stage": RUN_MARKER}
+                    ).scalar()
+                    if started_at is not None:
+                        logger.info(f"Продовження запуску {run_type}, розпочатого {started_at}")
+                        return started_at
+                    logger.info(f"Незавершеного запуску {run_type} немає, починаємо спочатку")
+                
+                started_at = datetime.now()
+                conn.execute(
+                    text(f'DELETE FROM "{CHECKPOINT_TABLE}" WHERE "run_type" = :run_type'),
+                    {"run_type": run_type}
+                )
+                conn.execute(
+                    text(
+                        f'INSERT INTO "{CHECKPOINT_TABLE}" ("run_type", "stage", "chunk", "watermark") '
+                        'VALUES (:run_type, :stage, 0, :watermark)'
+                    ),
+                    {"run_type": run_type, "stage": RUN_MARKER, "watermark": started_at}
+                )
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка початку запуску {run_type}: {e}")
+            raise
+        return started_at
+    
+    def completed_stages(self, run_type: str) -> dict[str, int]:
+        """Повертає завершені стадії запуску та кількість їх записів."""
+        try:
+            self._ensure_table()
+            with self.loader.engine.connect() as conn:
+                rows = conn.execute(
+                    text(
+                        f'SELECT "stage", "rows" FROM "{CHECKPOINT_TABLE}" '
+                        'WHERE "run_type" = :run_type AND "chunk" = 0 AND "stage" <> :marker'
+                    ),
+                    {"run_type": run_type, "marker": RUN_MARKER}
+                ).fetchall()
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка читання контрольних точок {run_type}: {e}")
+            raise
+        return {stage: int(count) for stage, count in rows}
+    
+    def complete_stage(
+        self,
+        run_type: str,
+        stage: str,
+        rows: int,
+        watermark: Optional[datetime] = None
+    ) -> None:
+        """Позначає стадію завершеною.
+        
+        Args:
+            run_type: Тип запуску
+            stage: Назва стадії
+            rows: Кількість записів стадії
+            watermark: Watermark джерела стадії після запису
+        """
+        self._save(run_type, stage, 0, rows, None, None, watermark, None)
+        logger.info(f"Контрольна точка: стадія {stage} завершена ({rows} записів)")
+    
+    def complete_chunk(
+        self,
+        run_type: str,
+        stage: str,
+        chunk: int,
+        rows: int,
+        first_date_key: int,
+        last_date_key: int,
+        watermark: Optional[datetime] = None,
+        last_day_rows: Optional[int] = None
+    ) -> None:
+        """Позначає чанк потокової стадії записаним.
+        
+        Args:
+            run_type: Тип запуску
+            stage: Назва стадії
+            chunk: Номер чанку (з 1)
+            rows: Кількість рядків чанку
+            first_date_key: Найменший date_key чанку
+            last_date_key: Найбільший date_key чанку (позиція продовження)
+            watermark: Watermark джерела після чанку
+            last_day_rows: Кількість рядків чанку з date_key = last_date_key
+        """
+        self._save(run_type, stage, chunk, rows, first_date_key, last_date_key, watermark, last_day_rows)
+        logger.debug(f"Контрольна точка: {stage} чанк {chunk} (до {last_date_key})")
+    
+    def chunk_progress(self, run_type: str, stage: str) -> Optional[ChunkProgress]:
+        """Повертає прогрес потокової стадії (None, якщо чанків не записано)."""
+        try:
+            self._ensure_table()
+            with self.loader.engine.connect() as conn:
+                # Рядки дня продовження - останній день чанків, що на ньому закінчуються
+                row = conn.execute(
+                    text(
+                        f'WITH chunks AS (SELECT * FROM "{CHECKPOINT_TABLE}" '
+                        'WHERE "run_type" = :run_type AND "stage" = :stage AND "chunk" > 0) '
+                        'SELECT count(*), coalesce(sum("rows"), 0), min("first_date_key"), '
+                        'max("last_date_key"), max("watermark"), '
+                        'coalesce(sum("last_day_rows") FILTER '
+                        '(WHERE "last_date_key" = (SELECT max("last_date_key") FROM chunks)), 0) '
+                        'FROM chunks'
+                    ),
+                    {"run_type": run_type, "stage": stage}
+                ).one()
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка читання контрольних точок {stage}: {e}")
+            raise
+        
+        chunks, rows, first_date_key, last_date_key, watermark, resume_day_rows = row
+        if not chunks:
+            return None
+        return ChunkProgress(
+            int(chunks), int(rows), int(first_date_key), int(last_date_key), watermark, int(resume_day_rows)
+        )
+    
+    def finish_run(self, run_type: str) -> None:
+        """Видаляє контрольні точки успішно завершеного запуску."""
+        try:
+            self._ensure_table()
+            with self.loader.engine.begin() as conn:
+                conn.execute(
+                    text(f'DELETE FROM "{CHECKPOINT_TABLE}" WHERE "run_type" = :run_type'),
+                    {"run_type": run_type}
+                )
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка очищення контрольних точок {run_type}: {e}")
+            raise
+    
+    def _save(
+        self,
+        run_type: str,
+        stage: str,
+        chunk: int,
+        rows: int,
+        first_date_key: Optional[int],
+        last_date_key: Optional[int],
+        watermark: Optional[datetime],
+        last_day_rows: Optional[int]
+    ) -> None:
+        """Записує (або оновлює) контрольну точку."""
+        if watermark is not None and pd.isna(watermark):
+            watermark = None
+        elif watermark is not None:
+            watermark = pd.Timestamp(watermark).to_pydatetime()
+        
+        try:
+            self._ensure_table()
+            with self.loader.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        f'INSERT INTO "{CHECKPOINT_TABLE}" ("run_type", "stage", "chunk", "rows", '
+                        '"first_date_key", "last_date_key", "watermark", "last_day_rows", "completed_at") '
+                        'VALUES (:run_type, :stage, :chunk, :rows, :first_date_key, '
+                        ':last_date_key, :watermark, :last_day_rows, now()) '
+                        'ON CONFLICT ("run_type", "stage", "chunk") DO UPDATE SET '
+                        '"rows" = EXCLUDED."rows", "first_date_key" = EXCLUDED."first_date_key", '
+                        '"last_date_key" = EXCLUDED."last_date_key", '
+                        '"watermark" = EXCLUDED."watermark", '
+                        '"last_day_rows" = EXCLUDED."last_day_rows", "completed_at" = now()'
+                    ),
+                    {
+                        "run_type": run_type,
+                        "stage": stage,
+                        "chunk": chunk,
+                        "rows": int(rows),
+                        "first_date_key": first_date_key,
+                        "last_date_key": last_date_key,
+                        "watermark": watermark,
+                        "last_day_rows": last_day_rows,
+                    }
+                )
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка збереження контрольної точки {stage}: {e}")
+            raise
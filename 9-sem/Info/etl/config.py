@@ -80,6 +80,23 @@ class ETLConfig:
         batch_size: Розмір пакету для обробки даних
         incremental: Чи використовувати інкрементальне завантаження
         log_level: Рівень логування
+        max_workers: Максимальна кількість паралельних стадій ETL
+        streaming: Чи обробляти fact_sales чанками розміром batch_size
+        load_method: Спосіб запису в DWH ('insert' - multi-row INSERT, 'copy' - COPY FROM STDIN)
+        staging_dir: Каталог Parquet кешу витягнутих даних (None - кеш вимкнено)
+        staging_max_bytes: Бюджет диска для staging кешу в байтах
+        staging_offline: Чи читати дані лише зі staging кешу, без запитів до OLTP
+        compact_dtypes: Чи використовувати компактні dtype в трансформації (category, Arrow strings)
+        track_memory: Чи звітувати пам'ять DataFrame'ів по кроках трансформації
+        metrics_dir: Каталог для JSON та Prometheus звітів метрик запуску (None - не записувати)
+        pushdown: Чи обчислювати похідні поля та фільтри трансформації в SQL витягування
+        dwh_schema_path: Шлях до DDL схеми DWH для pushdown (None - database/init/05_dwh_schema.sql)
+        frame_engine: Рушій обчислень трансформації: 'pandas', 'polars' або 'duckdb'
+        extract_shards: Кількість паралельних шардів витягування замовлень (1 - один запит)
+        memory_budget: Бюджет пам'яті процесу в байтах для регулювання розміру чанків (None - фіксований batch_size)
+        spill_dir: Каталог для чанків, скинутих на диск понад бюджетом (None - тимчасовий)
+        handoff_dir: Спільний каталог файлів передачі між task'ами Airflow (None - <tmp>/etl-handoff)
+        handoff_format: Формат файлів передачі: 'arrow' (Arrow IPC) або 'parquet'
     """
     auth_db: MySQLConfig
     catalog_db: MySQLConfig
@@ -89,6 +106,23 @@ class ETLConfig:
     batch_size: int = 1000
     incremental: bool = False
     log_level: str = "INFO"
+    max_workers: int = 4
+    streaming: bool = False
+    load_method: str = "insert"
+    staging_dir: Optional[str] = None
+    staging_max_bytes: int = 1024 ** 3
+    staging_offline: bool = False
+    compact_dtypes: bool = False
+    track_memory: bool = False
+    metrics_dir: Optional[str] = None
+    pushdown: bool = False
+    dwh_schema_path: Optional[str] = None
+    frame_engine: str = "pandas"
+    extract_shards: int = 1
+    memory_budget: Optional[int] = None
+    spill_dir: Optional[str] = None
+    handoff_dir: Optional[str] = None
+    handoff_format: str = "arrow"
     
     @classmethod
     def from_env(cls) -> "ETLConfig":
@@ -145,5 +179,22 @@ class ETLConfig:
             dwh_db=dwh_db,
             batch_size=int(os.getenv("ETL_BATCH_SIZE", "1000")),
             incremental=os.getenv("ETL_INCREMENTAL", "false").lower() == "true",
-            log_level=os.getenv("ETL_LOG_LEVEL", "INFO")
+            log_level=os.getenv("ETL_LOG_LEVEL", "INFO"),
+            max_workers=int(os.getenv("ETL_MAX_WORKERS", "4")),
+            streaming=os.getenv("ETL_STREAMING", "false").lower() == "true",
+            load_method=os.getenv("ETL_LOAD_METHOD", "insert").lower(),
+            staging_dir=os.getenv("ETL_STAGING_DIR") or None,
+            staging_max_bytes=int(os.getenv("ETL_STAGING_MAX_BYTES", str(1024 ** 3))),
+            staging_offline=os.getenv("ETL_STAGING_OFFLINE", "false").lower() == "true",
+            compact_dtypes=os.getenv("ETL_COMPACT_DTYPES", "false").lower() == "true",
+            track_memory=os.getenv("ETL_TRACK_MEMORY", "false").lower() == "true",
+            metrics_dir=os.getenv("ETL_METRICS_DIR") or None,
+            pushdown=os.getenv("ETL_PUSHDOWN", "false").lower() == "true",
+            dwh_schema_path=os.getenv("ETL_DWH_SCHEMA") or None,
+            frame_engine=os.getenv("ETL_FRAME_ENGINE", "pandas").lower(),
+            extract_shards=int(os.getenv("ETL_EXTRACT_SHARDS", "1")),
+            memory_budget=int(os.getenv("ETL_MEMORY_BUDGET") or 0) or None,
+            spill_dir=os.getenv("ETL_SPILL_DIR") or None,
+            handoff_dir=os.getenv("ETL_HANDOFF_DIR") or None,
+            handoff_format=os.getenv("ETL_HANDOFF_FORMAT", "arrow").lower()
         )
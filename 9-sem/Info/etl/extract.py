@@ -5,14 +5,20 @@ Extract модуль для витягування даних з OLTP баз д
 """
 
 import logging
-from typing import Optional, Generator
+import time
+from functools import partial
+from typing import Any, Callable, Optional, Generator, Sequence
 from datetime import datetime
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
 
 from .config import MySQLConfig
+from .governor import MemoryGovernor
+from .pushdown import PushdownSchema
+from .sharding import merge_shards, plan_date_shards
+from .staging import StagingCache
 
 logger = logging.getLogger(__name__)
 
@@ -23,15 +29,47 @@ class Extractor:
     Attributes:
         config: Конфігурація підключення до бази даних
         engine: SQLAlchemy engine для підключення
+        dtype_backend: Бекенд типів для чанків ('pyarrow' або None - NumPy)
+        staging: Локальний Parquet кеш витягнутих даних (опціонально)
+        pushdown: Схема DWH для pushdown витягування (None - сирі колонки OLTP)
+        shards: Кількість паралельних шардів великих запитів (1 - один запит)
+        governor: Регулятор розміру чанків за бюджетом пам'яті (None - фіксований chunksize)
+        on_engine: Виклик для щойно створеного engine (наприклад, підрахунок запитів)
+        query_stats: Статистика виконаних запитів (рядки, час, рядків/с)
     """
     
-    def __init__(self, config: MySQLConfig):
+    def __init__(
+        self,
+        config: MySQLConfig,
+        dtype_backend: Optional[str] = None,
+        staging: Optional[StagingCache] = None,
+        pushdown: Optional[PushdownSchema] = None,
+        shards: int = 1,
+        governor: Optional[MemoryGovernor] = None,
+        on_engine: Optional[Callable[[Engine], Any]] = None
+    ):
         """Ініціалізує екстрактор.
         
         Args:
             config: Конфігурація підключення до бази даних
+            dtype_backend: 'pyarrow' для Arrow-backed чанків, None - NumPy
+            staging: Parquet кеш; None - завжди читати з OLTP
+            pushdown: Схема DWH; запити вибирають лише колонки таблиць DWH
+                та обчислюють похідні поля в MySQL (див. etl.pushdown)
+            shards: Кількість діапазонів, на які ділиться великий запит і
+                які читаються паралельно окремими з'єднаннями (див. etl.sharding)
+            governor: Регулятор пам'яті; потокові чанки починаються з chunksize
+                і далі змінюються за виміряним обсягом рядка (див. etl.governor)
+            on_engine: Викликається з engine, коли той створюється (ліниво)
         """
         self.config = config
+        self.dtype_backend = dtype_backend
+        self.staging = staging
+        self.pushdown = pushdown
+        self.shards = max(1, shards)
+        self.governor = governor
+        self.on_engine = on_engine
+        self.query_stats: list[dict[str, Any]] = []
         self._engine: Optional[Engine] = None
         
     @property
@@ -49,38 +87,249 @@ class Extractor:
                 self._engine = create_engine(
                     self.config.connection_string,
                     pool_pre_ping=True,
-                    pool_recycle=3600
+                    pool_recycle=3600,
+                    # Шарди тримають по з'єднанню, не витісняючи інші стадії
+                    pool_size=max(5, self.shards)
                 )
+                if self.on_engine:
+                    self.on_engine(self._engine)
                 logger.info(f"З'єднання з {self.config.database} встановлено")
             except SQLAlchemyError as e:
                 logger.error(f"Помилка підключення до {self.config.database}: {e}")
                 raise
         return self._engine
     
-    def extract_query(self, query: str, chunksize: Optional[int] = None) -> pd.DataFrame | Generator[pd.DataFrame, None, None]:
+    def extract_query(
+        self,
+        query: str,
+        chunksize: Optional[int] = None,
+        params: Optional[dict[str, Any]] = None,
+        tables: Sequence[str] = ()
+    ) -> pd.DataFrame | Generator[pd.DataFrame, None, None]:
         """Виконує SQL запит та повертає результат.
         
+        Якщо налаштовано staging і вказано tables, результат читається з
+        Parquet кешу, поки маркери змін таблиць-джерел не змінились.
+        Потокове читання (chunksize) завжди йде напряму в OLTP.
+        
         Args:
-            query: SQL запит для виконання
+            query: SQL запит для виконання (з іменованими параметрами :name)
             chunksize: Розмір чанку для читання великих даних (опціонально)
+            params: Значення параметрів запиту
+            tables: Таблиці-джерела запиту (для ключа staging кешу)
             
         Returns:
             DataFrame з результатами або генератор DataFrame'ів
             
         Raises:
             SQLAlchemyError: Якщо помилка виконання запиту
+            FileNotFoundError: Якщо в offline режимі staging немає даних запиту
         """
+        if chunksize:
+            return self._stream_query(query, chunksize, params)
+        
+        if self.staging is not None and tables:
+            return self._extract_staged(query, params, tables)
+        
+        return self._read_query(query, params)
+    
+    def extract_shards(
+        self,
+        queries: Sequence[tuple[str, dict[str, Any]]],
+        chunksize: Optional[int] = None,
+        ordered: bool = True
+    ) -> pd.DataFrame | Generator[pd.DataFrame, None, None]:
+        """Виконує запити шардів паралельно та зливає їх результати.
+        
+        Одночасно відкрито не більше self.shards з'єднань. Staging кеш
+        не використовується: шарди завжди читаються з OLTP.
+        
+        Args:
+            queries: Пари (SQL запит, параметри) шардів
+            chunksize: Розмір чанку; None - один DataFrame
+            ordered: True - чанки в порядку шардів, False - в порядку надходження
+            
+        Returns:
+            DataFrame з результатами або генератор DataFrame'ів
+            
+        Raises:
+            SQLAlchemyError: Якщо помилка виконання запиту шарду
+        """
+        # Engine створюється до запуску потоків шардів
+        self.engine
+        if chunksize:
+            readers = [partial(self._stream_query, query, chunksize, params) for query, params in queries]
+            return merge_shards(readers, self.shards, ordered, governor=self.governor)
+        
+        def read(query: str, params: dict[str, Any]) -> Generator[pd.DataFrame, None, None]:
+            yield self._read_query(query, params)
+        
+        readers = [partial(read, query, params) for query, params in queries]
+        return pd.concat(list(merge_shards(readers, self.shards, ordered, governor=self.governor)), ignore_index=True)
+    
+    def _read_query(self, query: str, params: Optional[dict[str, Any]] = None) -> pd.DataFrame:
+        """Читає результат запиту одним DataFrame'ом."""
         try:
             logger.debug(f"Виконання запиту: {query[:100]}...")
+            started = time.perf_counter()
+            df = pd.read_sql(text(query), self.engine, params=params)
+            self._record_stats(query, len(df), time.perf_counter() - started)
+            return df
+                
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка виконання запиту: {e}")
+            raise
+    
+    def _extract_staged(
+        self,
+        query: str,
+        params: Optional[dict[str, Any]],
+        tables: Sequence[str]
+    ) -> pd.DataFrame:
+        """Повертає результат запиту з staging кешу або з OLTP із записом у кеш.
+        
+        Контрольна сума береться до читання даних: якщо джерело зміниться
+        між ними, файл отримає стару суму і наступний запуск просто
+        перечитає таблицю, тож застарілі дані з кешу не повертаються.
+        """
+        query_key = self.staging.query_key('+'.join(tables), query, params)
+        checksum = None if self.staging.offline else self.source_checksum(tables)
+        
+        df = self.staging.get(query_key, checksum)
+        if df is not None:
+            return df
+        
+        if self.staging.offline:
+            raise FileNotFoundError(f"Staging: немає збережених даних для {query_key}")
+        
+        df = self._read_query(query, params)
+        self.staging.put(query_key, checksum, df)
+        return df
+    
+    def source_checksum(self, tables: Sequence[str]) -> dict[str, Any]:
+        """Обчислює дешеві маркери змін таблиць-джерел.
+        
+        Маркер - кількість рядків і MAX(updated_at); для таблиць без
+        updated_at - час останньої зміни з information_schema.TABLES.
+        MAX(updated_at) - один пошук в індексі, що починається з updated_at
+        (customers, products - міграції index advisor, orders - міграція
+        002_source_checksum_updated_at.sql). COUNT(*) в InnoDB усе ж
+        обходить найменший індекс таблиці: це лінійна робота, хоч і
+        дешевша за CHECKSUM TABLE, що читає й хешує кожен рядок.
+        
+        Args:
+            tables: Назви таблиць
             
-            if chunksize:
-                return pd.read_sql(query, self.engine, chunksize=chunksize)
-            else:
-                return pd.read_sql(query, self.engine)
+        Returns:
+            Словник {таблиця: [кількість рядків, час останньої зміни]}
+        """
+        table_list = ', '.join(f"`{table}`" for table in tables)
+        try:
+            with self.engine.connect() as conn:
+                # UPDATE_TIME без кешування статистики information_schema (MySQL 8.0)
+                conn.execute(text("SET SESSION information_schema_stats_expiry = 0"))
+                meta = conn.execute(
+                    text(
+                        "SELECT t.TABLE_NAME, t.UPDATE_TIME, c.COLUMN_NAME IS NOT NULL "
+                        "FROM information_schema.TABLES t "
+                        "LEFT JOIN information_schema.COLUMNS c ON c.TABLE_SCHEMA = t.TABLE_SCHEMA "
+                        "AND c.TABLE_NAME = t.TABLE_NAME AND c.COLUMN_NAME = 'updated_at' "
+                        "WHERE t.TABLE_SCHEMA = DATABASE() AND t.TABLE_NAME IN :tables"
+                    ).bindparams(bindparam('tables', expanding=True)),
+                    {'tables': list(tables)}
+                ).fetchall()
                 
+                markers = {}
+                for table, update_time, has_updated_at in meta:
+                    if has_updated_at:
+                        count, changed = conn.execute(
+                            text(f"SELECT COUNT(*), MAX(`updated_at`) FROM `{table}`")
+                        ).one()
+                    else:
+                        count = conn.execute(text(f"SELECT COUNT(*) FROM `{table}`")).scalar()
+                        changed = update_time
+                    markers[table] = [count, changed]
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка обчислення маркерів змін {table_list}: {e}")
+            raise
+        
+        return markers
+    
+    def _stream_query(
+        self,
+        query: str,
+        chunksize: int,
+        params: Optional[dict[str, Any]] = None
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Читає результат запиту чанками через server-side курсор.
+        
+        З stream_results=True драйвер (pymysql SSCursor) не буферизує весь
+        результат на клієнті, тому в пам'яті одночасно лише один чанк.
+        З регулятором пам'яті розмір кожного наступного чанку визначає
+        MemoryGovernor (спільно для всіх потокових запитів бази).
+        
+        Args:
+            query: SQL запит
+            chunksize: Кількість рядків у чанку (з регулятором - початкова)
+            params: Значення параметрів запиту
+            
+        Yields:
+            DataFrame'и розміром до chunksize рядків
+            
+        Raises:
+            SQLAlchemyError: Якщо помилка виконання запиту
+        """
+        logger.debug(f"Потокове виконання запиту: {query[:100]}...")
+        started = time.perf_counter()
+        rows = 0
+        
+        try:
+            with self.engine.connect() as conn:
+                conn = conn.execution_options(stream_results=True, max_row_buffer=chunksize)
+                result = conn.execute(text(query), params or {})
+                columns = list(result.keys())
+                source = self.config.database
+                if self.governor:
+                    chunksize = self.governor.chunk_size(source, chunksize)
+                
+                while True:
+                    batch = result.fetchmany(chunksize)
+                    if not batch:
+                        break
+                    
+                    chunk = pd.DataFrame.from_records(batch, columns=columns, coerce_float=True)
+                    if self.dtype_backend:
+                        chunk = chunk.convert_dtypes(dtype_backend=self.dtype_backend)
+                    rows += len(chunk)
+                    if self.governor:
+                        chunksize = self.governor.observe(source, chunk, chunksize)
+                    yield chunk
+                    
         except SQLAlchemyError as e:
             logger.error(f"Помилка виконання запиту: {e}")
             raise
+        
+        self._record_stats(query, rows, time.perf_counter() - started)
+    
+    def _record_stats(self, query: str, rows: int, elapsed: float) -> None:
+        """Зберігає та логує пропускну здатність запиту.
+        
+        Args:
+            query: SQL запит
+            rows: Кількість прочитаних рядків
+            elapsed: Час виконання в секундах
+        """
+        rows_per_sec = rows / elapsed if elapsed > 0 else 0.0
+        self.query_stats.append({
+            'query': ' '.join(query.split())[:200],
+            'rows': rows,
+            'seconds': elapsed,
+            'rows_per_sec': rows_per_sec
+        })
+        logger.info(
+            f"{self.config.database}: {rows} рядків за {elapsed:.2f} с "
+            f"({rows_per_sec:,.0f} рядків/с)"
+        )
     
     def close(self) -> None:
         """Закриває з'єднання з базою даних."""
@@ -96,19 +345,37 @@ class OrdersExtractor(Extractor):
         self, 
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-        chunksize: Optional[int] = None
+        chunksize: Optional[int] = None,
+        since: Optional[datetime] = None,
+        ordered: bool = True
     ) -> pd.DataFrame | Generator[pd.DataFrame, None, None]:
         """Витягує дані замовлень.
         
+        З shards > 1 замовлення діляться на діапазони дат однакової ваги,
+        що читаються паралельно (див. _extract_orders_sharded).
+        
         Args:
             start_date: Початкова дата для фільтрації
             end_date: Кінцева дата для фільтрації
             chunksize: Розмір чанку для обробки великих даних
+            since: Watermark - лише замовлення з updated_at >= since
+            ordered: Чи впорядковувати результат за (order_date, order_id);
+                False - без ORDER BY, коли порядок рядків не потрібен
             
         Returns:
             DataFrame з даними замовлень або генератор DataFrame'ів
+            (у режимі pushdown - з похідними полями fact_sales)
         """
-        query = """
+        if self.pushdown:
+            query = f"""
+            SELECT
+                {self.pushdown.select_list('fact_sales')}
+            FROM orders o
+            JOIN order_items oi ON o.id = oi.order_id
+            WHERE o.status IN ('paid', 'shipped', 'delivered')
+        """
+        else:
+            query = """
             SELECT 
                 o.id as order_id,
                 o.customer_id,
@@ -118,6 +385,7 @@ class OrdersExtractor(Extractor):
                 o.status,
                 o.total_amount,
                 o.created_at,
+                o.updated_at,
                 oi.id as order_item_id,
                 oi.product_id,
                 oi.quantity,
@@ -128,25 +396,89 @@ class OrdersExtractor(Extractor):
             WHERE o.status IN ('paid', 'shipped', 'delivered')
         """
         
-        params = []
+        conditions = ""
+        params = {}
         if start_date:
-            query += " AND o.order_date >= %s"
-            params.append(start_date)
+            conditions += " AND o.order_date >= :start_date"
+            params['start_date'] = start_date
         if end_date:
-            query += " AND o.order_date <= %s"
-            params.append(end_date)
-            
-        query += " ORDER BY o.order_date, o.id"
+            conditions += " AND o.order_date <= :end_date"
+            params['end_date'] = end_date
+        if since:
+            conditions += " AND o.updated_at >= :since"
+            params['since'] = since
+        query += conditions
+        
+        order_by = " ORDER BY o.order_date, o.id" if ordered else ""
         
         logger.info(f"Витягування замовлень з {self.config.database}")
-        return self.extract_query(query, chunksize)
+        # Повний DataFrame зі staging кешу читається одним запитом
+        if self.shards > 1 and (chunksize or self.staging is None):
+            return self._extract_orders_sharded(query, conditions, params, order_by, chunksize, ordered)
+        return self.extract_query(query + order_by, chunksize, params, tables=('orders', 'order_items'))
     
-    def extract_customers(self) -> pd.DataFrame:
+    def _extract_orders_sharded(
+        self,
+        query: str,
+        conditions: str,
+        params: dict[str, Any],
+        order_by: str,
+        chunksize: Optional[int],
+        ordered: bool
+    ) -> pd.DataFrame | Generator[pd.DataFrame, None, None]:
+        """Витягує замовлення паралельними шардами за діапазонами order_date.
+        
+        Межі шардів вибираються за денною гістограмою кількості замовлень
+        (один GROUP BY по індексу order_date), тож шарди мають приблизно
+        однакову вагу. Кожен шард впорядковується окремо, а злиття в
+        порядку шардів зберігає глобальний порядок за датою. Замовлення
+        без order_date потрапляють у перший шард (як і в ORDER BY MySQL).
+        
+        Args:
+            query: Запит замовлень з фільтрами, без ORDER BY
+            conditions: Фільтри запиту (для гістограми)
+            params: Значення параметрів фільтрів
+            order_by: ORDER BY кожного шарду (порожній - без сортування)
+            chunksize: Розмір чанку; None - один DataFrame
+            ordered: Чи зливати чанки в порядку шардів
+        """
+        histogram = self._read_query(
+            "SELECT DATE(o.order_date) AS day, COUNT(*) AS orders FROM orders o "
+            f"WHERE o.status IN ('paid', 'shipped', 'delivered'){conditions} "
+            "GROUP BY DATE(o.order_date) ORDER BY day",
+            params
+        )
+        shards = plan_date_shards(histogram['day'], histogram['orders'], self.shards)
+        logger.info(f"Замовлення діляться на {len(shards)} шардів за order_date")
+        
+        queries = []
+        for number, shard in enumerate(shards):
+            shard_query, shard_params = query, dict(params)
+            if shard.start:
+                shard_query += " AND o.order_date >= :shard_start"
+                shard_params['shard_start'] = shard.start
+            if shard.end and number == 0:
+                shard_query += " AND (o.order_date < :shard_end OR o.order_date IS NULL)"
+                shard_params['shard_end'] = shard.end
+            elif shard.end:
+                shard_query += " AND o.order_date < :shard_end"
+                shard_params['shard_end'] = shard.end
+            queries.append((shard_query + order_by, shard_params))
+        
+        return self.extract_shards(queries, chunksize, ordered)
+    
+    def extract_customers(self, since: Optional[datetime] = None) -> pd.DataFrame:
         """Витягує дані клієнтів.
         
+        Args:
+            since: Watermark - лише записи, змінені не раніше since
+            
         Returns:
             DataFrame з даними клієнтів
         """
+        if self.pushdown:
+            return self._extract_customers_pushdown(since)
+        
         query = """
             SELECT 
                 id as customer_id,
@@ -157,19 +489,66 @@ class OrdersExtractor(Extractor):
                 created_at,
                 updated_at
             FROM customers
-            ORDER BY created_at
         """
         
+        params = {}
+        if since:
+            query += " WHERE updated_at >= :since"
+            params['since'] = since
+        
+        query += " ORDER BY created_at"
+        
         logger.info(f"Витягування клієнтів з {self.config.database}")
-        return self.extract_query(query)
+        return self.extract_query(query, params=params, tables=('customers',))
+    
+    def _extract_customers_pushdown(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        """Витягує клієнтів з видаленням дублікатів email у MySQL.
+        
+        Як і DataTransformer.transform_customers, для кожного email
+        залишається перший за created_at клієнт.
+        """
+        where = "WHERE updated_at >= :since" if since else ""
+        query = f"""
+            SELECT
+                {self.pushdown.select_list('dim_customer')}
+            FROM (
+                SELECT
+                    customers.*,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY LOWER(TRIM(email)) ORDER BY created_at
+                    ) AS email_rank
+                FROM customers
+                {where}
+            ) c
+            WHERE c.email_rank = 1
+            ORDER BY c.created_at
+        """
+        params = {'since': since} if since else {}
+        
+        logger.info(f"Витягування клієнтів з {self.config.database} (pushdown)")
+        return self.extract_query(query, params=params, tables=('customers',))
     
-    def extract_employees(self) -> pd.DataFrame:
+    def extract_employees(self, since: Optional[datetime] = None) -> pd.DataFrame:
         """Витягує дані співробітників.
         
+        У employees немає updated_at, тож since фільтрує за created_at і
+        повертає лише нових співробітників: зміни існуючих записів він не
+        бачить. Інкрементальне завантаження тому витягує таблицю повністю.
+        
+        Args:
+            since: Лише записи, створені не раніше since
+            
         Returns:
             DataFrame з даними співробітників
         """
-        query = """
+        if self.pushdown:
+            query = f"""
+            SELECT
+                {self.pushdown.select_list('dim_employee')}
+            FROM employees e
+        """
+        else:
+            query = """
             SELECT 
                 e.id as employee_id,
                 e.first_name,
@@ -182,11 +561,17 @@ class OrdersExtractor(Extractor):
                 e.created_at
             FROM employees e
             LEFT JOIN regions r ON e.region_id = r.id
-            ORDER BY e.created_at
         """
         
+        params = {}
+        if since:
+            query += " WHERE e.created_at >= :since"
+            params['since'] = since
+        
+        query += " ORDER BY e.created_at"
+        
         logger.info(f"Витягування співробітників з {self.config.database}")
-        return self.extract_query(query)
+        return self.extract_query(query, params=params, tables=('employees', 'regions'))
     
     def extract_regions(self) -> pd.DataFrame:
         """Витягує дані регіонів.
@@ -194,7 +579,15 @@ class OrdersExtractor(Extractor):
         Returns:
             DataFrame з даними регіонів
         """
-        query = """
+        if self.pushdown:
+            query = f"""
+            SELECT
+                {self.pushdown.select_list('dim_region')}
+            FROM regions
+            ORDER BY name
+        """
+        else:
+            query = """
             SELECT 
                 id as region_id,
                 name as region_name,
@@ -204,22 +597,34 @@ class OrdersExtractor(Extractor):
         """
         
         logger.info(f"Витягування регіонів з {self.config.database}")
-        return self.extract_query(query)
+        return self.extract_query(query, tables=('regions',))
 
 
 class CatalogExtractor(Extractor):
     """Екстрактор для Catalog DB."""
     
-    def extract_products(self) -> pd.DataFrame:
+    def extract_products(self, since: Optional[datetime] = None) -> pd.DataFrame:
         """Витягує дані товарів.
         
+        Args:
+            since: Watermark - лише записи, змінені не раніше since
+            
         Returns:
             DataFrame з даними товарів
         """
-        query = """
+        if self.pushdown:
+            # Назва та ієрархія категорії в dim_product не зберігаються - без JOIN
+            query = f"""
+            SELECT
+                {self.pushdown.select_list('dim_product')}
+            FROM products p
+        """
+        else:
+            query = """
             SELECT 
                 p.id as product_id,
                 p.name as product_name,
+                p.sku,
                 p.description,
                 p.price,
                 p.stock_quantity,
@@ -230,30 +635,57 @@ class CatalogExtractor(Extractor):
                 p.updated_at
             FROM products p
             LEFT JOIN categories c ON p.category_id = c.id
-            ORDER BY p.created_at
         """
         
+        params = {}
+        if since:
+            query += " WHERE p.updated_at >= :since"
+            params['since'] = since
+        
+        query += " ORDER BY p.created_at"
+        
         logger.info(f"Витягування товарів з {self.config.database}")
-        return self.extract_query(query)
+        return self.extract_query(query, params=params, tables=('products', 'categories'))
     
-    def extract_categories(self) -> pd.DataFrame:
+    def extract_categories(self, since: Optional[datetime] = None) -> pd.DataFrame:
         """Витягує дані категорій.
         
+        У categories немає updated_at, тож since фільтрує за created_at і
+        повертає лише нові категорії: перейменування чи зміну батьківської
+        категорії він не бачить. Інкрементальне завантаження тому витягує
+        таблицю повністю.
+        
+        Args:
+            since: Лише записи, створені не раніше since
+            
         Returns:
             DataFrame з даними категорій
         """
-        query = """
+        if self.pushdown:
+            query = f"""
+            SELECT
+                {self.pushdown.select_list('dim_category')}
+            FROM categories
+        """
+        else:
+            query = """
             SELECT 
                 id as category_id,
                 name as category_name,
                 parent_category_id,
                 created_at
             FROM categories
-            ORDER BY parent_category_id IS NULL DESC, parent_category_id, name
         """
         
+        params = {}
+        if since:
+            query += " WHERE created_at >= :since"
+            params['since'] = since
+        
+        query += " ORDER BY parent_category_id IS NULL DESC, parent_category_id, name"
+        
         logger.info(f"Витягування категорій з {self.config.database}")
-        return self.extract_query(query)
+        return self.extract_query(query, params=params, tables=('categories',))
 
 
 class PaymentsExtractor(Extractor):
@@ -262,13 +694,15 @@ class PaymentsExtractor(Extractor):
     def extract_payments(
         self,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        since: Optional[datetime] = None
     ) -> pd.DataFrame:
         """Витягує дані платежів.
         
         Args:
             start_date: Початкова дата для фільтрації
             end_date: Кінцева дата для фільтрації
+            since: Watermark - лише платежі з created_at >= since
             
         Returns:
             DataFrame з даними платежів
@@ -287,15 +721,18 @@ class PaymentsExtractor(Extractor):
             WHERE status = 'completed'
         """
         
-        params = []
+        params = {}
         if start_date:
-            query += " AND payment_date >= %s"
-            params.append(start_date)
+            query += " AND payment_date >= :start_date"
+            params['start_date'] = start_date
         if end_date:
-            query += " AND payment_date <= %s"
-            params.append(end_date)
+            query += " AND payment_date <= :end_date"
+            params['end_date'] = end_date
+        if since:
+            query += " AND created_at >= :since"
+            params['since'] = since
             
         query += " ORDER BY payment_date"
         
         logger.info(f"Витягування платежів з {self.config.database}")
-        return self.extract_query(query)
+        return self.extract_query(query, params=params, tables=('payments',))
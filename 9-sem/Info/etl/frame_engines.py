@@ -0,0 +1,401 @@
+"""
+Модуль рушіїв обчислень для трансформації (pandas / Polars / DuckDB).
+
+DataCleaner та DataTransformer описують трансформацію один раз, а
+видалення дублікатів, пошук пропущених значень, похідні поля замовлень та
+агрегації виконує рушій, вибраний у ETLConfig (ETL_FRAME_ENGINE):
+- pandas - однопотокове виконання (за замовчуванням);
+- polars, duckdb - багатопотокові колонкові рушії (опціональні пакети).
+
+Дані між кроками залишаються pandas DataFrame: колонкові рушії лише
+обчислюють маски рядків, нові колонки та агрегати, тож індекси, dtype та
+порядок рядків збігаються з pandas. Суми з плаваючою комою можуть
+відрізнятися від pandas в останніх розрядах через інший порядок додавання.
+
+Приведення типів (DataCleaner.validate_data_types) та заповнення
+пропусків виконує pandas для всіх рушіїв: їх семантику (розбір дат,
+astype) визначає саме pandas, а колонки все одно повертаються в pandas.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FRAME_ENGINES = ('pandas', 'polars', 'duckdb')
+
+# Функції агрегації, які підтримують усі рушії
+AGGREGATIONS = ('sum', 'nunique')
+
+
+def period_labels(dates: pd.Series, period: str) -> pd.Series:
+    """Повертає мітки періодів, як їх ставить pd.Grouper.
+    
+    Для 'D' - сам день, для 'W' - неділя тижня (W-SUN), для 'M' -
+    останній день місяця.
+    
+    Args:
+        dates: Колонка дат
+        period: Період агрегації ('D', 'W', 'M')
+    
+    Returns:
+        Колонка міток періодів (NaT для пропущених дат)
+    """
+    return dates.dt.to_period(period).dt.end_time.dt.normalize()
+
+
+class PandasEngine:
+    """Рушій на pandas (однопотоковий).
+    
+    Attributes:
+        name: Назва рушія (як у ETL_FRAME_ENGINE)
+    """
+    
+    name = 'pandas'
+    
+    def drop_duplicates(self, df: pd.DataFrame, subset: Optional[list[str]] = None) -> pd.DataFrame:
+        """Видаляє дублікати, залишаючи перше входження."""
+        return df.drop_duplicates(subset=subset, keep='first')
+    
+    def count_missing(self, df: pd.DataFrame) -> int:
+        """Повертає загальну кількість пропущених значень."""
+        return int(df.isnull().sum().sum())
+    
+    def drop_missing(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Видаляє рядки з пропущеними значеннями."""
+        return df.dropna()
+    
+    def order_metrics(self, orders_df: pd.DataFrame, cost_ratio: float) -> dict[str, pd.Series | np.ndarray]:
+        """Обчислює похідні поля позицій замовлень.
+        
+        Args:
+            orders_df: Замовлення з unit_price, quantity, discount та order_date
+            cost_ratio: Частка собівартості у виручці
+        
+        Returns:
+            Колонки revenue, discount_amount, cost, margin та date_key
+        """
+        revenue = orders_df['unit_price'] * orders_df['quantity']
+        discount_amount = orders_df['discount'].fillna(0)
+        cost = revenue * cost_ratio
+        order_date = orders_df['order_date'].dt
+        return {
+            'revenue': revenue,
+            'discount_amount': discount_amount,
+            'cost': cost,
+            'margin': revenue - discount_amount - cost,
+            'date_key': order_date.year * 10000 + order_date.month * 100 + order_date.day,
+        }
+    
+    def aggregate(self, df: pd.DataFrame, by: str, aggregations: dict[str, str]) -> pd.DataFrame:
+        """Групує рядки за колонкою.
+        
+        Args:
+            df: Вхідний DataFrame
+            by: Колонка групування (рядки з пропуском у ній не враховуються)
+            aggregations: Колонка -> функція ('sum' або 'nunique')
+        
+        Returns:
+            DataFrame з колонкою by та агрегатами, відсортований за by
+        """
+        return df.groupby(by).agg(aggregations).reset_index()
+    
+    def aggregate_by_period(
+        self,
+        df: pd.DataFrame,
+        date_column: str,
+        period: str,
+        aggregations: dict[str, str]
+    ) -> pd.DataFrame:
+        """Групує рядки за періодами дати, включно з періодами без рядків.
+        
+        Args:
+            df: Вхідний DataFrame
+            date_column: Колонка дати (datetime)
+            period: Період ('D', 'W', 'M')
+            aggregations: Колонка -> функція ('sum' або 'nunique')
+        
+        Returns:
+            DataFrame з міткою періоду в date_column та агрегатами
+        """
+        return df.groupby(pd.Grouper(key=date_column, freq=period)).agg(aggregations).reset_index()
+
+
+class ColumnarEngine(PandasEngine, ABC):
+    """Спільна основа багатопотокових колонкових рушіїв.
+    
+    Підкласи реалізують _first_occurrences, _missing_rows та _aggregate
+    (а також за потреби count_missing та order_metrics); фільтрація рядків
+    і збирання результату лишаються на pandas, щоб результат збігався з
+    PandasEngine.
+    """
+    
+    @abstractmethod
+    def _first_occurrences(self, df: pd.DataFrame, subset: list[str]) -> np.ndarray:
+        """Повертає маску перших входжень рядків за колонками subset."""
+    
+    @abstractmethod
+    def _missing_rows(self, df: pd.DataFrame) -> np.ndarray:
+        """Повертає маску рядків, що містять пропущені значення."""
+    
+    @abstractmethod
+    def _aggregate(self, df: pd.DataFrame, by: str, aggregations: dict[str, str]) -> pd.DataFrame:
+        """Групує рядки (див. PandasEngine.aggregate) без відновлення dtype."""
+    
+    def drop_duplicates(self, df: pd.DataFrame, subset: Optional[list[str]] = None) -> pd.DataFrame:
+        """Видаляє дублікати, залишаючи перше входження."""
+        if len(df) == 0:
+            return df.drop_duplicates(subset=subset)
+        return df[self._first_occurrences(df, list(subset or df.columns))]
+    
+    def drop_missing(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Видаляє рядки з пропущеними значеннями."""
+        if len(df) == 0:
+            return df.dropna()
+        return df[~self._missing_rows(df)]
+    
+    def aggregate(self, df: pd.DataFrame, by: str, aggregations: dict[str, str]) -> pd.DataFrame:
+        """Групує рядки за колонкою (див. PandasEngine.aggregate)."""
+        unsupported = set(aggregations.values()) - set(AGGREGATIONS)
+        if unsupported:
+            raise ValueError(f"Непідтримувані функції агрегації: {unsupported}")
+        
+        # pandas групує category з усіма категоріями, включно з відсутніми
+        if len(df) == 0 or isinstance(df[by].dtype, pd.CategoricalDtype):
+            return super().aggregate(df, by, aggregations)
+        
+        result = self._aggregate(df, by, aggregations)
+        result[by] = result[by].astype(df[by].dtype)
+        for column, function in aggregations.items():
+            # Типи результату pandas: nunique та суми цілих - int64, суми дробових - float64
+            values = df[column]
+            if function == 'nunique' or pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values):
+                result[column] = result[column].astype(np.int64)
+            elif pd.api.types.is_float_dtype(values):
+                result[column] = result[column].astype(np.float64)
+        return result.reset_index(drop=True)
+    
+    def aggregate_by_period(
+        self,
+        df: pd.DataFrame,
+        date_column: str,
+        period: str,
+        aggregations: dict[str, str]
+    ) -> pd.DataFrame:
+        """Групує рядки за періодами дати (див. PandasEngine.aggregate_by_period)."""
+        labelled = df[list(aggregations)].assign(**{date_column: period_labels(df[date_column], period)})
+        result = self.aggregate(labelled, date_column, aggregations)
+        if len(result) == 0:
+            return super().aggregate_by_period(df, date_column, period, aggregations)
+        
+        # Як pd.Grouper: періоди без рядків мають нульові агрегати
+        periods = pd.date_range(result[date_column].min(), result[date_column].max(), freq=period)
+        return (
+            result.set_index(date_column)
+            .reindex(periods, fill_value=0)
+            .rename_axis(date_column)
+            .reset_index()
+        )
+
+
+class PolarsEngine(ColumnarEngine):
+    """Рушій на Polars (багатопотоковий, потребує пакет polars)."""
+    
+    name = 'polars'
+    
+    def __init__(self):
+        """Імпортує Polars.
+        
+        Raises:
+            ImportError: Якщо пакет polars не встановлено
+        """
+        try:
+            import polars
+        except ImportError as e:
+            raise ImportError("Рушій polars потребує пакет polars (pip install polars)") from e
+        self._pl = polars
+    
+    def _frame(self, df: pd.DataFrame):
+        """Перетворює pandas DataFrame на Polars (NaN -> null, як isnull у pandas)."""
+        return self._pl.from_pandas(df, nan_to_null=True)
+    
+    def _first_occurrences(self, df: pd.DataFrame, subset: list[str]) -> np.ndarray:
+        pl = self._pl
+        mask = self._frame(df[subset]).select(pl.struct(subset).is_first_distinct())
+        return mask.to_series().to_numpy()
+    
+    def _missing_rows(self, df: pd.DataFrame) -> np.ndarray:
+        pl = self._pl
+        mask = self._frame(df).select(pl.any_horizontal(pl.all().is_null()))
+        return mask.to_series().to_numpy()
+    
+    def count_missing(self, df: pd.DataFrame) -> int:
+        """Повертає загальну кількість пропущених значень."""
+        if len(df) == 0:
+            return 0
+        return int(sum(self._frame(df).null_count().row(0)))
+    
+    def order_metrics(self, orders_df: pd.DataFrame, cost_ratio: float) -> dict[str, np.ndarray]:
+        """Обчислює похідні поля позицій замовлень (див. PandasEngine.order_metrics)."""
+        pl = self._pl
+        frame = self._frame(orders_df[['unit_price', 'quantity', 'discount', 'order_date']])
+        revenue = pl.col('unit_price') * pl.col('quantity')
+        discount_amount = pl.col('discount').fill_null(0.0)
+        cost = revenue * cost_ratio
+        order_date = pl.col('order_date').dt
+        result = frame.select(
+            revenue.alias('revenue'),
+            discount_amount.alias('discount_amount'),
+            cost.alias('cost'),
+            (revenue - discount_amount - cost).alias('margin'),
+            (
+                order_date.year().cast(pl.Int64) * 10000
+                + order_date.month().cast(pl.Int64) * 100
+                + order_date.day().cast(pl.Int64)
+            ).alias('date_key'),
+        )
+        return {column: result[column].to_numpy() for column in result.columns}
+    
+    def _aggregate(self, df: pd.DataFrame, by: str, aggregations: dict[str, str]) -> pd.DataFrame:
+        pl = self._pl
+        expressions = [
+            pl.col(column).drop_nulls().n_unique() if function == 'nunique' else pl.col(column).sum()
+            for column, function in aggregations.items()
+        ]
+        result = (
+            self._frame(df[[by, *aggregations]])
+            .filter(pl.col(by).is_not_null())
+            .group_by(by)
+            .agg(expressions)
+            .sort(by)
+        )
+        return result.to_pandas()
+
+
+class DuckDBEngine(ColumnarEngine):
+    """Рушій на DuckDB (багатопотоковий, потребує пакет duckdb).
+    
+    Стадії трансформації виконуються в окремих потоках і ділять один
+    рушій, тож кожен запит іде через власний курсор з'єднання: курсор
+    DuckDB - окреме з'єднання з тією ж базою, і зареєстрований frame
+    видно лише йому.
+    """
+    
+    name = 'duckdb'
+    
+    def __init__(self):
+        """Імпортує DuckDB та відкриває in-memory з'єднання.
+        
+        Raises:
+            ImportError: Якщо пакет duckdb не встановлено
+        """
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("Рушій duckdb потребує пакет duckdb (pip install duckdb)") from e
+        self._connection = duckdb.connect()
+    
+    def _query(self, df: pd.DataFrame, sql: str) -> pd.DataFrame:
+        """Виконує запит над DataFrame, зареєстрованим як frame у курсорі виклику."""
+        cursor = self._connection.cursor()
+        try:
+            cursor.register('frame', df)
+            return cursor.execute(sql).df()
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _quote(column: str) -> str:
+        """Екранує назву колонки для SQL."""
+        return '"' + column.replace('"', '""') + '"'
+    
+    def _first_occurrences(self, df: pd.DataFrame, subset: list[str]) -> np.ndarray:
+        columns = ', '.join(self._quote(column) for column in subset)
+        frame = df[subset].assign(__row=np.arange(len(df)))
+        first_rows = self._query(
+            frame, f'SELECT min(__row) AS first_row FROM frame GROUP BY {columns}'
+        )['first_row']
+        mask = np.zeros(len(df), dtype=bool)
+        mask[first_rows.to_numpy(dtype=np.int64)] = True
+        return mask
+    
+    def _missing_rows(self, df: pd.DataFrame) -> np.ndarray:
+        condition = ' OR '.join(f'{self._quote(column)} IS NULL' for column in df.columns)
+        # Проєкція без сортування зберігає порядок рядків (preserve_insertion_order)
+        result = self._query(df, f'SELECT coalesce({condition}, false) AS missing FROM frame')
+        return result['missing'].to_numpy(dtype=bool)
+    
+    def count_missing(self, df: pd.DataFrame) -> int:
+        """Повертає загальну кількість пропущених значень."""
+        if len(df) == 0 or len(df.columns) == 0:
+            return 0
+        counts = ' + '.join(
+            f'count(*) FILTER (WHERE {self._quote(column)} IS NULL)' for column in df.columns
+        )
+        return int(self._query(df, f'SELECT {counts} AS missing FROM frame')['missing'].iloc[0])
+    
+    def order_metrics(self, orders_df: pd.DataFrame, cost_ratio: float) -> dict[str, np.ndarray]:
+        """Обчислює похідні поля позицій замовлень (див. PandasEngine.order_metrics)."""
+        frame = orders_df[['unit_price', 'quantity', 'discount', 'order_date']]
+        result = self._query(frame, f'''
+            SELECT
+                revenue,
+                discount_amount,
+                revenue * CAST({cost_ratio!r} AS DOUBLE) AS cost,
+                revenue - discount_amount - revenue * CAST({cost_ratio!r} AS DOUBLE) AS margin,
+                date_key
+            FROM (
+                SELECT
+                    CAST(unit_price AS DOUBLE) * quantity AS revenue,
+                    coalesce(CAST(discount AS DOUBLE), 0.0) AS discount_amount,
+                    CAST(year(order_date) AS BIGINT) * 10000
+                        + month(order_date) * 100 + day(order_date) AS date_key
+                FROM frame
+            )
+        ''')
+        return {column: result[column].to_numpy() for column in result.columns}
+    
+    def _aggregate(self, df: pd.DataFrame, by: str, aggregations: dict[str, str]) -> pd.DataFrame:
+        key = self._quote(by)
+        expressions = []
+        for column, function in aggregations.items():
+            quoted = self._quote(column)
+            if function == 'nunique':
+                expressions.append(f'count(DISTINCT {quoted}) AS {quoted}')
+            elif pd.api.types.is_integer_dtype(df[column]):
+                # sum(BIGINT) у DuckDB - HUGEINT, який pandas отримав би як float
+                expressions.append(f'CAST(sum({quoted}) AS BIGINT) AS {quoted}')
+            else:
+                expressions.append(f'coalesce(sum({quoted}), 0) AS {quoted}')
+        return self._query(df[[by, *aggregations]], f'''
+            SELECT {key}, {', '.join(expressions)}
+            FROM frame
+            WHERE {key} IS NOT NULL
+            GROUP BY {key}
+            ORDER BY {key}
+        ''')
+
+
+def get_frame_engine(name: str = 'pandas') -> PandasEngine:
+    """Створює рушій обчислень за назвою.
+    
+    Args:
+        name: Назва рушія ('pandas', 'polars', 'duckdb')
+    
+    Returns:
+        Рушій
+    
+    Raises:
+        ValueError: Якщо рушій невідомий
+        ImportError: Якщо пакет рушія не встановлено
+    """
+    engines = {'pandas': PandasEngine, 'polars': PolarsEngine, 'duckdb': DuckDBEngine}
+    if name not in engines:
+        raise ValueError(f"Невідомий рушій трансформації: {name}. Доступні: {FRAME_ENGINES}")
+    engine = engines[name]()
+    logger.info(f"Рушій трансформації: {engine.name}")
+    return engine
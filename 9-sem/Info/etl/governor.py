@@ -0,0 +1,240 @@
+"""
+Модуль регулювання розміру чанків за бюджетом пам'яті.
+
+Фіксований розмір чанку (ETL_BATCH_SIZE) для вузьких рядків замовлень
+дає зайві звернення до бази, а для широких (опис товару) - ризик OOM.
+MemoryGovernor стежить за RSS процесу та виміряним обсягом рядка
+останніх чанків кожного джерела (екстрактора чи таблиці лоадера) і
+збільшує або зменшує наступний чанк так, щоб процес лишався в межах
+бюджету (ETL_MEMORY_BUDGET). batch_size лишається початковим розміром.
+
+Якщо бюджет вичерпано, чанки, що чекають на обробку (буфери паралельних
+шардів), скидаються у Parquet файли на локальному диску.
+"""
+
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from .transform import frame_memory
+
+logger = logging.getLogger(__name__)
+
+# Найменший та найбільший (у разах від batch_size) розмір чанку
+MIN_CHUNK_ROWS = 100
+MAX_CHUNK_GROWTH = 64
+
+# Частка вільного бюджету на один чанк: у конвеєрі одночасно живе кілька
+# його копій (сирий, трансформований, рядки для запису, CSV буфер)
+CHUNK_BUDGET_SHARE = 0.1
+
+# Скільки рядків чанку вимірюється для оцінки обсягу рядка
+SAMPLE_ROWS = 1000
+
+
+def current_rss_bytes() -> int:
+    """Повертає поточне споживання пам'яті процесом (RSS) в байтах.
+    
+    Без /proc (macOS) повертає пікове значення - оцінку зверху.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # macOS повертає ru_maxrss у байтах (див. etl.metrics.peak_rss_bytes)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def row_bytes(df: pd.DataFrame) -> float:
+    """Оцінює обсяг рядка DataFrame (deep) за першими SAMPLE_ROWS рядками."""
+    sample = df.iloc[:SAMPLE_ROWS]
+    return frame_memory(sample) / max(len(sample), 1)
+
+
+def spill_frame(chunk: pd.DataFrame, directory: Path) -> 'SpilledFrame':
+    """Скидає чанк у Parquet файл каталогу.
+    
+    Args:
+        chunk: Чанк, що чекатиме на обробку
+        directory: Каталог скинутих чанків
+    
+    Returns:
+        SpilledFrame чанку
+    """
+    path = directory / f'{uuid.uuid4().hex}.parquet'
+    chunk.to_parquet(path, index=False)
+    logger.debug(f"Чанк {len(chunk)} рядків скинуто на диск: {path}")
+    return SpilledFrame(path, len(chunk))
+
+
+@dataclass(frozen=True)
+class SpilledFrame:
+    """Чанк, скинутий на диск до моменту обробки.
+    
+    Attributes:
+        path: Parquet файл чанку
+        rows: Кількість рядків
+    """
+    path: Path
+    rows: int
+    
+    def load(self) -> pd.DataFrame:
+        """Читає чанк з диска та видаляє файл."""
+        df = pd.read_parquet(self.path)
+        self.path.unlink(missing_ok=True)
+        return df
+
+
+class MemoryGovernor:
+    """Регулятор розміру чанків за бюджетом пам'яті процесу.
+    
+    Потокобезпечний: стадії ETL та шарди витягування виконуються в
+    окремих потоках і спільно використовують один регулятор.
+    
+    Attributes:
+        memory_budget: Бюджет пам'яті процесу (RSS) в байтах
+        batch_size: Початковий розмір чанку (ETL_BATCH_SIZE)
+        min_rows: Найменший розмір чанку
+        max_rows: Найбільший розмір чанку
+        spill_dir: Каталог для скинутих чанків (None - тимчасовий)
+    """
+    
+    def __init__(
+        self,
+        memory_budget: int,
+        batch_size: int,
+        spill_dir: Optional[str] = None,
+        min_rows: int = MIN_CHUNK_ROWS,
+        max_rows: Optional[int] = None
+    ):
+        """Ініціалізує регулятор.
+        
+        Args:
+            memory_budget: Бюджет пам'яті процесу в байтах
+            batch_size: Початковий розмір чанку
+            spill_dir: Каталог для скинутих чанків (None - тимчасовий каталог)
+            min_rows: Найменший розмір чанку
+            max_rows: Найбільший розмір чанку (None - batch_size * MAX_CHUNK_GROWTH)
+        """
+        self.memory_budget = memory_budget
+        self.batch_size = batch_size
+        self.min_rows = max(1, min(min_rows, batch_size))
+        self.max_rows = max_rows or batch_size * MAX_CHUNK_GROWTH
+        self.spill_dir = spill_dir
+        self._sizes: dict[str, int] = {}
+        self._row_bytes: dict[str, float] = {}
+        self._spill_path: Optional[Path] = None
+        self._lock = threading.Lock()
+    
+    def chunk_size(self, source: str, initial: Optional[int] = None) -> int:
+        """Повертає поточний розмір чанку джерела.
+        
+        Args:
+            source: Джерело (база екстрактора або таблиця лоадера)
+            initial: Розмір до першого виміру (None - batch_size)
+        """
+        with self._lock:
+            return self._sizes.get(source, initial or self.batch_size)
+    
+    def observe(self, source: str, chunk: pd.DataFrame, initial: Optional[int] = None) -> int:
+        """Враховує виміряний чанк джерела та повертає розмір наступного.
+        
+        Понад бюджетом розмір зменшується вдвічі; інакше чанк займає
+        CHUNK_BUDGET_SHARE вільного бюджету, але росте не більш ніж удвічі
+        за крок, щоб один вузький чанк не роздув наступний.
+        
+        Args:
+            source: Джерело (база екстрактора або таблиця лоадера)
+            chunk: Прочитаний або записуваний чанк
+            initial: Розмір до першого виміру (None - batch_size)
+        
+        Returns:
+            Розмір наступного чанку в рядках
+        """
+        if len(chunk) == 0:
+            return self.chunk_size(source, initial)
+        
+        measured = row_bytes(chunk)
+        rss = current_rss_bytes()
+        with self._lock:
+            previous = self._row_bytes.get(source)
+            per_row = measured if previous is None else (previous + measured) / 2
+            self._row_bytes[source] = per_row
+            
+            size = self._sizes.get(source, initial or self.batch_size)
+            if rss > self.memory_budget:
+                target = size // 2
+            else:
+                free = self.memory_budget - rss
+                target = min(int(free * CHUNK_BUDGET_SHARE / max(per_row, 1.0)), size * 2)
+            resized = min(max(target, self.min_rows), self.max_rows)
+            self._sizes[source] = resized
+        
+        if resized != size:
+            logger.debug(
+                f"{source}: чанк {size} -> {resized} рядків "
+                f"({per_row:,.0f} байт/рядок, RSS {rss / 1024 ** 2:,.0f} МБ)"
+            )
+        return resized
+    
+    def over_budget(self) -> bool:
+        """Чи перевищує процес бюджет пам'яті."""
+        return current_rss_bytes() > self.memory_budget
+    
+    def hold(self, chunk: pd.DataFrame) -> pd.DataFrame | SpilledFrame:
+        """Готує чанк до очікування в буфері: понад бюджетом скидає його на диск.
+        
+        Args:
+            chunk: Чанк, що чекатиме на обробку
+        
+        Returns:
+            Той самий DataFrame або SpilledFrame (див. restore)
+        """
+        if len(chunk) == 0 or not self.over_budget():
+            return chunk
+        return self.spill(chunk)
+    
+    def spill(self, chunk: pd.DataFrame) -> SpilledFrame:
+        """Скидає чанк на диск незалежно від бюджету.
+        
+        Args:
+            chunk: Чанк, що чекатиме на обробку
+        
+        Returns:
+            SpilledFrame чанку (див. restore)
+        """
+        return spill_frame(chunk, self._spill_directory())
+    
+    @staticmethod
+    def restore(item: pd.DataFrame | SpilledFrame) -> pd.DataFrame:
+        """Повертає DataFrame чанку, прочитавши скинутий з диска."""
+        return item.load() if isinstance(item, SpilledFrame) else item
+    
+    def _spill_directory(self) -> Path:
+        """Повертає каталог скинутих чанків, створюючи його при потребі."""
+        with self._lock:
+            if self._spill_path is None:
+                if self.spill_dir:
+                    Path(self.spill_dir).mkdir(parents=True, exist_ok=True)
+                self._spill_path = Path(tempfile.mkdtemp(prefix='etl-spill-', dir=self.spill_dir))
+                logger.info(f"Бюджет пам'яті перевищено, чанки скидаються в {self._spill_path}")
+            return self._spill_path
+    
+    def close(self) -> None:
+        """Видаляє каталог скинутих чанків."""
+        with self._lock:
+            if self._spill_path is not None:
+                shutil.rmtree(self._spill_path, ignore_errors=True)
+                self._spill_path = None
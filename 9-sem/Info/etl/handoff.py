@@ -0,0 +1,196 @@
+"""
+Модуль передачі даних між стадіями ETL через файли.
+
+В Airflow витягування, трансформація та завантаження кожної таблиці -
+окремі task'и (можливо, в різних процесах). Дані між ними передаються
+файлами на спільному локальному диску (ETL_HANDOFF_DIR), а через XCom -
+лише маніфест: список файлів, кількість рядків та watermark. Тому
+невдалу стадію можна повторити без повторення попередніх, а витягування
+однієї таблиці перекривається із завантаженням іншої.
+
+Формати:
+- 'arrow' - Arrow IPC файли без стиснення: читаються через memory map,
+  числові колонки без NULL потрапляють у DataFrame без копіювання;
+- 'parquet' - менші файли ціною декодування при читанні.
+"""
+
+import logging
+import re
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Generator, Iterable, Mapping, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Формати файлів передачі та їх розширення
+HANDOFF_FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+
+@dataclass(frozen=True)
+class HandoffManifest:
+    """Маніфест результату стадії: файли чанків та їх підсумок.
+    
+    Attributes:
+        table: Назва таблиці DWH
+        stage: Стадія, що записала файли ('extract' або 'transform')
+        files: Шляхи файлів чанків у порядку запису
+        rows: Загальна кількість рядків
+        file_format: Формат файлів ('arrow' або 'parquet')
+        watermark: Watermark джерела після завантаження (ISO формат, опціонально)
+    """
+    table: str
+    stage: str
+    files: tuple[str, ...] = field(default=())
+    rows: int = 0
+    file_format: str = 'arrow'
+    watermark: Optional[str] = None
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Серіалізує маніфест для XCom."""
+        return {
+            'table': self.table,
+            'stage': self.stage,
+            'files': list(self.files),
+            'rows': self.rows,
+            'file_format': self.file_format,
+            'watermark': self.watermark,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'HandoffManifest':
+        """Відновлює маніфест з результату to_dict."""
+        return cls(
+            table=data['table'],
+            stage=data['stage'],
+            files=tuple(data.get('files') or ()),
+            rows=int(data.get('rows') or 0),
+            file_format=data.get('file_format', 'arrow'),
+            watermark=data.get('watermark'),
+        )
+
+
+class StageHandoff:
+    """Файли передачі даних між стадіями одного запуску.
+    
+    Файли запуску лежать у <directory>/<run_id>/<table>/<stage>-NNNNN.<ext>.
+    Кожен файл записується під тимчасовим іменем і перейменовується після
+    запису, а повторна спроба стадії спочатку видаляє файли попередньої:
+    маніфест ніколи не посилається на недописаний файл.
+    
+    Attributes:
+        directory: Каталог файлів запуску
+        file_format: Формат файлів ('arrow' або 'parquet')
+    """
+    
+    def __init__(self, directory: str | Path, run_id: str, file_format: str = 'arrow'):
+        """Ініціалізує передачу даних запуску.
+        
+        Args:
+            directory: Спільний каталог передачі (ETL_HANDOFF_DIR)
+            run_id: Ідентифікатор запуску (наприклад, run_id DAG run)
+            file_format: Формат файлів ('arrow' або 'parquet')
+        
+        Raises:
+            ValueError: Якщо формат невідомий
+        """
+        if file_format not in HANDOFF_FORMATS:
+            raise ValueError(
+                f"Невідомий формат передачі: {file_format} (очікується {tuple(HANDOFF_FORMATS)})"
+            )
+        self.directory = Path(directory) / re.sub(r'[^\w.-]', '_', run_id)
+        self.file_format = file_format
+    
+    def write(
+        self,
+        table: str,
+        stage: str,
+        chunks: Iterable[pd.DataFrame],
+        watermark: Optional[Any] = None
+    ) -> HandoffManifest:
+        """Записує чанки стадії у файли (порожні чанки пропускаються).
+        
+        Args:
+            table: Назва таблиці DWH
+            stage: Стадія, що записує ('extract' або 'transform')
+            chunks: DataFrame'и результату стадії
+            watermark: Watermark джерела для стадії завантаження (опціонально)
+        
+        Returns:
+            Маніфест записаних файлів
+        """
+        stage_dir = self.directory / table
+        stage_dir.mkdir(parents=True, exist_ok=True)
+        for stale in stage_dir.glob(f'{stage}-*'):
+            stale.unlink()
+        
+        suffix = HANDOFF_FORMATS[self.file_format]
+        files = []
+        rows = 0
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            path = stage_dir / f'{stage}-{len(files):05d}{suffix}'
+            self._write_file(chunk, path)
+            files.append(str(path))
+            rows += len(chunk)
+        
+        logger.info(f"{table}: {stage} записано {rows} рядків у {len(files)} файлів ({self.file_format})")
+        return HandoffManifest(
+            table=table,
+            stage=stage,
+            files=tuple(files),
+            rows=rows,
+            file_format=self.file_format,
+            watermark=pd.Timestamp(watermark).isoformat() if watermark is not None else None,
+        )
+    
+    def _write_file(self, df: pd.DataFrame, path: Path) -> None:
+        """Атомарно записує DataFrame у файл передачі."""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        partial = path.with_name(path.name + '.partial')
+        if self.file_format == 'arrow':
+            with pa.OSFile(str(partial), 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            pq.write_table(table, partial)
+        partial.replace(path)
+    
+    @staticmethod
+    def read(manifest: HandoffManifest) -> Generator[pd.DataFrame, None, None]:
+        """Читає чанки маніфесту по одному.
+        
+        Arrow файли відображаються в пам'ять: колонки, які pandas може
+        використати без конвертації, не копіюються (масиви лише для читання,
+        тож стадії замінюють колонки, а не змінюють їх на місці).
+        
+        Yields:
+            DataFrame кожного файлу в порядку запису
+        """
+        for path in manifest.files:
+            if manifest.file_format == 'arrow':
+                with pa.memory_map(path, 'r') as source:
+                    table = ipc.open_file(source).read_all()
+            else:
+                table = pq.read_table(path, memory_map=True)
+            yield table.to_pandas(split_blocks=True)
+    
+    @classmethod
+    def read_frame(cls, manifest: HandoffManifest) -> pd.DataFrame:
+        """Читає всі чанки маніфесту в один DataFrame (порожній, якщо файлів немає)."""
+        chunks = list(cls.read(manifest))
+        if not chunks:
+            return pd.DataFrame()
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True)
+    
+    def cleanup(self) -> None:
+        """Видаляє всі файли запуску."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        logger.info(f"Файли передачі запуску видалено: {self.directory}")
@@ -0,0 +1,1269 @@
+#!/usr/bin/env python3
+"""
+Підбір індексів та матеріалізованих представлень для запитів ETL і дашбордів.
+
+Запити витягування (etl.extract) та питання Metabase (build_questions у
+scripts/metabase_seed.py) розбираються на предикати рівності та діапазону,
+з'єднання і колонки, які запит читає з кожної таблиці. За ними
+пропонуються:
+- композитні індекси: спочатку колонки рівності, потім перша колонка
+  діапазону; таблиця без власних фільтрів, до якої приєднується
+  відфільтрована, отримує індекс за колонками з'єднання;
+- покривні індекси, якщо запит читає з таблиці небагато колонок
+  (PostgreSQL - INCLUDE, MySQL - колонки в кінці ключа);
+- матеріалізовані представлення DWH, що приєднують до зведення атрибути
+  вимірів, за якими фільтрує дашборд, з індексом на цих атрибутах. Їх
+  довелося б оновлювати після кожного завантаження, тож представлення
+  лише вимірюються у звіті і в міграції не записуються.
+Індекс не пропонується, якщо наявний індекс з тим самим лівим префіксом
+вже його обслуговує.
+
+Схема береться з DDL репозиторію (database/init та database/migrations,
+--offline) або з живих баз. На живих базах для кожного запиту виконується
+EXPLAIN і вимірюється затримка до та після пропозицій: у PostgreSQL -
+в транзакції, що відкочується, в MySQL - зі створенням і видаленням
+індексів (--apply лишає їх).
+
+Використання:
+    python -m etl.index_advisor --offline --emit database/migrations
+    # Перезаписати закомічені NNN_index_advisor.sql за поточними DDL та запитами
+    python -m etl.index_advisor --offline --regenerate --emit database/migrations
+    python -m etl.index_advisor --repeat 5 --report index_report.json
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import logging
+import re
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from .config import ETLConfig
+from .extract import CatalogExtractor, OrdersExtractor, PaymentsExtractor
+from .pushdown import PushdownSchema
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Питання Metabase, що створює scripts/metabase_seed.py
+METABASE_SEED_PATH = REPO_ROOT / 'scripts' / 'metabase_seed.py'
+
+# Найбільша кількість колонок індексу разом з покривними: у MySQL покривні
+# колонки стають частиною ключа, тож межа менша
+MAX_INDEX_COLUMNS = {'mysql': 5, 'postgresql': 6}
+
+# Найдовше ім'я індексу (PostgreSQL - 63, MySQL - 64 символи)
+MAX_IDENTIFIER_LENGTH = 63
+
+# Префікс матеріалізованих представлень, що пропонуються
+VIEW_PREFIX = 'mv_'
+
+# Суфікс файлів міграцій, які записує write_migrations
+MIGRATION_SUFFIX = '_index_advisor.sql'
+
+
+@dataclass(frozen=True)
+class SourceDatabase:
+    """База, для якої підбираються індекси.
+    
+    Attributes:
+        title: Назва бази в заголовку міграції
+        dialect: Діалект SQL ('mysql' або 'postgresql')
+        schema_file: DDL схеми в database/init
+        migrations: Каталог міграцій бази в database/migrations
+        apply_command: Команда застосування міграції ({path} - шлях файлу)
+    """
+    title: str
+    dialect: str
+    schema_file: str
+    migrations: str
+    apply_command: str
+
+
+# Ключі відповідають атрибутам ETLConfig з конфігурацією підключення
+SOURCE_DATABASES = {
+    'orders_db': SourceDatabase(
+        'Orders DB', 'mysql', '03_orders_schema.sql', 'orders',
+        'mysql -h localhost -P 3308 -u orders_user -p orders_db < {path}'
+    ),
+    'catalog_db': SourceDatabase(
+        'Catalog DB', 'mysql', '02_catalog_schema.sql', 'catalog',
+        'mysql -h localhost -P 3307 -u catalog_user -p catalog_db < {path}'
+    ),
+    'payments_db': SourceDatabase(
+        'Payments DB', 'mysql', '04_payments_schema.sql', 'payments',
+        'mysql -h localhost -P 3309 -u payments_user -p payments_db < {path}'
+    ),
+    'dwh_db': SourceDatabase(
+        'DWH', 'postgresql', '05_dwh_schema.sql', 'dwh',
+        'psql -h localhost -U dwh_user -d dwh_db -f {path}'
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Index:
+    """Індекс таблиці.
+    
+    Attributes:
+        table: Назва таблиці
+        columns: Колонки ключа в порядку індексу
+        include: Покривні колонки поза ключем (PostgreSQL INCLUDE)
+    """
+    table: str
+    columns: tuple[str, ...]
+    include: tuple[str, ...] = ()
+    
+    def serves(self, other: 'Index') -> bool:
+        """Чи обслуговує індекс запити іншого: ключ іншого - лівий префікс цього, колонки покриті."""
+        return (
+            self.table == other.table
+            and self.columns[:len(other.columns)] == other.columns
+            and set(other.include) <= set(self.columns) | set(self.include)
+        )
+
+
+@dataclass
+class TableSchema:
+    """Колонки та індекси таблиці.
+    
+    Attributes:
+        columns: Колонки в порядку DDL
+        indexes: Наявні індекси (включно з первинним ключем)
+        primary_key: Колонки первинного ключа
+        view: Чи це матеріалізоване представлення
+    """
+    columns: list[str] = field(default_factory=list)
+    indexes: list[Index] = field(default_factory=list)
+    primary_key: tuple[str, ...] = ()
+    view: bool = False
+
+
+@dataclass(frozen=True)
+class AdvisorQuery:
+    """Запит, для якого підбираються індекси.
+    
+    Attributes:
+        name: Назва (метод екстрактора або питання Metabase)
+        database: Ключ бази в SOURCE_DATABASES
+        sql: SQL з іменованими параметрами :name
+        params: Значення параметрів для EXPLAIN та вимірювань
+    """
+    name: str
+    database: str
+    sql: str
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class JoinClause:
+    """З'єднання запиту з однією умовою рівності колонок.
+    
+    Attributes:
+        kind: 'JOIN' або 'LEFT JOIN'
+        table: Приєднувана таблиця
+        alias: Аліас приєднуваної таблиці
+        condition: Пари (аліас, колонка) обох сторін умови
+        text: Текст з'єднання в запиті
+    """
+    kind: str
+    table: str
+    alias: str
+    condition: tuple[tuple[str, str], tuple[str, str]]
+    text: str
+
+
+@dataclass
+class QueryShape:
+    """Розібраний запит: таблиці, предикати, з'єднання та прочитані колонки.
+    
+    Attributes:
+        tables: Таблиці запиту в порядку появи
+        aliases: Аліас (або назва) -> таблиця
+        equality: Таблиця -> колонки з предикатами рівності (=, IN, IS)
+        ranges: Таблиця -> колонки з предикатами діапазону (<, >, BETWEEN, LIKE)
+        joins: Пари (таблиця, колонка) сторін умов з'єднання (в обох напрямках)
+        columns: Таблиця -> колонки, які запит читає
+        base: Перша таблиця FROM та її аліас
+        join_clauses: З'єднання з умовою рівності однієї пари колонок
+        unknown: Колонки предикатів, яких немає в схемі
+    """
+    tables: list[str] = field(default_factory=list)
+    aliases: dict[str, str] = field(default_factory=dict)
+    equality: dict[str, list[str]] = field(default_factory=dict)
+    ranges: dict[str, list[str]] = field(default_factory=dict)
+    joins: list[tuple[tuple[str, str], tuple[str, str]]] = field(default_factory=list)
+    columns: dict[str, list[str]] = field(default_factory=dict)
+    base: Optional[tuple[str, str]] = None
+    join_clauses: list[JoinClause] = field(default_factory=list)
+    unknown: list[str] = field(default_factory=list)
+    
+    def filtered(self, table: str) -> bool:
+        """Чи має таблиця власні предикати."""
+        return bool(self.equality.get(table) or self.ranges.get(table))
+
+
+@dataclass
+class IndexProposal:
+    """Запропонований індекс та запити, які він обслуговує.
+    
+    Attributes:
+        database: Ключ бази в SOURCE_DATABASES
+        index: Індекс
+        queries: Назви запитів
+    """
+    database: str
+    index: Index
+    queries: list[str] = field(default_factory=list)
+    
+    @property
+    def name(self) -> str:
+        """Ім'я індексу: <таблиця>_<колонки ключа>[_cov]_idx."""
+        suffix = '_cov_idx' if self.index.include else '_idx'
+        return _identifier(f"{self.index.table}_{'_'.join(self.index.columns)}", suffix)
+    
+    def create_sql(self, dialect: str) -> str:
+        """Повертає DDL створення індексу для діалекту."""
+        if dialect == 'mysql':
+            columns = ', '.join(f'`{column}`' for column in self.index.columns)
+            return f'CREATE INDEX `{self.name}` ON `{self.index.table}` ({columns})'
+        columns = ', '.join(f'"{column}"' for column in self.index.columns)
+        include = ''
+        if self.index.include and dialect == 'postgresql':
+            include = ' INCLUDE (' + ', '.join(f'"{column}"' for column in self.index.include) + ')'
+        return f'CREATE INDEX IF NOT EXISTS "{self.name}" ON "{self.index.table}" ({columns}){include}'
+    
+    def drop_sql(self, dialect: str) -> str:
+        """Повертає DDL видалення індексу для діалекту."""
+        if dialect == 'mysql':
+            return f'DROP INDEX `{self.name}` ON `{self.index.table}`'
+        return f'DROP INDEX IF EXISTS "{self.name}"'
+
+
+@dataclass
+class ViewProposal:
+    """Матеріалізоване представлення DWH: зведення з атрибутами вимірів.
+    
+    Attributes:
+        base: Базова таблиця (зведення)
+        joins: З'єднання (вид, вимір, колонка бази, колонка виміру)
+        attributes: Атрибути вимірів (вимір, колонка) у представленні
+        keys: Ключі індексів представлення як атрибути (вимір, колонка)
+        queries: Назви запитів
+        base_columns: Колонки базової таблиці (для імен атрибутів без конфліктів)
+    """
+    base: str
+    joins: tuple[tuple[str, str, str, str], ...]
+    attributes: list[tuple[str, str]] = field(default_factory=list)
+    keys: list[tuple[tuple[str, str], ...]] = field(default_factory=list)
+    queries: list[str] = field(default_factory=list)
+    base_columns: tuple[str, ...] = ()
+    
+    @property
+    def name(self) -> str:
+        """Ім'я представлення: mv_<зведення>_<виміри без префікса dim_>."""
+        dimensions = '_'.join(_stem(table) for _, table, _, _ in self.joins)
+        return _identifier(f'{VIEW_PREFIX}{self.base}_{dimensions}')
+    
+    @property
+    def columns(self) -> dict[tuple[str, str], str]:
+        """(вимір, колонка) -> колонка представлення.
+        
+        Атрибут зберігає назву колонки виміру, якщо вона не збігається з
+        колонкою зведення чи іншого виміру, інакше - з префіксом виміру.
+        Колонки з'єднання відповідають колонкам зведення.
+        """
+        names = [column for _, column in self.attributes]
+        columns = {}
+        for table, column in self.attributes:
+            clash = column in self.base_columns or names.count(column) > 1
+            columns[(table, column)] = f'{_stem(table)}_{column}' if clash else column
+        for _, table, base_column, join_column in self.joins:
+            columns[(table, join_column)] = base_column
+        return columns
+    
+    def indexes(self) -> list[IndexProposal]:
+        """Індекси представлення за атрибутами фільтрів."""
+        columns = self.columns
+        return [
+            IndexProposal('dwh_db', Index(self.name, tuple(columns[key] for key in keys)), list(self.queries))
+            for keys in self.keys
+        ]
+    
+    def create_sql(self) -> list[str]:
+        """Повертає DDL створення представлення та його індексів."""
+        columns = self.columns
+        select = [f'"{self.base}".*'] + [
+            f'"{table}"."{column}"' + (f' AS "{columns[(table, column)]}"' if columns[(table, column)] != column else '')
+            for table, column in self.attributes
+        ]
+        joins = [
+            f'{kind} "{table}" ON "{self.base}"."{base_column}" = "{table}"."{join_column}"'
+            for kind, table, base_column, join_column in self.joins
+        ]
+        statements = [
+            f'CREATE MATERIALIZED VIEW IF NOT EXISTS "{self.name}" AS\n'
+            f'SELECT {", ".join(select)}\n'
+            f'FROM "{self.base}"\n' + '\n'.join(joins)
+        ]
+        statements += [index.create_sql('postgresql') for index in self.indexes()]
+        return statements
+    
+    def drop_sql(self) -> str:
+        """Повертає DDL видалення представлення (разом з його індексами)."""
+        return f'DROP MATERIALIZED VIEW IF EXISTS "{self.name}"'
+    
+    def rewrite(self, sql: str, shape: QueryShape) -> str:
+        """Переписує запит на читання з представлення замість з'єднань.
+        
+        Args:
+            sql: Текст запиту, з якого отримано shape
+            shape: Розібраний запит, що входить у queries представлення
+        
+        Returns:
+            Запит до представлення з тими самими параметрами
+        """
+        base_table, base_alias = shape.base
+        dimensions = {table for _, table, _, _ in self.joins}
+        folded = {clause.alias: clause for clause in shape.join_clauses if clause.table in dimensions}
+        for clause in folded.values():
+            sql = sql.replace(clause.text, '', 1)
+        sql = re.sub(rf'\bFROM\s+{base_table}\b', f'FROM {self.name}', sql, count=1, flags=re.I)
+        columns = self.columns
+        
+        def column(match: re.Match) -> str:
+            clause = folded.get(match.group(1))
+            if clause is None:
+                return match.group(0)
+            return f'{base_alias}.{columns[(clause.table, match.group(2))]}'
+        
+        return _QUALIFIED_COLUMN.sub(column, sql)
+
+
+@dataclass
+class Advice:
+    """Пропозиції для набору запитів.
+    
+    Attributes:
+        indexes: Запропоновані індекси таблиць
+        views: Запропоновані матеріалізовані представлення DWH
+        shapes: Назва запиту -> розібраний запит
+    """
+    indexes: list[IndexProposal] = field(default_factory=list)
+    views: list[ViewProposal] = field(default_factory=list)
+    shapes: dict[str, QueryShape] = field(default_factory=dict)
+    
+    def view_for(self, query: str) -> Optional[ViewProposal]:
+        """Повертає представлення, що обслуговує запит (None, якщо такого немає)."""
+        return next((view for view in self.views if query in view.queries), None)
+
+
+def _identifier(name: str, suffix: str = '') -> str:
+    """Обрізає ім'я до MAX_IDENTIFIER_LENGTH, зберігаючи унікальність хешем."""
+    if len(name) + len(suffix) <= MAX_IDENTIFIER_LENGTH:
+        return name + suffix
+    digest = hashlib.md5(name.encode()).hexdigest()[:8]
+    return f'{name[:MAX_IDENTIFIER_LENGTH - len(suffix) - 9]}_{digest}{suffix}'
+
+
+def _stem(table: str) -> str:
+    """Назва виміру без префікса dim_."""
+    return table.removeprefix('dim_')
+
+
+def _unique(values) -> list:
+    """Унікальні значення в порядку появи."""
+    return list(dict.fromkeys(values))
+
+
+# ---------------------------------------------------------------------------
+# Схема
+# ---------------------------------------------------------------------------
+
+_IDENT = r'[`"]?(\w+)[`"]?'
+_CREATE_TABLE = re.compile(rf'CREATE TABLE (?:IF NOT EXISTS )?{_IDENT} \((.*?)\n\)', re.S | re.I)
+_COLUMN_LINE = re.compile(r'^\s*[`"](\w+)[`"]\s+(.*)$')
+_TABLE_PRIMARY_KEY = re.compile(r'^\s*PRIMARY KEY\s*\(([^)]*)\)', re.I)
+_ADD_COLUMN = re.compile(rf'ALTER TABLE {_IDENT} ADD COLUMN (?:IF NOT EXISTS )?{_IDENT}', re.I)
+_CREATE_INDEX = re.compile(
+    rf'CREATE (?:UNIQUE )?INDEX (?:IF NOT EXISTS )?(?:{_IDENT} )?ON {_IDENT}\s*\(([^)]*)\)'
+    r'(?:\s*INCLUDE\s*\(([^)]*)\))?',
+    re.I
+)
+_CREATE_VIEW = re.compile(rf'CREATE MATERIALIZED VIEW (?:IF NOT EXISTS )?{_IDENT}', re.I)
+
+
+def _column_list(columns: str) -> tuple[str, ...]:
+    """Розбирає список колонок DDL ("a", `b` DESC) у назви."""
+    return tuple(column.strip().split()[0].strip('`"') for column in columns.split(',') if column.strip())
+
+
+def parse_ddl(sql: str, schema: Optional[dict[str, TableSchema]] = None) -> dict[str, TableSchema]:
+    """Розбирає DDL (таблиці, колонки, індекси, матеріалізовані представлення).
+    
+    Розуміє DDL репозиторію в синтаксисі MySQL (`назви`) та PostgreSQL
+    ("назви"). Скрипти застосовуються послідовно, тож міграції
+    передаються разом зі схемою, що вони змінюють.
+    
+    Args:
+        sql: Текст DDL
+        schema: Схема, яку доповнити (None - нова)
+    
+    Returns:
+        Назва таблиці -> TableSchema
+    """
+    schema = {} if schema is None else schema
+    for table, body in _CREATE_TABLE.findall(sql):
+        definition = schema.setdefault(table, TableSchema())
+        for line in body.splitlines():
+            column = _COLUMN_LINE.match(line)
+            if column:
+                name, rest = column.groups()
+                if name not in definition.columns:
+                    definition.columns.append(name)
+                if 'PRIMARY KEY' in rest.upper():
+                    definition.primary_key = (name,)
+                    definition.indexes.append(Index(table, (name,)))
+                elif re.search(r'\bUNIQUE\b', rest, re.I):
+                    definition.indexes.append(Index(table, (name,)))
+                continue
+            primary_key = _TABLE_PRIMARY_KEY.match(line)
+            if primary_key:
+                definition.primary_key = _column_list(primary_key.group(1))
+                definition.indexes.append(Index(table, definition.primary_key))
+    
+    for table, column in _ADD_COLUMN.findall(sql):
+        definition = schema.setdefault(table, TableSchema())
+        if column not in definition.columns:
+            definition.columns.append(column)
+    
+    for _, table, columns, include in _CREATE_INDEX.findall(sql):
+        index = Index(table, _column_list(columns), _column_list(include))
+        definition = schema.setdefault(table, TableSchema())
+        if index not in definition.indexes:
+            definition.indexes.append(index)
+    
+    for view in _CREATE_VIEW.findall(sql):
+        schema.setdefault(view, TableSchema()).view = True
+    return schema
+
+
+def load_schema(database: str, root: Path = REPO_ROOT, include_advisor: bool = True) -> dict[str, TableSchema]:
+    """Будує схему бази з DDL репозиторію: database/init та міграції по порядку.
+    
+    Args:
+        database: Ключ бази в SOURCE_DATABASES
+        root: Корінь репозиторію
+        include_advisor: Чи застосовувати міграції, записані самим advisor'ом
+            (False - схема, з якої вони були згенеровані)
+    
+    Returns:
+        Назва таблиці -> TableSchema
+    """
+    source = SOURCE_DATABASES[database]
+    schema = parse_ddl((root / 'database' / 'init' / source.schema_file).read_text(encoding='utf-8'))
+    migrations = root / 'database' / 'migrations' / source.migrations
+    for path in sorted(migrations.glob('*.sql')):
+        if include_advisor or not path.name.endswith(MIGRATION_SUFFIX):
+            parse_ddl(path.read_text(encoding='utf-8'), schema)
+    return schema
+
+
+def inspect_schema(engine: Engine) -> dict[str, TableSchema]:
+    """Читає схему живої бази через SQLAlchemy inspector.
+    
+    Args:
+        engine: Підключення до бази
+    
+    Returns:
+        Назва таблиці -> TableSchema
+    """
+    inspector = inspect(engine)
+    schema = {}
+    for table in inspector.get_table_names():
+        primary_key = tuple(inspector.get_pk_constraint(table).get('constrained_columns') or ())
+        definition = TableSchema(
+            columns=[column['name'] for column in inspector.get_columns(table)],
+            primary_key=primary_key,
+            indexes=[Index(table, primary_key)] if primary_key else [],
+        )
+        for index in inspector.get_indexes(table):
+            include = index.get('include_columns') or index.get('dialect_options', {}).get('postgresql_include') or ()
+            columns = tuple(column for column in index['column_names'] if column is not None)
+            if columns:
+                definition.indexes.append(Index(table, columns, tuple(include)))
+        schema[table] = definition
+    if engine.dialect.name == 'postgresql':
+        for view in inspector.get_materialized_view_names():
+            schema[view] = TableSchema(view=True)
+    return schema
+
+
+# ---------------------------------------------------------------------------
+# Запити
+# ---------------------------------------------------------------------------
+
+def extraction_queries(
+    config: ETLConfig,
+    start_date: datetime,
+    end_date: datetime,
+    since: datetime
+) -> list[AdvisorQuery]:
+    """Збирає SQL запитів витягування без звернення до баз.
+    
+    Екстрактори викликаються так само, як у конвеєрі (повне та
+    інкрементальне витягування), але extract_query лише запам'ятовує
+    запит і параметри.
+    
+    Args:
+        config: Конфігурація ETL (pushdown та розмір пакета)
+        start_date: Початок періоду витягування замовлень та платежів
+        end_date: Кінець періоду
+        since: Watermark інкрементального витягування
+    
+    Returns:
+        Запити витягування
+    """
+    pushdown = PushdownSchema(config.dwh_schema_path) if config.pushdown else None
+    extractors = {
+        'orders_db': OrdersExtractor(config.orders_db, pushdown=pushdown),
+        'catalog_db': CatalogExtractor(config.catalog_db, pushdown=pushdown),
+        'payments_db': PaymentsExtractor(config.payments_db),
+    }
+    calls: dict[str, tuple[str, Callable[[Any], Any]]] = {
+        'extract_orders': ('orders_db', lambda e: e.extract_orders(start_date, end_date, ordered=False)),
+        'extract_orders_stream': (
+            'orders_db', lambda e: e.extract_orders(start_date, end_date, chunksize=config.batch_size)
+        ),
+        'extract_orders_since': ('orders_db', lambda e: e.extract_orders(since=since, ordered=False)),
+        'extract_customers': ('orders_db', lambda e: e.extract_customers(since)),
+        'extract_employees': ('orders_db', lambda e: e.extract_employees()),
+        'extract_regions': ('orders_db', lambda e: e.extract_regions()),
+        'extract_products': ('catalog_db', lambda e: e.extract_products(since)),
+        'extract_categories': ('catalog_db', lambda e: e.extract_categories()),
+        'extract_payments': ('payments_db', lambda e: e.extract_payments(start_date, end_date)),
+    }
+    
+    queries = []
+    for name, (database, call) in calls.items():
+        captured = []
+        
+        def record(query, chunksize=None, params=None, tables=()):
+            captured.append((query, dict(params or {})))
+            return pd.DataFrame()
+        
+        extractor = extractors[database]
+        extractor.extract_query = record
+        call(extractor)
+        queries += [AdvisorQuery(name, database, ' '.join(sql.split()), params) for sql, params in captured]
+    return queries
+
+
+def _string_value(node: ast.AST) -> Optional[str]:
+    """Значення рядкового літерала ("..." або "...".strip())."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if (
+        isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+        and node.func.attr == 'strip' and not node.args
+    ):
+        value = _string_value(node.func.value)
+        return value.strip() if value is not None else None
+    return None
+
+
+def metabase_questions(path: Path = METABASE_SEED_PATH) -> dict[str, str]:
+    """Читає SQL питань Metabase з build_questions без імпорту скрипта.
+    
+    Args:
+        path: Шлях до scripts/metabase_seed.py
+    
+    Returns:
+        Назва питання -> SQL з тегами Metabase ({{tag}}, [[...]])
+    """
+    tree = ast.parse(Path(path).read_text(encoding='utf-8'))
+    questions = {}
+    for function in ast.walk(tree):
+        if not (isinstance(function, ast.FunctionDef) and function.name == 'build_questions'):
+            continue
+        for node in ast.walk(function):
+            if not isinstance(node, ast.Dict):
+                continue
+            fields = {
+                key.value: value for key, value in zip(node.keys, node.values)
+                if isinstance(key, ast.Constant)
+            }
+            name = _string_value(fields['name']) if 'name' in fields else None
+            query = _string_value(fields['query']) if 'query' in fields else None
+            if name and query:
+                questions[name] = query
+    return questions
+
+
+_OPTIONAL_CLAUSE = re.compile(r'\[\[(.*?)\]\]', re.S)
+_TEMPLATE_TAG = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+def render_metabase_sql(sql: str, values: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    """Підставляє значення фільтрів у SQL питання Metabase.
+    
+    Необов'язкові блоки [[...]] лишаються, лише якщо задано всі їх теги
+    (як у Metabase), а теги {{tag}} стають параметрами :tag.
+    
+    Args:
+        sql: SQL питання з тегами Metabase
+        values: Значення тегів (тег без значення - фільтр не задано)
+    
+    Returns:
+        (SQL з параметрами, значення використаних параметрів)
+    """
+    def optional(match: re.Match) -> str:
+        clause = match.group(1)
+        return clause if all(tag in values for tag in _TEMPLATE_TAG.findall(clause)) else ''
+    
+    rendered = _OPTIONAL_CLAUSE.sub(optional, sql)
+    params = {tag: values[tag] for tag in _TEMPLATE_TAG.findall(rendered)}
+    rendered = _TEMPLATE_TAG.sub(lambda match: f':{match.group(1)}', rendered)
+    return rendered.strip().rstrip(';').strip(), params
+
+
+def dashboard_queries(
+    start_date: datetime,
+    end_date: datetime,
+    region: Optional[str] = None,
+    path: Path = METABASE_SEED_PATH
+) -> list[AdvisorQuery]:
+    """Збирає SQL питань Metabase з фільтрами дашборду.
+    
+    Args:
+        start_date: Значення фільтра start_date
+        end_date: Значення фільтра end_date
+        region: Значення фільтра region (None - не задано)
+        path: Шлях до scripts/metabase_seed.py
+    
+    Returns:
+        Запити до DWH
+    """
+    values: dict[str, Any] = {'start_date': start_date.date(), 'end_date': end_date.date()}
+    if region is not None:
+        values['region'] = region
+    queries = []
+    for name, sql in metabase_questions(path).items():
+        rendered, params = render_metabase_sql(sql, values)
+        queries.append(AdvisorQuery(name, 'dwh_db', rendered, params))
+    return queries
+
+
+# ---------------------------------------------------------------------------
+# Розбір запитів
+# ---------------------------------------------------------------------------
+
+_KEYWORDS = {
+    'where', 'join', 'left', 'right', 'inner', 'outer', 'full', 'cross', 'on', 'using',
+    'group', 'order', 'limit', 'having', 'union', 'as', 'and', 'or', 'not', 'select', 'from',
+}
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_TABLE_REF = re.compile(rf'\b(?:FROM|JOIN)\s+{_IDENT}(?:\s+(?:AS\s+)?(\w+))?', re.I)
+_JOIN_CLAUSE = re.compile(
+    rf'\b(?:(LEFT|RIGHT|INNER|FULL)\s+(?:OUTER\s+)?)?JOIN\s+{_IDENT}(?:\s+(?:AS\s+)?(\w+))?\s+ON\s+'
+    r'(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)',
+    re.I
+)
+_SELECT_LIST = re.compile(r'\bSELECT\b.*?\bFROM\b', re.I | re.S)
+_SORT_CLAUSE = re.compile(r'\b(?:GROUP|ORDER)\s+BY\b.*?(?=\bLIMIT\b|\bHAVING\b|\bORDER\s+BY\b|\)|$)', re.I | re.S)
+_OPERAND = r'(?:(\w+)\.)?(\w+)'
+_PREDICATE = re.compile(
+    rf'(?<![\w.:]){_OPERAND}\s*(>=|<=|<>|!=|=|<|>|\bNOT\s+IN\b|\bIN\b|\bBETWEEN\b|\bNOT\s+LIKE\b|\bLIKE\b|\bIS\b)'
+    rf'\s*(?:{_OPERAND}\b(?!\s*\())?',
+    re.I
+)
+_QUALIFIED_COLUMN = re.compile(r'(?<![\w.:])(\w+)\.(\w+)\b')
+_BARE_WORD = re.compile(r'(?<![\w.:])([A-Za-z_]\w*)\b(?!\s*[.(])')
+
+_EQUALITY_OPERATORS = {'=', 'IN', 'IS'}
+_RANGE_OPERATORS = {'>=', '<=', '<', '>', 'BETWEEN', 'LIKE'}
+
+
+def parse_query(sql: str, schema: dict[str, TableSchema]) -> QueryShape:
+    """Розбирає запит на таблиці, предикати, з'єднання та прочитані колонки.
+    
+    Розбір евристичний і розрахований на запити репозиторію: колонка без
+    аліасу належить таблиці запиту, якщо вона є лише в одній з них;
+    предикати над виразами (функції від колонок) не враховуються, бо
+    індекс за колонкою їм не допомагає.
+    
+    Args:
+        sql: SQL запиту
+        schema: Схема бази запиту
+    
+    Returns:
+        Розібраний запит
+    """
+    shape = QueryShape()
+    plain = _STRING.sub("''", sql)
+    for table, alias in _TABLE_REF.findall(plain):
+        if table not in schema:
+            continue
+        if table not in shape.tables:
+            shape.tables.append(table)
+        shape.aliases.setdefault(table, table)
+        if alias and alias.lower() not in _KEYWORDS:
+            shape.aliases[alias] = table
+            if shape.base is None:
+                shape.base = (table, alias)
+        elif shape.base is None:
+            shape.base = (table, table)
+    
+    def resolve(qualifier: Optional[str], column: str) -> Optional[str]:
+        if qualifier:
+            table = shape.aliases.get(qualifier)
+            return table if table and column in schema[table].columns else None
+        owners = [table for table in shape.tables if column in schema[table].columns]
+        return owners[0] if len(owners) == 1 else None
+    
+    def add(target: dict[str, list[str]], table: str, column: str) -> None:
+        columns = target.setdefault(table, [])
+        if column not in columns:
+            columns.append(column)
+    
+    for qualifier, column in _QUALIFIED_COLUMN.findall(plain):
+        table = resolve(qualifier, column)
+        if table:
+            add(shape.columns, table, column)
+    for word in _BARE_WORD.findall(plain):
+        if word.lower() in _KEYWORDS or word in shape.aliases:
+            continue
+        table = resolve(None, word)
+        if table:
+            add(shape.columns, table, word)
+    
+    conditions = _SORT_CLAUSE.sub(' ', _SELECT_LIST.sub('FROM', plain))
+    for left_qualifier, left, operator, right_qualifier, right in _PREDICATE.findall(conditions):
+        operator = ' '.join(operator.upper().split())
+        table = resolve(left_qualifier or None, left)
+        if table is None:
+            name = f'{left_qualifier}.{left}' if left_qualifier else left
+            known_qualifier = not left_qualifier or left_qualifier in shape.aliases
+            if known_qualifier and not left.isdigit() and name not in shape.unknown:
+                shape.unknown.append(name)
+            continue
+        other = resolve(right_qualifier or None, right) if right else None
+        if operator == '=' and other is not None and other != table:
+            shape.joins.append(((table, left), (other, right)))
+            shape.joins.append(((other, right), (table, left)))
+        elif operator == 'IS' and right.upper() == 'NOT':
+            continue
+        elif operator in _EQUALITY_OPERATORS:
+            add(shape.equality, table, left)
+        elif operator in _RANGE_OPERATORS:
+            add(shape.ranges, table, left)
+    
+    for match in _JOIN_CLAUSE.finditer(plain):
+        kind, table, alias, *condition = match.groups()
+        if table not in schema:
+            continue
+        kind = 'LEFT JOIN' if (kind or '').upper() == 'LEFT' else 'JOIN' if not kind or kind.upper() == 'INNER' else None
+        if kind is None:
+            continue
+        alias = alias if alias and alias.lower() not in _KEYWORDS else table
+        left_alias, left, right_alias, right = condition
+        shape.join_clauses.append(
+            JoinClause(kind, table, alias, ((left_alias, left), (right_alias, right)), sql[match.start():match.end()])
+        )
+    return shape
+
+
+# ---------------------------------------------------------------------------
+# Пропозиції
+# ---------------------------------------------------------------------------
+
+def propose_indexes(query: AdvisorQuery, shape: QueryShape, schema: dict[str, TableSchema]) -> list[IndexProposal]:
+    """Пропонує індекси таблиць одного запиту.
+    
+    Args:
+        query: Запит
+        shape: Розібраний запит
+        schema: Схема бази запиту
+    
+    Returns:
+        Індекси, яких не обслуговує жоден наявний
+    """
+    dialect = SOURCE_DATABASES[query.database].dialect
+    proposals = []
+    for table in shape.tables:
+        if schema[table].view:
+            continue
+        key = list(shape.equality.get(table, []))
+        key += [column for column in shape.ranges.get(table, []) if column not in key][:1]
+        if not key:
+            # Таблиця читається через з'єднання з відфільтрованою таблицею
+            key = _unique(
+                column for (side, column), (other, _) in shape.joins
+                if side == table and other != table and shape.filtered(other)
+            )
+        if not key:
+            continue
+        
+        primary_key = schema[table].primary_key
+        if primary_key and Index(table, primary_key).serves(Index(table, tuple(key))):
+            # Пошук за первинним ключем повертає один рядок (у MySQL - з усіма колонками)
+            continue
+        covered = [column for column in shape.columns.get(table, []) if column not in key]
+        if dialect == 'mysql':
+            # Вторинні індекси InnoDB вже містять первинний ключ
+            covered = [column for column in covered if column not in primary_key]
+        if len(key) + len(covered) > MAX_INDEX_COLUMNS[dialect]:
+            covered = []
+        if dialect == 'mysql':
+            index = Index(table, tuple(key + covered))
+        else:
+            index = Index(table, tuple(key), tuple(covered))
+        
+        if not any(existing.serves(index) for existing in schema[table].indexes):
+            proposals.append(IndexProposal(query.database, index, [query.name]))
+    return proposals
+
+
+def merge_indexes(proposals: list[IndexProposal]) -> list[IndexProposal]:
+    """Об'єднує пропозиції, ключ яких - лівий префікс іншої.
+    
+    Покривні колонки об'єднуються, якщо індекс лишається в межах
+    MAX_INDEX_COLUMNS; інакше ширший індекс поглинає вужчий, лише якщо
+    вже його обслуговує.
+    
+    Args:
+        proposals: Пропозиції всіх запитів
+    
+    Returns:
+        Пропозиції без дублікатів, впорядковані за базою, таблицею та ключем
+    """
+    merged: list[IndexProposal] = []
+    ordered = sorted(proposals, key=lambda p: (-len(p.index.columns), -len(p.index.include)))
+    for proposal in ordered:
+        for existing in merged:
+            if existing.database != proposal.database or not existing.index.serves(replace(proposal.index, include=())):
+                continue
+            include = _unique(
+                existing.index.include
+                + tuple(column for column in proposal.index.include if column not in existing.index.columns)
+            )
+            limit = MAX_INDEX_COLUMNS[SOURCE_DATABASES[existing.database].dialect]
+            if len(existing.index.columns) + len(include) <= limit:
+                existing.index = replace(existing.index, include=tuple(include))
+            elif not existing.index.serves(proposal.index):
+                continue
+            existing.queries = _unique(existing.queries + proposal.queries)
+            break
+        else:
+            merged.append(IndexProposal(proposal.database, proposal.index, list(proposal.queries)))
+    return sorted(merged, key=lambda p: (p.database, p.index.table, p.index.columns))
+
+
+def propose_view(query: AdvisorQuery, shape: QueryShape, schema: dict[str, TableSchema]) -> Optional[ViewProposal]:
+    """Пропонує матеріалізоване представлення DWH для запиту до зведення.
+    
+    До базової таблиці запиту приєднуються виміри, з яких запит читає
+    атрибути (крім ключа з'єднання). Представлення пропонується, лише якщо
+    запит фільтрує за атрибутом приєднаного виміру: тоді фільтр
+    обслуговує індекс представлення, а з'єднання виконується при REFRESH.
+    
+    Args:
+        query: Запит до DWH
+        shape: Розібраний запит
+        schema: Схема DWH
+    
+    Returns:
+        Представлення або None (якщо його немає або воно вже існує)
+    """
+    if SOURCE_DATABASES[query.database].dialect != 'postgresql' or shape.base is None:
+        return None
+    base_table, base_alias = shape.base
+    if schema[base_table].view:
+        return None
+    
+    joins, attributes, equality, ranges = [], [], [], []
+    for clause in shape.join_clauses:
+        (left_alias, left), (right_alias, right) = clause.condition
+        if (left_alias, right_alias) == (clause.alias, base_alias):
+            (left_alias, left), (right_alias, right) = (right_alias, right), (left_alias, left)
+        if (left_alias, right_alias) != (base_alias, clause.alias) or clause.table == base_table:
+            continue
+        used = [column for column in shape.columns.get(clause.table, []) if column != right]
+        if not used:
+            continue
+        joins.append((clause.kind, clause.table, left, right))
+        attributes += [(clause.table, column) for column in used]
+        equality += [(clause.table, column) for column in shape.equality.get(clause.table, []) if column != right]
+        ranges += [(clause.table, column) for column in shape.ranges.get(clause.table, []) if column != right]
+    
+    key = tuple(equality + [column for column in ranges if column not in equality][:1])
+    if not key:
+        return None
+    view = ViewProposal(
+        base=base_table,
+        joins=tuple(joins),
+        attributes=attributes,
+        keys=[key],
+        queries=[query.name],
+        base_columns=tuple(schema[base_table].columns),
+    )
+    return None if view.name in schema else view
+
+
+def merge_views(views: list[ViewProposal]) -> list[ViewProposal]:
+    """Об'єднує представлення з однаковими з'єднаннями (атрибути, індекси, запити)."""
+    merged: dict[tuple, ViewProposal] = {}
+    for view in views:
+        signature = (view.base, view.joins)
+        existing = merged.get(signature)
+        if existing is None:
+            merged[signature] = replace(view, attributes=list(view.attributes), keys=list(view.keys), queries=list(view.queries))
+            continue
+        existing.attributes = _unique(existing.attributes + view.attributes)
+        existing.queries = _unique(existing.queries + view.queries)
+        for key in view.keys:
+            if not any(other[:len(key)] == key for other in existing.keys):
+                existing.keys = [other for other in existing.keys if key[:len(other)] != other] + [key]
+    return list(merged.values())
+
+
+def advise(queries: list[AdvisorQuery], schemas: dict[str, dict[str, TableSchema]]) -> Advice:
+    """Підбирає індекси та представлення для запитів.
+    
+    Args:
+        queries: Запити (бази без схеми пропускаються)
+        schemas: Ключ бази -> схема
+    
+    Returns:
+        Пропозиції
+    """
+    advice = Advice()
+    indexes, views = [], []
+    for query in queries:
+        schema = schemas.get(query.database)
+        if schema is None:
+            continue
+        shape = parse_query(query.sql, schema)
+        advice.shapes[query.name] = shape
+        if shape.unknown:
+            logger.warning(f"{query.name}: колонок {', '.join(shape.unknown)} немає в схемі {query.database}")
+        indexes += propose_indexes(query, shape, schema)
+        view = propose_view(query, shape, schema)
+        if view is not None:
+            views.append(view)
+    advice.indexes = merge_indexes(indexes)
+    advice.views = merge_views(views)
+    return advice
+
+
+# ---------------------------------------------------------------------------
+# Міграції
+# ---------------------------------------------------------------------------
+
+def render_migration(database: str, advice: Advice, path: str) -> str:
+    """Формує текст міграції з індексами для бази (представлення не записуються).
+    
+    Args:
+        database: Ключ бази в SOURCE_DATABASES
+        advice: Пропозиції
+        path: Шлях міграції відносно кореня репозиторію (для заголовка)
+    
+    Returns:
+        SQL міграції
+    """
+    source = SOURCE_DATABASES[database]
+    lines = [
+        f'-- Міграція {source.title}: індекси для запитів '
+        + ('дашбордів Metabase' if source.dialect == 'postgresql' else 'витягування ETL'),
+        '-- Згенеровано etl.index_advisor: ключ - колонки рівності, потім діапазону;',
+        '-- покривні індекси містять усі колонки, які запит читає з таблиці.',
+    ]
+    lines += ['--', '-- Застосування:', f'--   {source.apply_command.format(path=path)}']
+    
+    for proposal in advice.indexes:
+        if proposal.database == database:
+            lines += ['', f"-- {', '.join(proposal.queries)}", proposal.create_sql(source.dialect) + ';']
+    return '\n'.join(lines) + '\n'
+
+
+def write_migrations(
+    advice: Advice,
+    directory: Path,
+    root: Path = REPO_ROOT,
+    regenerate: bool = False
+) -> list[Path]:
+    """Записує міграції з індексами: по файлу на базу з пропозиціями.
+    
+    Файл отримує наступний номер у каталозі міграцій бази
+    (<directory>/<каталог бази>/NNN_index_advisor.sql). З regenerate
+    перезаписується остання вже наявна міграція advisor'а бази (для
+    пропозицій за схемою load_schema(..., include_advisor=False)).
+    
+    Args:
+        advice: Пропозиції
+        directory: Каталог міграцій (database/migrations)
+        root: Корінь репозиторію для шляху в заголовку
+        regenerate: Перезаписати наявну міграцію advisor'а замість нової
+    
+    Returns:
+        Шляхи записаних файлів
+    """
+    written = []
+    for database, source in SOURCE_DATABASES.items():
+        target = Path(directory) / source.migrations
+        existing = sorted(target.glob(f'[0-9][0-9][0-9]{MIGRATION_SUFFIX}')) if regenerate else []
+        if not existing and not any(proposal.database == database for proposal in advice.indexes):
+            continue
+        target.mkdir(parents=True, exist_ok=True)
+        numbers = [int(path.name[:3]) for path in target.glob('[0-9][0-9][0-9]_*.sql')]
+        path = existing[-1] if existing else target / f'{max(numbers, default=0) + 1:03d}{MIGRATION_SUFFIX}'
+        try:
+            label = path.resolve().relative_to(root.resolve()).as_posix()
+        except ValueError:
+            label = path.as_posix()
+        path.write_text(render_migration(database, advice, label), encoding='utf-8')
+        logger.info(f"Міграцію {source.title} записано: {path}")
+        written.append(path)
+    return written
+
+
+# ---------------------------------------------------------------------------
+# EXPLAIN та вимірювання
+# ---------------------------------------------------------------------------
+
+def _plan_nodes(node: Any) -> list[str]:
+    """Збирає доступи до таблиць з JSON плану PostgreSQL або MySQL."""
+    steps = []
+    if isinstance(node, dict):
+        if 'Node Type' in node and 'Relation Name' in node:
+            index = f" ({node['Index Name']})" if node.get('Index Name') else ''
+            steps.append(f"{node['Node Type']} {node['Relation Name']}{index}")
+        elif 'table_name' in node and 'access_type' in node:
+            key = f" ({node['key']})" if node.get('key') else ''
+            steps.append(f"{node['table_name']}: {node['access_type']}{key}")
+        for value in node.values():
+            steps += _plan_nodes(value)
+    elif isinstance(node, list):
+        for value in node:
+            steps += _plan_nodes(value)
+    return steps
+
+
+def explain_plan(conn: Connection, sql: str, params: dict[str, Any]) -> str:
+    """Повертає стислий план запиту: доступ до кожної таблиці та індекс.
+    
+    Args:
+        conn: З'єднання з базою запиту
+        sql: SQL запиту
+        params: Параметри запиту
+    
+    Returns:
+        Кроки плану через '; '
+    """
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        plan = conn.execute(text(f'EXPLAIN (FORMAT JSON) {sql}'), params).scalar()
+    elif dialect == 'mysql':
+        plan = conn.execute(text(f'EXPLAIN FORMAT=JSON {sql}'), params).scalar()
+    else:
+        rows = conn.execute(text(f'EXPLAIN QUERY PLAN {sql}'), params).fetchall()
+        return '; '.join(str(row[-1]) for row in rows)
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return '; '.join(_plan_nodes(plan))
+
+
+def measure_latency(conn: Connection, sql: str, params: dict[str, Any], repeat: int) -> float:
+    """Вимірює медіанну затримку запиту (після одного прогріваючого виконання).
+    
+    Args:
+        conn: З'єднання з базою запиту
+        sql: SQL запиту
+        params: Параметри запиту
+        repeat: Кількість вимірюваних виконань
+    
+    Returns:
+        Медіана затримки в мілісекундах
+    """
+    conn.execute(text(sql), params).fetchall()
+    timings = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        conn.execute(text(sql), params).fetchall()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def _analyze(conn: Connection, table: str) -> None:
+    """Оновлює статистику таблиці для планувальника."""
+    if conn.dialect.name == 'mysql':
+        conn.execute(text(f'ANALYZE TABLE `{table}`'))
+    else:
+        conn.execute(text(f'ANALYZE "{table}"'))
+
+
+def evaluate(
+    engine: Engine,
+    database: str,
+    queries: list[AdvisorQuery],
+    advice: Advice,
+    repeat: int = 5,
+    apply: bool = False
+) -> list[dict[str, Any]]:
+    """Виконує EXPLAIN та вимірює затримку запитів бази до і після пропозицій.
+    
+    У PostgreSQL пропозиції створюються в транзакції вимірювання і
+    відкочуються; в інших базах DDL не транзакційний, тож індекси
+    видаляються після вимірювання. З apply лишаються індекси:
+    представлення лише вимірюються.
+    
+    Args:
+        engine: Підключення до бази
+        database: Ключ бази в SOURCE_DATABASES
+        queries: Запити бази
+        advice: Пропозиції
+        repeat: Кількість вимірюваних виконань кожного запиту
+        apply: Чи лишити індекси
+    
+    Returns:
+        Рядки звіту: запит, затримки (мс) та плани до/після
+    """
+    dialect = engine.dialect.name
+    indexes = [proposal for proposal in advice.indexes if proposal.database == database]
+    views = advice.views if dialect == 'postgresql' and database == 'dwh_db' else []
+    report = []
+    with engine.connect() as conn:
+        for query in queries:
+            report.append({
+                'query': query.name,
+                'database': database,
+                'before_ms': measure_latency(conn, query.sql, query.params, repeat),
+                'plan_before': explain_plan(conn, query.sql, query.params),
+            })
+        
+        created = []
+        try:
+            for proposal in indexes:
+                conn.execute(text(proposal.create_sql(dialect)))
+                created.append(proposal)
+            for view in views:
+                for statement in view.create_sql():
+                    conn.execute(text(statement))
+            for table in _unique(proposal.index.table for proposal in indexes):
+                _analyze(conn, table)
+            
+            for row, query in zip(report, queries):
+                row['after_ms'] = measure_latency(conn, query.sql, query.params, repeat)
+                row['plan_after'] = explain_plan(conn, query.sql, query.params)
+                view = next((view for view in views if query.name in view.queries), None)
+                if view is not None:
+                    rewritten = view.rewrite(query.sql, advice.shapes[query.name])
+                    row['view'] = view.name
+                    row['view_ms'] = measure_latency(conn, rewritten, query.params, repeat)
+                    row['plan_view'] = explain_plan(conn, rewritten, query.params)
+        finally:
+            if apply:
+                for view in views:
+                    conn.execute(text(view.drop_sql()))
+                conn.commit()
+            else:
+                conn.rollback()
+                if dialect != 'postgresql':
+                    for proposal in created:
+                        conn.execute(text(proposal.drop_sql(dialect)))
+                    conn.commit()
+    
+    for row in report:
+        logger.info(f"{row['query']}: {row['before_ms']:.1f} -> {row['after_ms']:.1f} мс")
+    return report
+
+
+def collect_queries(config: ETLConfig, days: int, region: Optional[str] = None) -> list[AdvisorQuery]:
+    """Збирає запити витягування та питань Metabase за останні days днів."""
+    end_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start_date = end_date - timedelta(days=days)
+    since = end_date - timedelta(days=1)
+    return extraction_queries(config, start_date, end_date, since) + dashboard_queries(start_date, end_date, region)
+
+
+def main() -> int:
+    """Головна функція.
+    
+    Returns:
+        Код виходу (0 - успіх)
+    """
+    parser = argparse.ArgumentParser(description='Підбір індексів і представлень для запитів ETL та дашбордів')
+    parser.add_argument('--offline', action='store_true', help='Схема з DDL репозиторію, без EXPLAIN та вимірювань')
+    parser.add_argument('--databases', nargs='+', choices=list(SOURCE_DATABASES), default=list(SOURCE_DATABASES),
+                        help='Бази для аналізу')
+    parser.add_argument('--emit', metavar='DIR', help='Записати міграції в каталог (наприклад, database/migrations)')
+    parser.add_argument('--regenerate', action='store_true',
+                        help='З --offline: підбір без міграцій advisor\'а і перезапис їх у --emit')
+    parser.add_argument('--report', metavar='FILE', help='JSON звіт затримок до/після')
+    parser.add_argument('--repeat', type=int, default=5, help='Кількість вимірюваних виконань запиту')
+    parser.add_argument('--days', type=int, default=30, help='Період фільтрів дат запитів, днів')
+    parser.add_argument('--region', help='Значення фільтра region питань Metabase')
+    parser.add_argument('--apply', action='store_true', help='Лишити індекси після вимірювань')
+    args = parser.parse_args()
+    if args.regenerate and not args.offline:
+        parser.error('--regenerate працює лише з --offline')
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    config = ETLConfig.from_env()
+    queries = [query for query in collect_queries(config, args.days, args.region) if query.database in args.databases]
+    engines = {} if args.offline else {
+        database: create_engine(getattr(config, database).connection_string) for database in args.databases
+    }
+    
+    try:
+        schemas = {
+            database: load_schema(database, include_advisor=not args.regenerate)
+            if args.offline else inspect_schema(engines[database])
+            for database in args.databases
+        }
+        advice = advise(queries, schemas)
+        
+        for proposal in advice.indexes:
+            dialect = SOURCE_DATABASES[proposal.database].dialect
+            print(f"{proposal.database}: {proposal.create_sql(dialect)}  -- {', '.join(proposal.queries)}")
+        for view in advice.views:
+            print(f"dwh_db: {view.name}  -- {', '.join(view.queries)}")
+        if args.emit:
+            for path in write_migrations(advice, Path(args.emit), regenerate=args.regenerate):
+                print(f"Міграція: {path}")
+        
+        if args.offline:
+            return 0
+        report = []
+        for database, engine in engines.items():
+            database_queries = [query for query in queries if query.database == database]
+            report += evaluate(engine, database, database_queries, advice, args.repeat, args.apply)
+    finally:
+        for engine in engines.values():
+            engine.dispose()
+    
+    print(f"{'Запит':<32} {'До, мс':>10} {'Після, мс':>10} {'MV, мс':>10}")
+    for row in report:
+        view = f"{row['view_ms']:>10.1f}" if 'view_ms' in row else f"{'-':>10}"
+        print(f"{row['query']:<32} {row['before_ms']:>10.1f} {row['after_ms']:>10.1f} {view}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, ensure_ascii=False, indent=2, default=str)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Модуль резолюції surrogate ключів для fact_sales.
+
+Перетворює business id з OLTP (product_id, customer_id, ...) на surrogate
+ключі вимірів DWH (product_key, customer_key, ...). Відображення кожного
+виміру завантажується один раз за запуск і застосовується векторизовано
+до кожного чанку фактів.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .load import DimensionKey, Loader
+
+logger = logging.getLogger(__name__)
+
+
+FACT_SALES_DIMENSIONS = (
+    DimensionKey('dim_product', 'product_id', 'product_key'),
+    DimensionKey('dim_customer', 'customer_id', 'customer_key'),
+    DimensionKey('dim_employee', 'employee_id', 'employee_key'),
+    DimensionKey('dim_region', 'region_id', 'region_key'),
+)
+
+
+class SurrogateKeyResolver:
+    """Кеш відображень business id -> surrogate key.
+    
+    Відображення зберігається як pd.Index business id та NumPy масив
+    ключів, тож резолюція чанку - це один get_indexer без SQL join'ів
+    і без пошуку по рядках. Business id, яких немає у вимірі, додаються
+    як inferred members (рядок лише з business id), щоб факт не втратив
+    зв'язок; повні атрибути запише наступне завантаження виміру.
+    
+    Кеш виміру перезавантажується, якщо він старший за max_age або
+    після invalidate() (наприклад, коли стадія виміру записала зміни).
+    
+    Attributes:
+        loader: Лоадер з підключенням до DWH
+        dimensions: Виміри, ключі яких резолвляться
+        max_age: Максимальний вік кешу (None - до явного invalidate)
+        inferred_counts: Кількість створених inferred members по вимірах
+    """
+    
+    def __init__(
+        self,
+        loader: Loader,
+        dimensions: tuple[DimensionKey, ...] = FACT_SALES_DIMENSIONS,
+        max_age: Optional[timedelta] = None
+    ):
+        """Ініціалізує резолвер.
+        
+        Args:
+            loader: Лоадер з підключенням до DWH
+            dimensions: Виміри для резолюції
+            max_age: Максимальний вік кешу виміру
+        """
+        self.loader = loader
+        self.dimensions = dimensions
+        self.max_age = max_age
+        self.inferred_counts: dict[str, int] = {dim.table: 0 for dim in dimensions}
+        self._cache: dict[str, tuple[pd.Index, np.ndarray, datetime]] = {}
+        self._lock = threading.Lock()
+    
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Скидає кеш виміру (або всіх вимірів).
+        
+        Args:
+            table: Назва таблиці-виміру; None - скинути всі
+        """
+        with self._lock:
+            if table is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(table, None)
+    
+    def _load_mapping(self, dim: DimensionKey) -> tuple[pd.Index, np.ndarray]:
+        """Читає відображення виміру з DWH.
+        
+        Args:
+            dim: Опис виміру
+        
+        Returns:
+            Кортеж (індекс business id, масив surrogate ключів)
+        """
+        query = (
+            f'SELECT "{dim.business_key}", "{dim.surrogate_key}" FROM "{dim.table}" '
+            f'WHERE "{dim.business_key}" IS NOT NULL'
+        )
+        try:
+            df = pd.read_sql(text(query), self.loader.engine)
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка читання ключів {dim.table}: {e}")
+            raise
+        
+        logger.info(f"Завантажено {len(df)} ключів {dim.table}")
+        return pd.Index(df[dim.business_key]), df[dim.surrogate_key].to_numpy(dtype=np.int64)
+    
+    def _mapping(self, dim: DimensionKey) -> tuple[pd.Index, np.ndarray]:
+        """Повертає відображення з кешу, перезавантажуючи застаріле."""
+        with self._lock:
+            cached = self._cache.get(dim.table)
+            if cached is not None:
+                index, keys, loaded_at = cached
+                if self.max_age is None or datetime.now() - loaded_at < self.max_age:
+                    return index, keys
+            
+            index, keys = self._load_mapping(dim)
+            self._cache[dim.table] = (index, keys, datetime.now())
+            return index, keys
+    
+    def _add_inferred_members(self, dim: DimensionKey, business_ids: np.ndarray) -> None:
+        """Створює inferred members для невідомих business id та додає їх у кеш.
+        
+        Args:
+            dim: Опис виміру
+            business_ids: Унікальні business id, відсутні у вимірі
+        """
+        ids = [str(value) for value in business_ids]
+        logger.warning(f"{dim.table}: {len(ids)} невідомих {dim.business_key}, створюються inferred members")
+        
+        try:
+            with self.loader.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        f'INSERT INTO "{dim.table}" ("{dim.business_key}") '
+                        'SELECT unnest(CAST(:ids AS text[])) '
+                        f'ON CONFLICT ("{dim.business_key}") DO NOTHING'
+                    ),
+                    {"ids": ids}
+                )
+                rows = conn.execute(
+                    text(
+                        f'SELECT "{dim.business_key}", "{dim.surrogate_key}" FROM "{dim.table}" '
+                        f'WHERE "{dim.business_key}" = ANY(CAST(:ids AS text[]))'
+                    ),
+                    {"ids": ids}
+                ).fetchall()
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка створення inferred members у {dim.table}: {e}")
+            raise
+        
+        with self._lock:
+            self.inferred_counts[dim.table] += len(rows)
+            cached = self._cache.get(dim.table)
+            if cached is None:
+                # Кеш скинуто паралельно - наступне звернення перечитає вимір
+                return
+            index, keys, loaded_at = cached
+            new_index = pd.Index([row[0] for row in rows])
+            new_keys = np.array([row[1] for row in rows], dtype=np.int64)
+            self._cache[dim.table] = (index.append(new_index), np.concatenate([keys, new_keys]), loaded_at)
+    
+    def resolve(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Додає до фактів surrogate ключі вимірів.
+        
+        Args:
+            df: DataFrame з business id (product_id, customer_id, ...)
+        
+        Returns:
+            Той самий DataFrame з колонками product_key, customer_key, ...
+            (Int64; NULL там, де business id відсутній)
+        """
+        for dim in self.dimensions:
+            business_ids = df[dim.business_key]
+            index, keys = self._mapping(dim)
+            positions = index.get_indexer(business_ids)
+            
+            missing = (positions == -1) & business_ids.notna().to_numpy()
+            if missing.any():
+                self._add_inferred_members(dim, business_ids[missing].unique())
+                index, keys = self._mapping(dim)
+                positions = index.get_indexer(business_ids)
+            
+            found = positions >= 0
+            values = np.zeros(len(positions), dtype=np.int64)
+            values[found] = keys[positions[found]]
+            df[dim.surrogate_key] = pd.arrays.IntegerArray(values, ~found)
+        
+        return df
@@ -4,35 +4,271 @@ Load модуль для завантаження даних у DWH.
 Відповідає за завантаження трансформованих даних у PostgreSQL DWH.
 """
 
+import csv
+import io
 import logging
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import SQLAlchemyError
 
 from .config import PostgreSQLConfig
+from .governor import MemoryGovernor
 
 logger = logging.getLogger(__name__)
 
+LOAD_METHODS = ('insert', 'copy')
+
+# Розмір чанку, який серіалізується в один COPY буфер
+COPY_CHUNKSIZE = 100_000
+
+# Розмір чанку multi-row INSERT
+INSERT_CHUNKSIZE = 1000
+
+# Колонки fact_sales у DWH: зв'язки з вимірами через surrogate ключі
+FACT_SALES_COLUMNS = [
+    'order_id', 'order_item_id', 'date_key', 'product_key',
+    'customer_key', 'employee_key', 'region_key', 'quantity',
+    'revenue', 'discount_amount', 'cost', 'margin'
+]
+
+# Колонка вимірів з хешем відстежуваних атрибутів рядка
+ROW_HASH_COLUMN = 'row_hash'
+
+# Службові колонки: їх зміна без зміни атрибутів не переписує рядок
+AUDIT_COLUMNS = ('created_at', 'updated_at')
+
+# До скількох ключів пакета хеші з DWH читаються лише для них, а не всі
+HASH_LOOKUP_MAX_KEYS = 10_000
+
+
+@dataclass(frozen=True)
+class DimensionKey:
+    """Опис зв'язку business id -> surrogate key для виміру.
+    
+    Attributes:
+        table: Таблиця-вимір у DWH
+        business_key: Колонка business id (з OLTP)
+        surrogate_key: Колонка surrogate ключа
+    """
+    table: str
+    business_key: str
+    surrogate_key: str
+
+
+@dataclass(frozen=True)
+class ColumnSource:
+    """Джерело колонки виміру DWH у DataFrame витягування.
+    
+    Attributes:
+        columns: Колонки-кандидати DataFrame (береться перша наявна)
+        reference: Вимір, у якому business id з колонки резолвиться в
+            surrogate ключ (None - значення записується як є)
+    """
+    columns: tuple[str, ...]
+    reference: Optional[DimensionKey] = None
+
+
+REGION_KEY = DimensionKey('dim_region', 'region_id', 'region_key')
+CATEGORY_KEY = DimensionKey('dim_category', 'category_id', 'category_key')
+
+# Відстежувані колонки вимірів DWH та їх джерела. Екстрактори без pushdown
+# дають назви OLTP (region_name, product_name), з pushdown - назви DWH;
+# FK колонки приходять як business id і резолвляться в surrogate ключі.
+# None - атрибут не має джерела в OLTP і лишається NULL
+DIMENSION_SOURCES: dict[str, dict[str, Optional[ColumnSource]]] = {
+    'dim_region': {
+        'name': ColumnSource(('region_name', 'name')),
+        'code': ColumnSource(('region_code', 'code')),
+    },
+    'dim_category': {
+        'name': ColumnSource(('category_name', 'name')),
+        'parent_category_key': ColumnSource(('parent_category_id',), CATEGORY_KEY),
+    },
+    'dim_product': {
+        'name': ColumnSource(('product_name', 'name')),
+        'sku': ColumnSource(('sku',)),
+        'category_key': ColumnSource(('category_id',), CATEGORY_KEY),
+    },
+    'dim_customer': {
+        'first_name': ColumnSource(('first_name',)),
+        'last_name': ColumnSource(('last_name',)),
+        'email': ColumnSource(('email',)),
+        # У customers OLTP немає регіону
+        'region_key': None,
+    },
+    'dim_employee': {
+        'first_name': ColumnSource(('first_name',)),
+        'last_name': ColumnSource(('last_name',)),
+        'email': ColumnSource(('email',)),
+        'region_key': ColumnSource(('region_id',), REGION_KEY),
+    },
+}
+
+
+def row_hashes(df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    """Обчислює стабільний хеш вмісту рядків (векторизовано).
+    
+    Хеш залежить лише від значень та dtype колонок (порядок колонок не
+    важливий) і не змінюється між запусками та процесами.
+    
+    Args:
+        df: DataFrame з рядками
+        columns: Відстежувані колонки
+        
+    Returns:
+        Масив int64 хешів (bigint у DWH) довжиною len(df)
+    """
+    if not columns:
+        return np.zeros(len(df), dtype=np.int64)
+    hashes = pd.util.hash_pandas_object(df[sorted(columns)], index=False)
+    return hashes.to_numpy().view(np.int64)
+
+
+def _null_safe_rows(df: pd.DataFrame) -> Iterable[tuple]:
+    """Повертає рядки DataFrame як кортежі, замінюючи NaN/NaT на None."""
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+
+def _copy_rows(dbapi_conn: Any, table_name: str, keys: list[str], rows: Iterable[tuple]) -> int:
+    """Серіалізує рядки в CSV буфер та виконує COPY FROM STDIN.
+    
+    Args:
+        dbapi_conn: DBAPI (psycopg2) з'єднання
+        table_name: Назва таблиці (вже екранована)
+        keys: Назви колонок
+        rows: Ітератор рядків
+        
+    Returns:
+        Кількість записаних рядків
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    buffer.seek(0)
+    
+    columns = ', '.join(f'"{key}"' for key in keys)
+    with dbapi_conn.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    return count
+
+
+def copy_from_stdin(table: Any, conn: Any, keys: list[str], data_iter: Iterable[tuple]) -> int:
+    """Записує рядки через PostgreSQL COPY FROM STDIN.
+    
+    Використовується як `method` для DataFrame.to_sql: рядки серіалізуються
+    в CSV буфер у пам'яті та передаються одним COPY замість INSERT
+    з прив'язкою параметрів для кожного значення.
+    
+    Args:
+        table: pandas SQLTable цільової таблиці
+        conn: SQLAlchemy Connection
+        keys: Назви колонок
+        data_iter: Ітератор рядків
+        
+    Returns:
+        Кількість записаних рядків
+    """
+    table_name = f'"{table.schema}"."{table.name}"' if table.schema else f'"{table.name}"'
+    return _copy_rows(conn.connection, table_name, keys, data_iter)
+
+
+def build_date_dimension(
+    start_date: datetime,
+    end_date: datetime,
+    freq: str = 'D'
+) -> pd.DataFrame:
+    """Будує календар векторизовано через аксесори DatetimeIndex.
+    
+    Для денної гранулярності date_key має формат YYYYMMDD, для погодинної
+    (freq='h') - YYYYMMDDHH і додається колонка hour.
+    
+    Args:
+        start_date: Початкова дата
+        end_date: Кінцева дата
+        freq: Частота pandas ('D', 'h', ...)
+        
+    Returns:
+        DataFrame з атрибутами календаря
+    """
+    offset = to_offset(freq)
+    hourly = isinstance(offset, Tick) and pd.Timedelta(offset) < pd.Timedelta(days=1)
+    
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    if not hourly:
+        # Календарні дні: межі без часу, щоб не загубити останній день
+        start, end = start.normalize(), end.normalize()
+    else:
+        start, end = start.floor('h'), end.floor('h')
+    
+    dates = pd.date_range(start=start, end=end, freq=offset)
+    date_key = dates.year * 10000 + dates.month * 100 + dates.day
+    
+    df = pd.DataFrame({
+        'date_key': np.asarray(date_key * 100 + dates.hour if hourly else date_key, dtype=np.int64),
+        'date': dates,
+        'year': dates.year,
+        'quarter': dates.quarter,
+        'month': dates.month,
+        'month_name': dates.month_name(),
+        'day': dates.day,
+        'day_of_week': dates.dayofweek + 1,
+        'day_name': dates.day_name(),
+        'week_of_year': dates.isocalendar().week.to_numpy(dtype=np.int64),
+        'is_weekend': dates.dayofweek >= 5
+    })
+    if hourly:
+        df.insert(2, 'hour', dates.hour)
+    return df
+
 
 class Loader:
     """Клас для завантаження даних у DWH.
     
     Attributes:
         config: Конфігурація підключення до DWH
+        load_method: Спосіб запису ('insert' або 'copy')
+        governor: Регулятор розміру чанків запису за бюджетом пам'яті (опціонально)
+        on_engine: Виклик для щойно створеного engine (наприклад, підрахунок запитів)
         engine: SQLAlchemy engine для підключення
     """
     
-    def __init__(self, config: PostgreSQLConfig):
+    def __init__(
+        self,
+        config: PostgreSQLConfig,
+        load_method: str = 'insert',
+        governor: Optional[MemoryGovernor] = None,
+        on_engine: Optional[Callable[[Engine], Any]] = None
+    ):
         """Ініціалізує лоадер.
         
         Args:
             config: Конфігурація підключення до PostgreSQL DWH
+            load_method: 'insert' - multi-row INSERT, 'copy' - COPY FROM STDIN
+            governor: Регулятор пам'яті; чанки запису підбираються за обсягом
+                рядків таблиці замість фіксованих COPY_CHUNKSIZE / INSERT_CHUNKSIZE
+            on_engine: Викликається з engine, коли той створюється (ліниво)
+            
+        Raises:
+            ValueError: Якщо спосіб запису невідомий
         """
+        if load_method not in LOAD_METHODS:
+            raise ValueError(f"Невідомий спосіб завантаження: {load_method}. Доступні: {LOAD_METHODS}")
         self.config = config
+        self.load_method = load_method
+        self.governor = governor
+        self.on_engine = on_engine
         self._engine: Optional[Engine] = None
+        self._table_columns: dict[str, tuple[list[str], list[str]]] = {}
         
     @property
     def engine(self) -> Engine:
@@ -51,6 +287,8 @@ class Loader:
                     pool_pre_ping=True,
                     pool_recycle=3600
                 )
+                if self.on_engine:
+                    self.on_engine(self._engine)
                 logger.info(f"З'єднання з DWH ({self.config.database}) встановлено")
             except SQLAlchemyError as e:
                 logger.error(f"Помилка підключення до DWH: {e}")
@@ -77,15 +315,18 @@ class Loader:
             SQLAlchemyError: Якщо помилка завантаження
         """
         try:
-            logger.info(f"Завантаження {len(df)} записів у {table_name}")
+            logger.info(f"Завантаження {len(df)} записів у {table_name} ({self.load_method})")
+            
+            method = copy_from_stdin if self.load_method == 'copy' else 'multi'
+            chunksize = self._write_chunksize(table_name, df)
             
             rows_inserted = df.to_sql(
                 table_name,
                 self.engine,
                 if_exists=if_exists,
                 index=False,
-                method='multi',
-                chunksize=1000
+                method=method,
+                chunksize=chunksize
             )
             
             logger.info(f"Успішно завантажено {len(df)} записів у {table_name}")
@@ -99,26 +340,147 @@ class Loader:
         """Завантажує дані продажів у fact_sales.
         
         Args:
-            df: DataFrame з фактами продажів
+            df: DataFrame з фактами продажів (з surrogate ключами, див. etl.keys)
             if_exists: Дія при існуванні таблиці
             
         Returns:
             Кількість завантажених записів
         """
         logger.info(f"Завантаження фактів продажів: {len(df)} записів")
+        return self.load_dimension(self._fact_sales_frame(df), 'fact_sales', if_exists)
+    
+    @staticmethod
+    def _fact_sales_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """Перевіряє та відбирає колонки fact_sales.
         
-        # Переконуємося що всі необхідні колонки присутні
-        required_columns = [
-            'order_id', 'order_item_id', 'date_key', 'product_id',
-            'customer_id', 'employee_id', 'region_id', 'quantity',
-            'revenue', 'discount_amount', 'cost', 'margin'
-        ]
-        
-        missing_columns = set(required_columns) - set(df.columns)
+        Args:
+            df: DataFrame з фактами продажів
+            
+        Returns:
+            DataFrame лише з колонками fact_sales
+            
+        Raises:
+            ValueError: Якщо бракує обов'язкових колонок
+        """
+        missing_columns = set(FACT_SALES_COLUMNS) - set(df.columns)
         if missing_columns:
             raise ValueError(f"Відсутні необхідні колонки: {missing_columns}")
+        return df[FACT_SALES_COLUMNS]
+    
+    def replace_fact_rows(
+        self,
+        df: pd.DataFrame,
+        key_column: str = 'order_item_id',
+        partition_column: Optional[str] = None
+    ) -> int:
+        """Ідемпотентно записує факти продажів.
+        
+        Рядки з тими ж ключами, що й у пакеті, видаляються та вставляються
+        заново в одній транзакції, тому повторний запуск за той самий
+        період не створює дублікатів.
         
-        return self.load_dimension(df[required_columns], 'fact_sales', if_exists)
+        З partition_column видалення обмежується значеннями ключа партиції
+        з пакета, тож PostgreSQL сканує лише зачеплені партиції. Це
+        припускає, що ключ партиції факту (дата замовлення) не змінюється.
+        
+        Args:
+            df: DataFrame з фактами продажів
+            key_column: Колонка, що однозначно ідентифікує факт
+            partition_column: Ключ партиціонування fact_sales (наприклад, date_key)
+            
+        Returns:
+            Кількість записаних рядків
+            
+        Raises:
+            SQLAlchemyError: Якщо помилка запису
+        """
+        df = self._fact_sales_frame(df).drop_duplicates(subset=[key_column], keep='last')
+        logger.info(f"Ідемпотентне завантаження fact_sales: {len(df)} записів")
+        
+        if len(df) == 0:
+            return 0
+        
+        try:
+            with self.engine.begin() as conn:
+                staging_table = self._create_staging(conn, 'fact_sales', list(df.columns))
+                self._bulk_insert(conn, df, staging_table)
+                delete_query = (
+                    f'DELETE FROM "fact_sales" f USING "{staging_table}" s '
+                    f'WHERE f."{key_column}" = s."{key_column}"'
+                )
+                params = {}
+                if partition_column:
+                    delete_query += f' AND f."{partition_column}" = ANY(:partition_values)'
+                    params['partition_values'] = [
+                        int(value) for value in df[partition_column].dropna().unique()
+                    ]
+                conn.execute(text(delete_query), params)
+                column_list = ', '.join(f'"{column}"' for column in df.columns)
+                conn.execute(text(
+                    f'INSERT INTO "fact_sales" ({column_list}) '
+                    f'SELECT {column_list} FROM "{staging_table}"'
+                ))
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка завантаження fact_sales: {e}")
+            raise
+        
+        return len(df)
+    
+    def trim_fact_sales(self, from_date_key: int, table_name: str = 'fact_sales') -> int:
+        """Видаляє факти з date_key >= from_date_key.
+        
+        Використовується для продовження перерваного повного завантаження:
+        хвіст, записаний після останньої контрольної точки, завантажується
+        заново (див. etl.checkpoints).
+        
+        Args:
+            from_date_key: Перший date_key, що видаляється
+            table_name: Таблиця фактів
+            
+        Returns:
+            Кількість рядків, що залишилися в таблиці
+        """
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    text(f'DELETE FROM "{table_name}" WHERE "date_key" >= :from_date_key'),
+                    {"from_date_key": int(from_date_key)}
+                )
+                kept = conn.execute(text(f'SELECT count(*) FROM "{table_name}"')).scalar()
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка очищення хвоста {table_name}: {e}")
+            raise
+        
+        logger.info(f"{table_name}: видалено факти з {from_date_key}, залишилось {kept}")
+        return int(kept)
+    
+    def load_fact_sales_stream(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        replace_existing: bool = False,
+        partition_column: Optional[str] = None
+    ) -> int:
+        """Дозаписує fact_sales по чанках.
+        
+        Кожен чанк завантажується одразу після отримання, тому в пам'яті
+        одночасно перебуває лише один чанк.
+        
+        Args:
+            chunks: Ітератор трансформованих DataFrame'ів
+            replace_existing: Замінювати рядки з тими ж ключами (replace_fact_rows)
+            partition_column: Ключ партиціонування для replace_fact_rows
+            
+        Returns:
+            Загальна кількість завантажених записів
+        """
+        total = 0
+        for chunk_number, chunk in enumerate(chunks, start=1):
+            if replace_existing:
+                total += self.replace_fact_rows(chunk, partition_column=partition_column)
+            else:
+                total += self.load_fact_sales(chunk, if_exists='append')
+            logger.info(f"Чанк {chunk_number}: всього завантажено {total} записів")
+        return total
     
     def truncate_table(self, table_name: str) -> None:
         """Очищає таблицю в DWH.
@@ -138,38 +500,75 @@ class Loader:
             logger.error(f"Помилка очищення {table_name}: {e}")
             raise
     
-    def load_dim_date(self, start_date: datetime, end_date: datetime) -> int:
+    def load_dim_date(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        incremental: bool = False,
+        freq: str = 'D',
+        table_name: str = 'dim_date'
+    ) -> int:
         """Завантажує дані у таблицю dim_date.
         
         Args:
             start_date: Початкова дата
             end_date: Кінцева дата
+            incremental: Дописати лише відсутні дати замість перестворення таблиці
+                (в існуючу таблицю пишуться лише її колонки)
+            freq: Гранулярність календаря ('D' - день, 'h' - година)
+            table_name: Назва таблиці календаря
             
         Returns:
             Кількість завантажених записів
         """
-        logger.info(f"Генерація dim_date з {start_date} до {end_date}")
-        
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        
-        date_data = []
-        for date in dates:
-            date_data.append({
-                'date_key': int(date.strftime('%Y%m%d')),
-                'date': date,
-                'year': date.year,
-                'quarter': date.quarter,
-                'month': date.month,
-                'month_name': date.strftime('%B'),
-                'day': date.day,
-                'day_of_week': date.dayofweek + 1,
-                'day_name': date.strftime('%A'),
-                'week_of_year': date.isocalendar()[1],
-                'is_weekend': date.dayofweek >= 5
-            })
-        
-        df_date = pd.DataFrame(date_data)
-        return self.load_dimension(df_date, 'dim_date', if_exists='replace')
+        logger.info(f"Генерація {table_name} з {start_date} до {end_date} (freq={freq})")
+        
+        df_date = build_date_dimension(start_date, end_date, freq)
+        
+        if not incremental:
+            return self.load_dimension(df_date, table_name, if_exists='replace')
+        
+        inspector = inspect(self.engine)
+        if not inspector.has_table(table_name):
+            return self.load_dimension(df_date, table_name, if_exists='append')
+        
+        # dim_date зі схеми DWH має не всі атрибути build_date_dimension
+        table_columns = {column['name'] for column in inspector.get_columns(table_name)}
+        df_date = df_date[[column for column in df_date.columns if column in table_columns]]
+        
+        existing_keys = self._existing_date_keys(
+            table_name,
+            int(df_date['date_key'].min()),
+            int(df_date['date_key'].max())
+        )
+        df_missing = df_date[~df_date['date_key'].isin(existing_keys)]
+        
+        if len(df_missing) == 0:
+            logger.info(f"{table_name} вже містить усі дати періоду")
+            return 0
+        return self.load_dimension(df_missing, table_name, if_exists='append')
+    
+    def _existing_date_keys(self, table_name: str, min_key: int, max_key: int) -> np.ndarray:
+        """Повертає date_key, що вже є в календарі в межах діапазону.
+        
+        Args:
+            table_name: Назва таблиці календаря
+            min_key: Нижня межа date_key
+            max_key: Верхня межа date_key
+            
+        Returns:
+            Масив існуючих date_key
+        """
+        try:
+            df = pd.read_sql(
+                text(f'SELECT "date_key" FROM "{table_name}" WHERE "date_key" BETWEEN :min_key AND :max_key'),
+                self.engine,
+                params={"min_key": min_key, "max_key": max_key}
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка читання {table_name}: {e}")
+            raise
+        return df['date_key'].to_numpy()
     
     def get_existing_keys(self, table_name: str, key_column: str) -> set[str]:
         """Отримує існуючі ключі з таблиці-виміру.
@@ -189,13 +588,86 @@ class Loader:
             logger.error(f"Помилка отримання ключів з {table_name}: {e}")
             return set()
     
+    @staticmethod
+    def _create_staging(conn: Connection, table_name: str, columns: list[str]) -> str:
+        """Створює тимчасову staging таблицю з колонками цільової таблиці.
+        
+        Таблиця видаляється автоматично в кінці транзакції.
+        
+        Args:
+            conn: SQLAlchemy Connection з відкритою транзакцією
+            table_name: Цільова таблиця
+            columns: Колонки staging таблиці
+            
+        Returns:
+            Назва staging таблиці
+        """
+        staging_table = f"stg_{table_name}"
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        conn.execute(text(
+            f'CREATE TEMP TABLE "{staging_table}" ON COMMIT DROP AS '
+            f'SELECT {column_list} FROM "{table_name}" WITH NO DATA'
+        ))
+        return staging_table
+    
+    def _write_chunksize(self, table_name: str, df: pd.DataFrame) -> int:
+        """Повертає розмір чанку запису DataFrame у таблицю.
+        
+        Без регулятора - фіксований розмір способу запису, з регулятором -
+        розмір за виміряним обсягом рядків і поточною пам'яттю процесу.
+        """
+        chunksize = COPY_CHUNKSIZE if self.load_method == 'copy' else INSERT_CHUNKSIZE
+        if self.governor is None:
+            return chunksize
+        return self.governor.observe(table_name, df, chunksize)
+    
+    def _bulk_insert(self, conn: Connection, df: pd.DataFrame, table_name: str) -> int:
+        """Записує DataFrame в існуючу таблицю в межах з'єднання.
+        
+        На відміну від load_dimension працює всередині відкритої транзакції,
+        тому придатний для тимчасових staging таблиць. З регулятором пам'яті
+        рядки серіалізуються чанками, а не всім DataFrame одразу.
+        
+        Args:
+            conn: SQLAlchemy Connection з відкритою транзакцією
+            df: Дані для запису
+            table_name: Назва таблиці
+            
+        Returns:
+            Кількість записаних рядків
+        """
+        columns = list(df.columns)
+        chunksize = self._write_chunksize(table_name, df) if self.governor else max(len(df), 1)
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        binds = ', '.join(f':p{i}' for i in range(len(columns)))
+        
+        written = 0
+        for start in range(0, len(df), chunksize):
+            chunk = df.iloc[start:start + chunksize]
+            if self.load_method == 'copy':
+                written += _copy_rows(conn.connection, f'"{table_name}"', columns, _null_safe_rows(chunk))
+                continue
+            
+            records = [
+                {f'p{i}': value for i, value in enumerate(row)}
+                for row in _null_safe_rows(chunk)
+            ]
+            conn.execute(text(f'INSERT INTO "{table_name}" ({column_list}) VALUES ({binds})'), records)
+            written += len(records)
+        return written
+    
     def upsert_dimension(
         self,
         df: pd.DataFrame,
         table_name: str,
         key_column: str
     ) -> dict[str, int]:
-        """Виконує upsert (insert or update) для таблиці-виміру.
+        """Виконує set-based upsert (insert or update) для таблиці-виміру.
+        
+        Пакет завантажується у тимчасову staging таблицю, після чого
+        один INSERT ... ON CONFLICT (key_column) DO UPDATE застосовує всі
+        зміни. Усе виконується в одній транзакції. Для key_column у таблиці
+        має існувати унікальний індекс.
         
         Args:
             df: DataFrame для завантаження
@@ -204,42 +676,258 @@ class Loader:
             
         Returns:
             Словник з кількістю вставлених та оновлених записів
+            
+        Raises:
+            SQLAlchemyError: Якщо помилка upsert
         """
         logger.info(f"Upsert в {table_name}: {len(df)} записів")
         
-        existing_keys = self.get_existing_keys(table_name, key_column)
-        
-        # Розділяємо на нові та існуючі
-        df_new = df[~df[key_column].isin(existing_keys)]
-        df_existing = df[df[key_column].isin(existing_keys)]
+        if len(df) == 0:
+            return {"inserted": 0, "updated": 0}
         
-        inserted = 0
-        updated = 0
+        # ON CONFLICT не може оновити той самий рядок двічі за один запит
+        df = df.drop_duplicates(subset=[key_column], keep='last')
         
-        # Вставляємо нові
-        if len(df_new) > 0:
-            inserted = self.load_dimension(df_new, table_name, if_exists='append')
+        columns = list(df.columns)
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        update_columns = [column for column in columns if column != key_column]
+        if update_columns:
+            conflict_action = "DO UPDATE SET " + ', '.join(
+                f'"{column}" = EXCLUDED."{column}"' for column in update_columns
+            )
+        else:
+            conflict_action = "DO NOTHING"
         
-        # Оновлюємо існуючі (видаляємо та вставляємо знову)
-        if len(df_existing) > 0:
-            try:
-                with self.engine.connect() as conn:
-                    for _, row in df_existing.iterrows():
-                        # Видаляємо старий запис
-                        delete_query = text(f"DELETE FROM {table_name} WHERE {key_column} = :key")
-                        conn.execute(delete_query, {"key": row[key_column]})
-                    conn.commit()
-                
-                # Вставляємо оновлені
-                updated = self.load_dimension(df_existing, table_name, if_exists='append')
+        try:
+            with self.engine.begin() as conn:
+                staging_table = self._create_staging(conn, table_name, columns)
+                self._bulk_insert(conn, df, staging_table)
                 
-            except SQLAlchemyError as e:
-                logger.error(f"Помилка оновлення в {table_name}: {e}")
-                raise
+                # xmax = 0 лише для щойно вставлених рядків
+                result = conn.execute(text(
+                    f'INSERT INTO "{table_name}" ({column_list}) '
+                    f'SELECT {column_list} FROM "{staging_table}" '
+                    f'ON CONFLICT ("{key_column}") {conflict_action} '
+                    f'RETURNING (xmax = 0) AS inserted'
+                ))
+                flags = [row[0] for row in result]
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка upsert в {table_name}: {e}")
+            raise
+        
+        inserted = sum(1 for flag in flags if flag)
+        updated = len(flags) - inserted
         
         logger.info(f"Upsert завершено: вставлено {inserted}, оновлено {updated}")
         return {"inserted": inserted, "updated": updated}
     
+    def _dimension_columns(self, table_name: str) -> tuple[list[str], list[str]]:
+        """Повертає колонки таблиці-виміру та її первинний ключ (кешуються).
+        
+        Колонку row_hash додає міграція database/migrations/dwh/007.
+        """
+        if table_name not in self._table_columns:
+            inspector = inspect(self.engine)
+            self._table_columns[table_name] = (
+                [column['name'] for column in inspector.get_columns(table_name)],
+                inspector.get_pk_constraint(table_name)['constrained_columns'],
+            )
+        return self._table_columns[table_name]
+    
+    def _reference_keys(self, values: pd.Series, reference: DimensionKey) -> tuple[pd.Series, set[str]]:
+        """Резолвить business id з колонки в surrogate ключі виміру.
+        
+        Як і SurrogateKeyResolver, для business id, яких ще немає у вимірі,
+        створює inferred members (рядок лише з business id), щоб зв'язок
+        не втратився; атрибути запише завантаження того виміру.
+        
+        Args:
+            values: Business id (NULL - зв'язку немає)
+            reference: Вимір, у якому шукаються ключі
+            
+        Returns:
+            Кортеж (surrogate ключі Int64 з тим самим індексом, business id
+            створених inferred members)
+        """
+        ids = [str(value) for value in values.dropna().unique()]
+        select = text(
+            f'SELECT "{reference.business_key}", "{reference.surrogate_key}" FROM "{reference.table}" '
+            f'WHERE "{reference.business_key}" = ANY(CAST(:ids AS text[]))'
+        )
+        created: set[str] = set()
+        rows = []
+        if ids:
+            with self.engine.begin() as conn:
+                rows = conn.execute(select, {"ids": ids}).fetchall()
+                missing = sorted(set(ids) - {row[0] for row in rows})
+                if missing:
+                    created = {row[0] for row in conn.execute(
+                        text(
+                            f'INSERT INTO "{reference.table}" ("{reference.business_key}") '
+                            'SELECT unnest(CAST(:ids AS text[])) '
+                            f'ON CONFLICT ("{reference.business_key}") DO NOTHING '
+                            f'RETURNING "{reference.business_key}"'
+                        ),
+                        {"ids": missing}
+                    )}
+                    rows += conn.execute(select, {"ids": missing}).fetchall()
+        if created:
+            logger.warning(
+                f"{reference.table}: {len(created)} невідомих {reference.business_key}, створено inferred members"
+            )
+        
+        index = pd.Index([row[0] for row in rows])
+        keys = np.array([row[1] for row in rows], dtype=np.int64)
+        positions = index.get_indexer(values.astype(object).where(values.notna(), None))
+        found = positions >= 0
+        resolved = np.zeros(len(positions), dtype=np.int64)
+        resolved[found] = keys[positions[found]]
+        return pd.Series(pd.arrays.IntegerArray(resolved, ~found), index=values.index), created
+    
+    def _dimension_frame(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        key_column: str
+    ) -> tuple[pd.DataFrame, list[str], set[str]]:
+        """Відображає DataFrame витягування на колонки виміру DWH.
+        
+        Колонки джерела перейменовуються за DIMENSION_SOURCES, business id
+        FK колонок резолвляться в surrogate ключі, решта колонок DataFrame
+        відкидається. Службові колонки (created_at, updated_at) беруться
+        як є, якщо вони є і в даних, і в таблиці.
+        
+        Args:
+            df: DataFrame з унікальними business key
+            table_name: Назва таблиці-виміру
+            key_column: Business key
+            
+        Returns:
+            Кортеж (DataFrame з колонками таблиці, відстежувані колонки,
+            business id inferred members, створених у самій таблиці)
+            
+        Raises:
+            ValueError: Якщо в таблиці немає key_column, а для відстежуваної
+                колонки таблиці немає джерела або його колонки в даних
+        """
+        table_columns, primary_key = self._dimension_columns(table_name)
+        if key_column not in table_columns:
+            raise ValueError(f"У таблиці {table_name} немає ключа {key_column}")
+        
+        sources = DIMENSION_SOURCES.get(table_name, {})
+        service_columns = {key_column, ROW_HASH_COLUMN, *AUDIT_COLUMNS, *primary_key}
+        frame = {key_column: df[key_column]}
+        tracked = []
+        created: set[str] = set()
+        for column in table_columns:
+            if column in service_columns:
+                continue
+            if column not in sources:
+                raise ValueError(f"Для {table_name}.{column} немає джерела в DIMENSION_SOURCES")
+            source = sources[column]
+            if source is None:
+                continue
+            available = [name for name in source.columns if name in df.columns]
+            if not available:
+                raise ValueError(f"Для {table_name}.{column} в даних немає жодної з колонок {source.columns}")
+            
+            values = df[available[0]]
+            if source.reference is not None:
+                values, inferred = self._reference_keys(values, source.reference)
+                if source.reference.table == table_name:
+                    created |= inferred
+            frame[column] = values
+            tracked.append(column)
+        
+        for column in AUDIT_COLUMNS:
+            if column in df.columns and column in table_columns:
+                frame[column] = df[column]
+        return pd.DataFrame(frame, index=df.index), tracked, created
+    
+    def _stored_hashes(self, table_name: str, key_column: str, keys: pd.Series) -> pd.DataFrame:
+        """Читає з DWH business key та row_hash рядків виміру.
+        
+        Для невеликого пакета читаються лише його ключі, інакше - вся таблиця.
+        
+        Returns:
+            DataFrame з колонками key_column та row_hash (NULL - хеш ще не записано)
+        """
+        query = f'SELECT "{key_column}", "{ROW_HASH_COLUMN}" FROM "{table_name}"'
+        params = {}
+        if len(keys) <= HASH_LOOKUP_MAX_KEYS:
+            query += f' WHERE "{key_column}" = ANY(CAST(:keys AS text[]))'
+            params['keys'] = [str(key) for key in keys]
+        
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(query), params).fetchall()
+        # Int64 замість float64 для NULL: bigint хеш не втрачає точності
+        return pd.DataFrame({
+            key_column: [row[0] for row in rows],
+            ROW_HASH_COLUMN: pd.array([row[1] for row in rows], dtype='Int64'),
+        })
+    
+    def sync_dimension(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        key_column: str
+    ) -> dict[str, int]:
+        """Записує у вимір лише нові та змінені рядки.
+        
+        Колонки витягування відображаються на колонки виміру за
+        DIMENSION_SOURCES (з резолюцією FK у surrogate ключі). Для кожного
+        рядка обчислюється хеш відстежуваних атрибутів - колонок таблиці,
+        крім ключів та службових (created_at, updated_at). Хеші одним
+        запитом порівнюються із записаними в DWH, і через upsert_dimension
+        пишуться лише рядки з новим ключем або іншим хешем (разом з новим
+        хешем). Рядки, яких немає в пакеті, не видаляються: на них можуть
+        посилатися факти.
+        
+        Args:
+            df: DataFrame з актуальним станом рядків виміру
+            table_name: Назва таблиці-виміру
+            key_column: Business key (з унікальним індексом)
+            
+        Returns:
+            Словник з кількістю вставлених, оновлених та незмінених записів
+            
+        Raises:
+            ValueError: Якщо в таблиці немає key_column або для колонки
+                таблиці немає джерела (див. _dimension_frame)
+            SQLAlchemyError: Якщо помилка читання або запису
+        """
+        if len(df) == 0:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+        
+        df = df.drop_duplicates(subset=[key_column], keep='last')
+        try:
+            frame, tracked, created = self._dimension_frame(df, table_name, key_column)
+            hashes = row_hashes(frame, tracked)
+            
+            stored = self._stored_hashes(table_name, key_column, frame[key_column])
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка порівняння хешів {table_name}: {e}")
+            raise
+        
+        # Новий ключ або ще не записаний хеш дають NA, тобто "змінено"
+        stored_hashes = pd.Series(
+            stored[ROW_HASH_COLUMN].array, index=stored[key_column].astype(str)
+        )
+        previous = stored_hashes.reindex(frame[key_column].astype(str))
+        same = (previous == hashes).fillna(False).to_numpy(dtype=bool)
+        
+        changed = frame.loc[~same].assign(**{ROW_HASH_COLUMN: hashes[~same]})
+        unchanged = int(same.sum())
+        logger.info(f"{table_name}: {len(changed)} нових або змінених записів, {unchanged} без змін")
+        
+        result = self.upsert_dimension(changed, table_name, key_column)
+        # Батьківські рядки пакета, щойно створені як inferred members
+        # (FK на саму таблицю), upsert бачить як оновлені
+        inferred = int(changed[key_column].astype(str).isin(created).sum())
+        if inferred:
+            result = {"inserted": result["inserted"] + inferred, "updated": result["updated"] - inferred}
+        return {**result, "unchanged": unchanged}
+    
     def close(self) -> None:
         """Закриває з'єднання з DWH."""
         if self._engine:
@@ -0,0 +1,430 @@
+"""
+Модуль метрик ETL.
+
+Для кожного кроку стадії (extract, transform, load) збирає час виконання,
+кількість рядків і рядків/с, обсяг даних, пікову пам'ять процесу (RSS) та
+кількість SQL запитів до баз даних. Метрики експортуються у JSON,
+Prometheus textfile та таблицю etl_run_metrics у DWH.
+"""
+
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional
+
+import pandas as pd
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from .load import Loader
+from .transform import frame_memory
+
+logger = logging.getLogger(__name__)
+
+METRICS_TABLE = 'etl_run_metrics'
+
+
+class _RoundTripCounter:
+    """Лічильник SQL запитів потоку та запущених ним робочих потоків."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+    
+    def add(self) -> None:
+        with self._lock:
+            self._value += 1
+    
+    @property
+    def value(self) -> int:
+        with self._lock:
+            return self._value
+
+
+# Стадії виконуються в окремих потоках, тож кожен потік має свій лічильник;
+# робочі потоки шардів (merge_shards копіює контекст) додають до лічильника
+# потоку, що їх запустив
+_round_trip_counter: ContextVar[Optional[_RoundTripCounter]] = ContextVar('round_trip_counter', default=None)
+
+
+def _current_counter() -> _RoundTripCounter:
+    """Повертає лічильник поточного контексту, створюючи його за потреби."""
+    counter = _round_trip_counter.get()
+    if counter is None:
+        counter = _RoundTripCounter()
+        _round_trip_counter.set(counter)
+    return counter
+
+
+def _count_round_trip(conn, cursor, statement, parameters, context, executemany) -> None:
+    """Рахує SQL запит engine, зареєстрованого track_round_trips."""
+    _current_counter().add()
+
+
+def track_round_trips(engine: Engine) -> None:
+    """Рахує SQL запити engine у вимірах MetricsCollector.
+    
+    Подія реєструється лише на переданому engine (а не на класі Engine),
+    тож запити інших engine процесу, наприклад метаданих Airflow, у
+    метрики ETL не потрапляють. Повторна реєстрація нічого не змінює.
+    
+    Args:
+        engine: Engine бази ETL
+    """
+    if not event.contains(engine, 'before_cursor_execute', _count_round_trip):
+        event.listen(engine, 'before_cursor_execute', _count_round_trip)
+
+
+def _round_trips() -> int:
+    """Повертає кількість SQL запитів поточного потоку та його робочих потоків."""
+    return _current_counter().value
+
+
+def peak_rss_bytes() -> int:
+    """Повертає пікове споживання пам'яті процесом (RSS) в байтах.
+    
+    Це ru_maxrss - максимум за все життя процесу, а не пам'ять кроку:
+    значення лише зростає, і кроки після найважчої стадії отримують її пік.
+    Щоб приписати пік окремому запуску, його виконують в окремому процесі
+    (див. etl.benchmarks.pipeline).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux повертає кілобайти, macOS - байти
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@dataclass
+class StageMetrics:
+    """Метрики одного кроку стадії ETL.
+    
+    Час і запити - власні для кроку: вкладені виміри (наприклад, витягування
+    чанку всередині потокового завантаження) віднімаються.
+    
+    Attributes:
+        stage: Назва стадії (зазвичай таблиця DWH)
+        step: Крок стадії ('extract', 'transform', 'load', ...)
+        wall_seconds: Час виконання в секундах
+        rows: Кількість оброблених рядків
+        bytes: Обсяг даних в пам'яті (DataFrame, deep)
+        peak_rss_bytes: Пікова пам'ять процесу від його старту до завершення
+            кроку (ru_maxrss, див. peak_rss_bytes), а не пам'ять самого кроку
+        db_round_trips: Кількість SQL запитів
+        calls: Кількість вимірів (чанків) у кроці
+    """
+    stage: str
+    step: str
+    wall_seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    peak_rss_bytes: int = 0
+    db_round_trips: int = 0
+    calls: int = 0
+    
+    @property
+    def rows_per_sec(self) -> float:
+        """Пропускна здатність кроку."""
+        return self.rows / self.wall_seconds if self.wall_seconds > 0 else 0.0
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Повертає метрики словником (з rows_per_sec)."""
+        data = asdict(self)
+        data['rows_per_sec'] = self.rows_per_sec
+        return data
+
+
+class Measurement:
+    """Вимір одного виконання кроку (див. MetricsCollector.measure)."""
+    
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.child_seconds = 0.0
+        self.child_round_trips = 0
+    
+    def record(self, df: Optional[pd.DataFrame] = None, rows: Optional[int] = None) -> None:
+        """Додає до виміру оброблені дані.
+        
+        Args:
+            df: Оброблений DataFrame (рядки та обсяг)
+            rows: Кількість рядків, якщо DataFrame недоступний
+        """
+        if df is not None:
+            self.bytes += frame_memory(df)
+            self.rows += len(df) if rows is None else rows
+        elif rows is not None:
+            self.rows += rows
+
+
+class MetricsCollector:
+    """Збирає метрики кроків одного запуску ETL.
+    
+    Attributes:
+        run_id: Ідентифікатор запуску
+        run_type: Тип запуску ('full' або 'incremental')
+        started_at: Час початку запуску
+    """
+    
+    def __init__(self, run_type: str = 'full'):
+        """Ініціалізує колектор.
+        
+        Args:
+            run_type: Тип запуску
+        """
+        self.run_id = uuid.uuid4().hex
+        self.run_type = run_type
+        self.started_at = datetime.now()
+        self._metrics: dict[tuple[str, str], StageMetrics] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    @contextmanager
+    def measure(self, stage: str, step: str) -> Iterator[Measurement]:
+        """Вимірює виконання кроку стадії.
+        
+        Args:
+            stage: Назва стадії
+            step: Назва кроку
+        
+        Yields:
+            Measurement для запису рядків та обсягу даних
+        """
+        stack = self._local.__dict__.setdefault('stack', [])
+        measurement = Measurement()
+        stack.append(measurement)
+        started = time.perf_counter()
+        trips_before = _round_trips()
+        
+        try:
+            yield measurement
+        finally:
+            elapsed = time.perf_counter() - started
+            trips = _round_trips() - trips_before
+            stack.pop()
+            if stack:
+                stack[-1].child_seconds += elapsed
+                stack[-1].child_round_trips += trips
+            
+            with self._lock:
+                metrics = self._metrics.setdefault((stage, step), StageMetrics(stage, step))
+                metrics.wall_seconds += elapsed - measurement.child_seconds
+                metrics.db_round_trips += trips - measurement.child_round_trips
+                metrics.rows += measurement.rows
+                metrics.bytes += measurement.bytes
+                metrics.peak_rss_bytes = max(metrics.peak_rss_bytes, peak_rss_bytes())
+                metrics.calls += 1
+    
+    def call(self, stage: str, step: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Виконує функцію кроку та записує її результат у вимір.
+        
+        DataFrame дає рядки та обсяг, int - кількість записаних рядків.
+        
+        Args:
+            stage: Назва стадії
+            step: Назва кроку
+            func: Функція кроку
+            *args: Позиційні аргументи функції
+            **kwargs: Іменовані аргументи функції
+        
+        Returns:
+            Результат функції
+        """
+        with self.measure(stage, step) as measurement:
+            result = func(*args, **kwargs)
+            if isinstance(result, pd.DataFrame):
+                measurement.record(result)
+            elif isinstance(result, int) and not isinstance(result, bool):
+                measurement.record(rows=result)
+        return result
+    
+    def stream(
+        self,
+        stage: str,
+        step: str,
+        chunks: Iterable[pd.DataFrame]
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Вимірює потоковий крок: час отримання кожного чанку.
+        
+        Args:
+            stage: Назва стадії
+            step: Назва кроку
+            chunks: Ітератор чанків
+        
+        Yields:
+            Ті самі чанки
+        """
+        iterator = iter(chunks)
+        while True:
+            with self.measure(stage, step) as measurement:
+                chunk = next(iterator, None)
+                if isinstance(chunk, pd.DataFrame):
+                    measurement.record(chunk)
+            if chunk is None:
+                return
+            yield chunk
+    
+    @property
+    def metrics(self) -> list[StageMetrics]:
+        """Метрики всіх кроків у порядку першого виміру."""
+        with self._lock:
+            return list(self._metrics.values())
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Повертає звіт запуску словником."""
+        return {
+            'run_id': self.run_id,
+            'run_type': self.run_type,
+            'started_at': self.started_at.isoformat(),
+            'stages': [metrics.to_dict() for metrics in self.metrics],
+        }
+    
+    def write_json(self, path: str | Path) -> Path:
+        """Записує звіт у JSON файл.
+        
+        Args:
+            path: Шлях до файлу
+        
+        Returns:
+            Шлях записаного файлу
+        """
+        return self._write_atomic(Path(path), json.dumps(self.to_dict(), ensure_ascii=False, indent=2))
+    
+    def to_prometheus(self) -> str:
+        """Повертає метрики у текстовому форматі Prometheus."""
+        gauges = (
+            ('wall_seconds', 'Час виконання кроку ETL, с'),
+            ('rows', 'Кількість оброблених рядків'),
+            ('rows_per_sec', 'Пропускна здатність кроку, рядків/с'),
+            ('bytes', "Обсяг даних кроку в пам'яті, байт"),
+            ('peak_rss_bytes', "Пікова пам'ять процесу від старту до кінця кроку, байт"),
+            ('db_round_trips', 'Кількість SQL запитів кроку'),
+        )
+        rows = [metrics.to_dict() for metrics in self.metrics]
+        lines = []
+        for name, description in gauges:
+            lines.append(f'# HELP etl_stage_{name} {description}')
+            lines.append(f'# TYPE etl_stage_{name} gauge')
+            for row in rows:
+                labels = f'run_type="{self.run_type}",stage="{row["stage"]}",step="{row["step"]}"'
+                lines.append(f'etl_stage_{name}{{{labels}}} {row[name]}')
+        lines.append('# HELP etl_run_started_timestamp_seconds Час початку запуску ETL')
+        lines.append('# TYPE etl_run_started_timestamp_seconds gauge')
+        lines.append(
+            f'etl_run_started_timestamp_seconds{{run_type="{self.run_type}"}} '
+            f'{self.started_at.timestamp()}'
+        )
+        return '\n'.join(lines) + '\n'
+    
+    def write_prometheus(self, path: str | Path) -> Path:
+        """Записує метрики у файл для textfile collector node_exporter.
+        
+        Args:
+            path: Шлях до .prom файлу
+        
+        Returns:
+            Шлях записаного файлу
+        """
+        return self._write_atomic(Path(path), self.to_prometheus())
+    
+    @staticmethod
+    def _write_atomic(path: Path, content: str) -> Path:
+        """Записує файл через тимчасовий, щоб читачі не бачили частковий вміст."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(content, encoding='utf-8')
+        os.replace(tmp_path, path)
+        return path
+
+
+class MetricsStore:
+    """Зберігає метрики запусків у таблиці etl_run_metrics DWH.
+    
+    Attributes:
+        loader: Лоадер, через engine якого виконуються запити до DWH
+    """
+    
+    def __init__(self, loader: Loader):
+        """Ініціалізує сховище.
+        
+        Args:
+            loader: Лоадер з підключенням до DWH
+        """
+        self.loader = loader
+        self._table_ready = False
+    
+    def _ensure_table(self) -> None:
+        """Створює таблицю метрик, якщо її ще немає."""
+        if self._table_ready:
+            return
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{METRICS_TABLE}" ('
+                '"id" bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY, '
+                '"run_id" varchar(32) NOT NULL, '
+                '"run_type" varchar(20) NOT NULL, '
+                '"started_at" timestamp NOT NULL, '
+                '"stage" varchar(100) NOT NULL, '
+                '"step" varchar(50) NOT NULL, '
+                '"wall_seconds" double precision NOT NULL, '
+                '"rows" bigint NOT NULL, '
+                '"rows_per_sec" double precision NOT NULL, '
+                '"bytes" bigint NOT NULL, '
+                '"peak_rss_bytes" bigint NOT NULL, '
+                '"db_round_trips" integer NOT NULL, '
+                '"recorded_at" timestamp NOT NULL DEFAULT now())'
+            ))
+            conn.execute(text(
+                f'CREATE INDEX IF NOT EXISTS "{METRICS_TABLE}_run_id_idx" '
+                f'ON "{METRICS_TABLE}" ("run_id")'
+            ))
+        self._table_ready = True
+    
+    def save(self, collector: MetricsCollector) -> int:
+        """Зберігає метрики запуску.
+        
+        Args:
+            collector: Колектор із зібраними метриками
+        
+        Returns:
+            Кількість збережених рядків
+        """
+        records = [
+            {
+                'run_id': collector.run_id,
+                'run_type': collector.run_type,
+                'started_at': collector.started_at,
+                **{key: value for key, value in metrics.to_dict().items() if key != 'calls'}
+            }
+            for metrics in collector.metrics
+        ]
+        if not records:
+            return 0
+        
+        try:
+            self._ensure_table()
+            with self.loader.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        f'INSERT INTO "{METRICS_TABLE}" ("run_id", "run_type", "started_at", "stage", '
+                        '"step", "wall_seconds", "rows", "rows_per_sec", "bytes", "peak_rss_bytes", '
+                        '"db_round_trips") VALUES (:run_id, :run_type, :started_at, :stage, :step, '
+                        ':wall_seconds, :rows, :rows_per_sec, :bytes, :peak_rss_bytes, :db_round_trips)'
+                    ),
+                    records
+                )
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка збереження метрик запуску {collector.run_id}: {e}")
+            raise
+        
+        logger.info(f"Збережено {len(records)} метрик запуску {collector.run_id}")
+        return len(records)
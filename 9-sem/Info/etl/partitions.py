@@ -0,0 +1,344 @@
+"""
+Модуль партицій fact_sales.
+
+fact_sales розбита за діапазонами date_key по місяцях (fact_sales_pYYYYMM)
+з DEFAULT партицією для рядків поза створеними місяцями. Повне перезавантаження будує
+кожну місячну партицію в окремій shadow таблиці та підміняє партиції
+однією короткою транзакцією, тож дашборди бачать старі дані до самого
+моменту підміни, а не порожню таблицю.
+"""
+
+import logging
+import re
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from .load import Loader
+
+logger = logging.getLogger(__name__)
+
+FACT_TABLE = 'fact_sales'
+
+
+def month_bounds(month: int) -> tuple[int, int]:
+    """Повертає межі діапазону date_key для місяця.
+    
+    Args:
+        month: Місяць у форматі YYYYMM
+    
+    Returns:
+        Кортеж (нижня межа включно, верхня межа не включно) у форматі date_key
+    """
+    year, month_number = divmod(month, 100)
+    next_month = (year + 1) * 100 + 1 if month_number == 12 else month + 1
+    return month * 100, next_month * 100
+
+
+def partition_name(month: int, table: str = FACT_TABLE) -> str:
+    """Повертає назву місячної партиції (наприклад, fact_sales_p202401)."""
+    return f"{table}_p{month}"
+
+
+def partition_months(date_keys: pd.Series) -> list[int]:
+    """Повертає відсортовані місяці (YYYYMM), яких торкаються date_key."""
+    keys = pd.to_numeric(date_keys, errors='coerce').dropna().astype(np.int64)
+    return sorted(int(month) for month in np.unique(keys.to_numpy() // 100))
+
+
+class FactPartitionManager:
+    """Керує місячними партиціями fact_sales.
+    
+    Attributes:
+        loader: Лоадер з підключенням до DWH
+        table: Партиціонована таблиця фактів
+    """
+    
+    def __init__(self, loader: Loader, table: str = FACT_TABLE):
+        """Ініціалізує менеджер партицій.
+        
+        Args:
+            loader: Лоадер з підключенням до DWH
+            table: Назва партиціонованої таблиці
+        """
+        self.loader = loader
+        self.table = table
+        self._partitioned: Optional[bool] = None
+    
+    def is_partitioned(self) -> bool:
+        """Перевіряє, чи таблиця фактів партиціонована (результат кешується).
+        
+        Returns:
+            True, якщо таблиця створена з PARTITION BY
+        """
+        if self._partitioned is None:
+            with self.loader.engine.connect() as conn:
+                self._partitioned = bool(conn.execute(
+                    text(
+                        'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table '
+                        'WHERE partrelid = to_regclass(:table))'
+                    ),
+                    {"table": self.table}
+                ).scalar())
+            if not self._partitioned:
+                logger.warning(
+                    f"{self.table} не партиціонована - застосуйте "
+                    "database/migrations/dwh/003_fact_sales_partitions.sql"
+                )
+        return self._partitioned
+    
+    def ensure_partitions(self, date_keys: pd.Series) -> list[int]:
+        """Створює відсутні місячні партиції для date_key пакета.
+        
+        Без цього рядки нового місяця потрапили б у DEFAULT партицію, і
+        пізніше створити партицію цього місяця вже не вдалося б.
+        
+        Args:
+            date_keys: Колонка date_key пакета фактів
+        
+        Returns:
+            Місяці, яких торкається пакет
+        """
+        months = partition_months(date_keys)
+        if not months:
+            return months
+        
+        try:
+            with self.loader.engine.begin() as conn:
+                for month in months:
+                    lower, upper = month_bounds(month)
+                    conn.execute(text(
+                        f'CREATE TABLE IF NOT EXISTS "{partition_name(month, self.table)}" '
+                        f'PARTITION OF "{self.table}" FOR VALUES FROM ({lower}) TO ({upper})'
+                    ))
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка створення партицій {self.table}: {e}")
+            raise
+        
+        return months
+    
+    def swap_reload(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        shadows: Optional[dict[int, str]] = None,
+        keep_shadows: bool = False
+    ) -> int:
+        """Повністю перезавантажує таблицю фактів через shadow партиції.
+        
+        1. Кожен чанк розкладається по shadow таблицях своїх місяців
+           (без індексів, тож запис не конкурує з їх підтримкою).
+        2. Після запису всіх даних на shadow таблицях будуються індекси,
+           первинний та зовнішні ключі, як у батьківської таблиці, щоб
+           ATTACH не створював і не перевіряв їх під блокуванням.
+        3. Одна транзакція відключає та видаляє старі партиції, очищує
+           DEFAULT партицію і підключає shadow таблиці. CHECK обмеження
+           з межами місяця дозволяє ATTACH не сканувати дані.
+        
+        Args:
+            chunks: Ітератор DataFrame'ів з фактами (з surrogate ключами)
+            shadows: Уже заповнені shadow таблиці перерваного завантаження
+                (див. resume_shadows); нові чанки дописуються до них
+            keep_shadows: Не видаляти shadow таблиці при помилці, щоб
+                завантаження можна було продовжити з контрольної точки
+        
+        Returns:
+            Кількість завантажених записів (без рядків переданих shadows)
+        """
+        shadows = dict(shadows or {})
+        total = 0
+        
+        try:
+            for chunk in chunks:
+                df = Loader._fact_sales_frame(chunk)
+                # date_key входить у первинний ключ, тож NULL тут неможливий
+                months = (pd.to_numeric(df['date_key']) // 100).astype(np.int64)
+                
+                with self.loader.engine.begin() as conn:
+                    for month, month_df in df.groupby(months):
+                        month = int(month)
+                        if month not in shadows:
+                            shadows[month] = self._create_shadow(conn, month)
+                        total += self.loader._bulk_insert(conn, month_df, shadows[month])
+            
+            with self.loader.engine.begin() as conn:
+                definitions = self._parent_definitions(conn)
+            for shadow in shadows.values():
+                with self.loader.engine.begin() as conn:
+                    self._build_indexes(conn, shadow, definitions)
+            
+            with self.loader.engine.begin() as conn:
+                self._swap(conn, shadows)
+        except Exception as e:
+            logger.error(f"Помилка перезавантаження партицій {self.table}: {e}")
+            if keep_shadows:
+                logger.info(f"Shadow таблиці збережено для продовження: {sorted(shadows.values())}")
+            else:
+                self._drop_shadows(shadows.values())
+            raise
+        
+        logger.info(f"{self.table}: підмінено {len(shadows)} партицій, {total} записів")
+        return total
+    
+    def resume_shadows(self, from_date_key: int) -> tuple[dict[int, str], int]:
+        """Готує shadow таблиці перерваного swap_reload до продовження.
+        
+        Факти з date_key >= from_date_key видаляються (вони будуть
+        завантажені заново), shadow таблиці пізніших місяців - цілком.
+        
+        Args:
+            from_date_key: Перший date_key, що завантажується заново
+        
+        Returns:
+            Кортеж (shadow таблиці за місяцем, кількість збережених рядків)
+        """
+        pattern = re.compile(rf'^{re.escape(self.table)}_p(\d{{6}})_shadow$')
+        from_month = int(from_date_key) // 100
+        shadows: dict[int, str] = {}
+        kept = 0
+        
+        try:
+            with self.loader.engine.begin() as conn:
+                names = conn.execute(
+                    text(
+                        "SELECT tablename FROM pg_tables "
+                        "WHERE schemaname = current_schema() AND tablename LIKE :pattern"
+                    ),
+                    {"pattern": f"{self.table}_p%_shadow"}
+                ).scalars().all()
+                for name in names:
+                    match = pattern.match(name)
+                    if not match:
+                        continue
+                    month = int(match.group(1))
+                    if month > from_month:
+                        conn.execute(text(f'DROP TABLE "{name}"'))
+                        continue
+                    if month == from_month:
+                        conn.execute(
+                            text(f'DELETE FROM "{name}" WHERE "date_key" >= :from_date_key'),
+                            {"from_date_key": int(from_date_key)}
+                        )
+                    shadows[month] = name
+                    kept += conn.execute(text(f'SELECT count(*) FROM "{name}"')).scalar()
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка підготовки shadow таблиць {self.table}: {e}")
+            raise
+        
+        logger.info(f"{self.table}: продовження з {from_date_key}, {len(shadows)} shadow таблиць, {kept} записів")
+        return shadows, int(kept)
+    
+    def _create_shadow(self, conn: Connection, month: int) -> str:
+        """Створює порожню shadow таблицю для місяця.
+        
+        sales_key отримує значення з identity послідовності батьківської
+        таблиці, тож ключі залишаються унікальними між партиціями.
+        """
+        shadow = f"{partition_name(month, self.table)}_shadow"
+        lower, upper = month_bounds(month)
+        
+        conn.execute(text(f'DROP TABLE IF EXISTS "{shadow}"'))
+        conn.execute(text(
+            f'CREATE TABLE "{shadow}" (LIKE "{self.table}" INCLUDING DEFAULTS, '
+            f'CONSTRAINT "{shadow}_bounds" CHECK '
+            f'("date_key" IS NOT NULL AND "date_key" >= {lower} AND "date_key" < {upper}))'
+        ))
+        sequence = conn.execute(
+            text("SELECT pg_get_serial_sequence(:table, 'sales_key')"),
+            {"table": f'"{self.table}"'}
+        ).scalar()
+        if sequence:
+            conn.execute(text(
+                f"ALTER TABLE \"{shadow}\" ALTER COLUMN \"sales_key\" SET DEFAULT nextval('{sequence}')"
+            ))
+        return shadow
+    
+    def _parent_definitions(self, conn: Connection) -> tuple[list[str], list[tuple[bool, str]]]:
+        """Читає визначення ключів та індексів батьківської таблиці.
+        
+        Returns:
+            Кортеж (визначення PRIMARY KEY/FOREIGN KEY обмежень,
+            індекси як пари (унікальний, 'USING btree (...)'))
+        """
+        constraints = conn.execute(
+            text(
+                "SELECT pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = to_regclass(:table) AND contype IN ('p', 'f') "
+                "ORDER BY contype DESC, conname"
+            ),
+            {"table": self.table}
+        ).scalars().all()
+        
+        indexes = []
+        rows = conn.execute(
+            text(
+                "SELECT pg_get_indexdef(i.indexrelid), i.indisunique FROM pg_index i "
+                "WHERE i.indrelid = to_regclass(:table) AND NOT EXISTS ("
+                "SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)"
+            ),
+            {"table": self.table}
+        ).fetchall()
+        for definition, is_unique in rows:
+            using = re.search(r'\bUSING\b.*$', definition)
+            if using:
+                indexes.append((bool(is_unique), using.group(0)))
+        
+        return list(constraints), indexes
+    
+    @staticmethod
+    def _build_indexes(
+        conn: Connection,
+        shadow: str,
+        definitions: tuple[list[str], list[tuple[bool, str]]]
+    ) -> None:
+        """Будує на заповненій shadow таблиці ключі та індекси батьківської."""
+        constraints, indexes = definitions
+        for constraint in constraints:
+            conn.execute(text(f'ALTER TABLE "{shadow}" ADD {constraint}'))
+        for is_unique, using in indexes:
+            unique = 'UNIQUE ' if is_unique else ''
+            conn.execute(text(f'CREATE {unique}INDEX ON "{shadow}" {using}'))
+        conn.execute(text(f'ANALYZE "{shadow}"'))
+    
+    def _swap(self, conn: Connection, shadows: dict[int, str]) -> None:
+        """Атомарно замінює всі партиції таблиці на shadow таблиці."""
+        conn.execute(text(f'LOCK TABLE "{self.table}" IN ACCESS EXCLUSIVE MODE'))
+        
+        partitions = conn.execute(
+            text(
+                "SELECT c.relname, c.relpartbound IS NOT NULL "
+                "AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT' "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:table)"
+            ),
+            {"table": self.table}
+        ).fetchall()
+        
+        for name, is_default in partitions:
+            if is_default:
+                conn.execute(text(f'TRUNCATE TABLE "{name}"'))
+                continue
+            conn.execute(text(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"'))
+            conn.execute(text(f'DROP TABLE "{name}"'))
+        
+        for month, shadow in sorted(shadows.items()):
+            name = partition_name(month, self.table)
+            lower, upper = month_bounds(month)
+            conn.execute(text(f'ALTER TABLE "{shadow}" RENAME TO "{name}"'))
+            conn.execute(text(
+                f'ALTER TABLE "{self.table}" ATTACH PARTITION "{name}" '
+                f'FOR VALUES FROM ({lower}) TO ({upper})'
+            ))
+            conn.execute(text(f'ALTER TABLE "{name}" DROP CONSTRAINT "{shadow}_bounds"'))
+    
+    def _drop_shadows(self, shadows: Iterable[str]) -> None:
+        """Видаляє shadow таблиці після невдалого перезавантаження."""
+        try:
+            with self.loader.engine.begin() as conn:
+                for shadow in shadows:
+                    conn.execute(text(f'DROP TABLE IF EXISTS "{shadow}"'))
+        except SQLAlchemyError as e:
+            logger.warning(f"Не вдалося видалити shadow таблиці: {e}")
@@ -5,16 +5,199 @@
 """
 
 import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
-from typing import Optional
+from pathlib import Path
+from typing import Callable, Generator, Iterable, Optional
 
+import pandas as pd
+
+from .aggregates import SalesAggregates
+from .backfill import BackfillWindow
+from .checkpoints import CheckpointStore, ChunkProgress
 from .config import ETLConfig
 from .extract import OrdersExtractor, CatalogExtractor, PaymentsExtractor
+from .governor import MemoryGovernor
+from .handoff import HandoffManifest, StageHandoff
 from .transform import DataTransformer
 from .load import Loader
+from .keys import SurrogateKeyResolver
+from .metrics import MetricsCollector, MetricsStore, track_round_trips
+from .partitions import FactPartitionManager
+from .pushdown import PushdownSchema
+from .staging import StagingCache
+from .watermark import WatermarkStore
 
 logger = logging.getLogger(__name__)
 
+# Джерела, для яких зберігається watermark інкрементального витягування
+# (dim_category та dim_employee не мають updated_at і синхронізуються повністю)
+WATERMARK_SOURCES = ('dim_product', 'dim_customer', 'fact_sales')
+
+# Виміри інкрементального завантаження (dim_date дописується лише повним)
+INCREMENTAL_DIMENSIONS = ('dim_region', 'dim_category', 'dim_product', 'dim_customer', 'dim_employee')
+
+# Таблиці, що завантажуються окремими task'ами extract/transform/load
+HANDOFF_TABLES = (*INCREMENTAL_DIMENSIONS, 'fact_sales')
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Стадія ETL процесу.
+    
+    Attributes:
+        name: Назва стадії (зазвичай назва таблиці в DWH)
+        func: Функція, що виконує стадію та повертає кількість записів
+        depends_on: Назви стадій, які мають завершитися раніше
+    """
+    name: str
+    func: Callable[[], int]
+    depends_on: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class DimensionSource:
+    """Опис інкрементального завантаження виміру.
+    
+    Attributes:
+        extract: Функція витягування, що приймає since
+        transform: Функція трансформації
+        key_column: Business key для upsert
+        watermark_column: Колонка з часом зміни (None - завжди повне витягування)
+        depends_on: Виміри, на які посилається вимір
+    """
+    extract: Callable[[Optional[datetime]], pd.DataFrame]
+    transform: Callable[[pd.DataFrame], pd.DataFrame]
+    key_column: str
+    watermark_column: Optional[str]
+    depends_on: tuple[str, ...] = ()
+
+
+class ETLStageError(Exception):
+    """Помилка виконання однієї або кількох стадій ETL.
+    
+    Attributes:
+        results: Кількість записів для успішно завершених стадій
+        errors: Помилки стадій (назва стадії: виняток)
+    """
+    
+    def __init__(self, results: dict[str, int], errors: dict[str, BaseException]):
+        self.results = results
+        self.errors = errors
+        details = "; ".join(f"{name}: {error}" for name, error in errors.items())
+        super().__init__(f"Стадії завершились з помилками: {details}")
+
+
+class StageSkippedError(Exception):
+    """Стадію пропущено через помилку в одній з її залежностей."""
+
+
+class ETLRunResults(dict):
+    """Результати запуску ETL: кількість записів за таблицею.
+    
+    Залишається звичайним словником для run_etl та XCom Airflow, а метрики
+    кроків доступні окремим атрибутом.
+    
+    Attributes:
+        metrics: Метрики кроків запуску
+    """
+    
+    def __init__(self, results: dict[str, int], metrics: MetricsCollector):
+        super().__init__(results)
+        self.metrics = metrics
+
+
+class StageExecutor:
+    """Виконує стадії ETL з урахуванням залежностей (DAG).
+    
+    Незалежні стадії запускаються паралельно в обмеженому пулі потоків,
+    тож загальний час наближається до найдовшого ланцюжка залежностей.
+    
+    Attributes:
+        stages: Стадії за назвою
+        max_workers: Максимальна кількість одночасних стадій
+    """
+    
+    def __init__(self, stages: list[Stage], max_workers: int = 4):
+        """Ініціалізує виконавця та перевіряє граф залежностей.
+        
+        Args:
+            stages: Список стадій
+            max_workers: Розмір пулу потоків
+            
+        Raises:
+            ValueError: Якщо залежність невідома або граф містить цикл
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_workers = max(1, max_workers)
+        self._validate()
+    
+    def _validate(self) -> None:
+        """Перевіряє що всі залежності відомі та граф ациклічний."""
+        for stage in self.stages.values():
+            unknown = set(stage.depends_on) - set(self.stages)
+            if unknown:
+                raise ValueError(f"Стадія {stage.name} залежить від невідомих стадій: {unknown}")
+        
+        # Алгоритм Кана: якщо не всі вершини відсортовано - є цикл
+        in_degree = {name: len(stage.depends_on) for name, stage in self.stages.items()}
+        ready = [name for name, degree in in_degree.items() if degree == 0]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for stage in self.stages.values():
+                if current in stage.depends_on:
+                    in_degree[stage.name] -= 1
+                    if in_degree[stage.name] == 0:
+                        ready.append(stage.name)
+        if visited != len(self.stages):
+            raise ValueError("Граф стадій містить циклічні залежності")
+    
+    def run(self) -> tuple[dict[str, int], dict[str, BaseException]]:
+        """Виконує всі стадії.
+        
+        Стадія стартує, щойно завершилися всі її залежності. Якщо залежність
+        завершилась помилкою, стадія не запускається і позначається як пропущена.
+        
+        Returns:
+            Кортеж (результати успішних стадій, помилки стадій)
+        """
+        results: dict[str, int] = {}
+        errors: dict[str, BaseException] = {}
+        pending = dict(self.stages)
+        running: dict[Future, str] = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='etl-stage') as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    failed = [dep for dep in stage.depends_on if dep in errors]
+                    if failed:
+                        logger.warning(f"Стадію {name} пропущено через помилки в {failed}")
+                        errors[name] = StageSkippedError(f"залежності завершились з помилкою: {failed}")
+                        del pending[name]
+                    elif all(dep in results for dep in stage.depends_on):
+                        logger.info(f"Запуск стадії {name}")
+                        running[pool.submit(stage.func)] = name
+                        del pending[name]
+                
+                if not running:
+                    continue
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        logger.info(f"Стадія {name} завершена: {results[name]} записів")
+                    except Exception as e:
+                        logger.error(f"Стадія {name} завершилась з помилкою: {e}")
+                        errors[name] = e
+        
+        return results, errors
+
 
 class ETLPipeline:
     """Головний клас ETL pipeline.
@@ -24,8 +207,17 @@ class ETLPipeline:
         orders_extractor: Екстрактор для Orders DB
         catalog_extractor: Екстрактор для Catalog DB
         payments_extractor: Екстрактор для Payments DB
+        staging: Parquet кеш витягнутих даних (None, якщо вимкнено)
+        pushdown: Схема DWH для pushdown трансформації в SQL (None, якщо вимкнено)
         transformer: Трансформер даних
         loader: Лоадер для DWH
+        watermarks: Сховище watermark'ів інкрементального витягування
+        key_resolver: Кеш surrogate ключів вимірів для fact_sales
+        partitions: Менеджер місячних партицій fact_sales
+        aggregates: Зведені таблиці продажів для дашбордів
+        metrics: Метрики кроків поточного (або останнього) запуску
+        metrics_store: Сховище метрик запусків у DWH
+        checkpoints: Контрольні точки для продовження перерваних запусків
     """
     
     def __init__(self, config: ETLConfig):
@@ -36,14 +228,61 @@ class ETLPipeline:
         """
         self.config = config
         
+        # Локальний Parquet кеш витягнутих даних (опціонально)
+        self.staging = None
+        if config.staging_dir:
+            self.staging = StagingCache(
+                config.staging_dir,
+                config.staging_max_bytes,
+                offline=config.staging_offline
+            )
+        
+        # Похідні поля та проєкція колонок у SQL витягування (опціонально)
+        self.pushdown = PushdownSchema(config.dwh_schema_path) if config.pushdown else None
+        
+        # Регулювання розміру чанків за бюджетом пам'яті (опціонально)
+        self.governor = None
+        if config.memory_budget:
+            self.governor = MemoryGovernor(config.memory_budget, config.batch_size, config.spill_dir)
+        
         # Ініціалізація екстракторів
-        self.orders_extractor = OrdersExtractor(config.orders_db)
-        self.catalog_extractor = CatalogExtractor(config.catalog_db)
-        self.payments_extractor = PaymentsExtractor(config.payments_db)
+        self.orders_extractor = OrdersExtractor(
+            config.orders_db,
+            staging=self.staging,
+            pushdown=self.pushdown,
+            shards=config.extract_shards,
+            governor=self.governor,
+            on_engine=track_round_trips
+        )
+        self.catalog_extractor = CatalogExtractor(
+            config.catalog_db, staging=self.staging, pushdown=self.pushdown, on_engine=track_round_trips
+        )
+        self.payments_extractor = PaymentsExtractor(
+            config.payments_db, staging=self.staging, on_engine=track_round_trips
+        )
         
         # Ініціалізація трансформера та лоадера
-        self.transformer = DataTransformer()
-        self.loader = Loader(config.dwh_db)
+        self.transformer = DataTransformer(
+            compact_dtypes=config.compact_dtypes,
+            track_memory=config.track_memory,
+            pushdown=config.pushdown,
+            frame_engine=config.frame_engine
+        )
+        self.loader = Loader(
+            config.dwh_db, load_method=config.load_method, governor=self.governor, on_engine=track_round_trips
+        )
+        self.watermarks = WatermarkStore(self.loader)
+        self.key_resolver = SurrogateKeyResolver(self.loader)
+        self.partitions = FactPartitionManager(self.loader)
+        self.aggregates = SalesAggregates(self.loader)
+        self.metrics = MetricsCollector()
+        self.metrics_store = MetricsStore(self.loader)
+        self.checkpoints = CheckpointStore(self.loader)
+        
+        # Стан контрольних точок поточного запуску
+        self._run_type = 'full'
+        self._resume = False
+        self._completed: dict[str, int] = {}
         
         # Налаштування логування
         logging.basicConfig(
@@ -51,47 +290,46 @@ class ETLPipeline:
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
     
-    def run_full_load(self) -> dict[str, int]:
+    def run_full_load(self, resume: bool = False) -> ETLRunResults:
         """Виконує повне завантаження всіх даних.
         
+        Незалежні стадії виконуються паралельно (див. StageExecutor).
+        Метрики кроків публікуються і після невдалого запуску.
+        
+        Args:
+            resume: Продовжити перерваний запуск з контрольних точок
+                (завершені стадії пропускаються)
+        
         Returns:
             Словник з кількістю завантажених записів для кожної таблиці
+            (з метриками кроків в атрибуті metrics)
+            
+        Raises:
+            ETLStageError: Якщо хоча б одна стадія завершилась з помилкою
         """
         logger.info("=" * 60)
         logger.info("Початок повного ETL процесу")
         logger.info("=" * 60)
         
         start_time = datetime.now()
-        results = {}
+        self.metrics = MetricsCollector('full')
         
         try:
-            # 1. Завантаження dim_date
-            logger.info("\n[1/7] Завантаження dim_date")
-            results['dim_date'] = self._load_dim_date()
+            # Для продовженого запуску - час початку першої спроби
+            run_started = self._start_run('full', resume)
+            executor = StageExecutor(
+                self._checkpointed(self._full_load_stages(), run_started),
+                self.config.max_workers
+            )
+            results, errors = executor.run()
             
-            # 2. Завантаження dim_region
-            logger.info("\n[2/7] Завантаження dim_region")
-            results['dim_region'] = self._load_dim_region()
+            if errors:
+                raise ETLStageError(results, errors)
             
-            # 3. Завантаження dim_category та dim_product
-            logger.info("\n[3/7] Завантаження dim_category та dim_product")
-            results['dim_category'] = self._load_dim_category()
-            results['dim_product'] = self._load_dim_product()
+            # Наступне інкрементальне завантаження почнеться з моменту старту
+            self._advance_watermarks(run_started)
+            self.checkpoints.finish_run('full')
             
-            # 4. Завантаження dim_customer
-            logger.info("\n[4/7] Завантаження dim_customer")
-            results['dim_customer'] = self._load_dim_customer()
-            
-            # 5. Завантаження dim_employee
-            logger.info("\n[5/7] Завантаження dim_employee")
-            results['dim_employee'] = self._load_dim_employee()
-            
-            # 6. Завантаження fact_sales
-            logger.info("\n[6/7] Завантаження fact_sales")
-            results['fact_sales'] = self._load_fact_sales()
-            
-            # 7. Статистика
-            logger.info("\n[7/7] Завершення ETL")
             elapsed_time = datetime.now() - start_time
             
             logger.info("=" * 60)
@@ -102,133 +340,872 @@ class ETLPipeline:
                 logger.info(f"  {table}: {count}")
             logger.info("=" * 60)
             
-            return results
+            return ETLRunResults(results, self.metrics)
             
         except Exception as e:
             logger.error(f"Помилка виконання ETL: {e}", exc_info=True)
             raise
         finally:
+            self._publish_metrics()
             self._cleanup()
     
+    def _full_load_stages(self) -> list[Stage]:
+        """Описує стадії повного завантаження та залежності між ними.
+        
+        Виміри, що посилаються на інші виміри (region_key, category_key),
+        чекають на них; fact_sales завантажується після всіх вимірів.
+        
+        Returns:
+            Список стадій для StageExecutor
+        """
+        dimensions = (
+            'dim_date', 'dim_region', 'dim_category',
+            'dim_product', 'dim_customer', 'dim_employee'
+        )
+        return [
+            Stage('dim_date', self._load_dim_date),
+            Stage('dim_region', self._load_dim_region),
+            Stage('dim_category', self._load_dim_category),
+            Stage('dim_product', self._load_dim_product, ('dim_category',)),
+            Stage('dim_customer', self._load_dim_customer, ('dim_region',)),
+            Stage('dim_employee', self._load_dim_employee, ('dim_region',)),
+            Stage('fact_sales', self._load_fact_sales, dimensions),
+        ]
+    
     def run_incremental_load(
         self,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> dict[str, int]:
-        """Виконує інкрементальне завантаження за період.
+        end_date: Optional[datetime] = None,
+        resume: bool = False,
+        stages: Optional[Iterable[str]] = None
+    ) -> ETLRunResults:
+        """Виконує інкрементальне завантаження.
+        
+        Виміри завжди витягуються від збереженого watermark. Для fact_sales
+        явно вказаний період має пріоритет (backfill), інакше також
+        використовується watermark. Повторний запуск за той самий період
+        ідемпотентний: рядки замінюються, а не дописуються.
         
         Args:
-            start_date: Початкова дата (за замовчуванням - вчора)
-            end_date: Кінцева дата (за замовчуванням - сьогодні)
+            start_date: Початкова дата періоду замовлень (опціонально)
+            end_date: Кінцева дата періоду замовлень (опціонально)
+            resume: Продовжити перерваний запуск з контрольних точок
+                (завершені стадії пропускаються, потоковий fact_sales
+                продовжується з останнього записаного чанку)
+            stages: Назви стадій для виконання (None - усі); залежності
+                від невибраних стадій вважаються виконаними раніше
+                (наприклад, вікна backfill завантажують лише fact_sales)
             
         Returns:
-            Словник з кількістю завантажених записів
+            Словник з кількістю завантажених записів (з метриками кроків
+            в атрибуті metrics)
+            
+        Raises:
+            ETLStageError: Якщо хоча б одна стадія завершилась з помилкою
         """
-        if start_date is None:
-            start_date = datetime.now() - timedelta(days=1)
-        if end_date is None:
-            end_date = datetime.now()
-        
         logger.info("=" * 60)
-        logger.info(f"Інкрементальне завантаження: {start_date} - {end_date}")
+        if start_date or end_date:
+            logger.info(f"Інкрементальне завантаження: {start_date} - {end_date}")
+        else:
+            logger.info("Інкрементальне завантаження від збережених watermark'ів")
         logger.info("=" * 60)
         
         start_time = datetime.now()
-        results = {}
+        self.metrics = MetricsCollector('incremental')
+        
+        # Запуски за явний період (вікна backfill) мають власні контрольні точки
+        run_type = 'incremental'
+        if start_date or end_date:
+            run_type = '-'.join(f'{value:%Y%m%d}' if value else '' for value in (start_date, end_date))
         
         try:
-            # Завантажуємо тільки нові дані
-            results['fact_sales'] = self._load_fact_sales_incremental(start_date, end_date)
+            run_started = self._start_run(run_type, resume)
+            selected = self._select_stages(self._incremental_stages(start_date, end_date), stages)
+            executor = StageExecutor(
+                self._checkpointed(selected, run_started),
+                self.config.max_workers
+            )
+            results, errors = executor.run()
+            
+            if errors:
+                raise ETLStageError(results, errors)
+            
+            self.checkpoints.finish_run(run_type)
             
             elapsed_time = datetime.now() - start_time
             logger.info(f"Інкрементальне завантаження завершено за {elapsed_time}")
             
-            return results
+            return ETLRunResults(results, self.metrics)
             
         except Exception as e:
             logger.error(f"Помилка інкрементального завантаження: {e}", exc_info=True)
             raise
         finally:
+            self._publish_metrics()
+            self._cleanup()
+    
+    def _incremental_stages(
+        self,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> list[Stage]:
+        """Описує стадії інкрементального завантаження.
+        
+        Returns:
+            Список стадій для StageExecutor
+        """
+        def dimension(name, source):
+            return lambda: self._load_dimension_incremental(
+                name, source.extract, source.transform, source.key_column, source.watermark_column
+            )
+        
+        stages = [
+            Stage(name, dimension(name, source), source.depends_on)
+            for name, source in self._incremental_dimensions().items()
+        ]
+        stages.append(Stage(
+            'fact_sales',
+            lambda: self._load_fact_sales_incremental(start_date, end_date),
+            INCREMENTAL_DIMENSIONS
+        ))
+        return stages
+    
+    def _incremental_dimensions(self) -> dict[str, DimensionSource]:
+        """Описує витягування та трансформацію вимірів інкрементального завантаження."""
+        cleaner = self.transformer.cleaner
+        # categories та employees не мають updated_at: watermark за created_at
+        # пропускав би зміни існуючих записів, тож ці невеликі таблиці
+        # витягуються повністю, а sync_dimension записує лише змінені рядки
+        return {
+            'dim_region': DimensionSource(
+                lambda since: self.orders_extractor.extract_regions(),
+                lambda df: cleaner.remove_duplicates(df, subset=['region_id']),
+                'region_id', None
+            ),
+            'dim_category': DimensionSource(
+                self.catalog_extractor.extract_categories,
+                lambda df: cleaner.remove_duplicates(df, subset=['category_id']),
+                'category_id', None
+            ),
+            'dim_product': DimensionSource(
+                self.catalog_extractor.extract_products,
+                self.transformer.transform_products,
+                'product_id', 'updated_at',
+                ('dim_category',)
+            ),
+            'dim_customer': DimensionSource(
+                self.orders_extractor.extract_customers,
+                self.transformer.transform_customers,
+                'customer_id', 'updated_at',
+                ('dim_region',)
+            ),
+            'dim_employee': DimensionSource(
+                self.orders_extractor.extract_employees,
+                lambda df: cleaner.remove_duplicates(df, subset=['employee_id']),
+                'employee_id', None,
+                ('dim_region',)
+            ),
+        }
+    
+    def prepare_backfill(self, windows: Iterable[BackfillWindow]) -> list[int]:
+        """Готує DWH до паралельного завантаження вікон backfill.
+        
+        Місячні партиції fact_sales створюються заздалегідь: інакше вікна
+        одного місяця створювали б ту саму партицію одночасно.
+        
+        Args:
+            windows: Вікна backfill (див. etl.backfill.backfill_windows)
+        
+        Returns:
+            Місяці (YYYYMM) періоду backfill
+        """
+        date_keys = pd.Series([key for window in windows for key in window.date_keys()])
+        if not self.partitions.is_partitioned():
+            return []
+        return self.partitions.ensure_partitions(date_keys)
+    
+    def handoff(self, run_id: str) -> StageHandoff:
+        """Повертає файли передачі між стадіями запуску (див. etl.handoff).
+        
+        Args:
+            run_id: Ідентифікатор запуску (run_id DAG run)
+        """
+        directory = self.config.handoff_dir or Path(tempfile.gettempdir()) / 'etl-handoff'
+        return StageHandoff(directory, run_id, self.config.handoff_format)
+    
+    def extract_stage(
+        self,
+        table: str,
+        handoff: StageHandoff,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> HandoffManifest:
+        """Витягує зміни таблиці у файли передачі (task extract в Airflow).
+        
+        Як і в run_incremental_load, виміри витягуються від watermark, а для
+        fact_sales явний період має пріоритет. Watermark не зсувається тут:
+        він передається маніфестом і зберігається лише після завантаження.
+        
+        Args:
+            table: Таблиця DWH (одна з HANDOFF_TABLES)
+            handoff: Файли передачі запуску
+            start_date: Початкова дата періоду замовлень (опціонально)
+            end_date: Кінцева дата періоду замовлень (опціонально)
+        
+        Returns:
+            Маніфест витягнутих даних
+        """
+        def extract() -> HandoffManifest:
+            if table == 'fact_sales':
+                return self._extract_fact_handoff(handoff, start_date, end_date)
+            source = self._dimension_source(table)
+            since = self.watermarks.get(table) if source.watermark_column else None
+            df = self.metrics.call(table, 'extract', source.extract, since)
+            watermark = df[source.watermark_column].max() if source.watermark_column and len(df) else None
+            return handoff.write(table, 'extract', [df], watermark=watermark)
+        
+        return self._run_handoff_stage(extract)
+    
+    def transform_stage(self, manifest: HandoffManifest, handoff: StageHandoff) -> HandoffManifest:
+        """Трансформує витягнуті дані таблиці у нові файли передачі (task transform).
+        
+        Surrogate ключі fact_sales резолвляться під час завантаження: так
+        трансформація фактів не чекає на завантаження вимірів.
+        
+        Args:
+            manifest: Маніфест стадії extract
+            handoff: Файли передачі запуску
+        
+        Returns:
+            Маніфест трансформованих даних (з watermark витягування)
+        """
+        table = manifest.table
+        
+        def transform() -> HandoffManifest:
+            if table == 'fact_sales':
+                chunks = self.metrics.stream(
+                    'fact_sales', 'transform', self.transformer.transform_orders_stream(handoff.read(manifest))
+                )
+            elif manifest.rows:
+                transform_dimension = self._dimension_source(table).transform
+                chunks = [self.metrics.call(table, 'transform', transform_dimension, handoff.read_frame(manifest))]
+            else:
+                chunks = []
+            return handoff.write(table, 'transform', chunks, watermark=manifest.watermark)
+        
+        return self._run_handoff_stage(transform)
+    
+    def load_stage(self, manifest: HandoffManifest) -> int:
+        """Завантажує трансформовані дані таблиці в DWH (task load).
+        
+        Виміри записуються через sync_dimension, fact_sales - заміною рядків
+        за order_item_id з перерахунком зведень зачеплених днів, тож повторна
+        спроба task'а ідемпотентна. Watermark зсувається після запису.
+        
+        Args:
+            manifest: Маніфест стадії transform
+        
+        Returns:
+            Кількість вставлених та оновлених записів
+        """
+        table = manifest.table
+        
+        def load() -> int:
+            if manifest.rows == 0:
+                logger.info(f"{table}: змін не знайдено")
+                return 0
+            if table == 'fact_sales':
+                count = self._load_fact_handoff(manifest)
+            else:
+                key_column = self._dimension_source(table).key_column
+                count = self._sync_dimension(table, StageHandoff.read_frame(manifest), key_column)
+            if manifest.watermark:
+                self.watermarks.set(table, datetime.fromisoformat(manifest.watermark))
+            return count
+        
+        return self._run_handoff_stage(load)
+    
+    def _run_handoff_stage(self, func: Callable[[], object]) -> object:
+        """Виконує стадію передачі з метриками та звільненням з'єднань."""
+        self.metrics = MetricsCollector('incremental')
+        try:
+            return func()
+        finally:
+            self._publish_metrics()
             self._cleanup()
     
+    def _dimension_source(self, table: str) -> DimensionSource:
+        """Повертає опис виміру інкрементального завантаження.
+        
+        Raises:
+            ValueError: Якщо таблиця не є виміром інкрементального завантаження
+        """
+        sources = self._incremental_dimensions()
+        if table not in sources:
+            raise ValueError(f"Невідома таблиця: {table} (очікується одна з {HANDOFF_TABLES})")
+        return sources[table]
+    
+    def _extract_fact_handoff(
+        self,
+        handoff: StageHandoff,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> HandoffManifest:
+        """Витягує замовлення у файли передачі (чанками при ETL_STREAMING)."""
+        use_watermark = start_date is None and end_date is None
+        since = self.watermarks.get('fact_sales') if use_watermark else None
+        
+        if self.config.streaming:
+            chunks = self.metrics.stream('fact_sales', 'extract', self.orders_extractor.extract_orders(
+                start_date, end_date, chunksize=self.config.batch_size, since=since, ordered=False
+            ))
+        else:
+            chunks = [self.metrics.call(
+                'fact_sales', 'extract',
+                self.orders_extractor.extract_orders, start_date, end_date, since=since, ordered=False
+            )]
+        
+        max_updated_at = []
+        
+        def track(chunks):
+            for chunk in chunks:
+                if len(chunk):
+                    max_updated_at.append(chunk['updated_at'].max())
+                yield chunk
+        
+        manifest = handoff.write('fact_sales', 'extract', track(chunks))
+        if use_watermark and max_updated_at:
+            manifest = replace(manifest, watermark=pd.Timestamp(max(max_updated_at)).isoformat())
+        return manifest
+    
+    def _load_fact_handoff(self, manifest: HandoffManifest) -> int:
+        """Резолвить surrogate ключі та замінює рядки fact_sales з файлів передачі."""
+        date_keys = []
+        
+        def collect_days(chunks):
+            for chunk in chunks:
+                date_keys.extend(chunk['date_key'].unique())
+                yield chunk
+        
+        chunks = self.metrics.stream(
+            'fact_sales', 'resolve_keys', self._resolve_keys_stream(StageHandoff.read(manifest))
+        )
+        count = self.metrics.call(
+            'fact_sales', 'load',
+            self.loader.load_fact_sales_stream,
+            self._ensure_partitions_stream(collect_days(chunks)),
+            replace_existing=True,
+            partition_column=self._partition_column()
+        )
+        self.metrics.call('fact_sales', 'aggregates', self.aggregates.refresh, date_keys)
+        return count
+    
+    @staticmethod
+    def _select_stages(stages: list[Stage], names: Optional[Iterable[str]]) -> list[Stage]:
+        """Залишає лише вибрані стадії (None - усі).
+        
+        Raises:
+            ValueError: Якщо вибрано невідому стадію
+        """
+        if names is None:
+            return stages
+        selected = set(names)
+        unknown = selected - {stage.name for stage in stages}
+        if unknown:
+            raise ValueError(f"Невідомі стадії: {sorted(unknown)}")
+        return [
+            Stage(stage.name, stage.func, tuple(dep for dep in stage.depends_on if dep in selected))
+            for stage in stages
+            if stage.name in selected
+        ]
+    
+    def _start_run(self, run_type: str, resume: bool) -> datetime:
+        """Починає (або продовжує) запуск у сховищі контрольних точок.
+        
+        Returns:
+            Час початку запуску
+        """
+        self._run_type = run_type
+        self._resume = resume
+        run_started = self.checkpoints.start_run(run_type, resume)
+        self._completed = self.checkpoints.completed_stages(run_type) if resume else {}
+        return run_started
+    
+    def _checkpointed(self, stages: list[Stage], run_started: datetime) -> list[Stage]:
+        """Огортає стадії контрольними точками.
+        
+        Стадія, завершена в перерваній спробі, не виконується повторно:
+        її результатом стає збережена кількість записів. Решта стадій
+        після успішного виконання позначаються завершеними.
+        
+        Args:
+            stages: Стадії запуску
+            run_started: Час початку запуску (watermark контрольної точки)
+        
+        Returns:
+            Стадії для StageExecutor
+        """
+        def skipped(name, rows):
+            def func():
+                logger.info(f"{name}: стадію завершено в попередній спробі, пропускаємо")
+                return rows
+            return func
+        
+        def recorded(name, func):
+            def wrapper():
+                rows = func()
+                self.checkpoints.complete_stage(self._run_type, name, rows, run_started)
+                return rows
+            return wrapper
+        
+        return [
+            Stage(stage.name, skipped(stage.name, self._completed[stage.name]), stage.depends_on)
+            if stage.name in self._completed
+            else Stage(stage.name, recorded(stage.name, stage.func), stage.depends_on)
+            for stage in stages
+        ]
+    
+    def _chunk_progress(self, stage: str) -> Optional[ChunkProgress]:
+        """Повертає прогрес потокової стадії перерваної спроби (None - починати спочатку)."""
+        if not self._resume:
+            return None
+        progress = self.checkpoints.chunk_progress(self._run_type, stage)
+        if progress:
+            logger.info(
+                f"{stage}: продовження з {progress.resume_date:%Y-%m-%d} "
+                f"({progress.chunks} чанків, {progress.rows} рядків уже записано)"
+            )
+        return progress
+    
+    def _checkpoint_chunks(
+        self,
+        stage: str,
+        chunks: Iterable[pd.DataFrame],
+        progress: Optional[ChunkProgress] = None,
+        watermark: Optional[Callable[[], Optional[datetime]]] = None
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Записує контрольну точку кожного чанку після його запису.
+        
+        Споживач запитує наступний чанк лише після запису попереднього,
+        тож контрольна точка чанку зберігається перед видачею наступного
+        (а останнього - після вичерпання потоку).
+        
+        Args:
+            stage: Назва стадії
+            chunks: Трансформовані чанки з колонкою date_key
+            progress: Прогрес перерваної спроби (нумерація чанків продовжується)
+            watermark: Функція, що повертає watermark джерела після чанку
+        """
+        number = progress.chunks if progress else 0
+        pending = None
+        for chunk in chunks:
+            if pending:
+                self.checkpoints.complete_chunk(self._run_type, stage, *pending)
+                pending = None
+            if len(chunk):
+                number += 1
+                date_keys = pd.to_numeric(chunk['date_key'])
+                last_date_key = int(date_keys.max())
+                pending = (
+                    number, len(chunk), int(date_keys.min()), last_date_key,
+                    watermark() if watermark else None, int((date_keys == last_date_key).sum())
+                )
+            yield chunk
+        if pending:
+            self.checkpoints.complete_chunk(self._run_type, stage, *pending)
+    
+    def _load_dimension_incremental(
+        self,
+        name: str,
+        extract: Callable[[Optional[datetime]], pd.DataFrame],
+        transform: Callable[[pd.DataFrame], pd.DataFrame],
+        key_column: str,
+        watermark_column: Optional[str]
+    ) -> int:
+        """Завантажує зміни виміру від його watermark.
+        
+        Args:
+            name: Назва таблиці-виміру (і джерела watermark)
+            extract: Функція витягування, що приймає since
+            transform: Функція трансформації
+            key_column: Business key для upsert
+            watermark_column: Колонка з часом зміни (None - завжди повне витягування)
+            
+        Returns:
+            Кількість вставлених та оновлених записів
+        """
+        since = self.watermarks.get(name) if watermark_column else None
+        df = self.metrics.call(name, 'extract', extract, since)
+        
+        if len(df) == 0:
+            logger.info(f"{name}: змін не знайдено")
+            return 0
+        
+        df = self.metrics.call(name, 'transform', transform, df)
+        count = self._sync_dimension(name, df, key_column)
+        
+        # Watermark зсувається лише після успішного запису
+        if watermark_column:
+            self.watermarks.set(name, df[watermark_column].max())
+        return count
+    
+    def _sync_dimension(self, name: str, df: pd.DataFrame, key_column: str) -> int:
+        """Записує у вимір лише нові та змінені рядки (див. Loader.sync_dimension).
+        
+        Args:
+            name: Назва таблиці-виміру
+            df: Трансформовані записи виміру
+            key_column: Business key виміру
+            
+        Returns:
+            Кількість вставлених та оновлених записів
+        """
+        def sync() -> int:
+            result = self.loader.sync_dimension(df, name, key_column)
+            return result['inserted'] + result['updated']
+        
+        count = self.metrics.call(name, 'load', sync)
+        self.key_resolver.invalidate(name)
+        return count
+    
+    def _advance_watermarks(self, value: datetime) -> None:
+        """Встановлює watermark усіх джерел після повного завантаження.
+        
+        Args:
+            value: Час початку повного завантаження
+        """
+        for source in WATERMARK_SOURCES:
+            self.watermarks.set(source, value)
+    
     def _load_dim_date(self) -> int:
-        """Завантажує dim_date."""
-        # Генеруємо календар на 2 роки (730 днів)
+        """Завантажує dim_date (дописує лише відсутні дати)."""
+        # Календар на рік назад і рік вперед; існуючі дати не перезаписуються,
+        # тож таблиця, її індекси та дашборди не блокуються
         start_date = datetime.now() - timedelta(days=365)
         end_date = datetime.now() + timedelta(days=365)
-        return self.loader.load_dim_date(start_date, end_date)
+        return self.metrics.call(
+            'dim_date', 'load',
+            self.loader.load_dim_date, start_date, end_date, incremental=True
+        )
     
     def _load_dim_region(self) -> int:
         """Завантажує dim_region."""
-        df_regions = self.orders_extractor.extract_regions()
-        df_regions_transformed = self.transformer.cleaner.remove_duplicates(
+        df_regions = self.metrics.call('dim_region', 'extract', self.orders_extractor.extract_regions)
+        df_regions_transformed = self.metrics.call(
+            'dim_region', 'transform',
+            self.transformer.cleaner.remove_duplicates,
             df_regions,
             subset=['region_id']
         )
-        return self.loader.load_dimension(df_regions_transformed, 'dim_region', 'replace')
+        return self._sync_dimension('dim_region', df_regions_transformed, 'region_id')
     
     def _load_dim_category(self) -> int:
         """Завантажує dim_category."""
-        df_categories = self.catalog_extractor.extract_categories()
-        df_categories_transformed = self.transformer.cleaner.remove_duplicates(
+        df_categories = self.metrics.call('dim_category', 'extract', self.catalog_extractor.extract_categories)
+        df_categories_transformed = self.metrics.call(
+            'dim_category', 'transform',
+            self.transformer.cleaner.remove_duplicates,
             df_categories,
             subset=['category_id']
         )
-        return self.loader.load_dimension(df_categories_transformed, 'dim_category', 'replace')
+        return self._sync_dimension('dim_category', df_categories_transformed, 'category_id')
     
     def _load_dim_product(self) -> int:
         """Завантажує dim_product."""
-        df_products = self.catalog_extractor.extract_products()
-        df_products_transformed = self.transformer.transform_products(df_products)
-        return self.loader.load_dimension(df_products_transformed, 'dim_product', 'replace')
+        df_products = self.metrics.call('dim_product', 'extract', self.catalog_extractor.extract_products)
+        df_products_transformed = self.metrics.call(
+            'dim_product', 'transform', self.transformer.transform_products, df_products
+        )
+        return self._sync_dimension('dim_product', df_products_transformed, 'product_id')
     
     def _load_dim_customer(self) -> int:
         """Завантажує dim_customer."""
-        df_customers = self.orders_extractor.extract_customers()
-        df_customers_transformed = self.transformer.transform_customers(df_customers)
-        return self.loader.load_dimension(df_customers_transformed, 'dim_customer', 'replace')
+        df_customers = self.metrics.call('dim_customer', 'extract', self.orders_extractor.extract_customers)
+        df_customers_transformed = self.metrics.call(
+            'dim_customer', 'transform', self.transformer.transform_customers, df_customers
+        )
+        return self._sync_dimension('dim_customer', df_customers_transformed, 'customer_id')
     
     def _load_dim_employee(self) -> int:
         """Завантажує dim_employee."""
-        df_employees = self.orders_extractor.extract_employees()
-        df_employees_transformed = self.transformer.cleaner.remove_duplicates(
+        df_employees = self.metrics.call('dim_employee', 'extract', self.orders_extractor.extract_employees)
+        df_employees_transformed = self.metrics.call(
+            'dim_employee', 'transform',
+            self.transformer.cleaner.remove_duplicates,
             df_employees,
             subset=['employee_id']
         )
-        return self.loader.load_dimension(df_employees_transformed, 'dim_employee', 'replace')
+        return self._sync_dimension('dim_employee', df_employees_transformed, 'employee_id')
     
     def _load_fact_sales(self) -> int:
-        """Завантажує fact_sales (повне завантаження)."""
-        # Витягуємо замовлення
-        df_orders = self.orders_extractor.extract_orders()
+        """Завантажує fact_sales (повне завантаження).
+        
+        Партиціонована fact_sales перезавантажується підміною партицій
+        (див. FactPartitionManager.swap_reload) і не буває порожньою під
+        час завантаження. Непартиціонована (до міграції) - очищується та
+        заповнюється заново. Після запису зведені таблиці продажів
+        перебудовуються повністю.
+        
+        Завершений запис фактів має власну контрольну точку: якщо запуск
+        перервався на перебудові зведень, продовження не перезавантажує
+        fact_sales.
+        """
+        if self._resume and 'fact_sales.load' in self._completed:
+            count = self._completed['fact_sales.load']
+            logger.info("fact_sales: факти записано в попередній спробі, перебудовуємо зведення")
+        else:
+            count = self._load_fact_sales_full()
+            self.checkpoints.complete_stage(self._run_type, 'fact_sales.load', count)
+        self.metrics.call('fact_sales', 'aggregates', self.aggregates.rebuild)
+        return count
+    
+    def _load_fact_sales_full(self) -> int:
+        """Повністю перезаписує fact_sales (див. _load_fact_sales).
+        
+        Потокове завантаження продовжується з останнього записаного чанку
+        перерваної спроби: вже записані дні зберігаються (у тіньових
+        партиціях або в самій таблиці), решта витягується заново.
+        """
+        progress = self._chunk_progress('fact_sales') if self.config.streaming else None
+        
+        if self.partitions.is_partitioned():
+            if self.config.streaming:
+                shadows, kept = (
+                    self.partitions.resume_shadows(progress.last_date_key) if progress else (None, 0)
+                )
+                chunks = self._checkpoint_chunks(
+                    'fact_sales', self._transform_fact_stream(self._extract_fact_chunks(progress)), progress
+                )
+                # Тіньові партиції зберігаються при помилці, щоб їх підхопило продовження
+                return kept + self.metrics.call(
+                    'fact_sales', 'load', self.partitions.swap_reload, chunks,
+                    shadows=shadows, keep_shadows=True
+                )
+            chunks = [self._transform_fact_frame(
+                self.metrics.call('fact_sales', 'extract', self.orders_extractor.extract_orders, ordered=False)
+            )]
+            return self.metrics.call('fact_sales', 'load', self.partitions.swap_reload, chunks)
+        
+        if self.config.streaming:
+            if progress:
+                # Видаляємо лише незавершений день, записане раніше залишається
+                kept = self.loader.trim_fact_sales(progress.last_date_key)
+                return kept + self._load_fact_sales_stream(progress)
+            # Очищаємо fact_sales перед повним завантаженням
+            self.loader.truncate_table('fact_sales')
+            return self._load_fact_sales_stream()
+        
+        # Витягуємо замовлення (порядок рядків для цілого DataFrame не потрібен)
+        df_orders = self.metrics.call(
+            'fact_sales', 'extract', self.orders_extractor.extract_orders, ordered=False
+        )
         
-        # Трансформуємо
-        df_orders_transformed = self.transformer.transform_orders(df_orders)
+        # Трансформуємо та замінюємо business id на surrogate ключі
+        df_orders_transformed = self._transform_fact_frame(df_orders)
         
         # Очищаємо fact_sales перед повним завантаженням
         self.loader.truncate_table('fact_sales')
         
         # Завантажуємо
-        return self.loader.load_fact_sales(df_orders_transformed, if_exists='append')
+        return self.metrics.call(
+            'fact_sales', 'load',
+            self.loader.load_fact_sales, df_orders_transformed, if_exists='append'
+        )
+    
+    def _load_fact_sales_stream(self, progress: Optional[ChunkProgress] = None) -> int:
+        """Завантажує fact_sales потоком чанків розміром batch_size.
+        
+        Extract, transform та load з'єднані генераторами, тому пікове
+        споживання пам'яті обмежене розміром одного чанку.
+        
+        Args:
+            progress: Прогрес перерваної спроби (None - з початку)
+        """
+        chunks = self._transform_fact_stream(self._extract_fact_chunks(progress))
+        return self.metrics.call(
+            'fact_sales', 'load',
+            self.loader.load_fact_sales_stream, self._checkpoint_chunks('fact_sales', chunks, progress)
+        )
+    
+    def _extract_fact_chunks(self, progress: Optional[ChunkProgress] = None) -> Iterable[pd.DataFrame]:
+        """Витягує всі замовлення чанками (з дня продовження, якщо є прогрес).
+        
+        Чанки впорядковані за датою: контрольні точки чанків (_checkpoint_chunks)
+        продовжують завантаження з дня останнього записаного чанку.
+        """
+        if progress:
+            return self.orders_extractor.extract_orders(
+                progress.resume_date, chunksize=self.config.batch_size
+            )
+        return self.orders_extractor.extract_orders(chunksize=self.config.batch_size)
+    
+    def _transform_fact_frame(self, df_orders: pd.DataFrame) -> pd.DataFrame:
+        """Трансформує замовлення та замінює business id на surrogate ключі."""
+        df_orders_transformed = self.metrics.call(
+            'fact_sales', 'transform', self.transformer.transform_orders, df_orders
+        )
+        return self.metrics.call(
+            'fact_sales', 'resolve_keys', self.key_resolver.resolve, df_orders_transformed
+        )
+    
+    def _transform_fact_stream(
+        self,
+        chunks: Iterable[pd.DataFrame]
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Потокова версія _transform_fact_frame з вимірами кожного кроку.
+        
+        Кожен крок вимірюється окремо: час витягування чанку не входить
+        у час трансформації, а час усього ланцюжка - у час запису.
+        """
+        extracted = self.metrics.stream('fact_sales', 'extract', chunks)
+        transformed = self.metrics.stream(
+            'fact_sales', 'transform', self.transformer.transform_orders_stream(extracted)
+        )
+        return self.metrics.stream('fact_sales', 'resolve_keys', self._resolve_keys_stream(transformed))
+    
+    def _resolve_keys_stream(
+        self,
+        chunks: Iterable[pd.DataFrame]
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Замінює business id на surrogate ключі в кожному чанку."""
+        for chunk in chunks:
+            yield self.key_resolver.resolve(chunk)
     
     def _load_fact_sales_incremental(
         self,
-        start_date: datetime,
-        end_date: datetime
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
     ) -> int:
-        """Завантажує fact_sales інкрементально."""
+        """Завантажує fact_sales інкрементально.
+        
+        Без явного періоду витягуються замовлення, змінені від watermark.
+        Рядки замінюються за order_item_id, тому повторний запуск не
+        створює дублікатів. Зведені таблиці продажів перераховуються для
+        днів, яких торкнулись записані факти.
+        
+        Потокове завантаження продовжується з дня останнього записаного
+        чанку перерваної спроби: завдяки заміні рядків повторно витягнутий
+        день не дублюється ні в таблиці, ні в кількості записів.
+        """
+        use_watermark = start_date is None and end_date is None
+        since = self.watermarks.get('fact_sales') if use_watermark else None
+        
+        if self.config.streaming:
+            max_updated_at = []
+            date_keys = []
+            
+            progress = self._chunk_progress('fact_sales')
+            if progress:
+                date_keys.extend(progress.days())
+                if progress.watermark is not None:
+                    max_updated_at.append(progress.watermark)
+                start_date = max(start_date, progress.resume_date) if start_date else progress.resume_date
+            
+            def track(chunks):
+                for chunk in chunks:
+                    max_updated_at.append(chunk['updated_at'].max())
+                    yield chunk
+            
+            def collect_days(chunks):
+                for chunk in chunks:
+                    date_keys.extend(chunk['date_key'].unique())
+                    yield chunk
+            
+            # Порядок за датою потрібен контрольним точкам чанків
+            chunks = self.orders_extractor.extract_orders(
+                start_date, end_date, chunksize=self.config.batch_size, since=since
+            )
+            chunks = self._checkpoint_chunks(
+                'fact_sales',
+                self._ensure_partitions_stream(collect_days(self._transform_fact_stream(track(chunks)))),
+                progress,
+                watermark=lambda: max(max_updated_at) if max_updated_at else None
+            )
+            count = self.metrics.call(
+                'fact_sales', 'load',
+                self.loader.load_fact_sales_stream,
+                chunks,
+                replace_existing=True,
+                partition_column=self._partition_column()
+            )
+            if progress:
+                # Рядки дня продовження вже враховано в count
+                count += progress.rows_before_resume
+            self.metrics.call('fact_sales', 'aggregates', self.aggregates.refresh, date_keys)
+            if use_watermark and max_updated_at:
+                self.watermarks.set('fact_sales', max(max_updated_at))
+            return count
+        
         # Витягуємо тільки нові замовлення
-        df_orders = self.orders_extractor.extract_orders(start_date, end_date)
+        df_orders = self.metrics.call(
+            'fact_sales', 'extract',
+            self.orders_extractor.extract_orders, start_date, end_date, since=since, ordered=False
+        )
         
         if len(df_orders) == 0:
             logger.info("Нових замовлень не знайдено")
             return 0
         
-        # Трансформуємо
-        df_orders_transformed = self.transformer.transform_orders(df_orders)
+        # Трансформуємо та замінюємо business id на surrogate ключі
+        df_orders_transformed = self._transform_fact_frame(df_orders)
+        
+        # Замінюємо рядки з тими ж order_item_id лише в зачеплених партиціях
+        if self.partitions.is_partitioned():
+            self.partitions.ensure_partitions(df_orders_transformed['date_key'])
+        count = self.metrics.call(
+            'fact_sales', 'load',
+            self.loader.replace_fact_rows,
+            df_orders_transformed,
+            partition_column=self._partition_column()
+        )
+        
+        # Зведення перераховуються лише для днів пакета
+        self.metrics.call(
+            'fact_sales', 'aggregates', self.aggregates.refresh, df_orders_transformed['date_key']
+        )
         
-        # Завантажуємо (додаємо до існуючих)
-        return self.loader.load_fact_sales(df_orders_transformed, if_exists='append')
+        if use_watermark:
+            self.watermarks.set('fact_sales', df_orders['updated_at'].max())
+        return count
+    
+    def _partition_column(self) -> Optional[str]:
+        """Повертає ключ партиціонування fact_sales (None, якщо таблиця не партиціонована)."""
+        return 'date_key' if self.partitions.is_partitioned() else None
+    
+    def _ensure_partitions_stream(
+        self,
+        chunks: Iterable[pd.DataFrame]
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Створює місячні партиції для кожного чанку перед його записом."""
+        for chunk in chunks:
+            if self.partitions.is_partitioned():
+                self.partitions.ensure_partitions(chunk['date_key'])
+            yield chunk
+    
+    def _publish_metrics(self) -> None:
+        """Записує метрики запуску у файли звітів та таблицю DWH.
+        
+        Помилки публікації лише логуються: метрики не мають зривати ETL.
+        """
+        for metrics in self.metrics.metrics:
+            logger.info(
+                f"Метрики {metrics.stage}.{metrics.step}: {metrics.wall_seconds:.2f} с, "
+                f"{metrics.rows} рядків ({metrics.rows_per_sec:.0f}/с), "
+                f"{metrics.db_round_trips} SQL запитів"
+            )
+        
+        if self.config.metrics_dir:
+            try:
+                directory = Path(self.config.metrics_dir)
+                self.metrics.write_json(directory / 'etl_metrics.json')
+                self.metrics.write_prometheus(directory / 'etl_metrics.prom')
+            except OSError as e:
+                logger.warning(f"Не вдалося записати звіт метрик: {e}")
+        
+        try:
+            self.metrics_store.save(self.metrics)
+        except Exception as e:
+            logger.warning(f"Не вдалося зберегти метрики в DWH: {e}")
     
     def _cleanup(self) -> None:
         """Очищає ресурси після завершення ETL."""
@@ -237,6 +1214,8 @@ class ETLPipeline:
         self.catalog_extractor.close()
         self.payments_extractor.close()
         self.loader.close()
+        if self.governor:
+            self.governor.close()
         logger.info("Ресурси звільнено")
 
 
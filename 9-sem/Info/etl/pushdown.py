@@ -0,0 +1,175 @@
+"""
+Модуль pushdown трансформацій у SQL витягування.
+
+У режимі pushdown (ETL_PUSHDOWN=true) екстрактори вибирають з OLTP лише
+колонки цільової таблиці DWH, а похідні поля замовлень (revenue,
+discount_amount, cost, margin, date_key) обчислюються в MySQL. Список
+колонок береться зі схеми DWH (database/init/05_dwh_schema.sql), а не
+підтримується вручну:
+- колонка DWH без виразу джерела (identity ключ, атрибут, якого немає
+  в OLTP) не вибирається;
+- колонки OLTP, яких немає в DWH (опис товару, телефон), не передаються;
+- surrogate ключі вимірів (product_key, region_key, ...) резолвляться
+  в DWH (etl.keys), тож замість них вибираються business id.
+"""
+
+import logging
+import re
+from pathlib import Path
+from typing import Optional
+
+from .keys import FACT_SALES_DIMENSIONS
+from .transform import COST_RATIO
+
+logger = logging.getLogger(__name__)
+
+# Схема DWH у репозиторії (ETL_DWH_SCHEMA перевизначає шлях)
+DWH_SCHEMA_PATH = Path(__file__).resolve().parent.parent / 'database' / 'init' / '05_dwh_schema.sql'
+
+# Surrogate ключ DWH -> business id, що вибирається з OLTP замість нього
+BUSINESS_KEYS = {
+    **{dimension.surrogate_key: dimension.business_key for dimension in FACT_SALES_DIMENSIONS},
+    'category_key': 'category_id',
+    'parent_category_key': 'parent_category_id',
+}
+
+_REVENUE = 'oi.unit_price * oi.quantity'
+_DISCOUNT = 'COALESCE(oi.discount, 0)'
+
+# Вирази MySQL для колонок DWH (та business id замість surrogate ключів).
+# Аліаси таблиць відповідають запитам екстракторів (etl.extract)
+SOURCE_EXPRESSIONS = {
+    'fact_sales': {
+        'order_id': 'o.id',
+        'order_item_id': 'oi.id',
+        'date_key': 'YEAR(o.order_date) * 10000 + MONTH(o.order_date) * 100 + DAY(o.order_date)',
+        'product_id': 'oi.product_id',
+        'customer_id': 'o.customer_id',
+        'employee_id': 'o.employee_id',
+        'region_id': 'o.region_id',
+        'quantity': 'oi.quantity',
+        'revenue': _REVENUE,
+        'discount_amount': _DISCOUNT,
+        'cost': f'{_REVENUE} * {COST_RATIO}',
+        'margin': f'{_REVENUE} - {_DISCOUNT} - {_REVENUE} * {COST_RATIO}',
+    },
+    'dim_product': {
+        'product_id': 'p.id',
+        'name': 'p.name',
+        'sku': 'p.sku',
+        'category_id': 'p.category_id',
+        'updated_at': 'p.updated_at',
+    },
+    'dim_customer': {
+        'customer_id': 'c.id',
+        'first_name': 'c.first_name',
+        'last_name': 'c.last_name',
+        'email': 'LOWER(TRIM(c.email))',
+        'updated_at': 'c.updated_at',
+    },
+    'dim_employee': {
+        'employee_id': 'e.id',
+        'first_name': 'e.first_name',
+        'last_name': 'e.last_name',
+        'email': 'e.email',
+        'region_id': 'e.region_id',
+        'updated_at': 'e.created_at',
+    },
+    'dim_category': {
+        'category_id': 'id',
+        'name': 'name',
+        'parent_category_id': 'parent_category_id',
+        'updated_at': 'created_at',
+    },
+    'dim_region': {
+        'region_id': 'id',
+        'name': 'name',
+        'code': 'code',
+    },
+}
+
+# Колонки, потрібні самому pipeline (watermark), навіть якщо їх немає в DWH
+PIPELINE_COLUMNS = {
+    'fact_sales': {'updated_at': 'o.updated_at'},
+    'dim_employee': {'created_at': 'e.created_at'},
+    'dim_category': {'created_at': 'created_at'},
+}
+
+_CREATE_TABLE = re.compile(r'CREATE TABLE "(\w+)" \((.*?)\n\)', re.S)
+_COLUMN = re.compile(r'^\s*"(\w+)"\s+(.*)$')
+
+
+def parse_dwh_schema(sql: str) -> dict[str, list[str]]:
+    """Повертає колонки таблиць зі SQL схеми DWH.
+    
+    Identity колонки (GENERATED ... AS IDENTITY) пропускаються: їх
+    значення генерує DWH.
+    
+    Args:
+        sql: Текст CREATE TABLE інструкцій
+    
+    Returns:
+        Словник {таблиця: колонки в порядку оголошення}
+    """
+    tables = {}
+    for table, body in _CREATE_TABLE.findall(sql):
+        columns = []
+        for line in body.splitlines():
+            match = _COLUMN.match(line)
+            if match and 'GENERATED' not in match.group(2).upper():
+                columns.append(match.group(1))
+        tables[table] = columns
+    return tables
+
+
+class PushdownSchema:
+    """Колонки витягування, виведені зі схеми DWH.
+    
+    Attributes:
+        schema_path: Шлях до SQL схеми DWH
+        tables: Колонки таблиць DWH (без identity ключів)
+    """
+    
+    def __init__(self, schema_path: Optional[str | Path] = None):
+        """Читає схему DWH.
+        
+        Args:
+            schema_path: Шлях до SQL схеми (None - схема з репозиторію)
+        
+        Raises:
+            FileNotFoundError: Якщо файл схеми не знайдено
+        """
+        self.schema_path = Path(schema_path) if schema_path else DWH_SCHEMA_PATH
+        self.tables = parse_dwh_schema(self.schema_path.read_text(encoding='utf-8'))
+        logger.info(f"Pushdown: схема DWH {self.schema_path} ({len(self.tables)} таблиць)")
+    
+    def columns(self, table: str) -> dict[str, str]:
+        """Повертає колонки витягування для таблиці DWH.
+        
+        Args:
+            table: Таблиця DWH
+        
+        Returns:
+            Словник {аліас колонки: вираз MySQL} у порядку колонок DWH,
+            далі - службові колонки pipeline
+        
+        Raises:
+            KeyError: Якщо таблиці немає в схемі або для неї немає виразів
+        """
+        expressions = SOURCE_EXPRESSIONS[table]
+        columns = {}
+        for column in self.tables[table]:
+            alias = BUSINESS_KEYS.get(column, column)
+            if alias in expressions:
+                columns[alias] = expressions[alias]
+            else:
+                logger.debug(f"Pushdown: {table}.{column} не має виразу джерела, пропускаємо")
+        for alias, expression in PIPELINE_COLUMNS.get(table, {}).items():
+            columns.setdefault(alias, expression)
+        return columns
+    
+    def select_list(self, table: str) -> str:
+        """Повертає список SELECT для таблиці DWH (вирази з аліасами)."""
+        return ',\n                '.join(
+            f"{expression} AS {alias}" for alias, expression in self.columns(table).items()
+        )
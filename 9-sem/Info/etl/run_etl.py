@@ -6,9 +6,18 @@
     # Повне завантаження
     python run_etl.py --mode full
     
-    # Інкрементальне завантаження
+    # Інкрементальне завантаження від збережених watermark'ів
+    python run_etl.py --mode incremental
+    
+    # Інкрементальне завантаження (backfill) за період
     python run_etl.py --mode incremental --start-date 2024-01-01 --end-date 2024-01-31
     
+    # Перезапуск transform/load зі staged даних без запитів до OLTP
+    python run_etl.py --mode full --from-staging
+    
+    # Продовження перерваного запуску з контрольних точок
+    python run_etl.py --mode full --resume
+    
     # З вказаним .env файлом
     python run_etl.py --mode full --env-file /path/to/.env
 """
@@ -74,6 +83,18 @@ def parse_args() -> argparse.Namespace:
         help='Шлях до .env файлу (за замовчуванням: .env)'
     )
     
+    parser.add_argument(
+        '--from-staging',
+        action='store_true',
+        help='Читати дані лише зі staging кешу (ETL_STAGING_DIR), без запитів до OLTP'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Продовжити перерваний запуск: пропустити завершені стадії та записані чанки'
+    )
+    
     parser.add_argument(
         '--log-level',
         type=str,
@@ -104,9 +125,13 @@ def validate_dates(
         ValueError: Якщо дати некоректні
     """
     if mode == 'incremental':
+        if not start_date and not end_date:
+            # Період не вказано - завантаження від збережених watermark'ів
+            return None, None
         if not start_date or not end_date:
             raise ValueError(
-                "Для incremental режиму потрібно вказати --start-date та --end-date"
+                "Для incremental режиму вкажіть обидві дати --start-date та --end-date "
+                "або жодної (завантаження від watermark)"
             )
         
         try:
@@ -158,6 +183,12 @@ def main() -> int:
         logger.info("Завантаження конфігурації...")
         config = ETLConfig.from_env()
         
+        if args.from_staging:
+            if not config.staging_dir:
+                logger.error("Для --from-staging вкажіть ETL_STAGING_DIR")
+                return 1
+            config.staging_offline = True
+        
         # Створення pipeline
         logger.info("Ініціалізація ETL pipeline...")
         pipeline = ETLPipeline(config)
@@ -165,10 +196,10 @@ def main() -> int:
         # Запуск ETL
         if args.mode == 'full':
             logger.info("Запуск повного завантаження...")
-            results = pipeline.run_full_load()
+            results = pipeline.run_full_load(resume=args.resume)
         else:
             logger.info("Запуск інкрементального завантаження...")
-            results = pipeline.run_incremental_load(start_dt, end_dt)
+            results = pipeline.run_incremental_load(start_dt, end_dt, resume=args.resume)
         
         # Виведення результатів
         logger.info("=" * 60)
@@ -44,6 +44,10 @@ setup(
         'airflow': [
             'apache-airflow>=2.7.0',
         ],
+        'engines': [
+            'polars>=0.20.0',
+            'duckdb>=0.10.0',
+        ],
     },
     entry_points={
         'console_scripts': [
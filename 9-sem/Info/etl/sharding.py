@@ -0,0 +1,215 @@
+"""
+Модуль шардованого витягування великих таблиць OLTP.
+
+MySQL виконує кожен запит в одному потоці, тож одне велике витягування
+замовлень обмежене одним ядром сервера та одним з'єднанням. Тут таблиця
+ділиться на діапазони дат приблизно однакової ваги (за денною гістограмою
+кількості рядків), а діапазони читаються паралельно обмеженою кількістю
+з'єднань і зливаються в один потік чанків:
+- ordered=True - чанки видаються в порядку шардів (глобальний порядок за
+  датою зберігається, якщо кожен шард впорядкований); шарди, що чекають
+  на свою чергу, не зупиняються: їх чанки понад prefetch скидаються на диск;
+- ordered=False - чанки видаються в порядку надходження.
+"""
+
+import contextvars
+import logging
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .governor import MemoryGovernor, SpilledFrame, spill_frame
+
+logger = logging.getLogger(__name__)
+
+# Скільки чанків кожен шард тримає в пам'яті, поки споживач їх не забрав
+SHARD_PREFETCH = 2
+
+# Як часто (с) заблокований шард перевіряє, чи не зупинено злиття
+_STOP_POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+@dataclass(frozen=True)
+class DateShard:
+    """Напіввідкритий діапазон дат шарду [start, end).
+    
+    Attributes:
+        start: Початок діапазону (None - без нижньої межі)
+        end: Кінець діапазону, не включно (None - без верхньої межі)
+    """
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class _ShardError:
+    """Помилка шарду, передана споживачу через чергу."""
+    shard: int
+    error: BaseException
+
+
+def plan_date_shards(days: pd.Series, counts: pd.Series, shards: int) -> list[DateShard]:
+    """Ділить денну гістограму на діапазони з приблизно однаковою кількістю рядків.
+    
+    Межі шардів - початки днів гістограми, тож рядки одного дня завжди
+    потрапляють в один шард. Перший і останній шарди відкриті, щоб
+    покрити рядки поза гістограмою.
+    
+    Args:
+        days: Дні гістограми за зростанням (NULL дні ігноруються)
+        counts: Кількість рядків кожного дня
+        shards: Бажана кількість шардів
+    
+    Returns:
+        Список діапазонів (не більше shards; один - якщо ділити нічого)
+    """
+    days = pd.to_datetime(pd.Series(days).reset_index(drop=True))
+    known = days.notna().to_numpy()
+    days = days[known].reset_index(drop=True)
+    if shards <= 1 or len(days) < 2:
+        return [DateShard()]
+    
+    weights = np.cumsum(np.asarray(counts, dtype=np.float64)[known])
+    targets = weights[-1] * np.arange(1, shards) / shards
+    # День, на якому накопичена вага досягає цілі, відходить до шарду,
+    # межа якого ближча до цілі (важкий день не зсуває сусідні межі)
+    reached = np.searchsorted(weights, targets, side='left')
+    before = np.where(reached > 0, weights[np.maximum(reached - 1, 0)], 0.0)
+    positions = np.where(targets - before <= weights[reached] - targets, reached, reached + 1)
+    positions = np.unique(positions[(positions > 0) & (positions < len(days))])
+    
+    bounds = [days[position].normalize().to_pydatetime() for position in positions]
+    edges = [None, *bounds, None]
+    return [DateShard(start, end) for start, end in zip(edges[:-1], edges[1:])]
+
+
+def merge_shards(
+    readers: Sequence[Callable[[], Iterable[pd.DataFrame]]],
+    max_workers: int,
+    ordered: bool = True,
+    prefetch: int = SHARD_PREFETCH,
+    governor: Optional[MemoryGovernor] = None
+) -> Generator[pd.DataFrame, None, None]:
+    """Читає шарди паралельно та зливає їх чанки в один потік.
+    
+    Кожен шард читається в окремому потоці пулу з max_workers потоків,
+    тож одночасно відкрито не більше max_workers з'єднань. У пам'яті
+    кожен шард тримає не більше prefetch чанків.
+    
+    Без порядку шарди ділять спільну чергу: споживач забирає чанки будь-
+    якого шарду, тож заповнена черга лише пригальмовує швидші шарди.
+    У порядку шардів споживач читає лише поточний шард; решта не чекає
+    на нього з відкритим курсором (net_write_timeout MySQL), а скидає
+    чанки понад prefetch на диск, тож шарди читаються паралельно. З
+    governor чанки в пам'яті понад бюджетом теж скидаються на диск.
+    Помилка шарду передається споживачу; якщо споживач закриває потік
+    раніше, читання шардів зупиняється, а скинуті чанки видаляються.
+    
+    Args:
+        readers: Функції, що повертають ітератор чанків шарду
+        max_workers: Максимальна кількість одночасно прочитуваних шардів
+        ordered: True - чанки в порядку шардів, False - в порядку надходження
+        prefetch: Кількість чанків шарду в пам'яті
+        governor: Регулятор пам'яті для скидання чанків (опціонально)
+    
+    Yields:
+        Чанки всіх шардів
+    """
+    workers = max(1, min(max_workers, len(readers)))
+    stop = threading.Event()
+    if ordered:
+        queues = [queue.Queue() for _ in readers]
+        slots = [threading.Semaphore(prefetch) for _ in readers]
+    else:
+        shared = queue.Queue(maxsize=prefetch * workers)
+        queues = [shared] * len(readers)
+    # Шард, який зараз читає споживач (для ordered)
+    current = [0]
+    spill_lock = threading.Lock()
+    spill_path: list[Path] = []
+    
+    def spill(chunk: pd.DataFrame) -> SpilledFrame:
+        if governor:
+            return governor.spill(chunk)
+        with spill_lock:
+            if not spill_path:
+                spill_path.append(Path(tempfile.mkdtemp(prefix='etl-shards-')))
+        return spill_frame(chunk, spill_path[0])
+    
+    def put(shard: int, item: Any, in_memory: bool = False) -> bool:
+        while not stop.is_set():
+            try:
+                queues[shard].put((item, in_memory), timeout=_STOP_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def buffer(shard: int, chunk: pd.DataFrame) -> bool:
+        if not ordered:
+            return put(shard, governor.hold(chunk) if governor else chunk)
+        while not stop.is_set():
+            # Поточний шард чекає на споживача; решта не блокуються
+            waiting = shard == current[0]
+            if slots[shard].acquire(timeout=_STOP_POLL_SECONDS) if waiting else slots[shard].acquire(blocking=False):
+                return put(shard, governor.hold(chunk) if governor else chunk, in_memory=True)
+            if not waiting:
+                return put(shard, spill(chunk))
+        return False
+    
+    def read(shard: int) -> None:
+        chunks = None
+        try:
+            chunks = iter(readers[shard]())
+            for chunk in chunks:
+                if not buffer(shard, chunk):
+                    return
+            put(shard, _DONE)
+        except BaseException as e:
+            put(shard, _ShardError(shard, e))
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close:
+                close()
+    
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='etl-shard')
+    try:
+        for shard in range(len(readers)):
+            pool.submit(contextvars.copy_context().run, read, shard)
+        
+        pending = len(readers)
+        while pending:
+            item, in_memory = queues[current[0]].get()
+            if in_memory:
+                slots[current[0]].release()
+            if isinstance(item, _ShardError):
+                logger.error(f"Шард {item.shard} завершився з помилкою: {item.error}")
+                raise item.error
+            if item is _DONE:
+                pending -= 1
+                if ordered:
+                    current[0] += 1
+                continue
+            yield MemoryGovernor.restore(item)
+    finally:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        # Скинуті чанки, які споживач не забрав
+        for buffered in {id(q): q for q in queues}.values():
+            while not buffered.empty():
+                item, _ = buffered.get_nowait()
+                if isinstance(item, SpilledFrame):
+                    item.path.unlink(missing_ok=True)
+        if spill_path:
+            shutil.rmtree(spill_path[0], ignore_errors=True)
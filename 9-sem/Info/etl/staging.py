@@ -0,0 +1,169 @@
+"""
+Staging модуль - локальний кеш витягнутих даних у Parquet.
+
+Кожен результат витягування зберігається у файл, адресований таблицею,
+текстом запиту з параметрами та контрольною сумою джерела. Якщо джерело
+не змінилось з попереднього запуску, дані читаються з кешу без повторного
+запиту до OLTP. Розмір кешу обмежений бюджетом диска (LRU витіснення).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STAGING_SUFFIX = '.parquet'
+
+
+class StagingCache:
+    """Content-addressed кеш DataFrame'ів у Parquet файлах.
+    
+    Файл називається <table>-<хеш запиту>-<хеш контрольної суми>.parquet:
+    зміна запиту, його параметрів або даних джерела дає новий файл, а
+    застарілі версії з часом витісняються. Час модифікації файлу
+    оновлюється при кожному читанні і слугує міткою для LRU.
+    
+    В offline режимі контрольна сума не обчислюється (OLTP не
+    запитується): повертається найсвіжіша збережена версія запиту, що
+    дозволяє перезапускати transform/load лише зі staged даних.
+    
+    Attributes:
+        directory: Каталог кешу
+        max_bytes: Бюджет диска в байтах
+        offline: Чи читати дані лише з кешу
+    """
+    
+    def __init__(self, directory: str | Path, max_bytes: int, offline: bool = False):
+        """Ініціалізує кеш.
+        
+        Args:
+            directory: Каталог кешу (створюється при потребі)
+            max_bytes: Максимальний сумарний розмір файлів
+            offline: Читати дані лише з кешу
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _digest(value: Any) -> str:
+        """Повертає короткий sha256 від JSON представлення значення."""
+        payload = json.dumps(value, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def query_key(self, table: str, query: str, params: Optional[dict[str, Any]] = None) -> str:
+        """Формує ключ запиту (без урахування стану джерела).
+        
+        Args:
+            table: Назва таблиці-джерела
+            query: Текст SQL запиту
+            params: Параметри запиту
+        
+        Returns:
+            Префікс імені файлу кешу
+        """
+        normalized = ' '.join(query.split())
+        return f"{table}-{self._digest([normalized, params or {}])}"
+    
+    def path(self, query_key: str, checksum: Any) -> Path:
+        """Повертає шлях файлу для ключа запиту та контрольної суми джерела."""
+        return self.directory / f"{query_key}-{self._digest(checksum)}{STAGING_SUFFIX}"
+    
+    def get(self, query_key: str, checksum: Any = None) -> Optional[pd.DataFrame]:
+        """Читає дані з кешу.
+        
+        Args:
+            query_key: Ключ запиту (див. query_key)
+            checksum: Контрольна сума джерела; в offline режимі ігнорується
+        
+        Returns:
+            DataFrame або None, якщо відповідного файлу немає
+        """
+        if self.offline:
+            candidates = list(self.directory.glob(f"{query_key}-*{STAGING_SUFFIX}"))
+            if not candidates:
+                return None
+            path = max(candidates, key=lambda p: p.stat().st_mtime)
+        else:
+            path = self.path(query_key, checksum)
+            if not path.exists():
+                return None
+        
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)
+        except FileNotFoundError:
+            # Файл витіснено паралельним записом
+            return None
+        
+        logger.info(f"Staging: {len(df)} рядків з кешу {path.name}")
+        return df
+    
+    def put(self, query_key: str, checksum: Any, df: pd.DataFrame) -> Path:
+        """Зберігає дані в кеш та витісняє старі файли понад бюджет.
+        
+        Запис атомарний: файл пишеться під тимчасовим ім'ям і
+        перейменовується, тож паралельні читачі не бачать частковий файл.
+        
+        Args:
+            query_key: Ключ запиту
+            checksum: Контрольна сума джерела
+            df: Дані для збереження
+        
+        Returns:
+            Шлях збереженого файлу
+        """
+        path = self.path(query_key, checksum)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        
+        logger.info(f"Staging: збережено {len(df)} рядків у {path.name}")
+        self.evict(keep=path)
+        return path
+    
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Видаляє найдавніше використані файли, поки кеш перевищує бюджет.
+        
+        Args:
+            keep: Файл, який не витісняється (щойно записаний)
+        
+        Returns:
+            Кількість видалених файлів
+        """
+        with self._lock:
+            entries = []
+            for path in self.directory.glob(f"*{STAGING_SUFFIX}"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        
+        if removed:
+            logger.info(f"Staging: витіснено {removed} файлів")
+        return removed
+    
+    def size(self) -> int:
+        """Повертає сумарний розмір файлів кешу в байтах."""
+        return sum(path.stat().st_size for path in self.directory.glob(f"*{STAGING_SUFFIX}"))
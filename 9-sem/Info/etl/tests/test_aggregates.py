@@ -0,0 +1,105 @@
+"""
+Тести для модуля агрегатів продажів.
+
+Перевіряє визначення зачеплених днів та періодів і SQL перерахунку зведень.
+"""
+
+import datetime
+
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+
+from etl.aggregates import SalesAggregates, affected_days, period_starts
+
+
+@pytest.fixture
+def connection():
+    """Фікстура з'єднання, що записує виконані SQL."""
+    return MagicMock()
+
+
+@pytest.fixture
+def aggregates(connection):
+    """Фікстура з SalesAggregates поверх mock лоадера."""
+    loader = MagicMock()
+    loader.engine.begin.return_value.__enter__.return_value = connection
+    return SalesAggregates(loader)
+
+
+def executed(connection):
+    """Повертає виконані SQL та їх параметри."""
+    return [
+        (str(call.args[0]), call.args[1] if len(call.args) > 1 else None)
+        for call in connection.execute.call_args_list
+    ]
+
+
+class TestAggregateHelpers:
+    """Тести допоміжних функцій агрегатів."""
+    
+    def test_affected_days(self):
+        """Тест унікальних днів пакета (NULL ігнорується)."""
+        assert affected_days(pd.Series([20240105, 20240103, 20240105, None])) == [20240103, 20240105]
+    
+    def test_week_starts_on_monday(self):
+        """Тест що тиждень починається з понеділка, як date_trunc('week')."""
+        starts = period_starts([20240107, 20240108, 20240110], 'week')
+        
+        assert starts == [pd.Timestamp('2024-01-01'), pd.Timestamp('2024-01-08')]
+    
+    def test_month_starts(self):
+        """Тест початків місяців."""
+        assert period_starts([20240131, 20240201], 'month') == [
+            pd.Timestamp('2024-01-01'), pd.Timestamp('2024-02-01')
+        ]
+
+
+class TestSalesAggregates:
+    """Тести для SalesAggregates."""
+    
+    def test_refresh_recomputes_only_affected_days(self, aggregates, connection):
+        """Тест що перераховуються лише дні пакета, а кількість замовлень - COUNT(DISTINCT)."""
+        days = aggregates.refresh(pd.Series([20240131, 20240131, 20240201]))
+        
+        assert days == 2
+        statements = executed(connection)
+        
+        delete, params = next(s for s in statements if s[0].startswith('DELETE FROM "agg_sales_daily"'))
+        assert params == {'days': [20240131, 20240201]}
+        insert = next(sql for sql, _ in statements if sql.startswith('INSERT INTO "agg_sales_product"'))
+        assert 'COUNT(DISTINCT f."order_id")' in insert
+        assert 'WHERE f."date_key" = ANY(:days)' in insert
+        assert 'GROUP BY f."date_key", f."product_key", f."region_key"' in insert
+        assert not any(sql.startswith('TRUNCATE') for sql, _ in statements)
+    
+    def test_refresh_rolls_up_periods_from_daily(self, aggregates, connection):
+        """Тест що місячне зведення збирається з денного лише для зачеплених місяців."""
+        aggregates.refresh([20240131, 20240201])
+        
+        statements = executed(connection)
+        delete, params = next(s for s in statements if s[0].startswith('DELETE FROM "agg_sales_monthly"'))
+        assert params == {'periods': [datetime.date(2024, 1, 1), datetime.date(2024, 2, 1)]}
+        insert, params = next(s for s in statements if s[0].startswith('INSERT INTO "agg_sales_monthly"'))
+        assert 'FROM "agg_sales_daily" d' in insert
+        assert 'SUM(d."orders_count")' in insert
+        assert params['lower'] == 20240101
+        assert params['upper'] == 20240301
+    
+    def test_refresh_without_days(self, aggregates, connection):
+        """Тест що порожній пакет не звертається до DWH."""
+        assert aggregates.refresh(pd.Series([], dtype='int64')) == 0
+        connection.execute.assert_not_called()
+    
+    def test_rebuild(self, aggregates, connection):
+        """Тест повної перебудови зведень після повного завантаження."""
+        aggregates.rebuild()
+        
+        statements = [sql for sql, _ in executed(connection)]
+        truncated = [sql for sql in statements if sql.startswith('TRUNCATE')]
+        assert len(truncated) == 5
+        # Денне зведення заповнюється раніше за тижневе та місячне
+        daily = statements.index(next(sql for sql in statements if sql.startswith('INSERT INTO "agg_sales_daily"')))
+        weekly = statements.index(next(sql for sql in statements if sql.startswith('INSERT INTO "agg_sales_weekly"')))
+        assert daily < weekly
+        assert not any('ANY(' in sql for sql in statements)
@@ -0,0 +1,87 @@
+"""
+Тести для Backfill модуля.
+
+Перевіряє розбиття періоду на вікна та зведення результатів вікон.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+from etl.backfill import BackfillWindow, backfill_windows, merge_results
+
+
+class TestBackfillWindows:
+    """Тести для backfill_windows."""
+    
+    def test_daily_windows(self):
+        """Тест що денні вікна покривають кожен день періоду включно з останнім."""
+        windows = backfill_windows(datetime(2024, 1, 30), datetime(2024, 2, 1))
+        
+        assert [window.key for window in windows] == [
+            '20240130-20240130', '20240131-20240131', '20240201-20240201'
+        ]
+        assert windows[-1].end_date == datetime(2024, 2, 2) - timedelta(microseconds=1)
+    
+    def test_weekly_windows_aligned_to_monday(self):
+        """Тест що тижневі вікна вирівнюються по понеділку."""
+        # 2024-01-03 - середа, 2024-01-22 - понеділок
+        windows = backfill_windows(datetime(2024, 1, 3), datetime(2024, 1, 22), 'week')
+        
+        assert [window.key for window in windows] == [
+            '20240103-20240107', '20240108-20240114', '20240115-20240121', '20240122-20240122'
+        ]
+        assert all(window.start_date.weekday() == 0 for window in windows[1:])
+    
+    def test_windows_do_not_overlap(self):
+        """Тест що вікна не перетинаються і не мають проміжків."""
+        windows = backfill_windows(datetime(2024, 1, 1), datetime(2024, 3, 31), 'week')
+        
+        for previous, current in zip(windows, windows[1:]):
+            assert previous.end_date < current.start_date
+            assert current.start_date - previous.end_date == timedelta(microseconds=1)
+    
+    def test_time_of_day_ignored(self):
+        """Тест що вікна починаються з півночі незалежно від часу дат періоду."""
+        windows = backfill_windows(datetime(2024, 1, 1, 15, 30), datetime(2024, 1, 1, 8, 0))
+        
+        assert windows == [BackfillWindow(datetime(2024, 1, 1), datetime(2024, 1, 1, 23, 59, 59, 999999))]
+    
+    @pytest.mark.parametrize('start, end, granularity', [
+        (datetime(2024, 2, 1), datetime(2024, 1, 1), 'day'),
+        (datetime(2024, 1, 1), datetime(2024, 1, 31), 'month'),
+    ])
+    def test_invalid_period(self, start, end, granularity):
+        """Тест помилки для порожнього періоду або невідомої гранулярності."""
+        with pytest.raises(ValueError):
+            backfill_windows(start, end, granularity)
+
+
+class TestBackfillWindow:
+    """Тести для BackfillWindow."""
+    
+    def test_dict_roundtrip(self):
+        """Тест серіалізації вікна для XCom."""
+        window = backfill_windows(datetime(2024, 1, 8), datetime(2024, 1, 14), 'week')[0]
+        
+        assert BackfillWindow.from_dict(window.to_dict()) == window
+    
+    def test_date_keys(self):
+        """Тест date_key вікна."""
+        window = backfill_windows(datetime(2024, 2, 26), datetime(2024, 3, 3), 'week')[0]
+        
+        assert window.date_keys() == [20240226, 20240227, 20240228, 20240229, 20240301, 20240302, 20240303]
+
+
+class TestMergeResults:
+    """Тести для merge_results."""
+    
+    def test_sums_per_table(self):
+        """Тест що результати вікон сумуються за таблицями."""
+        summary = merge_results([
+            {'dim_customer': 5},
+            {'fact_sales': 100},
+            None,
+            {'fact_sales': 250},
+        ])
+        
+        assert summary == {'dim_customer': 5, 'fact_sales': 350}
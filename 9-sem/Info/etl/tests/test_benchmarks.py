@@ -0,0 +1,200 @@
+"""
+Тести для бенчмарків ETL.
+
+Перевіряє детермінованість синтетичних даних, дельту інкрементального
+завантаження, запис у MySQL бази-замінники, захист баз від перезапису
+та порівняння запусків.
+"""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from etl.benchmarks.mysql_source import (
+    EMPLOYEE_COLUMNS, check_disposable, schema_statements, split_statements, table_rows
+)
+from etl.benchmarks.pipeline import benchmark_config, compare, find_baseline
+from etl.benchmarks.synthetic import SyntheticCatalogExtractor, SyntheticOrdersExtractor, SyntheticSource
+from etl.config import PostgreSQLConfig
+from etl.transform import DataTransformer
+
+ANCHOR = datetime(2024, 6, 1)
+
+
+@pytest.fixture
+def source():
+    """Фікстура з невеликим синтетичним джерелом."""
+    return SyntheticSource(30_000, seed=7, anchor=ANCHOR)
+
+
+def record(rows_per_sec=1000.0, **stages):
+    """Повертає запис результату бенчмарку."""
+    return {
+        'scale': 100_000, 'mode': 'full', 'streaming': False, 'batch_size': 1000,
+        'rows_per_sec': rows_per_sec,
+        'stages': {name: {'wall_seconds': seconds} for name, seconds in stages.items()},
+    }
+
+
+class TestSyntheticSource:
+    """Тести для SyntheticSource."""
+    
+    def test_chunks_do_not_depend_on_chunk_size(self, source):
+        """Тест що дані однакові за будь-якого розміру чанку."""
+        whole = pd.concat(source.order_chunks(chunk_rows=30_000), ignore_index=True)
+        chunked = pd.concat(source.order_chunks(chunk_rows=999), ignore_index=True)
+        
+        assert len(whole) == 30_000
+        pd.testing.assert_frame_equal(whole, chunked)
+        assert whole['order_item_id'].is_unique
+    
+    def test_same_seed_same_data(self, source):
+        """Тест відтворюваності за seed."""
+        other = SyntheticSource(30_000, seed=7, anchor=ANCHOR)
+        
+        pd.testing.assert_frame_equal(source.order_items(0, 300), other.order_items(0, 300))
+        pd.testing.assert_frame_equal(source.products(), other.products())
+    
+    def test_delta(self, source):
+        """Тест що після watermark повертається лише дельта: змінені та нові позиції."""
+        changed_at = datetime(2024, 6, 1, 12)
+        source.with_delta(0.01, changed_at)
+        
+        delta = pd.concat(source.order_chunks(since=changed_at - timedelta(hours=1)), ignore_index=True)
+        
+        assert len(delta) == 300
+        assert (delta['updated_at'] == changed_at).all()
+        history = set(source.order_items(0, source.scale)['order_item_id'])
+        assert delta['order_item_id'].isin(history).sum() == 150
+        assert list(source.order_chunks(since=changed_at + timedelta(hours=1))) == []
+    
+    def test_extractor_output_transforms(self, source):
+        """Тест що синтетичні замовлення проходять трансформацію ETL."""
+        extractor = SyntheticOrdersExtractor(source)
+        
+        df = DataTransformer().transform_orders(extractor.extract_orders(start_date=ANCHOR - timedelta(days=30)))
+        
+        assert len(df) > 0
+        assert df['date_key'].min() >= 20240502
+    
+    def test_extractor_matches_pipeline_calls(self, source):
+        """Тест що синтетичні екстрактори приймають аргументи пайплайну та мають колонки вимірів."""
+        chunks = SyntheticOrdersExtractor(source).extract_orders(chunksize=10_000, ordered=False)
+        products = SyntheticCatalogExtractor(source).extract_products()
+        
+        assert sum(len(chunk) for chunk in chunks) == 30_000
+        assert products['sku'].is_unique
+
+
+class TestMySQLSource:
+    """Тести запису синтетичного джерела в MySQL бази-замінники."""
+    
+    def test_split_statements_keeps_comments_with_semicolons(self):
+        """Тест що ';' всередині COMMENT не розриває інструкцію."""
+        sql = (
+            "-- коментар; не інструкція\n"
+            "CREATE TABLE `t` (\n  `a` char(36) COMMENT 'Nullable; ієрархія'\n);\n\n"
+            "CREATE INDEX `t_a_idx` ON `t` (`a`);\n"
+        )
+        
+        statements = split_statements(sql)
+        
+        assert len(statements) == 2
+        assert "'Nullable; ієрархія'" in statements[0]
+        assert statements[1] == "CREATE INDEX `t_a_idx` ON `t` (`a`)"
+    
+    def test_schema_includes_advisor_migrations(self):
+        """Тест що схема бази-замінника містить DDL репозиторію та індекси міграцій."""
+        statements = schema_statements('orders_db')
+        
+        assert statements[0].startswith('CREATE TABLE `customers`')
+        assert any('orders_status_updated_at_idx' in statement for statement in statements)
+        assert all(';' not in statement.splitlines()[-1] for statement in statements)
+    
+    def test_table_rows_use_driver_types(self, source):
+        """Тест що рядки таблиці мають колонки OLTP та Python типи."""
+        rows = table_rows(source.employees(), EMPLOYEE_COLUMNS)
+        
+        assert len(rows) == source.n_employees
+        assert set(rows[0]) == set(EMPLOYEE_COLUMNS.values())
+        assert type(rows[0]['is_manager']) is bool
+        assert type(rows[0]['created_at']) is datetime
+        assert rows[0]['phone'] is None
+    
+    def test_check_disposable(self):
+        """Тест що перезаписувати можна лише бази з 'bench' у назві."""
+        check_disposable(PostgreSQLConfig('localhost', 5432, 'u', 'p', 'dwh_bench'))
+        
+        with pytest.raises(ValueError, match='dwh_db'):
+            check_disposable(PostgreSQLConfig('localhost', 5432, 'u', 'p', 'dwh_db'))
+
+
+class TestBenchmarkConfig:
+    """Тести конфігурації запуску бенчмарку."""
+    
+    @pytest.fixture(autouse=True)
+    def env(self, monkeypatch):
+        """Фікстура з базами .env за замовчуванням."""
+        for name in ('DWH_DB_NAME', 'ORDERS_DB_NAME', 'CATALOG_DB_NAME'):
+            monkeypatch.delenv(name, raising=False)
+    
+    def test_refuses_non_disposable_dwh(self):
+        """Тест що DWH з .env без 'bench' у назві не перезаписується."""
+        with pytest.raises(ValueError, match='dwh_db'):
+            benchmark_config({'source': 'synthetic'})
+    
+    def test_urls_replace_databases(self):
+        """Тест що URL баз замінюють .env, а для mysql перевіряються й джерела."""
+        case = {'source': 'synthetic', 'dwh_url': 'postgresql+psycopg2://bench:secret@db:5433/dwh_bench'}
+        
+        config = benchmark_config(case)
+        
+        assert (config.dwh_db.host, config.dwh_db.port, config.dwh_db.database) == ('db', 5433, 'dwh_bench')
+        assert config.dwh_db.password == 'secret'
+        with pytest.raises(ValueError, match='orders_db'):
+            benchmark_config({**case, 'source': 'mysql'})
+        config = benchmark_config({
+            **case,
+            'source': 'mysql',
+            'orders_url': 'mysql+pymysql://u:p@localhost:3308/orders_bench',
+            'catalog_url': 'mysql+pymysql://u:p@localhost:3307/catalog_bench',
+        })
+        assert config.orders_db.database == 'orders_bench'
+
+
+class TestCompare:
+    """Тести порівняння запусків."""
+    
+    def test_flags_throughput_and_stage_regressions(self):
+        """Тест регресій пропускної здатності та часу кроку."""
+        baseline = record(1000.0, **{'fact_sales.load': 10.0, 'dim_date.load': 0.1})
+        current = record(800.0, **{'fact_sales.load': 12.0, 'dim_date.load': 0.3})
+        
+        regressions = compare(current, baseline, threshold=0.1)
+        
+        assert len(regressions) == 2
+        assert regressions[0].startswith('rows/sec')
+        assert regressions[1].startswith('fact_sales.load')
+    
+    def test_within_threshold(self):
+        """Тест що зміни в межах порогу не є регресією."""
+        baseline = record(1000.0, **{'fact_sales.load': 10.0})
+        
+        assert compare(record(950.0, **{'fact_sales.load': 10.5}), baseline, threshold=0.1) == []
+    
+    def test_find_baseline_uses_latest_matching_run(self):
+        """Тест що базою є останній запуск з тими ж параметрами."""
+        older, newer = record(1.0), record(2.0)
+        other = {**record(3.0), 'streaming': True}
+        
+        assert find_baseline(record(), [older, newer, other]) is newer
+        assert find_baseline({**record(), 'scale': 1}, [older]) is None
+    
+    def test_find_baseline_separates_sources(self):
+        """Тест що запуски з MySQL джерелами не порівнюються з синтетичними."""
+        synthetic = record(1.0)
+        mysql = {**record(2.0), 'source': 'mysql'}
+        
+        assert find_baseline({**record(), 'source': 'synthetic'}, [synthetic, mysql]) is synthetic
+        assert find_baseline({**record(), 'source': 'mysql'}, [synthetic]) is None
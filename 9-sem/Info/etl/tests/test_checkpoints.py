@@ -0,0 +1,149 @@
+"""
+Тести для Checkpoints модуля.
+
+Перевіряє збереження контрольних точок стадій і чанків та продовження запусків.
+"""
+
+import pytest
+import pandas as pd
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from etl.checkpoints import CheckpointStore, ChunkProgress, CHECKPOINT_TABLE, RUN_MARKER
+
+
+@pytest.fixture
+def mock_loader():
+    """Фікстура з лоадером, engine якого замокано."""
+    return MagicMock()
+
+
+class TestChunkProgress:
+    """Тести для ChunkProgress."""
+    
+    def test_resume_date(self):
+        """Тест що продовження починається з дня останнього чанку."""
+        progress = ChunkProgress(chunks=3, rows=300, first_date_key=20240101, last_date_key=20240215)
+        
+        assert progress.resume_date == datetime(2024, 2, 15)
+    
+    def test_days_cover_month_boundary(self):
+        """Тест що дні прогресу охоплюють межу місяця."""
+        progress = ChunkProgress(chunks=1, rows=10, first_date_key=20240130, last_date_key=20240202)
+        
+        assert progress.days() == [20240130, 20240131, 20240201, 20240202]
+    
+    def test_rows_before_resume_exclude_resume_day(self):
+        """Тест що рядки дня продовження не входять у вже враховані."""
+        progress = ChunkProgress(2, 1000, 20240101, 20240103, resume_day_rows=120)
+        
+        assert progress.rows_before_resume == 880
+
+
+class TestCheckpointStore:
+    """Тести для CheckpointStore."""
+    
+    def test_start_run_resets_previous_checkpoints(self, mock_loader):
+        """Тест що новий запуск видаляє контрольні точки попереднього."""
+        conn = mock_loader.engine.begin.return_value.__enter__.return_value
+        
+        store = CheckpointStore(mock_loader)
+        started_at = store.start_run('full')
+        
+        statements = [str(c.args[0]) for c in conn.execute.call_args_list]
+        assert any(s.startswith(f'DELETE FROM "{CHECKPOINT_TABLE}"') for s in statements)
+        sql, params = conn.execute.call_args.args
+        assert 'INSERT INTO' in str(sql)
+        assert params == {"run_type": "full", "stage": RUN_MARKER, "watermark": started_at}
+    
+    def test_start_run_resume_returns_first_attempt_start(self, mock_loader):
+        """Тест що продовження повертає час початку першої спроби."""
+        first_attempt = datetime(2024, 3, 1, 2, 0)
+        conn = mock_loader.engine.begin.return_value.__enter__.return_value
+        conn.execute.return_value.scalar.return_value = first_attempt
+        
+        store = CheckpointStore(mock_loader)
+        
+        assert store.start_run('full', resume=True) == first_attempt
+        statements = [str(c.args[0]) for c in conn.execute.call_args_list]
+        assert not any(s.startswith('DELETE') for s in statements)
+    
+    def test_start_run_resume_without_checkpoints(self, mock_loader):
+        """Тест що продовження без незавершеного запуску починає спочатку."""
+        conn = mock_loader.engine.begin.return_value.__enter__.return_value
+        conn.execute.return_value.scalar.return_value = None
+        
+        store = CheckpointStore(mock_loader)
+        started_at = store.start_run('incremental', resume=True)
+        
+        assert isinstance(started_at, datetime)
+        assert conn.execute.call_args.args[1]["stage"] == RUN_MARKER
+    
+    def test_completed_stages(self, mock_loader):
+        """Тест читання завершених стадій."""
+        conn = mock_loader.engine.connect.return_value.__enter__.return_value
+        conn.execute.return_value.fetchall.return_value = [('dim_date', 730), ('dim_region', 5)]
+        
+        store = CheckpointStore(mock_loader)
+        
+        assert store.completed_stages('full') == {'dim_date': 730, 'dim_region': 5}
+        assert conn.execute.call_args.args[1] == {"run_type": "full", "marker": RUN_MARKER}
+    
+    def test_complete_chunk_upserts(self, mock_loader):
+        """Тест що контрольна точка чанку перезаписується при повторі."""
+        conn = mock_loader.engine.begin.return_value.__enter__.return_value
+        
+        store = CheckpointStore(mock_loader)
+        store.complete_chunk(
+            'incremental', 'fact_sales', 2, 500, 20240101, 20240103,
+            watermark=pd.Timestamp('2024-01-03 12:00:00')
+        )
+        
+        sql, params = conn.execute.call_args.args
+        assert 'ON CONFLICT ("run_type", "stage", "chunk")' in str(sql)
+        assert params["chunk"] == 2
+        assert params["last_date_key"] == 20240103
+        assert params["watermark"] == datetime(2024, 1, 3, 12, 0)
+    
+    def test_complete_stage_ignores_empty_watermark(self, mock_loader):
+        """Тест що порожній watermark зберігається як NULL."""
+        conn = mock_loader.engine.begin.return_value.__enter__.return_value
+        
+        store = CheckpointStore(mock_loader)
+        store.complete_stage('full', 'dim_region', 5, pd.NaT)
+        
+        params = conn.execute.call_args.args[1]
+        assert params["chunk"] == 0
+        assert params["watermark"] is None
+    
+    def test_chunk_progress(self, mock_loader):
+        """Тест читання прогресу потокової стадії."""
+        watermark = datetime(2024, 1, 3, 12, 0)
+        conn = mock_loader.engine.connect.return_value.__enter__.return_value
+        conn.execute.return_value.one.return_value = (2, 1000, 20240101, 20240103, watermark, 120)
+        
+        store = CheckpointStore(mock_loader)
+        
+        assert store.chunk_progress('incremental', 'fact_sales') == ChunkProgress(
+            2, 1000, 20240101, 20240103, watermark, 120
+        )
+    
+    def test_chunk_progress_without_chunks(self, mock_loader):
+        """Тест що без записаних чанків прогресу немає."""
+        conn = mock_loader.engine.connect.return_value.__enter__.return_value
+        conn.execute.return_value.one.return_value = (0, 0, None, None, None, 0)
+        
+        store = CheckpointStore(mock_loader)
+        
+        assert store.chunk_progress('full', 'fact_sales') is None
+    
+    def test_table_created_once(self, mock_loader):
+        """Тест що контрольна таблиця створюється один раз."""
+        conn = mock_loader.engine.begin.return_value.__enter__.return_value
+        
+        store = CheckpointStore(mock_loader)
+        store.complete_stage('full', 'dim_date', 730)
+        store.finish_run('full')
+        
+        create_calls = [c for c in conn.execute.call_args_list if 'CREATE TABLE' in str(c.args[0])]
+        assert len(create_calls) == 1
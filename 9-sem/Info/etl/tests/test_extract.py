@@ -8,9 +8,13 @@ import pytest
 import pandas as pd
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
+from sqlalchemy import create_engine, text
 
 from etl.config import MySQLConfig
 from etl.extract import Extractor, OrdersExtractor, CatalogExtractor, PaymentsExtractor
+from etl.index_advisor import load_schema
+from etl.pushdown import PushdownSchema
+from etl.staging import StagingCache
 
 
 @pytest.fixture
@@ -44,6 +48,39 @@ def sample_orders_df():
     })
 
 
+@pytest.fixture
+def orders_db(tmp_path):
+    """Фікстура з файловою SQLite базою замовлень (спільна для потоків шардів)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'orders.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE orders (id TEXT, customer_id TEXT, employee_id TEXT, region_id TEXT, "
+            "order_date TEXT, status TEXT, total_amount REAL, created_at TEXT, updated_at TEXT)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE order_items (id TEXT, order_id TEXT, product_id TEXT, "
+            "quantity INTEGER, unit_price REAL, discount REAL)"
+        ))
+        orders = [
+            {'id': f'order{i:02d}', 'order_date': f'2024-01-{1 + i % 9:02d} {i % 24:02d}:00:00',
+             'status': 'cancelled' if i % 7 == 0 else 'paid'}
+            for i in range(40)
+        ]
+        orders.append({'id': 'order99', 'order_date': None, 'status': 'paid'})
+        conn.execute(
+            text(
+                "INSERT INTO orders VALUES (:id, 'cust', 'emp', 'reg', :order_date, :status, "
+                "10, '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+            ),
+            orders
+        )
+        conn.execute(
+            text("INSERT INTO order_items VALUES (:id, :order_id, 'prod', 1, 10, 0)"),
+            [{'id': f"{order['id']}-{item}", 'order_id': order['id']} for order in orders for item in range(2)]
+        )
+    return engine
+
+
 class TestExtractor:
     """Тести для базового класу Extractor."""
     
@@ -91,6 +128,152 @@ class TestExtractor:
         assert len(result) == 2
         mock_read_sql.assert_called_once()
     
+    @patch('etl.extract.create_engine')
+    @patch('etl.extract.pd.read_sql')
+    def test_extract_query_binds_params(
+        self,
+        mock_read_sql,
+        mock_create_engine,
+        mysql_config,
+        sample_orders_df
+    ):
+        """Тест передачі bound параметрів у read_sql."""
+        mock_read_sql.return_value = sample_orders_df
+        params = {'since': datetime(2024, 1, 1)}
+        
+        extractor = Extractor(mysql_config)
+        extractor.extract_query("SELECT * FROM test WHERE updated_at >= :since", params=params)
+        
+        assert mock_read_sql.call_args.kwargs['params'] == params
+    
+    def test_extract_query_streams_chunks(self, mysql_config):
+        """Тест потокового читання чанками через server-side курсор."""
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER, price NUMERIC)"))
+            conn.execute(
+                text("INSERT INTO items VALUES (:id, :price)"),
+                [{'id': i, 'price': i * 1.5} for i in range(5)]
+            )
+        
+        extractor = Extractor(mysql_config)
+        extractor._engine = engine
+        
+        chunks = extractor.extract_query(
+            "SELECT id, price FROM items WHERE id >= :min_id ORDER BY id",
+            chunksize=2,
+            params={'min_id': 0}
+        )
+        
+        # Запит виконується лише під час ітерації
+        assert not isinstance(chunks, pd.DataFrame)
+        result = list(chunks)
+        
+        assert [len(chunk) for chunk in result] == [2, 2, 1]
+        assert list(result[0].columns) == ['id', 'price']
+        assert pd.concat(result)['id'].tolist() == [0, 1, 2, 3, 4]
+        assert extractor.query_stats[-1]['rows'] == 5
+        assert extractor.query_stats[-1]['rows_per_sec'] > 0
+    
+    def test_extract_query_streams_arrow_chunks(self, mysql_config):
+        """Тест Arrow-backed чанків."""
+        pytest.importorskip('pyarrow')
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER, name TEXT)"))
+            conn.execute(text("INSERT INTO items VALUES (1, 'a'), (2, 'b')"))
+        
+        extractor = Extractor(mysql_config, dtype_backend='pyarrow')
+        extractor._engine = engine
+        
+        chunk = next(iter(extractor.extract_query("SELECT id, name FROM items", chunksize=10)))
+        
+        assert str(chunk['id'].dtype) == 'int64[pyarrow]'
+    
+    def test_extract_query_served_from_staging(self, mysql_config, tmp_path):
+        """Тест що незмінене джерело читається зі staging кешу."""
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER, name TEXT)"))
+            conn.execute(text("INSERT INTO items VALUES (1, 'a'), (2, 'b')"))
+        
+        extractor = Extractor(mysql_config, staging=StagingCache(tmp_path, 10 ** 6))
+        extractor._engine = engine
+        query = "SELECT id, name FROM items ORDER BY id"
+        
+        with patch.object(extractor, 'source_checksum', return_value={'items': 1}):
+            first = extractor.extract_query(query, tables=('items',))
+            with patch('etl.extract.pd.read_sql') as mock_read_sql:
+                second = extractor.extract_query(query, tables=('items',))
+        
+        mock_read_sql.assert_not_called()
+        pd.testing.assert_frame_equal(first, second)
+        assert len(extractor.query_stats) == 1
+    
+    def test_extract_query_rereads_changed_source(self, mysql_config, tmp_path):
+        """Тест що зміна контрольної суми джерела повторно читає OLTP."""
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER)"))
+            conn.execute(text("INSERT INTO items VALUES (1)"))
+        
+        extractor = Extractor(mysql_config, staging=StagingCache(tmp_path, 10 ** 6))
+        extractor._engine = engine
+        
+        with patch.object(extractor, 'source_checksum', return_value={'items': 1}):
+            extractor.extract_query("SELECT id FROM items", tables=('items',))
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO items VALUES (2)"))
+        with patch.object(extractor, 'source_checksum', return_value={'items': 2}):
+            df = extractor.extract_query("SELECT id FROM items", tables=('items',))
+        
+        assert df['id'].tolist() == [1, 2]
+        assert len(extractor.query_stats) == 2
+    
+    def test_source_checksum_uses_change_markers(self, mysql_config):
+        """Тест що маркер змін не читає таблицю через CHECKSUM TABLE."""
+        changed = datetime(2024, 1, 5, 10, 0)
+        update_time = datetime(2024, 1, 6, 8, 30)
+        extractor = Extractor(mysql_config)
+        extractor._engine = MagicMock()
+        conn = extractor._engine.connect.return_value.__enter__.return_value
+        conn.execute.side_effect = [
+            Mock(),
+            Mock(fetchall=Mock(return_value=[('customers', None, 1), ('regions', update_time, 0)])),
+            Mock(one=Mock(return_value=(10, changed))),
+            Mock(scalar=Mock(return_value=3)),
+        ]
+        
+        markers = extractor.source_checksum(('customers', 'regions'))
+        
+        assert markers == {'customers': [10, changed], 'regions': [3, update_time]}
+        queries = [str(c.args[0]) for c in conn.execute.call_args_list]
+        assert queries[2] == "SELECT COUNT(*), MAX(`updated_at`) FROM `customers`"
+        assert queries[3] == "SELECT COUNT(*) FROM `regions`"
+        assert not any('CHECKSUM' in query for query in queries)
+    
+    @pytest.mark.parametrize('database', ['orders_db', 'catalog_db'])
+    def test_change_markers_have_updated_at_index(self, database):
+        """Тест що MAX(updated_at) маркера змін має індекс, який починається з updated_at."""
+        for table, schema in load_schema(database).items():
+            if 'updated_at' in schema.columns:
+                assert any(index.columns[0] == 'updated_at' for index in schema.indexes), table
+    
+    def test_extract_query_offline_staging(self, mysql_config, tmp_path):
+        """Тест offline режиму: дані лише з кешу, без контрольної суми."""
+        online = StagingCache(tmp_path, 10 ** 6)
+        online.put(online.query_key('items', "SELECT id FROM items"), {'items': 1}, pd.DataFrame({'id': [1]}))
+        
+        extractor = Extractor(mysql_config, staging=StagingCache(tmp_path, 10 ** 6, offline=True))
+        with patch.object(extractor, 'source_checksum') as mock_checksum:
+            df = extractor.extract_query("SELECT id FROM items", tables=('items',))
+            
+            with pytest.raises(FileNotFoundError):
+                extractor.extract_query("SELECT name FROM items", tables=('items',))
+        
+        mock_checksum.assert_not_called()
+        assert df['id'].tolist() == [1]
+    
     @patch('etl.extract.create_engine')
     def test_close_disposes_engine(self, mock_create_engine, mysql_config):
         """Тест закриття з'єднання."""
@@ -142,6 +325,41 @@ class TestOrdersExtractor:
         
         assert isinstance(result, pd.DataFrame)
         mock_extract_query.assert_called_once()
+        query, chunksize, params = mock_extract_query.call_args.args
+        assert "o.order_date >= :start_date" in query
+        assert "o.order_date <= :end_date" in query
+        assert params == {'start_date': start_date, 'end_date': end_date}
+    
+    @patch('etl.extract.Extractor.extract_query')
+    def test_extract_orders_since_watermark(
+        self,
+        mock_extract_query,
+        mysql_config,
+        sample_orders_df
+    ):
+        """Тест витягування замовлень, змінених після watermark."""
+        mock_extract_query.return_value = sample_orders_df
+        since = datetime(2024, 1, 15, 8, 30)
+        
+        extractor = OrdersExtractor(mysql_config)
+        extractor.extract_orders(since=since)
+        
+        query, chunksize, params = mock_extract_query.call_args.args
+        assert "o.updated_at >= :since" in query
+        assert query.rstrip().endswith("ORDER BY o.order_date, o.id")
+        assert params == {'since': since}
+    
+    @patch('etl.extract.Extractor.extract_query')
+    def test_extract_customers_since_watermark(self, mock_extract_query, mysql_config):
+        """Тест інкрементального витягування клієнтів."""
+        since = datetime(2024, 1, 15)
+        
+        extractor = OrdersExtractor(mysql_config)
+        extractor.extract_customers(since=since)
+        
+        query = mock_extract_query.call_args.args[0]
+        assert "WHERE updated_at >= :since" in query
+        assert mock_extract_query.call_args.kwargs['params'] == {'since': since}
     
     @patch('etl.extract.Extractor.extract_query')
     def test_extract_customers(self, mock_extract_query, mysql_config):
@@ -196,6 +414,90 @@ class TestOrdersExtractor:
         assert len(result) == 2
         assert 'region_name' in result.columns
 
+    
+    @patch('etl.extract.Extractor.extract_query')
+    def test_extract_orders_pushdown(
+        self,
+        mock_extract_query,
+        mysql_config,
+        sample_orders_df
+    ):
+        """Тест що pushdown витягує похідні поля fact_sales замість сирих колонок."""
+        mock_extract_query.return_value = sample_orders_df
+        start_date = datetime(2024, 1, 1)
+        
+        extractor = OrdersExtractor(mysql_config, pushdown=PushdownSchema())
+        extractor.extract_orders(start_date=start_date, chunksize=500)
+        
+        query, chunksize, params = mock_extract_query.call_args.args
+        assert "oi.unit_price * oi.quantity AS revenue" in query
+        assert "AS date_key" in query
+        assert "o.updated_at AS updated_at" in query
+        assert "o.total_amount" not in query
+        assert "o.order_date >= :start_date" in query
+        assert query.rstrip().endswith("ORDER BY o.order_date, o.id")
+        assert chunksize == 500
+        assert params == {'start_date': start_date}
+    
+    @patch('etl.extract.Extractor.extract_query')
+    def test_extract_customers_pushdown(self, mock_extract_query, mysql_config):
+        """Тест видалення дублікатів email клієнтів у SQL."""
+        since = datetime(2024, 1, 15)
+        
+        extractor = OrdersExtractor(mysql_config, pushdown=PushdownSchema())
+        extractor.extract_customers(since=since)
+        
+        query = mock_extract_query.call_args.args[0]
+        assert "PARTITION BY LOWER(TRIM(email)) ORDER BY created_at" in query
+        assert "WHERE updated_at >= :since" in query
+        assert "WHERE c.email_rank = 1" in query
+        assert "LOWER(TRIM(c.email)) AS email" in query
+        assert "phone" not in query
+        assert mock_extract_query.call_args.kwargs['params'] == {'since': since}
+
+
+    def test_extract_orders_sharded(self, mysql_config, orders_db):
+        """Тест що шарди разом дають той самий впорядкований результат, що й один запит."""
+        single = OrdersExtractor(mysql_config)
+        single._engine = orders_db
+        sharded = OrdersExtractor(mysql_config, shards=3)
+        sharded._engine = orders_db
+        
+        expected = single.extract_orders()
+        streamed = pd.concat(sharded.extract_orders(chunksize=7), ignore_index=True)
+        
+        assert len(expected) == 2 * 35
+        pd.testing.assert_frame_equal(streamed, expected)
+        pd.testing.assert_frame_equal(sharded.extract_orders(), expected)
+        # Гістограма та три шарди в кожному з двох витягувань
+        assert len(sharded.query_stats) == 8
+    
+    def test_extract_orders_sharded_unordered(self, mysql_config, orders_db):
+        """Тест шардів без ORDER BY з фільтром по даті."""
+        start_date = datetime(2024, 1, 3)
+        extractor = OrdersExtractor(mysql_config, shards=4)
+        extractor._engine = orders_db
+        
+        with patch.object(extractor, '_stream_query', wraps=extractor._stream_query) as mock_stream:
+            result = pd.concat(
+                extractor.extract_orders(start_date, chunksize=5, ordered=False), ignore_index=True
+            )
+        
+        queries = [c.args[0] for c in mock_stream.call_args_list]
+        assert len(queries) == 4
+        assert all('ORDER BY' not in query for query in queries)
+        assert result['order_item_id'].is_unique
+        assert (pd.to_datetime(result['order_date']) >= start_date).all()
+        assert len(result) == 2 * len({f'order{i:02d}' for i in range(40) if i % 7 and 1 + i % 9 >= 3})
+    
+    @patch('etl.extract.Extractor.extract_query')
+    def test_extract_orders_unordered(self, mock_extract_query, mysql_config):
+        """Тест що без потреби в порядку запит іде без ORDER BY."""
+        extractor = OrdersExtractor(mysql_config)
+        extractor.extract_orders(ordered=False)
+        
+        assert 'ORDER BY' not in mock_extract_query.call_args.args[0]
+
 
 class TestCatalogExtractor:
     """Тести для CatalogExtractor."""
@@ -235,6 +537,18 @@ class TestCatalogExtractor:
         assert isinstance(result, pd.DataFrame)
         assert len(result) == 3
         assert 'parent_category_id' in result.columns
+    
+    @patch('etl.extract.Extractor.extract_query')
+    def test_extract_products_pushdown(self, mock_extract_query, mysql_config):
+        """Тест що pushdown вибирає лише колонки dim_product без JOIN категорій."""
+        extractor = CatalogExtractor(mysql_config, pushdown=PushdownSchema())
+        extractor.extract_products()
+        
+        query = mock_extract_query.call_args.args[0]
+        assert "p.name AS name" in query
+        assert "p.category_id AS category_id" in query
+        assert "description" not in query
+        assert "JOIN" not in query
 
 
 class TestPaymentsExtractor:
@@ -283,3 +597,8 @@ class TestPaymentsExtractor:
         
         assert isinstance(result, pd.DataFrame)
         assert len(result) == 1
+        # Параметри передаються у запит, а не лише додаються до тексту
+        assert mock_extract_query.call_args.kwargs['params'] == {
+            'start_date': start_date,
+            'end_date': end_date
+        }
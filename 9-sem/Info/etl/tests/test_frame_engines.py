@@ -0,0 +1,159 @@
+"""
+Тести для модуля frame_engines.
+
+Перевіряє, що колонкові рушії дають ті самі результати, що й pandas.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.frame_engines import ColumnarEngine, get_frame_engine, period_labels
+from etl.transform import DataTransformer
+
+
+class PandasBackedEngine(ColumnarEngine):
+    """Колонковий рушій, чиї обчислення виконує pandas (перевіряє спільну логіку)."""
+    
+    name = 'pandas-backed'
+    
+    def _first_occurrences(self, df, subset):
+        return (~df.duplicated(subset=subset)).to_numpy()
+    
+    def _missing_rows(self, df):
+        return df.isnull().any(axis=1).to_numpy()
+    
+    def _aggregate(self, df, by, aggregations):
+        # Як колонкові рушії: ключ повертається як object, агрегати - float
+        result = df.groupby(by).agg(aggregations).reset_index()
+        return result.astype({by: object, **{column: float for column in aggregations}})
+
+
+@pytest.fixture
+def orders_df():
+    """Фікстура з замовленнями: дублікати, пропуски та порожні тижні."""
+    rng = np.random.default_rng(7)
+    rows = 300
+    df = pd.DataFrame({
+        'order_id': [f'order{i}' for i in rng.integers(0, 60, rows)],
+        'order_item_id': [f'item{i}' for i in rng.integers(0, 250, rows)],
+        'order_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 120, rows), unit='D'),
+        'created_at': pd.Timestamp('2024-01-01'),
+        'quantity': rng.integers(1, 6, rows),
+        'unit_price': np.round(rng.uniform(5, 500, rows), 2),
+        'discount': np.where(rng.random(rows) < 0.2, np.nan, np.round(rng.uniform(0, 5, rows), 2)),
+        'total_amount': 100.0,
+        'customer_id': [f'cust{i}' for i in rng.integers(0, 20, rows)],
+        'employee_id': [f'emp{i}' for i in rng.integers(0, 8, rows)],
+        'region_id': 'reg1',
+        'product_id': [f'prod{i}' for i in rng.integers(0, 30, rows)],
+    })
+    # Замовлення лише в січні та квітні: між ними тижні без продажів
+    return df[(df['order_date'] < '2024-02-01') | (df['order_date'] >= '2024-04-01')].reset_index(drop=True)
+
+
+def assert_same_results(actual, orders_df):
+    """Порівнює очищення, трансформацію та агрегації трансформера з pandas."""
+    expected = DataTransformer()
+    
+    pd.testing.assert_frame_equal(
+        actual.cleaner.remove_duplicates(orders_df, subset=['order_item_id']),
+        expected.cleaner.remove_duplicates(orders_df, subset=['order_item_id'])
+    )
+    pd.testing.assert_frame_equal(
+        actual.cleaner.handle_missing_values(orders_df, strategy='drop'),
+        expected.cleaner.handle_missing_values(orders_df, strategy='drop')
+    )
+    
+    transformed = expected.transform_orders(orders_df)
+    pd.testing.assert_frame_equal(actual.transform_orders(orders_df), transformed, check_exact=True)
+    
+    for period in ('D', 'W', 'M'):
+        pd.testing.assert_frame_equal(
+            actual.aggregate_sales_by_period(transformed.copy(), period),
+            expected.aggregate_sales_by_period(transformed.copy(), period)
+        )
+    pd.testing.assert_frame_equal(
+        actual.aggregate_sales_by_product(transformed),
+        expected.aggregate_sales_by_product(transformed)
+    )
+    pd.testing.assert_frame_equal(
+        actual.aggregate_sales_by_employee(transformed),
+        expected.aggregate_sales_by_employee(transformed)
+    )
+
+
+class TestFrameEngines:
+    """Тести для рушіїв трансформації."""
+    
+    def test_unknown_engine(self):
+        """Тест помилки для невідомого рушія."""
+        with pytest.raises(ValueError, match="Невідомий рушій"):
+            get_frame_engine('spark')
+    
+    def test_period_labels_match_grouper(self, orders_df):
+        """Тест що мітки періодів збігаються з мітками pd.Grouper."""
+        for period in ('D', 'W', 'M'):
+            grouped = orders_df.groupby(pd.Grouper(key='order_date', freq=period)).size()
+            labels = period_labels(orders_df['order_date'], period)
+            
+            assert set(labels.unique()) <= set(grouped.index)
+            assert set(grouped[grouped > 0].index) == set(labels.unique())
+    
+    def test_columnar_engine_matches_pandas(self, orders_df):
+        """Тест що спільна логіка колонкових рушіїв відновлює результат pandas."""
+        transformer = DataTransformer()
+        transformer.frame_engine = PandasBackedEngine()
+        transformer.cleaner.engine = transformer.frame_engine
+        
+        assert_same_results(transformer, orders_df)
+    
+    @pytest.mark.parametrize('engine_name', ['polars', 'duckdb'])
+    def test_engine_matches_pandas(self, engine_name, orders_df):
+        """Тест що Polars та DuckDB дають ті самі результати, що й pandas."""
+        pytest.importorskip(engine_name)
+        
+        assert_same_results(DataTransformer(frame_engine=engine_name), orders_df)
+    
+    def test_columnar_engine_requires_hooks(self):
+        """Тест що колонковий рушій без обчислювальних хуків не створюється."""
+        class Incomplete(ColumnarEngine):
+            def _first_occurrences(self, df, subset):
+                return np.ones(len(df), dtype=bool)
+        
+        with pytest.raises(TypeError, match='_aggregate'):
+            Incomplete()
+    
+    @pytest.mark.parametrize('engine_name', ['polars', 'duckdb'])
+    def test_engine_shared_between_threads(self, engine_name):
+        """Тест що стадії в різних потоках можуть ділити один рушій."""
+        pytest.importorskip(engine_name)
+        engine = get_frame_engine(engine_name)
+        frames = [
+            pd.DataFrame({'id': np.arange(2000) % (50 + worker), 'worker': worker})
+            for worker in range(8)
+        ]
+        
+        def dedupe(df):
+            return [engine.drop_duplicates(df, subset=['id']) for _ in range(20)]
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(dedupe, frames))
+        
+        for df, runs in zip(frames, results):
+            for result in runs:
+                pd.testing.assert_frame_equal(result, df.drop_duplicates(subset=['id']))
+    
+    @pytest.mark.parametrize('engine_name', ['polars', 'duckdb'])
+    def test_engine_counts_missing(self, engine_name):
+        """Тест підрахунку пропущених значень (None, NaN, NaT)."""
+        pytest.importorskip(engine_name)
+        df = pd.DataFrame({
+            'name': ['A', None, 'C'],
+            'value': [1.0, np.nan, np.nan],
+            'date': pd.to_datetime(['2024-01-01', None, '2024-01-03']),
+        })
+        
+        assert get_frame_engine(engine_name).count_missing(df) == 4
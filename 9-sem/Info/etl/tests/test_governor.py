@@ -0,0 +1,142 @@
+"""
+Тести для модуля governor.
+
+Перевіряє підбір розміру чанків за бюджетом пам'яті та скидання на диск.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from etl.config import MySQLConfig, PostgreSQLConfig
+from etl.extract import Extractor
+from etl.governor import MemoryGovernor, SpilledFrame
+from etl.load import Loader
+from etl.sharding import merge_shards
+
+MB = 1024 ** 2
+
+
+@pytest.fixture
+def narrow_df():
+    """Фікстура з вузькими рядками (як позиції замовлень)."""
+    return pd.DataFrame({'id': range(2000), 'quantity': 1, 'price': 9.99})
+
+
+@pytest.fixture
+def wide_df():
+    """Фікстура з широкими рядками (як товари з описом)."""
+    return pd.DataFrame({'id': range(2000), 'description': ['опис товару ' * 100] * 2000})
+
+
+def rss(value):
+    """Підміняє поточний RSS процесу."""
+    return patch('etl.governor.current_rss_bytes', return_value=value)
+
+
+class TestMemoryGovernor:
+    """Тести для MemoryGovernor."""
+    
+    def test_wide_rows_get_smaller_chunks(self, narrow_df, wide_df):
+        """Тест що широкі рядки отримують менший чанк за той самий бюджет."""
+        governor = MemoryGovernor(1024 * MB, batch_size=1000, max_rows=10 ** 9)
+        
+        with rss(512 * MB):
+            for _ in range(20):
+                narrow = governor.observe('orders_db', narrow_df)
+                wide = governor.observe('catalog_db', wide_df)
+        
+        assert narrow > 100_000
+        assert wide < narrow / 10
+        assert governor.chunk_size('orders_db') == narrow
+    
+    def test_growth_is_gradual_and_bounded(self, narrow_df):
+        """Тест що чанк росте не більш ніж удвічі за крок і не понад max_rows."""
+        governor = MemoryGovernor(1024 * MB, batch_size=1000)
+        
+        with rss(100 * MB):
+            sizes = [governor.observe('orders_db', narrow_df) for _ in range(10)]
+        
+        assert sizes[:3] == [2000, 4000, 8000]
+        assert max(sizes) == governor.max_rows == 64_000
+    
+    def test_shrinks_over_budget(self, narrow_df):
+        """Тест зменшення чанку вдвічі понад бюджетом, не нижче min_rows."""
+        governor = MemoryGovernor(100 * MB, batch_size=1000)
+        
+        with rss(200 * MB):
+            sizes = [governor.observe('orders_db', narrow_df) for _ in range(5)]
+        
+        assert sizes == [500, 250, 125, 100, 100]
+    
+    def test_hold_spills_over_budget(self, wide_df, tmp_path):
+        """Тест скидання чанку на диск понад бюджетом та його відновлення."""
+        governor = MemoryGovernor(100 * MB, batch_size=1000, spill_dir=str(tmp_path))
+        
+        with rss(50 * MB):
+            assert governor.hold(wide_df) is wide_df
+        with rss(200 * MB):
+            spilled = governor.hold(wide_df)
+        
+        assert isinstance(spilled, SpilledFrame)
+        assert spilled.path.exists()
+        pd.testing.assert_frame_equal(governor.restore(spilled), wide_df)
+        assert not spilled.path.exists()
+        
+        governor.close()
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_merge_shards_spills_prefetched_chunks(self, tmp_path):
+        """Тест що чанки в чергах шардів понад бюджетом чекають на диску."""
+        governor = MemoryGovernor(100 * MB, batch_size=1000, spill_dir=str(tmp_path))
+        readers = [
+            lambda shard=shard: (pd.DataFrame({'shard': [shard] * 10, 'chunk': chunk}) for chunk in range(3))
+            for shard in range(3)
+        ]
+        
+        with rss(200 * MB), patch.object(governor, 'spill', wraps=governor.spill) as mock_spill:
+            merged = pd.concat(merge_shards(readers, 2, governor=governor), ignore_index=True)
+        
+        assert mock_spill.call_count == 9
+        assert list(tmp_path.rglob('*.parquet')) == []
+        assert merged['shard'].tolist() == [shard for shard in range(3) for _ in range(30)]
+        governor.close()
+
+
+class TestGovernedExtractAndLoad:
+    """Тести регулювання чанків екстрактора та лоадера."""
+    
+    def test_stream_query_follows_governor(self):
+        """Тест що потокове читання бере розмір кожного чанку з регулятора."""
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER)"))
+            conn.execute(text("INSERT INTO items VALUES (:id)"), [{'id': i} for i in range(1000)])
+        
+        governor = MemoryGovernor(100 * MB, batch_size=400, min_rows=50)
+        config = MySQLConfig(host='localhost', port=3306, user='u', password='p', database='test_db')
+        extractor = Extractor(config, governor=governor)
+        extractor._engine = engine
+        
+        with rss(200 * MB):
+            chunks = list(extractor.extract_query("SELECT id FROM items ORDER BY id", chunksize=400))
+        
+        assert [len(chunk) for chunk in chunks] == [400, 200, 100, 50, 50, 50, 50, 50, 50]
+        assert pd.concat(chunks)['id'].tolist() == list(range(1000))
+    
+    @patch('etl.load.create_engine')
+    def test_bulk_insert_in_governed_chunks(self, mock_create_engine, narrow_df):
+        """Тест що staging заповнюється чанками регулятора, а не одним INSERT."""
+        config = PostgreSQLConfig(host='localhost', port=5432, database='dwh', user='u', password='p')
+        governor = MemoryGovernor(100 * MB, batch_size=1000)
+        loader = Loader(config, governor=governor)
+        conn = MagicMock()
+        
+        with rss(200 * MB):
+            written = loader._bulk_insert(conn, narrow_df, 'stg_fact_sales')
+        
+        assert written == 2000
+        # Понад бюджетом чанк запису зменшується вдвічі від INSERT_CHUNKSIZE
+        assert [len(c.args[1]) for c in conn.execute.call_args_list] == [500, 500, 500, 500]
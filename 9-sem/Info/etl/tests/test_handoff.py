@@ -0,0 +1,103 @@
+"""
+Тести для модуля handoff.
+
+Перевіряє запис і читання файлів передачі між стадіями та їх маніфести.
+"""
+
+import json
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from etl.handoff import HandoffManifest, StageHandoff
+
+
+@pytest.fixture
+def orders_df():
+    """Фікстура з типами колонок, які дає витягування замовлень."""
+    return pd.DataFrame({
+        'order_item_id': ['item1', 'item2', 'item3'],
+        'quantity': [1, 2, 3],
+        'unit_price': [Decimal('9.99'), Decimal('100.00'), None],
+        'order_date': pd.to_datetime(['2024-01-01', '2024-01-02', None]),
+        'status': pd.Categorical(['new', 'paid', 'new']),
+    })
+
+
+class TestStageHandoff:
+    """Тести для StageHandoff."""
+    
+    @pytest.mark.parametrize('file_format', ['arrow', 'parquet'])
+    def test_round_trip(self, orders_df, tmp_path, file_format):
+        """Тест що чанки читаються в порядку запису з тими ж типами."""
+        handoff = StageHandoff(tmp_path, 'run1', file_format)
+        
+        manifest = handoff.write('fact_sales', 'extract', [orders_df.iloc[:2], orders_df.iloc[2:]])
+        
+        assert manifest.rows == 3
+        assert len(manifest.files) == 2
+        assert all(path.endswith(f'.{file_format}') for path in manifest.files)
+        pd.testing.assert_frame_equal(StageHandoff.read_frame(manifest), orders_df)
+    
+    def test_arrow_read_is_zero_copy(self, tmp_path):
+        """Тест що числові колонки Arrow файлу не копіюються (масиви лише для читання)."""
+        handoff = StageHandoff(tmp_path, 'run1')
+        manifest = handoff.write('fact_sales', 'transform', [pd.DataFrame({'quantity': range(1000)})])
+        
+        df = next(StageHandoff.read(manifest))
+        
+        assert not df['quantity'].to_numpy().flags.writeable
+        # Стадії замінюють колонки, а не змінюють їх на місці
+        df['quantity'] = df['quantity'] * 2
+        assert df['quantity'].iloc[-1] == 1998
+    
+    def test_empty_chunks_skipped(self, orders_df, tmp_path):
+        """Тест що порожній результат дає маніфест без файлів."""
+        handoff = StageHandoff(tmp_path, 'run1')
+        
+        manifest = handoff.write('dim_region', 'extract', [orders_df.iloc[:0]])
+        
+        assert manifest.files == ()
+        assert manifest.rows == 0
+        assert StageHandoff.read_frame(manifest).empty
+    
+    def test_retry_replaces_stage_files(self, orders_df, tmp_path):
+        """Тест що повторна спроба стадії видаляє файли попередньої."""
+        handoff = StageHandoff(tmp_path, 'run1')
+        handoff.write('fact_sales', 'extract', [orders_df.iloc[:1], orders_df.iloc[1:2], orders_df.iloc[2:]])
+        handoff.write('fact_sales', 'transform', [orders_df])
+        
+        manifest = handoff.write('fact_sales', 'extract', [orders_df])
+        
+        names = sorted(path.name for path in (handoff.directory / 'fact_sales').iterdir())
+        assert names == ['extract-00000.arrow', 'transform-00000.arrow']
+        assert manifest.rows == 3
+    
+    def test_manifest_survives_xcom(self, orders_df, tmp_path):
+        """Тест що маніфест серіалізується в JSON (XCom) і відновлюється."""
+        handoff = StageHandoff(tmp_path, 'scheduled__2024-01-01T02:00:00+00:00')
+        manifest = handoff.write('dim_customer', 'extract', [orders_df], watermark=orders_df['order_date'].max())
+        
+        restored = HandoffManifest.from_dict(json.loads(json.dumps(manifest.to_dict())))
+        
+        assert restored == manifest
+        assert restored.watermark == '2024-01-02T00:00:00'
+        assert handoff.directory.parent == tmp_path
+        assert ':' not in handoff.directory.name
+    
+    def test_cleanup_removes_run_files(self, orders_df, tmp_path):
+        """Тест видалення файлів запуску без зачеплення інших запусків."""
+        handoff = StageHandoff(tmp_path, 'run1')
+        handoff.write('fact_sales', 'extract', [orders_df])
+        other = StageHandoff(tmp_path, 'run2')
+        other.write('fact_sales', 'extract', [orders_df])
+        
+        handoff.cleanup()
+        
+        assert [path.name for path in tmp_path.iterdir()] == ['run2']
+    
+    def test_unknown_format(self, tmp_path):
+        """Тест помилки для невідомого формату."""
+        with pytest.raises(ValueError, match='csv'):
+            StageHandoff(tmp_path, 'run1', 'csv')
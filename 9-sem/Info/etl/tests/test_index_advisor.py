@@ -0,0 +1,265 @@
+"""
+Тести для модуля index_advisor.
+
+Перевіряє розбір DDL і запитів, підбір індексів та представлень,
+запис міграцій і вимірювання до/після на SQLite.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from etl.config import ETLConfig
+from etl.index_advisor import (
+    MIGRATION_SUFFIX, REPO_ROOT, SOURCE_DATABASES, AdvisorQuery, Index, advise, dashboard_queries, evaluate,
+    extraction_queries, load_schema, metabase_questions, parse_ddl, parse_query, render_metabase_sql,
+    write_migrations
+)
+
+ORDERS_DDL = """
+CREATE TABLE `orders` (
+  `id` char(36) PRIMARY KEY,
+  `customer_id` char(36),
+  `order_date` datetime,
+  `status` varchar(20) COMMENT 'new, paid',
+  `total_amount` decimal(10,2),
+  `updated_at` datetime
+);
+
+CREATE TABLE `order_items` (
+  `id` char(36) PRIMARY KEY,
+  `order_id` char(36),
+  `quantity` integer
+);
+
+CREATE INDEX `order_date_idx` ON `orders` (`order_date`);
+"""
+
+ORDERS_QUERY = AdvisorQuery(
+    'extract_orders',
+    'orders_db',
+    "SELECT o.id, o.order_date, oi.quantity FROM orders o JOIN order_items oi ON o.id = oi.order_id "
+    "WHERE o.status IN ('paid', 'shipped') AND o.order_date >= :start_date AND o.order_date <= :end_date "
+    "ORDER BY o.order_date",
+    {'start_date': '2024-01-01', 'end_date': '2024-01-31'},
+)
+
+REVENUE_SQL = """
+SELECT d.year, SUM(a.total_revenue) AS revenue
+FROM agg_sales_daily a
+JOIN dim_date d ON a.date_key = d.date_key
+LEFT JOIN dim_region r ON a.region_key = r.region_key
+WHERE 1=1
+[[AND d.date >= {{start_date}}]]
+[[AND r.name = {{region}}]]
+GROUP BY d.year
+ORDER BY d.year;
+""".strip()
+
+
+@pytest.fixture
+def orders_schema():
+    """Фікстура зі схемою замовлень у синтаксисі MySQL."""
+    return parse_ddl(ORDERS_DDL)
+
+
+@pytest.fixture
+def dwh_schema():
+    """Фікстура зі схемою DWH з database/init (без міграцій)."""
+    return parse_ddl((REPO_ROOT / 'database' / 'init' / '05_dwh_schema.sql').read_text(encoding='utf-8'))
+
+
+class TestSchemaAndQueries:
+    """Тести розбору DDL та збору запитів."""
+    
+    def test_parse_ddl(self, orders_schema):
+        """Тест колонок, первинних ключів та індексів з DDL."""
+        orders = orders_schema['orders']
+        
+        assert orders.columns == ['id', 'customer_id', 'order_date', 'status', 'total_amount', 'updated_at']
+        assert orders.primary_key == ('id',)
+        assert Index('orders', ('order_date',)) in orders.indexes
+    
+    def test_load_schema_applies_migrations(self):
+        """Тест що схема DWH враховує міграції (таблицю та колонку, додані ними)."""
+        dwh_schema = load_schema('dwh_db')
+        
+        assert 'etl_watermarks' in dwh_schema
+        assert 'row_hash' in dwh_schema['dim_product'].columns
+        assert dwh_schema['fact_sales'].primary_key == ('sales_key', 'date_key')
+    
+    def test_render_metabase_sql(self):
+        """Тест що блок [[...]] без значення тегу прибирається, а теги стають параметрами."""
+        sql, params = render_metabase_sql(REVENUE_SQL, {'start_date': '2024-01-01'})
+        
+        assert 'AND d.date >= :start_date' in sql
+        assert 'r.name' not in sql
+        assert params == {'start_date': '2024-01-01'}
+        assert not sql.endswith(';')
+    
+    def test_metabase_questions_from_seed_script(self):
+        """Тест що питання читаються з build_questions без імпорту скрипта."""
+        questions = metabase_questions()
+        
+        assert 'Revenue by Month' in questions
+        assert all('{{start_date}}' in sql for sql in questions.values())
+    
+    def test_extraction_queries_do_not_connect(self, monkeypatch):
+        """Тест збору SQL витягування без звернення до баз."""
+        monkeypatch.setenv('ETL_PUSHDOWN', 'false')
+        day = datetime(2024, 1, 31)
+        
+        queries = {query.name: query for query in extraction_queries(ETLConfig.from_env(), day, day, day)}
+        
+        assert queries['extract_orders_since'].params == {'since': day}
+        assert 'o.updated_at >= :since' in queries['extract_orders_since'].sql
+        assert queries['extract_payments'].database == 'payments_db'
+
+
+class TestAdvice:
+    """Тести підбору індексів і представлень."""
+    
+    def test_parse_query(self, orders_schema):
+        """Тест предикатів рівності, діапазону та з'єднань."""
+        shape = parse_query(ORDERS_QUERY.sql, orders_schema)
+        
+        assert shape.tables == ['orders', 'order_items']
+        assert shape.equality == {'orders': ['status']}
+        assert shape.ranges == {'orders': ['order_date']}
+        assert (('order_items', 'order_id'), ('orders', 'id')) in shape.joins
+        assert shape.columns['order_items'] == ['quantity', 'order_id']
+    
+    def test_composite_and_covering_indexes(self, orders_schema):
+        """Тест композитного індексу (рівність, діапазон) та покривного для з'єднання."""
+        advice = advise([ORDERS_QUERY], {'orders_db': orders_schema})
+        
+        indexes = {proposal.index.table: proposal.index for proposal in advice.indexes}
+        assert indexes['orders'].columns == ('status', 'order_date')
+        # MySQL: покривні колонки в ключі, первинний ключ не дублюється
+        assert indexes['order_items'].columns == ('order_id', 'quantity')
+        assert advice.indexes[0].queries == ['extract_orders']
+    
+    def test_existing_index_not_proposed(self, orders_schema):
+        """Тест що індекс з тим самим лівим префіксом не пропонується повторно."""
+        orders_schema['orders'].indexes.append(Index('orders', ('status', 'order_date', 'id')))
+        
+        advice = advise([ORDERS_QUERY], {'orders_db': orders_schema})
+        
+        assert [proposal.index.table for proposal in advice.indexes] == ['order_items']
+    
+    def test_prefix_proposals_merged(self, orders_schema):
+        """Тест що пропозиція з ключем-префіксом іншої не дає окремого індексу."""
+        narrow = AdvisorQuery('by_status', 'orders_db', "SELECT o.id FROM orders o WHERE o.status = 'paid'")
+        
+        advice = advise([ORDERS_QUERY, narrow], {'orders_db': orders_schema})
+        
+        orders = [proposal for proposal in advice.indexes if proposal.index.table == 'orders']
+        assert len(orders) == 1
+        assert orders[0].queries == ['extract_orders', 'by_status']
+    
+    def test_unknown_columns_reported(self, orders_schema):
+        """Тест що колонки предикатів поза схемою не дають пропозицій."""
+        query = AdvisorQuery('payments', 'orders_db', "SELECT id FROM orders WHERE paid_at >= :start_date")
+        
+        advice = advise([query], {'orders_db': orders_schema})
+        
+        assert advice.shapes['payments'].unknown == ['paid_at']
+        assert advice.indexes == []
+    
+    def test_dashboard_view(self, dwh_schema):
+        """Тест представлення зведення з атрибутами виміру, за якими фільтрує дашборд."""
+        sql, params = render_metabase_sql(REVENUE_SQL, {'start_date': '2024-01-01'})
+        query = AdvisorQuery('Revenue', 'dwh_db', sql, params)
+        
+        advice = advise([query], {'dwh_db': dwh_schema})
+        
+        view = advice.view_for('Revenue')
+        assert view.name == 'mv_agg_sales_daily_date'
+        create_view, create_index = view.create_sql()
+        assert 'JOIN "dim_date" ON "agg_sales_daily"."date_key" = "dim_date"."date_key"' in create_view
+        assert 'dim_region' not in create_view
+        assert create_index.endswith('ON "mv_agg_sales_daily_date" ("date")')
+        
+        rewritten = view.rewrite(sql, advice.shapes['Revenue'])
+        assert 'FROM mv_agg_sales_daily_date a' in rewritten
+        assert 'JOIN dim_date' not in rewritten
+        assert 'a.date >= :start_date' in rewritten
+        assert 'LEFT JOIN dim_region r' in rewritten
+    
+    def test_dashboard_questions_get_dim_date_index(self, dwh_schema):
+        """Тест що фільтр дат дашбордів дає індекс dim_date за датою."""
+        day = datetime(2024, 1, 31)
+        
+        advice = advise(dashboard_queries(day, day), {'dwh_db': dwh_schema})
+        
+        dim_date = [proposal.index for proposal in advice.indexes if proposal.index.table == 'dim_date']
+        assert [index.columns for index in dim_date] == [('date',)]
+    
+    def test_repository_migrations_cover_dashboards(self):
+        """Тест що міграції репозиторію вже містять індекси для питань Metabase."""
+        day = datetime(2024, 1, 31)
+        
+        advice = advise(dashboard_queries(day, day), {'dwh_db': load_schema('dwh_db')})
+        
+        assert advice.indexes == []
+
+
+class TestMigrationsAndEvaluation:
+    """Тести запису міграцій та вимірювань."""
+    
+    def test_write_migrations_numbering(self, orders_schema, tmp_path):
+        """Тест що міграція отримує наступний номер у каталозі бази."""
+        (tmp_path / 'orders').mkdir()
+        (tmp_path / 'orders' / '001_initial.sql').write_text('-- 001\n')
+        advice = advise([ORDERS_QUERY], {'orders_db': orders_schema})
+        
+        paths = write_migrations(advice, tmp_path)
+        
+        assert [path.name for path in paths] == ['002_index_advisor.sql']
+        content = paths[0].read_text(encoding='utf-8')
+        assert content.startswith('-- Міграція Orders DB')
+        assert 'mysql -h localhost -P 3308 -u orders_user -p orders_db <' in content
+        assert 'CREATE INDEX `orders_status_order_date_idx` ON `orders` (`status`, `order_date`);' in content
+        # Повторний аналіз зі схемою після міграції нічого не пропонує
+        migrated = parse_ddl(content, parse_ddl(ORDERS_DDL))
+        assert advise([ORDERS_QUERY], {'orders_db': migrated}).indexes == []
+    
+    def test_regenerate_reproduces_repository_migrations(self, monkeypatch, tmp_path):
+        """Тест що --regenerate перезаписує міграції advisor'а тим самим текстом без представлень."""
+        monkeypatch.setenv('ETL_PUSHDOWN', 'false')
+        day = datetime(2024, 1, 31)
+        queries = extraction_queries(ETLConfig.from_env(), day, day, day) + dashboard_queries(day, day)
+        schemas = {database: load_schema(database, include_advisor=False) for database in SOURCE_DATABASES}
+        migrations = REPO_ROOT / 'database' / 'migrations'
+        committed = sorted(migrations.glob(f'*/*{MIGRATION_SUFFIX}'))
+        for path in committed:
+            (tmp_path / path.parent.name).mkdir(exist_ok=True)
+            (tmp_path / path.parent.name / path.name).write_text('-- застаріла\n', encoding='utf-8')
+        
+        paths = write_migrations(advise(queries, schemas), tmp_path, regenerate=True)
+        
+        assert sorted(path.relative_to(tmp_path) for path in paths) == [path.relative_to(migrations) for path in committed]
+        for path in committed:
+            generated = (tmp_path / path.parent.name / path.name).read_text(encoding='utf-8')
+            assert generated.replace(tmp_path.as_posix(), 'database/migrations') == path.read_text(encoding='utf-8')
+            assert 'MATERIALIZED VIEW' not in generated
+    
+    @pytest.mark.parametrize('apply', [False, True])
+    def test_evaluate_before_after(self, orders_schema, tmp_path, apply):
+        """Тест EXPLAIN та затримок до/після; без apply індекси видаляються."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'orders.db'}")
+        with engine.begin() as conn:
+            for statement in ORDERS_DDL.replace("COMMENT 'new, paid'", '').split(';'):
+                if statement.strip():
+                    conn.execute(text(statement))
+        advice = advise([ORDERS_QUERY], {'orders_db': orders_schema})
+        
+        report = evaluate(engine, 'orders_db', [ORDERS_QUERY], advice, repeat=1, apply=apply)
+        
+        assert report[0]['query'] == 'extract_orders'
+        assert report[0]['before_ms'] >= 0 and report[0]['after_ms'] >= 0
+        assert 'orders_status_order_date_idx' not in report[0]['plan_before']
+        assert 'orders_status_order_date_idx' in report[0]['plan_after']
+        indexes = {index['name'] for index in inspect(engine).get_indexes('orders')}
+        assert ('orders_status_order_date_idx' in indexes) == apply
@@ -0,0 +1,106 @@
+"""
+Тести для Keys модуля.
+
+Перевіряє резолюцію surrogate ключів для fact_sales.
+"""
+
+import pytest
+import pandas as pd
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from etl.keys import SurrogateKeyResolver, DimensionKey
+
+
+PRODUCT = DimensionKey('dim_product', 'product_id', 'product_key')
+CUSTOMER = DimensionKey('dim_customer', 'customer_id', 'customer_key')
+
+
+def mapping_reader(mappings):
+    """Повертає заміну pd.read_sql, що віддає відображення за назвою таблиці."""
+    def read_sql(query, engine):
+        for table, df in mappings.items():
+            if f'FROM "{table}"' in str(query):
+                return df.copy()
+        raise AssertionError(f"Неочікуваний запит: {query}")
+    return read_sql
+
+
+@pytest.fixture
+def mappings():
+    """Фікстура з відображеннями business id -> surrogate key."""
+    return {
+        'dim_product': pd.DataFrame({'product_id': ['prod1', 'prod2'], 'product_key': [1, 2]}),
+        'dim_customer': pd.DataFrame({'customer_id': ['cust1', 'cust2'], 'customer_key': [10, 20]}),
+    }
+
+
+class TestSurrogateKeyResolver:
+    """Тести для SurrogateKeyResolver."""
+    
+    def test_resolve(self, mappings):
+        """Тест векторизованої заміни business id на surrogate ключі."""
+        resolver = SurrogateKeyResolver(MagicMock(), dimensions=(PRODUCT, CUSTOMER))
+        df = pd.DataFrame({
+            'product_id': ['prod2', 'prod1', 'prod2'],
+            'customer_id': ['cust1', 'cust2', None]
+        })
+        
+        with patch('etl.keys.pd.read_sql', side_effect=mapping_reader(mappings)):
+            result = resolver.resolve(df)
+        
+        assert result['product_key'].tolist() == [2, 1, 2]
+        assert result['customer_key'].tolist()[:2] == [10, 20]
+        # Відсутній business id дає NULL, а не inferred member
+        assert pd.isna(result['customer_key'].iloc[2])
+        assert str(result['product_key'].dtype) == 'Int64'
+    
+    def test_mapping_loaded_once_per_run(self, mappings):
+        """Тест що відображення читається з DWH один раз для всіх чанків."""
+        resolver = SurrogateKeyResolver(MagicMock(), dimensions=(PRODUCT,))
+        
+        with patch('etl.keys.pd.read_sql', side_effect=mapping_reader(mappings)) as mock_read_sql:
+            for _ in range(3):
+                resolver.resolve(pd.DataFrame({'product_id': ['prod1']}))
+        
+        assert mock_read_sql.call_count == 1
+    
+    def test_invalidate_reloads(self, mappings):
+        """Тест що invalidate змушує перечитати вимір."""
+        resolver = SurrogateKeyResolver(MagicMock(), dimensions=(PRODUCT,))
+        
+        with patch('etl.keys.pd.read_sql', side_effect=mapping_reader(mappings)) as mock_read_sql:
+            resolver.resolve(pd.DataFrame({'product_id': ['prod1']}))
+            resolver.invalidate('dim_product')
+            resolver.resolve(pd.DataFrame({'product_id': ['prod1']}))
+        
+        assert mock_read_sql.call_count == 2
+    
+    def test_max_age_refresh(self, mappings):
+        """Тест що застарілий кеш перечитується."""
+        resolver = SurrogateKeyResolver(MagicMock(), dimensions=(PRODUCT,), max_age=timedelta(0))
+        
+        with patch('etl.keys.pd.read_sql', side_effect=mapping_reader(mappings)) as mock_read_sql:
+            resolver.resolve(pd.DataFrame({'product_id': ['prod1']}))
+            resolver.resolve(pd.DataFrame({'product_id': ['prod1']}))
+        
+        assert mock_read_sql.call_count == 2
+    
+    def test_inferred_members(self, mappings):
+        """Тест що невідомі business id створюються як inferred members."""
+        loader = MagicMock()
+        conn = loader.engine.begin.return_value.__enter__.return_value
+        conn.execute.return_value.fetchall.return_value = [('prod9', 99)]
+        resolver = SurrogateKeyResolver(loader, dimensions=(PRODUCT,))
+        
+        with patch('etl.keys.pd.read_sql', side_effect=mapping_reader(mappings)) as mock_read_sql:
+            result = resolver.resolve(pd.DataFrame({'product_id': ['prod1', 'prod9', 'prod9']}))
+            # Новий ключ потрапив у кеш - повторного звернення до DWH немає
+            resolver.resolve(pd.DataFrame({'product_id': ['prod9']}))
+        
+        assert result['product_key'].tolist() == [1, 99, 99]
+        assert resolver.inferred_counts['dim_product'] == 1
+        assert mock_read_sql.call_count == 1
+        insert_sql, params = conn.execute.call_args_list[0].args
+        assert 'ON CONFLICT ("product_id") DO NOTHING' in str(insert_sql)
+        assert params == {'ids': ['prod9']}
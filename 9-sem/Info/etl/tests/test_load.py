@@ -12,7 +12,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 
 from etl.config import PostgreSQLConfig
-from etl.load import Loader
+from etl.load import DimensionKey, Loader, build_date_dimension, copy_from_stdin, row_hashes, COPY_CHUNKSIZE
+
+# Колонки dim_date у database/init/05_dwh_schema.sql
+DWH_DIM_DATE_COLUMNS = ['date_key', 'date', 'year', 'quarter', 'month', 'day', 'day_of_week', 'is_weekend']
 
 
 @pytest.fixture
@@ -44,10 +47,10 @@ def sample_fact_df():
         'order_id': ['order1', 'order2', 'order3'],
         'order_item_id': ['item1', 'item2', 'item3'],
         'date_key': [20240101, 20240102, 20240103],
-        'product_id': ['prod1', 'prod2', 'prod3'],
-        'customer_id': ['cust1', 'cust1', 'cust2'],
-        'employee_id': ['emp1', 'emp2', 'emp1'],
-        'region_id': ['reg1', 'reg1', 'reg2'],
+        'product_key': [1, 2, 3],
+        'customer_key': [10, 10, 11],
+        'employee_key': [5, 6, 5],
+        'region_key': [1, 1, 2],
         'quantity': [2, 3, 1],
         'revenue': [200.0, 450.0, 200.0],
         'discount_amount': [10.0, 0.0, 20.0],
@@ -56,6 +59,21 @@ def sample_fact_df():
     })
 
 
+class TestRowHashes:
+    """Тести для row_hashes."""
+    
+    def test_stable_and_order_independent(self, sample_dimension_df):
+        """Тест що хеш не залежить від порядку колонок і змінюється разом зі значенням."""
+        hashes = row_hashes(sample_dimension_df, ['region_name', 'country'])
+        reordered = sample_dimension_df[['country', 'region_name', 'region_id']]
+        changed = sample_dimension_df.assign(country=['USA', 'Canada', 'Ireland'])
+        
+        assert hashes.dtype == 'int64'
+        assert (row_hashes(reordered, ['country', 'region_name']) == hashes).all()
+        assert (row_hashes(changed, ['region_name', 'country']) == hashes).tolist() == [True, True, False]
+        assert len(set(hashes)) == 3
+
+
 class TestLoader:
     """Тести для Loader."""
     
@@ -120,6 +138,53 @@ class TestLoader:
                 method='multi'
             )
     
+    @patch('etl.load.create_engine')
+    def test_load_dimension_copy(self, mock_create_engine, postgres_config, sample_dimension_df):
+        """Тест завантаження dimension через COPY."""
+        mock_engine = Mock()
+        mock_create_engine.return_value = mock_engine
+        
+        loader = Loader(postgres_config, load_method='copy')
+        
+        with patch.object(pd.DataFrame, 'to_sql') as mock_to_sql:
+            loader.load_dimension(sample_dimension_df, 'dim_region')
+            
+            mock_to_sql.assert_called_once_with(
+                'dim_region',
+                mock_engine,
+                if_exists='append',
+                index=False,
+                chunksize=COPY_CHUNKSIZE,
+                method=copy_from_stdin
+            )
+    
+    def test_unknown_load_method(self, postgres_config):
+        """Тест помилки при невідомому способі завантаження."""
+        with pytest.raises(ValueError, match="Невідомий спосіб завантаження"):
+            Loader(postgres_config, load_method='bulk')
+    
+    def test_copy_from_stdin(self):
+        """Тест серіалізації рядків у CSV для COPY."""
+        table = Mock()
+        table.schema = None
+        table.name = 'dim_region'
+        cursor = MagicMock()
+        conn = MagicMock()
+        conn.connection.cursor.return_value.__enter__.return_value = cursor
+        
+        rows = copy_from_stdin(
+            table,
+            conn,
+            ['region_id', 'region_name'],
+            iter([('reg1', 'Київ, центр'), ('reg2', None)])
+        )
+        
+        assert rows == 2
+        sql, buffer = cursor.copy_expert.call_args[0]
+        assert sql == 'COPY "dim_region" ("region_id", "region_name") FROM STDIN WITH (FORMAT csv)'
+        # Значення з комою екрануються, None стає порожнім полем (NULL)
+        assert buffer.getvalue() == 'reg1,"Київ, центр"\r\nreg2,\r\n'
+    
     @patch('etl.load.create_engine')
     def test_load_fact_sales(self, mock_create_engine, postgres_config, sample_fact_df):
         """Тест завантаження fact_sales."""
@@ -153,6 +218,68 @@ class TestLoader:
         with pytest.raises(ValueError, match="Відсутні необхідні колонки"):
             loader.load_fact_sales(invalid_df)
     
+    @patch('etl.load.create_engine')
+    def test_load_fact_sales_stream(self, mock_create_engine, postgres_config, sample_fact_df):
+        """Тест потокового завантаження fact_sales."""
+        loader = Loader(postgres_config)
+        chunks = (sample_fact_df.iloc[i:i + 2] for i in range(0, len(sample_fact_df), 2))
+        
+        with patch.object(pd.DataFrame, 'to_sql') as mock_to_sql:
+            total = loader.load_fact_sales_stream(chunks)
+        
+        assert total == len(sample_fact_df)
+        assert mock_to_sql.call_count == 2
+        for args, kwargs in mock_to_sql.call_args_list:
+            assert args[0] == 'fact_sales'
+            assert kwargs['if_exists'] == 'append'
+    
+    @patch('etl.load.create_engine')
+    def test_replace_fact_rows(self, mock_create_engine, postgres_config, sample_fact_df):
+        """Тест ідемпотентного запису фактів: delete + insert в одній транзакції."""
+        mock_engine = MagicMock()
+        mock_create_engine.return_value = mock_engine
+        conn = mock_engine.begin.return_value.__enter__.return_value
+        
+        loader = Loader(postgres_config)
+        # Повтор рядка в пакеті не подвоює факт
+        df = pd.concat([sample_fact_df, sample_fact_df.iloc[[0]]])
+        
+        result = loader.replace_fact_rows(df)
+        
+        assert result == len(sample_fact_df)
+        mock_engine.begin.assert_called_once()
+        statements = [str(c.args[0]) for c in conn.execute.call_args_list]
+        assert statements[0].startswith('CREATE TEMP TABLE "stg_fact_sales"')
+        assert statements[1].startswith('INSERT INTO "stg_fact_sales"')
+        assert statements[2].startswith('DELETE FROM "fact_sales" f USING "stg_fact_sales" s')
+        assert 'f."order_item_id" = s."order_item_id"' in statements[2]
+        assert statements[3].startswith('INSERT INTO "fact_sales"')
+    
+    @patch('etl.load.create_engine')
+    def test_replace_fact_rows_prunes_partitions(self, mock_create_engine, postgres_config, sample_fact_df):
+        """Тест що видалення обмежене значеннями ключа партиції з пакета."""
+        mock_engine = MagicMock()
+        mock_create_engine.return_value = mock_engine
+        conn = mock_engine.begin.return_value.__enter__.return_value
+        
+        loader = Loader(postgres_config)
+        loader.replace_fact_rows(sample_fact_df, partition_column='date_key')
+        
+        delete_call = conn.execute.call_args_list[2]
+        assert 'AND f."date_key" = ANY(:partition_values)' in str(delete_call.args[0])
+        assert sorted(delete_call.args[1]['partition_values']) == sorted(sample_fact_df['date_key'].unique())
+    
+    @patch('etl.load.create_engine')
+    def test_load_fact_sales_stream_replace_existing(self, mock_create_engine, postgres_config, sample_fact_df):
+        """Тест потокового ідемпотентного завантаження."""
+        loader = Loader(postgres_config)
+        
+        with patch.object(loader, 'replace_fact_rows', return_value=3) as mock_replace:
+            total = loader.load_fact_sales_stream(iter([sample_fact_df]), replace_existing=True)
+        
+        assert total == 3
+        mock_replace.assert_called_once()
+    
     @patch('etl.load.create_engine')
     def test_load_dim_date(self, mock_create_engine, postgres_config):
         """Тест завантаження календаря."""
@@ -169,6 +296,61 @@ class TestLoader:
             
             mock_to_sql.assert_called_once()
     
+    @patch('etl.load.inspect')
+    @patch('etl.load.create_engine')
+    def test_load_dim_date_incremental(self, mock_create_engine, mock_inspect, postgres_config):
+        """Тест що інкрементальний режим дописує лише відсутні дати в колонки таблиці."""
+        mock_inspect.return_value.has_table.return_value = True
+        mock_inspect.return_value.get_columns.return_value = [
+            {'name': name} for name in DWH_DIM_DATE_COLUMNS
+        ]
+        loader = Loader(postgres_config)
+        existing = pd.DataFrame({'date_key': [20240101, 20240102]})
+        
+        with patch('etl.load.pd.read_sql', return_value=existing) as mock_read_sql, \
+             patch.object(loader, 'load_dimension', return_value=2) as mock_load:
+            result = loader.load_dim_date(datetime(2024, 1, 1), datetime(2024, 1, 4), incremental=True)
+        
+        assert result == 2
+        assert mock_read_sql.call_args.kwargs['params'] == {'min_key': 20240101, 'max_key': 20240104}
+        df_loaded, table_name = mock_load.call_args.args
+        assert table_name == 'dim_date'
+        assert df_loaded['date_key'].tolist() == [20240103, 20240104]
+        # month_name, day_name, week_of_year немає в database/init/05_dwh_schema.sql
+        assert list(df_loaded.columns) == DWH_DIM_DATE_COLUMNS
+        assert mock_load.call_args.kwargs['if_exists'] == 'append'
+    
+    @patch('etl.load.inspect')
+    @patch('etl.load.create_engine')
+    def test_load_dim_date_incremental_complete(self, mock_create_engine, mock_inspect, postgres_config):
+        """Тест що повний календар нічого не дописує."""
+        mock_inspect.return_value.has_table.return_value = True
+        mock_inspect.return_value.get_columns.return_value = [
+            {'name': name} for name in DWH_DIM_DATE_COLUMNS
+        ]
+        loader = Loader(postgres_config)
+        existing = pd.DataFrame({'date_key': [20240101, 20240102]})
+        
+        with patch('etl.load.pd.read_sql', return_value=existing), \
+             patch.object(loader, 'load_dimension') as mock_load:
+            result = loader.load_dim_date(datetime(2024, 1, 1), datetime(2024, 1, 2), incremental=True)
+        
+        assert result == 0
+        mock_load.assert_not_called()
+    
+    @patch('etl.load.inspect')
+    @patch('etl.load.create_engine')
+    def test_load_dim_date_incremental_new_table(self, mock_create_engine, mock_inspect, postgres_config):
+        """Тест що відсутня таблиця створюється повним календарем."""
+        mock_inspect.return_value.has_table.return_value = False
+        loader = Loader(postgres_config)
+        
+        with patch.object(loader, 'load_dimension', return_value=3) as mock_load:
+            result = loader.load_dim_date(datetime(2024, 1, 1), datetime(2024, 1, 3), incremental=True)
+        
+        assert result == 3
+        assert len(mock_load.call_args.args[0]) == 3
+    
     @patch('etl.load.create_engine')
     def test_get_existing_keys(self, mock_create_engine, postgres_config):
         """Тест отримання існуючих ключів."""
@@ -189,52 +371,206 @@ class TestLoader:
     
     @patch('etl.load.create_engine')
     def test_upsert_dimension(self, mock_create_engine, postgres_config, sample_dimension_df):
-        """Тест upsert для dimension."""
+        """Тест set-based upsert через staging таблицю та ON CONFLICT."""
         mock_engine = MagicMock()
         mock_create_engine.return_value = mock_engine
+        conn = mock_engine.begin.return_value.__enter__.return_value
+        # reg1 вже існував (xmax != 0), reg2 та reg3 - нові
+        conn.execute.side_effect = [Mock(), Mock(), iter([(False,), (True,), (True,)])]
         
         loader = Loader(postgres_config)
         
-        # Mock для get_existing_keys
-        existing_keys = {'reg1'}
+        with patch.object(loader, 'get_existing_keys') as mock_get_keys:
+            result = loader.upsert_dimension(
+                df=sample_dimension_df,
+                table_name='dim_region',
+                key_column='region_id'
+            )
+        
+        assert result == {"inserted": 2, "updated": 1}
+        # Ключі більше не витягуються в pandas
+        mock_get_keys.assert_not_called()
+        # Одна транзакція: staging, пакетний insert, один upsert
+        mock_engine.begin.assert_called_once()
+        statements = [str(c.args[0]) for c in conn.execute.call_args_list]
+        assert statements[0].startswith('CREATE TEMP TABLE "stg_dim_region" ON COMMIT DROP')
+        assert statements[1].startswith('INSERT INTO "stg_dim_region"')
+        assert len(conn.execute.call_args_list[1].args[1]) == 3
+        assert 'ON CONFLICT ("region_id") DO UPDATE SET' in statements[2]
+        assert '"region_name" = EXCLUDED."region_name"' in statements[2]
+        assert 'DELETE' not in ' '.join(statements)
+    
+    @patch('etl.load.create_engine')
+    def test_upsert_dimension_deduplicates_keys(self, mock_create_engine, postgres_config):
+        """Тест що дублікати ключа в пакеті не ламають ON CONFLICT."""
+        mock_engine = MagicMock()
+        mock_create_engine.return_value = mock_engine
+        conn = mock_engine.begin.return_value.__enter__.return_value
+        conn.execute.side_effect = [Mock(), Mock(), iter([(False,)])]
+        
+        df = pd.DataFrame({
+            'region_id': ['reg1', 'reg1'],
+            'region_name': ['Old name', 'New name']
+        })
+        
+        loader = Loader(postgres_config)
+        result = loader.upsert_dimension(df=df, table_name='dim_region', key_column='region_id')
         
-        with patch.object(loader, 'get_existing_keys', return_value=existing_keys):
-            with patch.object(pd.DataFrame, 'to_sql') as mock_to_sql:
-                loader.upsert_dimension(
-                    df=sample_dimension_df,
-                    table_name='dim_region',
-                    key_column='region_id'
-                )
-                
-                # Повинно викликатися двічі: для нових та для оновлення
-                assert mock_to_sql.call_count == 2
+        assert result == {"inserted": 0, "updated": 1}
+        records = conn.execute.call_args_list[1].args[1]
+        assert records == [{'p0': 'reg1', 'p1': 'New name'}]
     
     @patch('etl.load.create_engine')
-    def test_upsert_dimension_no_new_records(self, mock_create_engine, postgres_config):
-        """Тест upsert коли немає нових записів."""
+    def test_upsert_dimension_copy_staging(self, mock_create_engine, postgres_config, sample_dimension_df):
+        """Тест що з load_method='copy' staging заповнюється через COPY."""
         mock_engine = MagicMock()
         mock_create_engine.return_value = mock_engine
+        conn = mock_engine.begin.return_value.__enter__.return_value
+        conn.execute.side_effect = [Mock(), iter([(True,), (True,), (True,)])]
+        cursor = conn.connection.cursor.return_value.__enter__.return_value
+        
+        loader = Loader(postgres_config, load_method='copy')
+        result = loader.upsert_dimension(sample_dimension_df, 'dim_region', 'region_id')
+        
+        assert result == {"inserted": 3, "updated": 0}
+        sql, buffer = cursor.copy_expert.call_args[0]
+        assert sql.startswith('COPY "stg_dim_region"')
+        assert buffer.getvalue().count('\n') == 3
+    
+    @patch('etl.load.create_engine')
+    def test_upsert_dimension_empty(self, mock_create_engine, postgres_config):
+        """Тест upsert порожнього пакету."""
+        loader = Loader(postgres_config)
+        
+        result = loader.upsert_dimension(pd.DataFrame({'region_id': []}), 'dim_region', 'region_id')
+        
+        assert result == {"inserted": 0, "updated": 0}
+        mock_create_engine.assert_not_called()
+    
+    @patch('etl.load.create_engine')
+    def test_sync_dimension_writes_changed_rows(self, mock_create_engine, postgres_config):
+        """Тест що записуються лише нові та змінені рядки (колонки регіонів з екстрактора)."""
+        loader = Loader(postgres_config)
+        df = pd.DataFrame({
+            'region_id': ['reg1', 'reg2', 'reg3'],
+            'region_name': ['Region 1', 'Region 2', 'Region 3'],
+            'region_code': ['R1', 'R2', 'R3'],
+        })
+        hashes = row_hashes(df.rename(columns={'region_name': 'name', 'region_code': 'code'}), ['name', 'code'])
+        # reg1 без змін, reg2 змінився, reg3 ще немає в DWH
+        stored = pd.DataFrame({'region_id': ['reg1', 'reg2'], 'row_hash': pd.array([hashes[0], hashes[1] ^ 1], dtype='Int64')})
+        columns = (['region_key', 'region_id', 'name', 'code', 'updated_at', 'row_hash'], ['region_key'])
+        
+        with patch.object(loader, '_dimension_columns', return_value=columns), \
+             patch.object(loader, '_stored_hashes', return_value=stored), \
+             patch.object(loader, 'upsert_dimension', return_value={'inserted': 1, 'updated': 1}) as mock_upsert:
+            result = loader.sync_dimension(df, 'dim_region', 'region_id')
+        
+        assert result == {'inserted': 1, 'updated': 1, 'unchanged': 1}
+        written, table_name, key_column = mock_upsert.call_args.args
+        assert (table_name, key_column) == ('dim_region', 'region_id')
+        assert list(written.columns) == ['region_id', 'name', 'code', 'row_hash']
+        assert written['name'].tolist() == ['Region 2', 'Region 3']
+        assert written['row_hash'].tolist() == hashes[1:].tolist()
+    
+    @patch('etl.load.create_engine')
+    def test_sync_dimension_maps_extractor_columns(self, mock_create_engine, postgres_config):
+        """Тест відображення колонок extract_products на dim_product з резолюцією category_key."""
+        loader = Loader(postgres_config)
+        df = pd.DataFrame({
+            'product_id': ['p1', 'p2'],
+            'product_name': ['Laptop', 'Mouse'],
+            'sku': ['SKU-1', 'SKU-2'],
+            'description': ['Опис', 'Опис відсутній'],
+            'price': [999.0, 19.0],
+            'stock_quantity': [5, 0],
+            'category_id': ['cat1', None],
+            'category_name': ['Computers', 'Без категорії'],
+            'parent_category_id': [None, None],
+            'created_at': pd.to_datetime(['2024-01-01', '2024-01-02']),
+            'updated_at': pd.to_datetime(['2024-01-03', '2024-01-04']),
+        })
+        columns = (['product_key', 'product_id', 'name', 'sku', 'category_key', 'updated_at', 'row_hash'], ['product_key'])
+        category_keys = pd.Series(pd.array([10, None], dtype='Int64'), index=df.index)
         
+        with patch.object(loader, '_dimension_columns', return_value=columns), \
+             patch.object(loader, '_reference_keys', return_value=(category_keys, set())) as mock_keys, \
+             patch.object(loader, '_stored_hashes', return_value=pd.DataFrame({'product_id': [], 'row_hash': pd.array([], dtype='Int64')})), \
+             patch.object(loader, 'upsert_dimension', return_value={'inserted': 2, 'updated': 0}) as mock_upsert:
+            result = loader.sync_dimension(df, 'dim_product', 'product_id')
+        
+        assert result == {'inserted': 2, 'updated': 0, 'unchanged': 0}
+        values, reference = mock_keys.call_args.args
+        assert values.tolist() == ['cat1', None]
+        assert (reference.table, reference.surrogate_key) == ('dim_category', 'category_key')
+        written = mock_upsert.call_args.args[0]
+        assert list(written.columns) == ['product_id', 'name', 'sku', 'category_key', 'updated_at', 'row_hash']
+        assert written['name'].tolist() == ['Laptop', 'Mouse']
+        assert written['category_key'].tolist() == [10, pd.NA]
+        # Зміна категорії змінює хеш рядка
+        assert written['row_hash'].nunique() == 2
+        assert row_hashes(written.assign(category_key=pd.array([11, None], dtype='Int64')), ['name', 'sku', 'category_key'])[0] \
+            != written['row_hash'].iloc[0]
+    
+    @patch('etl.load.create_engine')
+    def test_sync_dimension_counts_inferred_parents_as_inserted(self, mock_create_engine, postgres_config):
+        """Тест що батьківська категорія пакета, створена як inferred member, рахується вставленою."""
+        loader = Loader(postgres_config)
         df = pd.DataFrame({
-            'region_id': ['reg1'],
-            'region_name': ['Region 1']
+            'category_id': ['root', 'child'],
+            'category_name': ['Electronics', 'Laptops'],
+            'parent_category_id': [None, 'root'],
         })
+        columns = (['category_key', 'category_id', 'name', 'parent_category_key', 'updated_at', 'row_hash'], ['category_key'])
+        parent_keys = pd.Series(pd.array([None, 1], dtype='Int64'), index=df.index)
         
+        with patch.object(loader, '_dimension_columns', return_value=columns), \
+             patch.object(loader, '_reference_keys', return_value=(parent_keys, {'root'})), \
+             patch.object(loader, '_stored_hashes', return_value=pd.DataFrame({'category_id': ['root'], 'row_hash': pd.array([None], dtype='Int64')})), \
+             patch.object(loader, 'upsert_dimension', return_value={'inserted': 1, 'updated': 1}):
+            result = loader.sync_dimension(df, 'dim_category', 'category_id')
+        
+        assert result == {'inserted': 2, 'updated': 0, 'unchanged': 0}
+    
+    @patch('etl.load.create_engine')
+    def test_sync_dimension_requires_source_for_tracked_columns(self, mock_create_engine, postgres_config, sample_dimension_df):
+        """Тест помилки для колонки таблиці без джерела або без даних джерела."""
+        loader = Loader(postgres_config)
+        
+        with patch.object(loader, '_dimension_columns', return_value=(['region_key', 'region_id', 'name', 'code', 'country'], ['region_key'])):
+            with pytest.raises(ValueError, match='dim_region.country'):
+                loader.sync_dimension(sample_dimension_df.assign(region_code='R'), 'dim_region', 'region_id')
+        with patch.object(loader, '_dimension_columns', return_value=(['region_key', 'region_id', 'name', 'code'], ['region_key'])):
+            with pytest.raises(ValueError, match='dim_region.code'):
+                loader.sync_dimension(sample_dimension_df, 'dim_region', 'region_id')
+    
+    @patch('etl.load.create_engine')
+    def test_reference_keys_creates_inferred_members(self, mock_create_engine, postgres_config):
+        """Тест резолюції business id у surrogate ключі з inferred members для невідомих."""
+        conn = mock_create_engine.return_value.begin.return_value.__enter__.return_value
+        found = MagicMock()
+        found.fetchall.return_value = [('reg1', 1)]
+        inferred = MagicMock()
+        inferred.fetchall.return_value = [('reg9', 7)]
+        conn.execute.side_effect = [found, [('reg9',)], inferred]
         loader = Loader(postgres_config)
+        reference = DimensionKey('dim_region', 'region_id', 'region_key')
         
-        # Всі ключі вже існують
-        existing_keys = {'reg1'}
+        keys, created = loader._reference_keys(pd.Series(['reg1', None, 'reg9', 'reg1']), reference)
         
-        with patch.object(loader, 'get_existing_keys', return_value=existing_keys):
-            with patch.object(pd.DataFrame, 'to_sql') as mock_to_sql:
-                loader.upsert_dimension(
-                    df=df,
-                    table_name='dim_region',
-                    key_column='region_id'
-                )
-                
-                # Тільки update, без insert
-                assert mock_to_sql.call_count == 1
+        assert keys.tolist() == [1, pd.NA, 7, 1]
+        assert created == {'reg9'}
+        assert conn.execute.call_args_list[1].args[1] == {'ids': ['reg9']}
+    
+    @patch('etl.load.create_engine')
+    def test_sync_dimension_empty(self, mock_create_engine, postgres_config):
+        """Тест синхронізації порожнього пакету."""
+        loader = Loader(postgres_config)
+        
+        result = loader.sync_dimension(pd.DataFrame({'region_id': []}), 'dim_region', 'region_id')
+        
+        assert result == {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        mock_create_engine.assert_not_called()
     
     @patch('etl.load.create_engine')
     def test_close(self, mock_create_engine, postgres_config):
@@ -258,3 +594,40 @@ class TestLoader:
         loader.close()
         
         mock_create_engine.assert_not_called()
+
+
+class TestBuildDateDimension:
+    """Тести для векторизованої генерації календаря."""
+    
+    def test_matches_per_day_attributes(self):
+        """Тест що атрибути збігаються з поденним обчисленням."""
+        df = build_date_dimension(datetime(2023, 12, 25), datetime(2024, 1, 8))
+        
+        for row, date in zip(df.itertuples(), pd.date_range('2023-12-25', '2024-01-08')):
+            assert row.date_key == int(date.strftime('%Y%m%d'))
+            assert row.month_name == date.strftime('%B')
+            assert row.day_name == date.strftime('%A')
+            assert row.week_of_year == date.isocalendar()[1]
+            assert row.day_of_week == date.dayofweek + 1
+            assert row.quarter == date.quarter
+            assert row.is_weekend == (date.dayofweek >= 5)
+    
+    def test_includes_last_day_with_time(self):
+        """Тест що межі з часом не гублять останній день."""
+        df = build_date_dimension(datetime(2024, 1, 1, 15, 30), datetime(2024, 1, 3, 8, 0))
+        
+        assert df['date_key'].tolist() == [20240101, 20240102, 20240103]
+    
+    def test_hourly_granularity(self):
+        """Тест погодинного календаря."""
+        df = build_date_dimension(datetime(2024, 1, 1, 22), datetime(2024, 1, 2, 1), freq='h')
+        
+        assert df['date_key'].tolist() == [2024010122, 2024010123, 2024010200, 2024010201]
+        assert df['hour'].tolist() == [22, 23, 0, 1]
+    
+    def test_decades(self):
+        """Тест генерації календаря на десятиліття одним проходом."""
+        df = build_date_dimension(datetime(2000, 1, 1), datetime(2029, 12, 31))
+        
+        assert len(df) == 10958
+        assert df['date_key'].is_unique
@@ -0,0 +1,188 @@
+"""
+Тести для scripts/metabase_seed.py (режим --sync).
+
+Синхронізація перевіряється на in-memory заглушці Metabase API
+(scripts/metabase_stub.py), запущеній у потоці тесту.
+"""
+
+import importlib.util
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('requests')
+
+SCRIPTS = Path(__file__).resolve().parents[2] / 'scripts'
+
+
+def load_script(name):
+    """Імпортує скрипт з каталогу scripts як модуль."""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / f'{name}.py')
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+seed = load_script('metabase_seed')
+stub = load_script('metabase_stub')
+
+
+@pytest.fixture
+def metabase():
+    """Заглушка Metabase на вільному порту; повертає її URL."""
+    server = stub.serve(0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def request_counts(client):
+    """Лічильники запитів заглушки за 'METHOD path'."""
+    return Counter(client._get('/stub/requests'))
+
+
+def writes(client, before):
+    """POST/PUT/DELETE запити після знімка before (без входу в сесію)."""
+    after = request_counts(client) - before
+    return {
+        request: count for request, count in after.items()
+        if request.split()[0] in ('POST', 'PUT', 'DELETE') and request != 'POST /api/session'
+    }
+
+
+def card_ids(client):
+    """Id карток за назвою."""
+    return {card['name']: card['id'] for card in client.list_cards()}
+
+
+def managed(obj_id, name, **fields):
+    """Об'єкт Metabase, створений скриптом."""
+    return {'id': obj_id, 'name': name, 'description': seed.CARD_DESCRIPTION, **fields}
+
+
+class TestSync:
+    """Тести --sync на заглушці Metabase API."""
+    
+    @pytest.fixture
+    def client(self, metabase):
+        """Клієнт заглушки та id бази DWH."""
+        client = seed.MetabaseClient(metabase, 'admin@example.com', 'secret', pool_size=4)
+        client.db_id = client.create_database('TechMarket DWH', 'dwh-db', 5432, 'dwh_db', 'dwh_user', 'dwh_pass')
+        return client
+    
+    def test_second_sync_writes_nothing(self, client):
+        """Тест що повторна синхронізація без змін нічого не записує."""
+        dashboard_id = seed.sync(client, client.db_id, workers=4)
+        ids = card_ids(client)
+        before = request_counts(client)
+        
+        assert seed.sync(client, client.db_id, workers=4) == dashboard_id
+        
+        assert writes(client, before) == {}
+        assert card_ids(client) == ids
+        dashboard = client.get_dashboard(dashboard_id)
+        assert sorted(card['card_id'] for card in dashboard['dashcards']) == sorted(ids.values())
+    
+    def test_changed_question_updates_one_card(self, client, monkeypatch):
+        """Тест що змінене питання оновлює одну картку на місці."""
+        seed.sync(client, client.db_id, workers=4)
+        ids = card_ids(client)
+        build_questions = seed.build_questions
+        
+        def changed_questions(db_id):
+            questions = build_questions(db_id)
+            questions[0]['query'] = questions[0]['query'].replace('LEFT JOIN', 'JOIN')
+            return questions
+        
+        monkeypatch.setattr(seed, 'build_questions', changed_questions)
+        before = request_counts(client)
+        seed.sync(client, client.db_id, workers=4)
+        
+        assert writes(client, before) == {f"PUT /api/card/{ids['Revenue by Month']}": 1}
+        assert card_ids(client) == ids
+    
+    def test_reverts_ui_edits(self, client):
+        """Тест що зміни картки та дашборду в UI повертаються до визначення."""
+        dashboard_id = seed.sync(client, client.db_id, workers=4)
+        card_id = card_ids(client)['Orders by Region']
+        # Описи (позначка керування) лишаються як були
+        client._put(f'/api/card/{card_id}', {'display': 'pie', 'visualization_settings': {'pie.show_legend': True}})
+        client._put(f'/api/dashboard/{dashboard_id}', {'parameters': []})
+        before = request_counts(client)
+        
+        seed.sync(client, client.db_id, workers=4)
+        
+        changed = writes(client, before)
+        assert changed[f'PUT /api/card/{card_id}'] == 1
+        assert changed[f'PUT /api/dashboard/{dashboard_id}'] >= 1
+        assert not any(request.startswith(('POST', 'DELETE')) for request in changed)
+        assert client._get(f'/api/card/{card_id}')['display'] == 'bar'
+        assert client.get_dashboard(dashboard_id)['parameters'] == seed.dashboard_parameters()
+        before = request_counts(client)
+        seed.sync(client, client.db_id, workers=4)
+        assert writes(client, before) == {}
+    
+    def test_removes_duplicates_and_keeps_hand_made_cards(self, client):
+        """Тест що дублікати керованих карток видаляються, а створені вручну лишаються."""
+        seed.sync(client, client.db_id, workers=4)
+        ids = card_ids(client)
+        duplicate = client.save_card({'name': 'Margin Percentage', 'description': seed.CARD_DESCRIPTION})
+        hand_made = client.save_card({'name': 'My Revenue Check', 'description': 'ad hoc'})
+        before = request_counts(client)
+        
+        seed.sync(client, client.db_id, workers=4)
+        
+        assert writes(client, before) == {f'DELETE /api/card/{duplicate}': 1}
+        assert card_ids(client) == {**ids, 'My Revenue Check': hand_made}
+
+
+class TestPlanSync:
+    """Тести plan_sync."""
+    
+    DESIRED = {
+        'Revenue': seed.card_content(managed(None, 'Revenue', display='line')),
+        'Orders': seed.card_content(managed(None, 'Orders', display='bar')),
+    }
+    
+    def test_keeps_managed_card_among_duplicates(self):
+        """Тест що з карток з однією назвою лишається керована, решта видаляються."""
+        existing = [
+            {'id': 1, 'name': 'Revenue', 'description': 'by hand', 'display': 'line'},
+            managed(7, 'Revenue', display='line'),
+            managed(4, 'Revenue', display='area'),
+            managed(2, 'Orders', display='bar'),
+        ]
+        
+        plan = seed.plan_sync(self.DESIRED, existing, seed.card_content)
+        
+        assert plan.unchanged == {'Orders': 2}
+        assert plan.update == {'Revenue': 4}
+        assert sorted(plan.delete) == [1, 7]
+        assert plan.create == []
+    
+    def test_hand_made_cards(self):
+        """Тест що картка з потрібною назвою переймається, інші створені вручну не чіпаються."""
+        existing = [
+            {'id': 3, 'name': 'Orders', 'description': None, 'display': 'bar'},
+            {'id': 5, 'name': 'Custom', 'description': 'by hand'},
+            managed(6, 'Retired'),
+            {'id': 8, 'name': 'Revenue', 'description': 'old', 'archived': True},
+        ]
+        
+        plan = seed.plan_sync(self.DESIRED, existing, seed.card_content)
+        
+        assert plan.create == ['Revenue']
+        assert plan.update == {'Orders': 3}
+        assert plan.delete == [6]
+    
+    def test_legacy_fingerprint_marks_managed(self):
+        """Тест що опис з fingerprint попередніх запусків --sync вважається керованим."""
+        legacy = {'id': 9, 'name': 'Retired', 'description': 'KPI\n\nseed-fingerprint: 0123456789abcdef'}
+        
+        assert seed.plan_sync({}, [legacy], seed.card_content).delete == [9]
@@ -0,0 +1,158 @@
+"""
+Тести для модуля метрик ETL.
+
+Перевіряє виміри кроків, підрахунок SQL запитів та експорт звітів.
+"""
+
+import json
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+from unittest.mock import MagicMock, patch
+
+from etl.config import MySQLConfig
+from etl.extract import Extractor
+from etl.metrics import MetricsCollector, MetricsStore, StageMetrics, track_round_trips
+
+
+def metrics_by_step(collector):
+    """Повертає метрики колектора за (stage, step)."""
+    return {(m.stage, m.step): m for m in collector.metrics}
+
+
+class TestMetricsCollector:
+    """Тести для MetricsCollector."""
+    
+    def test_call_records_dataframe(self):
+        """Тест що крок з DataFrame записує рядки та обсяг."""
+        collector = MetricsCollector()
+        df = pd.DataFrame({'a': range(10)})
+        
+        result = collector.call('dim_a', 'extract', lambda: df)
+        
+        assert result is df
+        metrics = metrics_by_step(collector)[('dim_a', 'extract')]
+        assert metrics.rows == 10
+        assert metrics.bytes > 0
+        assert metrics.peak_rss_bytes > 0
+        assert metrics.calls == 1
+    
+    def test_nested_time_is_exclusive(self):
+        """Тест що час вкладеного кроку не входить у зовнішній."""
+        collector = MetricsCollector()
+        
+        with collector.measure('fact', 'load'):
+            with collector.measure('fact', 'extract'):
+                time.sleep(0.05)
+        
+        metrics = metrics_by_step(collector)
+        assert metrics[('fact', 'extract')].wall_seconds >= 0.05
+        assert metrics[('fact', 'load')].wall_seconds < 0.05
+    
+    def test_stream_measures_each_chunk(self):
+        """Тест що потоковий крок сумує всі чанки."""
+        collector = MetricsCollector()
+        chunks = [pd.DataFrame({'a': [1, 2]}), pd.DataFrame({'a': [3]})]
+        
+        result = list(collector.stream('fact', 'extract', iter(chunks)))
+        
+        assert len(result) == 2
+        metrics = metrics_by_step(collector)[('fact', 'extract')]
+        assert metrics.rows == 3
+        # Останній вимір - вичерпання ітератора
+        assert metrics.calls == 3
+    
+    def test_counts_db_round_trips(self):
+        """Тест підрахунку SQL запитів кроку лише для зареєстрованих engine."""
+        collector = MetricsCollector()
+        engine, other = create_engine('sqlite://'), create_engine('sqlite://')
+        track_round_trips(engine)
+        track_round_trips(engine)
+        
+        with collector.measure('dim_a', 'load'):
+            with engine.connect() as conn, other.connect() as other_conn:
+                for _ in range(3):
+                    conn.execute(text('SELECT 1'))
+                    other_conn.execute(text('SELECT 1'))
+        
+        assert metrics_by_step(collector)[('dim_a', 'load')].db_round_trips == 3
+    
+    def test_extractor_registers_created_engine(self):
+        """Тест що on_engine викликається один раз при лінивому створенні engine."""
+        on_engine = MagicMock()
+        extractor = Extractor(MySQLConfig('localhost', 3306, 'user', 'pass', 'orders_db'), on_engine=on_engine)
+        
+        with patch('etl.extract.create_engine') as mock_create_engine:
+            extractor.engine
+            extractor.engine
+        
+        on_engine.assert_called_once_with(mock_create_engine.return_value)
+    
+    def test_counts_sharded_round_trips(self, tmp_path):
+        """Тест що запити потоків шардів додаються до кроку, який їх запустив."""
+        collector = MetricsCollector()
+        extractor = Extractor(MySQLConfig('localhost', 3306, 'user', 'pass', 'orders_db'), shards=3)
+        extractor._engine = create_engine(f"sqlite:///{tmp_path / 'orders.db'}")
+        track_round_trips(extractor._engine)
+        with extractor.engine.begin() as conn:
+            conn.execute(text('CREATE TABLE orders (id INTEGER)'))
+            conn.execute(text('INSERT INTO orders VALUES (1), (2), (3)'))
+        queries = [('SELECT id FROM orders WHERE id = :id', {'id': i}) for i in (1, 2, 3)]
+        
+        with collector.measure('fact_sales', 'extract'):
+            df = extractor.extract_shards(queries)
+        with collector.measure('fact_sales', 'extract_stream'):
+            chunks = list(extractor.extract_shards(queries, chunksize=10))
+        
+        assert len(df) == 3 and len(chunks) == 3
+        metrics = metrics_by_step(collector)
+        assert metrics[('fact_sales', 'extract')].db_round_trips == 3
+        assert metrics[('fact_sales', 'extract_stream')].db_round_trips == 3
+    
+    def test_rows_per_sec(self):
+        """Тест пропускної здатності кроку."""
+        assert StageMetrics('a', 'load', wall_seconds=2.0, rows=100).rows_per_sec == 50.0
+        assert StageMetrics('a', 'load').rows_per_sec == 0.0
+    
+    def test_write_reports(self, tmp_path):
+        """Тест JSON та Prometheus звітів."""
+        collector = MetricsCollector('incremental')
+        collector.call('dim_a', 'load', lambda: 5)
+        
+        report = json.loads(collector.write_json(tmp_path / 'etl_metrics.json').read_text())
+        prom = collector.write_prometheus(tmp_path / 'etl_metrics.prom').read_text()
+        
+        assert report['run_type'] == 'incremental'
+        assert report['stages'][0]['rows'] == 5
+        assert '# TYPE etl_stage_rows gauge' in prom
+        assert 'etl_stage_rows{run_type="incremental",stage="dim_a",step="load"} 5' in prom
+        assert list(tmp_path.glob('*.tmp')) == []
+
+
+class TestMetricsStore:
+    """Тести для MetricsStore."""
+    
+    def test_save(self):
+        """Тест створення таблиці та вставки метрик одним запитом."""
+        loader = MagicMock()
+        conn = loader.engine.begin.return_value.__enter__.return_value
+        collector = MetricsCollector()
+        collector.call('dim_a', 'load', lambda: 5)
+        collector.call('dim_b', 'load', lambda: 7)
+        
+        assert MetricsStore(loader).save(collector) == 2
+        
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        assert statements[0].startswith('CREATE TABLE IF NOT EXISTS "etl_run_metrics"')
+        records = conn.execute.call_args_list[-1].args[1]
+        assert [record['stage'] for record in records] == ['dim_a', 'dim_b']
+        assert records[0]['run_id'] == collector.run_id
+        assert 'calls' not in records[0]
+    
+    def test_save_without_metrics(self):
+        """Тест що порожній запуск нічого не записує."""
+        loader = MagicMock()
+        
+        assert MetricsStore(loader).save(MetricsCollector()) == 0
+        loader.engine.begin.assert_not_called()
@@ -0,0 +1,208 @@
+"""
+Тести для модуля партицій fact_sales.
+
+Перевіряє межі місячних партицій та послідовність SQL підміни партицій.
+"""
+
+import pytest
+import pandas as pd
+from unittest.mock import MagicMock
+
+from etl.load import FACT_SALES_COLUMNS
+from etl.partitions import FactPartitionManager, month_bounds, partition_months, partition_name
+
+
+class FakeConnection:
+    """З'єднання, що записує виконані SQL та повертає підготовлені результати."""
+    
+    def __init__(self, statements, partitions=(), constraints=(), indexes=(), shadows=()):
+        self.statements = statements
+        self.partitions = list(partitions)
+        self.constraints = list(constraints)
+        self.indexes = list(indexes)
+        self.shadows = list(shadows)
+    
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        result = MagicMock()
+        if 'pg_inherits' in sql:
+            result.fetchall.return_value = self.partitions
+        elif 'pg_get_constraintdef' in sql:
+            result.scalars.return_value.all.return_value = self.constraints
+        elif 'pg_get_indexdef' in sql:
+            result.fetchall.return_value = self.indexes
+        elif 'pg_get_serial_sequence' in sql:
+            result.scalar.return_value = 'public.fact_sales_sales_key_seq'
+        elif 'pg_tables' in sql:
+            result.scalars.return_value.all.return_value = self.shadows
+        elif 'count(*)' in sql:
+            result.scalar.return_value = 10
+        return result
+
+
+@pytest.fixture
+def statements():
+    """Фікстура зі списком виконаних SQL."""
+    return []
+
+
+@pytest.fixture
+def loader(statements):
+    """Фікстура з лоадером, що записує SQL у statements."""
+    loader = MagicMock()
+    connection = FakeConnection(
+        statements,
+        partitions=[('fact_sales_p202312', False), ('fact_sales_default', True)],
+        constraints=[
+            'PRIMARY KEY (sales_key, date_key)',
+            'FOREIGN KEY (date_key) REFERENCES dim_date(date_key)'
+        ],
+        indexes=[('CREATE INDEX fact_sales_product_key_idx ON ONLY public.fact_sales USING btree (product_key)', False)]
+    )
+    loader.engine.begin.return_value.__enter__.return_value = connection
+    loader._bulk_insert.side_effect = lambda conn, df, table: statements.append(
+        f'BULK {table} {len(df)}'
+    ) or len(df)
+    return loader
+
+
+def fact_rows(date_keys):
+    """Створює факти продажів із заданими date_key."""
+    df = pd.DataFrame({column: [1] * len(date_keys) for column in FACT_SALES_COLUMNS})
+    df['date_key'] = date_keys
+    return df
+
+
+class TestPartitionHelpers:
+    """Тести допоміжних функцій партицій."""
+    
+    def test_month_bounds(self):
+        """Тест меж місяця у форматі date_key."""
+        assert month_bounds(202401) == (20240100, 20240200)
+        assert month_bounds(202312) == (20231200, 20240100)
+    
+    def test_partition_name(self):
+        """Тест назви місячної партиції."""
+        assert partition_name(202401) == 'fact_sales_p202401'
+    
+    def test_partition_months(self):
+        """Тест місяців, яких торкаються date_key (NULL ігнорується)."""
+        date_keys = pd.Series([20240131, 20240201, 20240105, None])
+        
+        assert partition_months(date_keys) == [202401, 202402]
+
+
+class TestFactPartitionManager:
+    """Тести для FactPartitionManager."""
+    
+    def test_ensure_partitions(self, loader, statements):
+        """Тест створення відсутніх місячних партицій."""
+        manager = FactPartitionManager(loader)
+        
+        months = manager.ensure_partitions(pd.Series([20240131, 20240201]))
+        
+        assert months == [202401, 202402]
+        assert statements == [
+            'CREATE TABLE IF NOT EXISTS "fact_sales_p202401" PARTITION OF "fact_sales" '
+            'FOR VALUES FROM (20240100) TO (20240200)',
+            'CREATE TABLE IF NOT EXISTS "fact_sales_p202402" PARTITION OF "fact_sales" '
+            'FOR VALUES FROM (20240200) TO (20240300)',
+        ]
+    
+    def test_swap_reload(self, loader, statements):
+        """Тест побудови shadow партицій та атомарної підміни."""
+        manager = FactPartitionManager(loader)
+        chunks = [fact_rows([20240105, 20240210]), fact_rows([20240120, 20240121])]
+        
+        total = manager.swap_reload(iter(chunks))
+        
+        assert total == 4
+        bulk = [sql for sql in statements if sql.startswith('BULK')]
+        assert bulk == [
+            'BULK fact_sales_p202401_shadow 1',
+            'BULK fact_sales_p202402_shadow 1',
+            'BULK fact_sales_p202401_shadow 2',
+        ]
+        
+        # Індекси будуються після запису всіх даних у shadow таблиці
+        last_shadow_insert = statements.index('BULK fact_sales_p202401_shadow 2')
+        index_statement = 'CREATE INDEX ON "fact_sales_p202401_shadow" USING btree (product_key)'
+        assert statements.index(index_statement) > last_shadow_insert
+        assert 'ALTER TABLE "fact_sales_p202401_shadow" ADD PRIMARY KEY (sales_key, date_key)' in statements
+        
+        # Підміна: старі партиції відключаються, DEFAULT очищується, нові підключаються
+        swap = statements[statements.index('LOCK TABLE "fact_sales" IN ACCESS EXCLUSIVE MODE'):]
+        assert swap[2:] == [
+            'ALTER TABLE "fact_sales" DETACH PARTITION "fact_sales_p202312"',
+            'DROP TABLE "fact_sales_p202312"',
+            'TRUNCATE TABLE "fact_sales_default"',
+            'ALTER TABLE "fact_sales_p202401_shadow" RENAME TO "fact_sales_p202401"',
+            'ALTER TABLE "fact_sales" ATTACH PARTITION "fact_sales_p202401" '
+            'FOR VALUES FROM (20240100) TO (20240200)',
+            'ALTER TABLE "fact_sales_p202401" DROP CONSTRAINT "fact_sales_p202401_shadow_bounds"',
+            'ALTER TABLE "fact_sales_p202402_shadow" RENAME TO "fact_sales_p202402"',
+            'ALTER TABLE "fact_sales" ATTACH PARTITION "fact_sales_p202402" '
+            'FOR VALUES FROM (20240200) TO (20240300)',
+            'ALTER TABLE "fact_sales_p202402" DROP CONSTRAINT "fact_sales_p202402_shadow_bounds"',
+        ]
+    
+    def test_swap_reload_failure_drops_shadows(self, loader, statements):
+        """Тест що невдале перезавантаження прибирає shadow таблиці і не чіпає партиції."""
+        manager = FactPartitionManager(loader)
+        
+        def failing_chunks():
+            yield fact_rows([20240105])
+            raise RuntimeError("extract failed")
+        
+        with pytest.raises(RuntimeError):
+            manager.swap_reload(failing_chunks())
+        
+        assert statements[-1] == 'DROP TABLE IF EXISTS "fact_sales_p202401_shadow"'
+        assert not any('ATTACH' in sql or 'DETACH' in sql for sql in statements)
+    
+    def test_swap_reload_failure_keeps_shadows(self, loader, statements):
+        """Тест що з keep_shadows shadow таблиці залишаються для продовження."""
+        manager = FactPartitionManager(loader)
+        
+        def failing_chunks():
+            yield fact_rows([20240105])
+            raise RuntimeError("extract failed")
+        
+        with pytest.raises(RuntimeError):
+            manager.swap_reload(failing_chunks(), keep_shadows=True)
+        
+        # Єдине видалення - перед створенням shadow таблиці
+        assert statements.count('DROP TABLE IF EXISTS "fact_sales_p202401_shadow"') == 1
+        assert not any('ATTACH' in sql or 'DETACH' in sql for sql in statements)
+    
+    def test_resume_shadows(self, loader, statements):
+        """Тест що продовження обрізає shadow таблицю дня продовження і видаляє пізніші."""
+        connection = loader.engine.begin.return_value.__enter__.return_value
+        connection.shadows = [
+            'fact_sales_p202401_shadow', 'fact_sales_p202402_shadow',
+            'fact_sales_p202403_shadow', 'fact_sales_p2024_backup_shadow'
+        ]
+        manager = FactPartitionManager(loader)
+        
+        shadows, kept = manager.resume_shadows(20240215)
+        
+        assert shadows == {202401: 'fact_sales_p202401_shadow', 202402: 'fact_sales_p202402_shadow'}
+        assert kept == 20
+        assert 'DELETE FROM "fact_sales_p202402_shadow" WHERE "date_key" >= :from_date_key' in statements
+        assert 'DROP TABLE "fact_sales_p202403_shadow"' in statements
+        assert not any('fact_sales_p202401_shadow' in sql and 'DELETE' in sql for sql in statements)
+    
+    def test_swap_reload_continues_shadows(self, loader, statements):
+        """Тест що передані shadow таблиці доповнюються, а не створюються заново."""
+        manager = FactPartitionManager(loader)
+        
+        total = manager.swap_reload(
+            [fact_rows([20240215, 20240301])],
+            shadows={202402: 'fact_sales_p202402_shadow'}
+        )
+        
+        assert total == 2
+        assert not any('CREATE TABLE "fact_sales_p202402_shadow"' in sql for sql in statements)
+        assert any('CREATE TABLE "fact_sales_p202403_shadow"' in sql for sql in statements)
+        assert 'BULK fact_sales_p202402_shadow 1' in statements
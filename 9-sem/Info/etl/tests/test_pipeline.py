@@ -4,13 +4,18 @@
 Перевіряє коректність оркестрації ETL процесу.
 """
 
+import threading
+
 import pytest
 import pandas as pd
 from datetime import datetime
-from unittest.mock import Mock, patch, MagicMock, call
+from unittest.mock import ANY, Mock, patch, MagicMock, call
 
+from etl.backfill import backfill_windows
+from etl.checkpoints import ChunkProgress
 from etl.config import ETLConfig, MySQLConfig, PostgreSQLConfig
-from etl.pipeline import ETLPipeline
+from etl.metrics import track_round_trips
+from etl.pipeline import ETLPipeline, ETLStageError, Stage, StageExecutor, StageSkippedError
 
 
 @pytest.fixture
@@ -148,11 +153,48 @@ class TestETLPipeline:
         pipeline = ETLPipeline(etl_config)
         
         assert pipeline.config == etl_config
-        mock_orders_extractor.assert_called_once_with(etl_config.orders_db)
-        mock_catalog_extractor.assert_called_once_with(etl_config.catalog_db)
-        mock_payments_extractor.assert_called_once_with(etl_config.payments_db)
+        mock_orders_extractor.assert_called_once_with(
+            etl_config.orders_db, staging=None, pushdown=None, shards=etl_config.extract_shards, governor=None,
+            on_engine=track_round_trips
+        )
+        mock_catalog_extractor.assert_called_once_with(
+            etl_config.catalog_db, staging=None, pushdown=None, on_engine=track_round_trips
+        )
+        mock_payments_extractor.assert_called_once_with(
+            etl_config.payments_db, staging=None, on_engine=track_round_trips
+        )
         mock_transformer.assert_called_once()
-        mock_loader.assert_called_once_with(etl_config.dwh_db)
+        mock_loader.assert_called_once_with(
+            etl_config.dwh_db, load_method=etl_config.load_method, governor=None, on_engine=track_round_trips
+        )
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_init_pushdown(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест передачі схеми pushdown екстракторам та трансформеру."""
+        etl_config.pushdown = True
+        pipeline = ETLPipeline(etl_config)
+        
+        assert 'fact_sales' in pipeline.pushdown.tables
+        mock_orders_extractor.assert_called_once_with(
+            etl_config.orders_db, staging=None, pushdown=pipeline.pushdown, shards=1, governor=None,
+            on_engine=track_round_trips
+        )
+        mock_catalog_extractor.assert_called_once_with(
+            etl_config.catalog_db, staging=None, pushdown=pipeline.pushdown, on_engine=track_round_trips
+        )
+        assert mock_transformer.call_args.kwargs['pushdown'] is True
     
     @patch('etl.pipeline.Loader')
     @patch('etl.pipeline.DataTransformer')
@@ -200,13 +242,13 @@ class TestETLPipeline:
         
         # Mock loader instance
         mock_loader_instance = Mock()
-        mock_loader_instance.load_dimension.return_value = len(sample_regions_df)
+        mock_loader_instance.sync_dimension.return_value = {'inserted': len(sample_regions_df), 'updated': 0, 'unchanged': 0}
         pipeline.loader = mock_loader_instance
         
         result = pipeline._load_dim_region()
         
         mock_extractor_instance.extract_regions.assert_called_once()
-        mock_loader_instance.load_dimension.assert_called_once()
+        mock_loader_instance.sync_dimension.assert_called_once()
         assert result == len(sample_regions_df)
     
     @patch('etl.pipeline.Loader')
@@ -233,14 +275,15 @@ class TestETLPipeline:
         pipeline.catalog_extractor = mock_catalog_instance
         
         mock_loader_instance = Mock()
-        mock_loader_instance.load_dimension.return_value = len(sample_categories_df)
+        mock_loader_instance.sync_dimension.return_value = {'inserted': 1, 'updated': 1, 'unchanged': 1}
         pipeline.loader = mock_loader_instance
         
         result = pipeline._load_dim_category()
         
         mock_catalog_instance.extract_categories.assert_called_once()
-        mock_loader_instance.load_dimension.assert_called_once()
-        assert result == len(sample_categories_df)
+        mock_loader_instance.sync_dimension.assert_called_once()
+        assert mock_loader_instance.sync_dimension.call_args.args[1:] == ('dim_category', 'category_id')
+        assert result == 2
     
     @patch('etl.pipeline.Loader')
     @patch('etl.pipeline.DataTransformer')
@@ -261,12 +304,13 @@ class TestETLPipeline:
         pipeline = ETLPipeline(etl_config)
         pipeline.catalog_extractor.extract_products.return_value = sample_products_df
         pipeline.transformer.transform_products.return_value = sample_products_df
+        pipeline.loader.sync_dimension.return_value = {'inserted': 1, 'updated': 0, 'unchanged': 2}
         
-        pipeline._load_dim_product()
+        assert pipeline._load_dim_product() == 1
         
         pipeline.catalog_extractor.extract_products.assert_called_once()
         pipeline.transformer.transform_products.assert_called_once_with(sample_products_df)
-        pipeline.loader.load_dimension.assert_called_once()
+        pipeline.loader.sync_dimension.assert_called_once()
     
     @patch('etl.pipeline.Loader')
     @patch('etl.pipeline.DataTransformer')
@@ -287,12 +331,13 @@ class TestETLPipeline:
         pipeline = ETLPipeline(etl_config)
         pipeline.orders_extractor.extract_customers.return_value = sample_customers_df
         pipeline.transformer.transform_customers.return_value = sample_customers_df
+        pipeline.loader.sync_dimension.return_value = {'inserted': 0, 'updated': 0, 'unchanged': 3}
         
-        pipeline._load_dim_customer()
+        assert pipeline._load_dim_customer() == 0
         
         pipeline.orders_extractor.extract_customers.assert_called_once()
         pipeline.transformer.transform_customers.assert_called_once_with(sample_customers_df)
-        pipeline.loader.load_dimension.assert_called_once()
+        pipeline.loader.sync_dimension.assert_called_once()
     
     @patch('etl.pipeline.Loader')
     @patch('etl.pipeline.DataTransformer')
@@ -312,11 +357,12 @@ class TestETLPipeline:
         """Тест завантаження dim_employee."""
         pipeline = ETLPipeline(etl_config)
         pipeline.orders_extractor.extract_employees.return_value = sample_employees_df
+        pipeline.loader.sync_dimension.return_value = {'inserted': 2, 'updated': 0, 'unchanged': 0}
         
         pipeline._load_dim_employee()
         
         pipeline.orders_extractor.extract_employees.assert_called_once()
-        pipeline.loader.load_dimension.assert_called_once()
+        pipeline.loader.sync_dimension.assert_called_once()
     
     @patch('etl.pipeline.Loader')
     @patch('etl.pipeline.DataTransformer')
@@ -333,19 +379,108 @@ class TestETLPipeline:
         etl_config,
         sample_orders_df
     ):
-        """Тест завантаження fact_sales."""
+        """Тест завантаження непартиціонованої fact_sales."""
         pipeline = ETLPipeline(etl_config)
+        pipeline.partitions = Mock()
+        pipeline.partitions.is_partitioned.return_value = False
         pipeline.orders_extractor.extract_orders.return_value = sample_orders_df
         
         transformed_df = sample_orders_df.copy()
         transformed_df['revenue'] = 200.0
         pipeline.transformer.transform_orders.return_value = transformed_df
+        pipeline.key_resolver = Mock()
+        pipeline.aggregates = Mock()
         
         pipeline._load_fact_sales()
         
         pipeline.orders_extractor.extract_orders.assert_called_once()
         pipeline.transformer.transform_orders.assert_called_once_with(sample_orders_df)
-        pipeline.loader.load_fact_sales.assert_called_once()
+        pipeline.key_resolver.resolve.assert_called_once_with(transformed_df)
+        pipeline.loader.load_fact_sales.assert_called_once_with(
+            pipeline.key_resolver.resolve.return_value,
+            if_exists='append'
+        )
+        pipeline.aggregates.rebuild.assert_called_once()
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_load_fact_sales_streaming(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест потокового завантаження fact_sales чанками batch_size."""
+        etl_config.streaming = True
+        etl_config.batch_size = 500
+        pipeline = ETLPipeline(etl_config)
+        pipeline.partitions = Mock()
+        pipeline.partitions.is_partitioned.return_value = False
+        pipeline.key_resolver = Mock()
+        pipeline.key_resolver.resolve.side_effect = lambda chunk: chunk.assign(resolved=True)
+        chunks = [
+            pd.DataFrame({'order_id': ['o1'], 'date_key': [20240101]}),
+            pd.DataFrame({'order_id': ['o2'], 'date_key': [20240102]})
+        ]
+        pipeline.orders_extractor.extract_orders.return_value = iter(chunks)
+        pipeline.transformer.transform_orders_stream.side_effect = lambda stream: iter(list(stream))
+        pipeline.loader.load_fact_sales_stream.side_effect = lambda stream: sum(len(c) for c in stream)
+        
+        result = pipeline._load_fact_sales()
+        
+        assert result == 2
+        pipeline.loader.truncate_table.assert_called_once_with('fact_sales')
+        pipeline.orders_extractor.extract_orders.assert_called_once_with(chunksize=500)
+        pipeline.transformer.transform_orders_stream.assert_called_once()
+        # Ключі резолвляться для кожного чанку по ходу потоку
+        assert pipeline.key_resolver.resolve.call_count == 2
+        pipeline.transformer.transform_orders.assert_not_called()
+        
+        # Кожен крок потоку вимірюється окремо
+        metrics = {(m.stage, m.step): m for m in pipeline.metrics.metrics}
+        assert metrics[('fact_sales', 'extract')].rows == 2
+        assert metrics[('fact_sales', 'resolve_keys')].rows == 2
+        assert metrics[('fact_sales', 'load')].rows == 2
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_load_fact_sales_partition_swap(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config,
+        sample_orders_df
+    ):
+        """Тест що партиціонована fact_sales перезавантажується підміною партицій."""
+        pipeline = ETLPipeline(etl_config)
+        pipeline.partitions = Mock()
+        pipeline.partitions.is_partitioned.return_value = True
+        pipeline.partitions.swap_reload.side_effect = lambda chunks: sum(len(c) for c in chunks)
+        pipeline.orders_extractor.extract_orders.return_value = sample_orders_df
+        pipeline.key_resolver = Mock()
+        pipeline.key_resolver.resolve.return_value = sample_orders_df
+        
+        result = pipeline._load_fact_sales()
+        
+        assert result == 2
+        pipeline.key_resolver.resolve.assert_called_once_with(
+            pipeline.transformer.transform_orders.return_value
+        )
+        # Таблиця не очищується - дашборди бачать старі дані до підміни
+        pipeline.loader.truncate_table.assert_not_called()
+        pipeline.loader.load_fact_sales.assert_not_called()
     
     @patch('etl.pipeline.Loader')
     @patch('etl.pipeline.DataTransformer')
@@ -433,3 +568,768 @@ class TestETLPipeline:
                 
                 # Перевіряємо що cleanup викликано
                 pipeline._cleanup.assert_called_once()
+
+
+class TestStageExecutor:
+    """Тести для StageExecutor."""
+    
+    def test_runs_stages_after_dependencies(self):
+        """Тест що стадія стартує лише після своїх залежностей."""
+        finished = []
+        
+        def make(name, count):
+            def func():
+                finished.append(name)
+                return count
+            return func
+        
+        executor = StageExecutor([
+            Stage('fact', make('fact', 10), ('dim_a', 'dim_b')),
+            Stage('dim_a', make('dim_a', 1)),
+            Stage('dim_b', make('dim_b', 2), ('dim_a',)),
+        ], max_workers=2)
+        
+        results, errors = executor.run()
+        
+        assert errors == {}
+        assert results == {'dim_a': 1, 'dim_b': 2, 'fact': 10}
+        assert finished == ['dim_a', 'dim_b', 'fact']
+    
+    def test_independent_stages_run_concurrently(self):
+        """Тест що незалежні стадії виконуються одночасно."""
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def func():
+            barrier.wait()
+            return 1
+        
+        executor = StageExecutor([Stage('a', func), Stage('b', func)], max_workers=2)
+        
+        results, errors = executor.run()
+        
+        assert errors == {}
+        assert results == {'a': 1, 'b': 1}
+    
+    def test_failure_skips_dependents(self):
+        """Тест що залежні від невдалої стадії стадії пропускаються."""
+        def fail():
+            raise RuntimeError("boom")
+        
+        executor = StageExecutor([
+            Stage('dim', fail),
+            Stage('other', lambda: 5),
+            Stage('fact', lambda: 10, ('dim',)),
+        ])
+        
+        results, errors = executor.run()
+        
+        assert results == {'other': 5}
+        assert isinstance(errors['dim'], RuntimeError)
+        assert isinstance(errors['fact'], StageSkippedError)
+    
+    def test_unknown_dependency(self):
+        """Тест помилки при невідомій залежності."""
+        with pytest.raises(ValueError, match="невідомих стадій"):
+            StageExecutor([Stage('fact', lambda: 0, ('missing',))])
+    
+    def test_cycle_detection(self):
+        """Тест виявлення циклічних залежностей."""
+        with pytest.raises(ValueError, match="циклічні"):
+            StageExecutor([
+                Stage('a', lambda: 0, ('b',)),
+                Stage('b', lambda: 0, ('a',)),
+            ])
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_run_full_load_reports_stage_errors(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що ETLStageError містить результати та помилки стадій."""
+        pipeline = ETLPipeline(etl_config)
+        
+        with patch.object(pipeline, '_load_dim_date', return_value=730), \
+             patch.object(pipeline, '_load_dim_region', side_effect=RuntimeError("db down")), \
+             patch.object(pipeline, '_load_dim_category', return_value=5), \
+             patch.object(pipeline, '_load_dim_product', return_value=50), \
+             patch.object(pipeline, '_load_dim_customer', return_value=100), \
+             patch.object(pipeline, '_load_dim_employee', return_value=10), \
+             patch.object(pipeline, '_load_fact_sales', return_value=1000) as mock_fact:
+            with pytest.raises(ETLStageError) as exc_info:
+                pipeline.run_full_load()
+        
+        error = exc_info.value
+        assert error.results == {'dim_date': 730, 'dim_category': 5, 'dim_product': 50}
+        assert set(error.errors) == {'dim_region', 'dim_customer', 'dim_employee', 'fact_sales'}
+        mock_fact.assert_not_called()
+
+
+class TestIncrementalLoad:
+    """Тести для інкрементального завантаження з watermark'ами."""
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_dimension_uses_watermark(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що вимір витягується від watermark і зсуває його після запису."""
+        pipeline = ETLPipeline(etl_config)
+        pipeline.watermarks = Mock()
+        since = datetime(2024, 1, 1)
+        pipeline.watermarks.get.return_value = since
+        
+        df = pd.DataFrame({
+            'customer_id': ['cust1', 'cust2'],
+            'updated_at': pd.to_datetime(['2024-01-02', '2024-01-05'])
+        })
+        extract = Mock(return_value=df)
+        pipeline.loader.sync_dimension.return_value = {'inserted': 1, 'updated': 1, 'unchanged': 0}
+        
+        result = pipeline._load_dimension_incremental(
+            'dim_customer', extract, lambda d: d, 'customer_id', 'updated_at'
+        )
+        
+        assert result == 2
+        extract.assert_called_once_with(since)
+        pipeline.loader.sync_dimension.assert_called_once_with(df, 'dim_customer', 'customer_id')
+        pipeline.watermarks.set.assert_called_once_with('dim_customer', pd.Timestamp('2024-01-05'))
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_dimensions_without_updated_at_sync_fully(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що категорії та співробітники витягуються повністю: created_at не бачить змін."""
+        pipeline = ETLPipeline(etl_config)
+        pipeline.watermarks = Mock()
+        sources = pipeline._incremental_dimensions()
+        
+        for name in ('dim_region', 'dim_category', 'dim_employee'):
+            assert sources[name].watermark_column is None
+        pipeline._load_dimension_incremental('dim_employee', *(
+            getattr(sources['dim_employee'], field)
+            for field in ('extract', 'transform', 'key_column', 'watermark_column')
+        ))
+        
+        pipeline.orders_extractor.extract_employees.assert_called_once_with(None)
+        pipeline.watermarks.get.assert_not_called()
+        pipeline.watermarks.set.assert_not_called()
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_dimension_without_changes(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що без змін нічого не записується і watermark не змінюється."""
+        pipeline = ETLPipeline(etl_config)
+        pipeline.watermarks = Mock()
+        
+        result = pipeline._load_dimension_incremental(
+            'dim_product', Mock(return_value=pd.DataFrame()), lambda d: d, 'product_id', 'updated_at'
+        )
+        
+        assert result == 0
+        pipeline.loader.sync_dimension.assert_not_called()
+        pipeline.watermarks.set.assert_not_called()
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_fact_sales_from_watermark(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config,
+        sample_orders_df
+    ):
+        """Тест інкрементального fact_sales від watermark з заміною рядків."""
+        pipeline = ETLPipeline(etl_config)
+        pipeline.watermarks = Mock()
+        since = datetime(2024, 1, 1)
+        pipeline.watermarks.get.return_value = since
+        
+        sample_orders_df['updated_at'] = pd.to_datetime(['2024-01-01 10:00', '2024-01-02 09:00'])
+        pipeline.orders_extractor.extract_orders.return_value = sample_orders_df
+        pipeline.loader.replace_fact_rows.return_value = 2
+        pipeline.key_resolver = MagicMock()
+        pipeline.partitions = Mock()
+        pipeline.partitions.is_partitioned.return_value = False
+        pipeline.aggregates = Mock()
+        
+        result = pipeline._load_fact_sales_incremental()
+        
+        assert result == 2
+        pipeline.orders_extractor.extract_orders.assert_called_once_with(None, None, since=since, ordered=False)
+        pipeline.loader.replace_fact_rows.assert_called_once_with(
+            pipeline.key_resolver.resolve.return_value,
+            partition_column=None
+        )
+        pipeline.loader.load_fact_sales.assert_not_called()
+        # Зведення перераховуються для днів записаних фактів
+        pipeline.aggregates.refresh.assert_called_once_with(
+            pipeline.key_resolver.resolve.return_value.__getitem__.return_value
+        )
+        pipeline.watermarks.set.assert_called_once_with('fact_sales', pd.Timestamp('2024-01-02 09:00'))
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_fact_sales_explicit_period(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config,
+        sample_orders_df
+    ):
+        """Тест що явний період не читає і не зсуває watermark."""
+        pipeline = ETLPipeline(etl_config)
+        pipeline.watermarks = Mock()
+        pipeline.orders_extractor.extract_orders.return_value = sample_orders_df
+        pipeline.key_resolver = MagicMock()
+        pipeline.partitions = Mock()
+        pipeline.partitions.is_partitioned.return_value = True
+        resolved = pipeline.key_resolver.resolve.return_value
+        start_date, end_date = datetime(2024, 1, 1), datetime(2024, 1, 2)
+        
+        pipeline._load_fact_sales_incremental(start_date, end_date)
+        
+        pipeline.orders_extractor.extract_orders.assert_called_once_with(start_date, end_date, since=None, ordered=False)
+        # Перезаписуються лише партиції місяців пакета
+        pipeline.partitions.ensure_partitions.assert_called_once_with(resolved.__getitem__.return_value)
+        resolved.__getitem__.assert_called_with('date_key')
+        pipeline.loader.replace_fact_rows.assert_called_once_with(resolved, partition_column='date_key')
+        pipeline.watermarks.get.assert_not_called()
+        pipeline.watermarks.set.assert_not_called()
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_run_incremental_load_covers_dimensions(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що інкрементальне завантаження охоплює виміри та fact_sales."""
+        pipeline = ETLPipeline(etl_config)
+        
+        with patch.object(pipeline, '_load_dimension_incremental', return_value=1) as mock_dim, \
+             patch.object(pipeline, '_load_fact_sales_incremental', return_value=10) as mock_fact:
+            results = pipeline.run_incremental_load()
+        
+        assert results == {
+            'dim_region': 1, 'dim_category': 1, 'dim_product': 1,
+            'dim_customer': 1, 'dim_employee': 1, 'fact_sales': 10
+        }
+        assert mock_dim.call_count == 5
+        mock_fact.assert_called_once_with(None, None)
+        assert results.metrics.run_type == 'incremental'
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_run_publishes_metrics(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config,
+        tmp_path
+    ):
+        """Тест що метрики запуску записуються у файли та DWH."""
+        etl_config.metrics_dir = str(tmp_path)
+        pipeline = ETLPipeline(etl_config)
+        pipeline.metrics_store = Mock()
+        pipeline.orders_extractor.extract_regions.return_value = pd.DataFrame({'region_id': [1, 2, 3]})
+        pipeline.loader.sync_dimension.return_value = {'inserted': 2, 'updated': 1, 'unchanged': 0}
+        
+        with patch.object(pipeline, '_load_fact_sales_incremental', return_value=0):
+            results = pipeline.run_incremental_load()
+        
+        metrics = {(m.stage, m.step): m for m in results.metrics.metrics}
+        assert metrics[('dim_region', 'load')].rows == 3
+        pipeline.metrics_store.save.assert_called_once_with(results.metrics)
+        assert (tmp_path / 'etl_metrics.json').exists()
+        assert 'etl_stage_wall_seconds{' in (tmp_path / 'etl_metrics.prom').read_text()
+
+
+class TestResume:
+    """Тести для продовження перерваних запусків з контрольних точок."""
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_resume_skips_completed_stages(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що продовження пропускає стадії, завершені в попередній спробі."""
+        first_attempt = datetime(2024, 3, 1, 2, 0)
+        pipeline = ETLPipeline(etl_config)
+        pipeline.watermarks = Mock()
+        pipeline.checkpoints = Mock()
+        pipeline.checkpoints.start_run.return_value = first_attempt
+        pipeline.checkpoints.completed_stages.return_value = {'dim_date': 730, 'dim_region': 5}
+        
+        loads = {
+            name: patch.object(pipeline, f'_load_{name}', return_value=1)
+            for name in ('dim_date', 'dim_region', 'dim_category', 'dim_product',
+                         'dim_customer', 'dim_employee', 'fact_sales')
+        }
+        mocks = {name: patcher.start() for name, patcher in loads.items()}
+        try:
+            results = pipeline.run_full_load(resume=True)
+        finally:
+            patch.stopall()
+        
+        mocks['dim_date'].assert_not_called()
+        mocks['dim_region'].assert_not_called()
+        mocks['fact_sales'].assert_called_once()
+        assert results['dim_date'] == 730
+        assert results['fact_sales'] == 1
+        pipeline.checkpoints.start_run.assert_called_once_with('full', True)
+        pipeline.checkpoints.complete_stage.assert_any_call('full', 'fact_sales', 1, first_attempt)
+        pipeline.checkpoints.finish_run.assert_called_once_with('full')
+        # Watermark'и зсуваються на початок першої спроби
+        pipeline.watermarks.set.assert_any_call('fact_sales', first_attempt)
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_failed_run_keeps_checkpoints(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що невдалий запуск зберігає контрольні точки завершених стадій."""
+        pipeline = ETLPipeline(etl_config)
+        pipeline.checkpoints = Mock()
+        
+        with patch.object(pipeline, '_load_dim_date', return_value=730), \
+             patch.object(pipeline, '_load_dim_region', side_effect=Exception("Test error")):
+            with pytest.raises(ETLStageError):
+                pipeline.run_full_load()
+        
+        pipeline.checkpoints.complete_stage.assert_any_call('full', 'dim_date', 730, ANY)
+        stages = [c.args[1] for c in pipeline.checkpoints.complete_stage.call_args_list]
+        assert 'dim_region' not in stages
+        pipeline.checkpoints.finish_run.assert_not_called()
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_streaming_full_resume_partitioned(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що потокове повне завантаження продовжується з тіньових партицій."""
+        etl_config.streaming = True
+        etl_config.batch_size = 500
+        pipeline = ETLPipeline(etl_config)
+        pipeline.checkpoints = Mock()
+        pipeline.checkpoints.chunk_progress.return_value = ChunkProgress(3, 300, 20240101, 20240215)
+        pipeline._resume = True
+        shadows = {202401: 'fact_sales_p202401_shadow', 202402: 'fact_sales_p202402_shadow'}
+        pipeline.partitions = Mock()
+        pipeline.partitions.is_partitioned.return_value = True
+        pipeline.partitions.resume_shadows.return_value = (shadows, 250)
+        pipeline.partitions.swap_reload.side_effect = lambda chunks, **kwargs: sum(len(c) for c in chunks)
+        pipeline.key_resolver = Mock()
+        pipeline.key_resolver.resolve.side_effect = lambda chunk: chunk
+        pipeline.orders_extractor.extract_orders.return_value = iter([
+            pd.DataFrame({'order_id': ['o1', 'o2'], 'date_key': [20240215, 20240216]}),
+            pd.DataFrame({'order_id': ['o3'], 'date_key': [20240301]})
+        ])
+        pipeline.transformer.transform_orders_stream.side_effect = lambda stream: iter(list(stream))
+        
+        result = pipeline._load_fact_sales_full()
+        
+        assert result == 253
+        pipeline.partitions.resume_shadows.assert_called_once_with(20240215)
+        pipeline.orders_extractor.extract_orders.assert_called_once_with(
+            datetime(2024, 2, 15), chunksize=500
+        )
+        assert pipeline.partitions.swap_reload.call_args.kwargs == {'shadows': shadows, 'keep_shadows': True}
+        # Нумерація чанків продовжується після записаних
+        pipeline.checkpoints.complete_chunk.assert_has_calls([
+            call('full', 'fact_sales', 4, 2, 20240215, 20240216, None, 1),
+            call('full', 'fact_sales', 5, 1, 20240301, 20240301, None, 1),
+        ])
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_streaming_incremental_resume(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що потокове інкрементальне завантаження продовжується з дня останнього чанку."""
+        etl_config.streaming = True
+        etl_config.batch_size = 500
+        since = datetime(2024, 1, 1)
+        checkpoint_watermark = datetime(2024, 1, 3, 12, 0)
+        pipeline = ETLPipeline(etl_config)
+        pipeline.checkpoints = Mock()
+        pipeline.checkpoints.chunk_progress.return_value = ChunkProgress(
+            2, 100, 20240101, 20240103, checkpoint_watermark, resume_day_rows=30
+        )
+        pipeline._run_type = 'incremental'
+        pipeline._resume = True
+        pipeline.watermarks = Mock()
+        pipeline.watermarks.get.return_value = since
+        pipeline.partitions = Mock()
+        pipeline.partitions.is_partitioned.return_value = False
+        pipeline.aggregates = Mock()
+        pipeline.key_resolver = Mock()
+        pipeline.key_resolver.resolve.side_effect = lambda chunk: chunk
+        pipeline.orders_extractor.extract_orders.return_value = iter([pd.DataFrame({
+            'order_id': ['o1'],
+            'date_key': [20240104],
+            'updated_at': pd.to_datetime(['2024-01-04 09:00'])
+        })])
+        pipeline.transformer.transform_orders_stream.side_effect = lambda stream: iter(list(stream))
+        pipeline.loader.load_fact_sales_stream.side_effect = (
+            lambda stream, **kwargs: sum(len(c) for c in stream)
+        )
+        
+        result = pipeline._load_fact_sales_incremental()
+        
+        # 30 рядків дня продовження витягуються заново і не враховуються двічі
+        assert result == 71
+        pipeline.orders_extractor.extract_orders.assert_called_once_with(
+            datetime(2024, 1, 3), None, chunksize=500, since=since
+        )
+        refreshed = pipeline.aggregates.refresh.call_args.args[0]
+        assert sorted(set(refreshed)) == [20240101, 20240102, 20240103, 20240104]
+        pipeline.checkpoints.complete_chunk.assert_called_once_with(
+            'incremental', 'fact_sales', 3, 1, 20240104, 20240104, pd.Timestamp('2024-01-04 09:00'), 1
+        )
+        pipeline.watermarks.set.assert_called_once_with('fact_sales', pd.Timestamp('2024-01-04 09:00'))
+
+
+class TestBackfill:
+    """Тести для завантаження вікон backfill."""
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_window_loads_only_selected_stages(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що вікно backfill завантажує лише fact_sales з власними контрольними точками."""
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 7, 23, 59, 59)
+        pipeline = ETLPipeline(etl_config)
+        pipeline.checkpoints = Mock()
+        
+        with patch.object(pipeline, '_load_dimension_incremental') as mock_dim, \
+             patch.object(pipeline, '_load_fact_sales_incremental', return_value=10) as mock_fact:
+            results = pipeline.run_incremental_load(start, end, stages=('fact_sales',))
+        
+        assert results == {'fact_sales': 10}
+        mock_dim.assert_not_called()
+        mock_fact.assert_called_once_with(start, end)
+        pipeline.checkpoints.start_run.assert_called_once_with('20240101-20240107', False)
+        pipeline.checkpoints.finish_run.assert_called_once_with('20240101-20240107')
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_unknown_stage(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест помилки для невідомої стадії."""
+        pipeline = ETLPipeline(etl_config)
+        pipeline.checkpoints = Mock()
+        
+        with pytest.raises(ValueError, match='dim_date'):
+            pipeline.run_incremental_load(stages=('dim_date',))
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_prepare_backfill_creates_partitions(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config
+    ):
+        """Тест що партиції всього періоду створюються до паралельних вікон."""
+        pipeline = ETLPipeline(etl_config)
+        pipeline.partitions = Mock()
+        pipeline.partitions.is_partitioned.return_value = True
+        windows = backfill_windows(datetime(2024, 1, 29), datetime(2024, 3, 2), 'week')
+        
+        pipeline.prepare_backfill(windows)
+        
+        date_keys = pipeline.partitions.ensure_partitions.call_args.args[0]
+        assert date_keys.iloc[0] == 20240129
+        assert date_keys.iloc[-1] == 20240302
+        assert len(date_keys) == 34
+
+
+class TestHandoffStages:
+    """Тести для стадій extract/transform/load з передачею через файли."""
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_dimension_stages(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config,
+        sample_customers_df,
+        tmp_path
+    ):
+        """Тест що вимір проходить стадії через файли, а watermark зсувається лише після запису."""
+        etl_config.handoff_dir = str(tmp_path)
+        pipeline = ETLPipeline(etl_config)
+        pipeline.watermarks = Mock()
+        pipeline.metrics_store = Mock()
+        since = datetime(2024, 1, 1)
+        pipeline.watermarks.get.return_value = since
+        sample_customers_df['updated_at'] = pd.to_datetime(['2024-01-02', '2024-01-05'])
+        pipeline.orders_extractor.extract_customers.return_value = sample_customers_df
+        pipeline.transformer.transform_customers.side_effect = lambda df: df.assign(segment='retail')
+        pipeline.loader.sync_dimension.return_value = {'inserted': 1, 'updated': 1, 'unchanged': 0}
+        handoff = pipeline.handoff('manual__2024-01-06')
+        
+        extracted = pipeline.extract_stage('dim_customer', handoff)
+        transformed = pipeline.transform_stage(extracted, handoff)
+        pipeline.watermarks.set.assert_not_called()
+        result = pipeline.load_stage(transformed)
+        
+        assert result == 2
+        pipeline.orders_extractor.extract_customers.assert_called_once_with(since)
+        assert transformed.rows == 2
+        assert transformed.watermark == '2024-01-05T00:00:00'
+        loaded = pipeline.loader.sync_dimension.call_args.args[0]
+        assert loaded['segment'].tolist() == ['retail', 'retail']
+        pipeline.watermarks.set.assert_called_once_with('dim_customer', datetime(2024, 1, 5))
+        # Кожна стадія закриває з'єднання та публікує власні метрики
+        assert pipeline.loader.close.call_count == 3
+        assert pipeline.metrics_store.save.call_count == 3
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_fact_sales_stages(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config,
+        sample_orders_df,
+        tmp_path
+    ):
+        """Тест що fact_sales за період резолвить ключі та замінює рядки на стадії load."""
+        etl_config.handoff_dir = str(tmp_path)
+        pipeline = ETLPipeline(etl_config)
+        pipeline.watermarks = Mock()
+        pipeline.metrics_store = Mock()
+        pipeline.key_resolver = Mock()
+        pipeline.key_resolver.resolve.side_effect = lambda df: df.assign(date_key=[20240101, 20240102])
+        pipeline.partitions = Mock()
+        pipeline.partitions.is_partitioned.return_value = False
+        pipeline.aggregates = Mock()
+        sample_orders_df['updated_at'] = pd.to_datetime(['2024-01-01 10:00', '2024-01-02 09:00'])
+        pipeline.orders_extractor.extract_orders.return_value = sample_orders_df
+        pipeline.transformer.transform_orders_stream.side_effect = lambda chunks: (
+            chunk.assign(revenue=chunk['total_amount']) for chunk in chunks
+        )
+        written = []
+        
+        def load_stream(chunks, **kwargs):
+            written.extend(chunks)
+            return sum(len(chunk) for chunk in written)
+        
+        pipeline.loader.load_fact_sales_stream.side_effect = load_stream
+        handoff = pipeline.handoff('scheduled__2024-01-01T02:00:00+00:00')
+        start_date, end_date = datetime(2024, 1, 1), datetime(2024, 1, 2)
+        
+        extracted = pipeline.extract_stage('fact_sales', handoff, start_date, end_date)
+        transformed = pipeline.transform_stage(extracted, handoff)
+        pipeline.key_resolver.resolve.assert_not_called()
+        result = pipeline.load_stage(transformed)
+        
+        assert result == 2
+        pipeline.orders_extractor.extract_orders.assert_called_once_with(
+            start_date, end_date, since=None, ordered=False
+        )
+        assert written[0]['revenue'].tolist() == [190.0, 450.0]
+        assert pipeline.loader.load_fact_sales_stream.call_args.kwargs == {
+            'replace_existing': True, 'partition_column': None
+        }
+        pipeline.aggregates.refresh.assert_called_once_with([20240101, 20240102])
+        # Явний період не зсуває watermark
+        assert transformed.watermark is None
+        pipeline.watermarks.set.assert_not_called()
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_streaming_fact_sales_extract_unordered(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config,
+        sample_orders_df,
+        tmp_path
+    ):
+        """Тест що потокове витягування у файли передачі не впорядковує шарди."""
+        etl_config.handoff_dir = str(tmp_path)
+        etl_config.streaming = True
+        etl_config.batch_size = 500
+        pipeline = ETLPipeline(etl_config)
+        pipeline.watermarks = Mock()
+        pipeline.metrics_store = Mock()
+        sample_orders_df['updated_at'] = pd.to_datetime(['2024-01-01 10:00', '2024-01-02 09:00'])
+        pipeline.orders_extractor.extract_orders.return_value = iter([sample_orders_df])
+        start_date, end_date = datetime(2024, 1, 1), datetime(2024, 1, 2)
+        
+        extracted = pipeline.extract_stage('fact_sales', pipeline.handoff('run1'), start_date, end_date)
+        
+        assert extracted.rows == 2
+        pipeline.orders_extractor.extract_orders.assert_called_once_with(
+            start_date, end_date, chunksize=500, since=None, ordered=False
+        )
+    
+    @patch('etl.pipeline.Loader')
+    @patch('etl.pipeline.DataTransformer')
+    @patch('etl.pipeline.PaymentsExtractor')
+    @patch('etl.pipeline.CatalogExtractor')
+    @patch('etl.pipeline.OrdersExtractor')
+    def test_unknown_table(
+        self,
+        mock_orders_extractor,
+        mock_catalog_extractor,
+        mock_payments_extractor,
+        mock_transformer,
+        mock_loader,
+        etl_config,
+        tmp_path
+    ):
+        """Тест помилки для таблиці без стадій передачі."""
+        etl_config.handoff_dir = str(tmp_path)
+        pipeline = ETLPipeline(etl_config)
+        pipeline.metrics_store = Mock()
+        
+        with pytest.raises(ValueError, match='dim_date'):
+            pipeline.extract_stage('dim_date', pipeline.handoff('run1'))
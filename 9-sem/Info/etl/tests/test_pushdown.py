@@ -0,0 +1,96 @@
+"""
+Тести для модуля pushdown.
+
+Перевіряє виведення колонок витягування зі схеми DWH.
+"""
+
+import pytest
+
+from etl.pushdown import PushdownSchema, parse_dwh_schema
+
+
+SCHEMA_SQL = '''
+CREATE TABLE "dim_region" (
+  "region_key" int GENERATED BY DEFAULT AS IDENTITY,
+  "region_id" char(36) UNIQUE,
+  "name" varchar(100),
+  "code" varchar(10),
+  "updated_at" timestamp,
+  PRIMARY KEY ("region_key")
+);
+
+CREATE TABLE "fact_sales" (
+  "sales_key" BIGINT GENERATED BY DEFAULT AS IDENTITY,
+  "order_id" char(36),
+  "date_key" int NOT NULL,
+  "product_key" int,
+  "revenue" decimal(10,2),
+  PRIMARY KEY ("sales_key", "date_key")
+) PARTITION BY RANGE ("date_key");
+'''
+
+
+@pytest.fixture
+def schema_path(tmp_path):
+    """Фікстура з файлом скороченої схеми DWH."""
+    path = tmp_path / 'dwh_schema.sql'
+    path.write_text(SCHEMA_SQL, encoding='utf-8')
+    return path
+
+
+class TestParseDwhSchema:
+    """Тести для parse_dwh_schema."""
+    
+    def test_skips_identity_columns(self):
+        """Тест що identity ключі та обмеження не вважаються колонками."""
+        tables = parse_dwh_schema(SCHEMA_SQL)
+        
+        assert tables['dim_region'] == ['region_id', 'name', 'code', 'updated_at']
+        assert tables['fact_sales'] == ['order_id', 'date_key', 'product_key', 'revenue']
+
+
+class TestPushdownSchema:
+    """Тести для PushdownSchema."""
+    
+    def test_fact_sales_selects_business_ids(self, schema_path):
+        """Тест заміни surrogate ключів на business id та службового updated_at."""
+        columns = PushdownSchema(schema_path).columns('fact_sales')
+        
+        assert list(columns) == ['order_id', 'date_key', 'product_id', 'revenue', 'updated_at']
+        assert columns['product_id'] == 'oi.product_id'
+        assert columns['revenue'] == 'oi.unit_price * oi.quantity'
+        assert columns['updated_at'] == 'o.updated_at'
+    
+    def test_skips_columns_without_source(self, schema_path):
+        """Тест що колонка DWH без виразу джерела не вибирається."""
+        columns = PushdownSchema(schema_path).columns('dim_region')
+        
+        assert list(columns) == ['region_id', 'name', 'code']
+    
+    def test_select_list(self, schema_path):
+        """Тест списку SELECT з аліасами."""
+        select_list = PushdownSchema(schema_path).select_list('dim_region')
+        
+        assert select_list.split(',\n') == [
+            'id AS region_id',
+            '                name AS name',
+            '                code AS code',
+        ]
+    
+    def test_repository_schema(self):
+        """Тест що схема з репозиторію покриває всі таблиці pushdown."""
+        schema = PushdownSchema()
+        
+        assert 'description' not in schema.columns('dim_product')
+        assert 'sales_key' not in schema.columns('fact_sales')
+        assert set(schema.columns('fact_sales')) >= {
+            'order_id', 'order_item_id', 'date_key', 'product_id', 'customer_id',
+            'employee_id', 'region_id', 'quantity', 'revenue', 'discount_amount',
+            'cost', 'margin'
+        }
+        assert schema.columns('dim_customer')['email'] == 'LOWER(TRIM(c.email))'
+    
+    def test_missing_schema_file(self, tmp_path):
+        """Тест помилки для відсутнього файлу схеми."""
+        with pytest.raises(FileNotFoundError):
+            PushdownSchema(tmp_path / 'missing.sql')
@@ -0,0 +1,145 @@
+"""
+Тести для модуля sharding.
+
+Перевіряє планування діапазонів шардів та злиття їх чанків.
+"""
+
+import threading
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from etl.governor import MemoryGovernor
+from etl.sharding import DateShard, merge_shards, plan_date_shards
+
+
+def shard_reader(shard, chunks=2, started=None):
+    """Повертає функцію читання шарду з chunks чанків."""
+    def read():
+        if started is not None:
+            started.append(shard)
+        for chunk in range(chunks):
+            yield pd.DataFrame({'shard': [shard], 'chunk': [chunk]})
+    return read
+
+
+class TestPlanDateShards:
+    """Тести для plan_date_shards."""
+    
+    def test_equal_weight_ranges(self):
+        """Тест що межі ділять гістограму на частини однакової ваги."""
+        days = pd.Series(pd.date_range('2024-01-01', periods=8))
+        shards = plan_date_shards(days, [10] * 8, 4)
+        
+        assert shards == [
+            DateShard(None, datetime(2024, 1, 3)),
+            DateShard(datetime(2024, 1, 3), datetime(2024, 1, 5)),
+            DateShard(datetime(2024, 1, 5), datetime(2024, 1, 7)),
+            DateShard(datetime(2024, 1, 7), None),
+        ]
+    
+    def test_skewed_histogram(self):
+        """Тест що важкий день не ділиться і не дає порожніх шардів."""
+        days = pd.Series(['2024-01-01', '2024-01-02', '2024-01-03', None])
+        shards = plan_date_shards(days, [1, 100, 1, 50], 4)
+        
+        assert shards == [
+            DateShard(None, datetime(2024, 1, 2)),
+            DateShard(datetime(2024, 1, 2), datetime(2024, 1, 3)),
+            DateShard(datetime(2024, 1, 3), None),
+        ]
+    
+    def test_single_shard(self):
+        """Тест одного відкритого діапазону без даних або з shards=1."""
+        assert plan_date_shards(pd.Series([], dtype=object), [], 4) == [DateShard()]
+        assert plan_date_shards(pd.Series(['2024-01-01', '2024-01-02']), [1, 1], 1) == [DateShard()]
+
+
+class TestMergeShards:
+    """Тести для merge_shards."""
+    
+    def test_ordered_merge(self):
+        """Тест що впорядковане злиття видає чанки в порядку шардів."""
+        readers = [shard_reader(shard) for shard in range(5)]
+        
+        merged = pd.concat(merge_shards(readers, max_workers=2), ignore_index=True)
+        
+        assert merged['shard'].tolist() == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4]
+    
+    def test_unordered_merge(self):
+        """Тест що злиття без порядку видає всі чанки всіх шардів."""
+        readers = [shard_reader(shard, chunks=3) for shard in range(4)]
+        
+        merged = pd.concat(merge_shards(readers, max_workers=4, ordered=False), ignore_index=True)
+        
+        assert sorted(zip(merged['shard'], merged['chunk'])) == [
+            (shard, chunk) for shard in range(4) for chunk in range(3)
+        ]
+    
+    def test_ordered_merge_reads_waiting_shards(self):
+        """Тест що шарди, які чекають на свою чергу, дочитуються без споживача."""
+        finished = {shard: threading.Event() for shard in range(3)}
+        
+        def reader(shard):
+            def read():
+                for chunk in range(5):
+                    yield pd.DataFrame({'shard': [shard], 'chunk': [chunk]})
+                finished[shard].set()
+            return read
+        
+        merged = merge_shards([reader(shard) for shard in range(3)], max_workers=3)
+        first = next(merged)
+        
+        assert finished[1].wait(5) and finished[2].wait(5)
+        assert not finished[0].is_set()
+        rest = pd.concat([first, *merged], ignore_index=True)
+        assert list(zip(rest['shard'], rest['chunk'])) == [
+            (shard, chunk) for shard in range(3) for chunk in range(5)
+        ]
+    
+    def test_early_close_removes_spilled_chunks(self, tmp_path):
+        """Тест що закриття потоку видаляє скинуті чанки шардів."""
+        governor = MemoryGovernor(10 ** 12, batch_size=100, spill_dir=str(tmp_path))
+        done = threading.Event()
+        
+        def waiting():
+            for chunk in range(5):
+                yield pd.DataFrame({'shard': [1], 'chunk': [chunk]})
+            done.set()
+        
+        merged = merge_shards([shard_reader(0, chunks=3), waiting], max_workers=2, governor=governor)
+        next(merged)
+        assert done.wait(5)
+        merged.close()
+        
+        assert list(tmp_path.rglob('*.parquet')) == []
+        governor.close()
+    
+    def test_shard_error_propagates(self):
+        """Тест що помилка шарду передається споживачу."""
+        def failing():
+            yield pd.DataFrame({'shard': [1], 'chunk': [0]})
+            raise RuntimeError('connection lost')
+        
+        with pytest.raises(RuntimeError, match='connection lost'):
+            list(merge_shards([shard_reader(0), failing, shard_reader(2)], max_workers=2))
+    
+    def test_early_close_stops_shards(self):
+        """Тест що закриття потоку зупиняє читання решти шардів."""
+        started = []
+        closed = threading.Event()
+        
+        def endless():
+            try:
+                while True:
+                    yield pd.DataFrame({'shard': [0]})
+            finally:
+                closed.set()
+        
+        merged = merge_shards([endless, shard_reader(1, started=started)], max_workers=1)
+        next(merged)
+        merged.close()
+        
+        assert closed.is_set()
+        assert started == []
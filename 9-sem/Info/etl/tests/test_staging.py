@@ -0,0 +1,94 @@
+"""
+Тести для Staging модуля.
+
+Перевіряє content-addressed Parquet кеш та LRU витіснення.
+"""
+
+import os
+
+import pytest
+import pandas as pd
+
+from etl.staging import StagingCache
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def sample_df():
+    """Фікстура з прикладом витягнутих даних."""
+    return pd.DataFrame({
+        'customer_id': [1, 2, 3],
+        'email': ['a@example.com', 'b@example.com', None],
+        'updated_at': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03'])
+    })
+
+
+class TestStagingCache:
+    """Тести для StagingCache."""
+    
+    def test_put_get_roundtrip(self, tmp_path, sample_df):
+        """Тест що збережені дані читаються без змін."""
+        cache = StagingCache(tmp_path, 10 ** 6)
+        key = cache.query_key('customers', 'SELECT * FROM customers')
+        
+        cache.put(key, {'customers': 42}, sample_df)
+        
+        pd.testing.assert_frame_equal(cache.get(key, {'customers': 42}), sample_df)
+    
+    def test_miss_on_changed_checksum(self, tmp_path, sample_df):
+        """Тест що зміна контрольної суми джерела дає промах."""
+        cache = StagingCache(tmp_path, 10 ** 6)
+        key = cache.query_key('customers', 'SELECT * FROM customers')
+        cache.put(key, {'customers': 42}, sample_df)
+        
+        assert cache.get(key, {'customers': 43}) is None
+    
+    def test_query_key_depends_on_query_and_params(self, tmp_path):
+        """Тест що ключ враховує запит і параметри, але не пробіли."""
+        cache = StagingCache(tmp_path, 10 ** 6)
+        
+        base = cache.query_key('orders', 'SELECT *  FROM orders\n WHERE a = :a', {'a': 1})
+        
+        assert base == cache.query_key('orders', 'SELECT * FROM orders WHERE a = :a', {'a': 1})
+        assert base != cache.query_key('orders', 'SELECT * FROM orders WHERE a = :a', {'a': 2})
+        assert base.startswith('orders-')
+    
+    def test_offline_returns_latest_version(self, tmp_path, sample_df):
+        """Тест що offline режим повертає найсвіжішу версію запиту."""
+        cache = StagingCache(tmp_path, 10 ** 6)
+        key = cache.query_key('customers', 'SELECT * FROM customers')
+        old_path = cache.put(key, {'customers': 1}, sample_df.head(1))
+        os.utime(old_path, (1, 1))
+        cache.put(key, {'customers': 2}, sample_df)
+        
+        offline = StagingCache(tmp_path, 10 ** 6, offline=True)
+        
+        assert len(offline.get(key)) == 3
+        assert offline.get(offline.query_key('customers', 'SELECT 1')) is None
+    
+    def test_evicts_least_recently_used(self, tmp_path, sample_df):
+        """Тест LRU витіснення за бюджетом диска."""
+        cache = StagingCache(tmp_path, 10 ** 6)
+        keys = [cache.query_key(f't{i}', 'SELECT 1') for i in range(3)]
+        paths = [cache.put(key, 1, sample_df) for key in keys]
+        for i, path in enumerate(paths):
+            os.utime(path, (i + 1, i + 1))
+        
+        # Читання робить t0 найсвіжішим
+        cache.get(keys[0], 1)
+        cache.max_bytes = paths[0].stat().st_size * 2
+        
+        assert cache.evict() == 1
+        assert not paths[1].exists()
+        assert paths[0].exists() and paths[2].exists()
+        assert cache.size() <= cache.max_bytes
+    
+    def test_put_keeps_new_file_over_budget(self, tmp_path, sample_df):
+        """Тест що щойно записаний файл не витісняється."""
+        cache = StagingCache(tmp_path, 1)
+        first = cache.put(cache.query_key('a', 'SELECT 1'), 1, sample_df)
+        second = cache.put(cache.query_key('b', 'SELECT 1'), 1, sample_df)
+        
+        assert not first.exists()
+        assert second.exists()
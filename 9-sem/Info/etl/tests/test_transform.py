@@ -8,6 +8,7 @@ import pytest
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from decimal import Decimal
 
 from etl.transform import DataCleaner, DataTransformer
 
@@ -154,6 +155,16 @@ class TestDataCleaner:
         assert pd.api.types.is_datetime64_any_dtype(result['date_col'])
         assert pd.api.types.is_numeric_dtype(result['num_col'])
         assert pd.api.types.is_string_dtype(result['str_col'])
+    
+    def test_validate_data_types_inplace(self):
+        """Тест валідації без копіювання DataFrame."""
+        df = pd.DataFrame({'num_col': ['10', '20'], 'other': [1, 2]})
+        
+        cleaner = DataCleaner()
+        result = cleaner.validate_data_types(df, {'num_col': 'numeric'}, inplace=True)
+        
+        assert result is df
+        assert pd.api.types.is_numeric_dtype(df['num_col'])
 
 
 class TestDataTransformer:
@@ -179,6 +190,45 @@ class TestDataTransformer:
         assert result.loc[0, 'date_key'] == 20240101
         assert result.loc[1, 'date_key'] == 20240102
     
+    def test_transform_orders_keeps_input_unchanged(self, sample_orders_df):
+        """Тест що трансформація на місці не змінює вхідний DataFrame."""
+        original = sample_orders_df.copy()
+        
+        DataTransformer().transform_orders(sample_orders_df)
+        
+        pd.testing.assert_frame_equal(sample_orders_df, original)
+    
+    def test_transform_orders_compact_dtypes(self, sample_orders_df):
+        """Тест що компактний режим дає ті самі значення в менших dtype."""
+        pytest.importorskip('pyarrow')
+        orders = pd.concat([sample_orders_df] * 3, ignore_index=True)
+        orders['order_item_id'] = [f'item{i}' for i in range(len(orders))]
+        
+        regular = DataTransformer().transform_orders(orders)
+        compact = DataTransformer(compact_dtypes=True).transform_orders(orders)
+        
+        assert isinstance(compact['customer_id'].dtype, pd.CategoricalDtype)
+        assert compact['order_item_id'].dtype == pd.StringDtype('pyarrow')
+        assert compact['quantity'].dtype == np.int8
+        assert compact['date_key'].dtype == np.int32
+        assert compact['revenue'].dtype == np.float64
+        for column in regular.columns:
+            assert compact[column].astype(object).tolist() == regular[column].astype(object).tolist()
+    
+    def test_transform_orders_memory_report(self, sample_orders_df):
+        """Тест звіту про пам'ять по кроках трансформації."""
+        transformer = DataTransformer(compact_dtypes=True, track_memory=True)
+        transformer.transform_orders(sample_orders_df)
+        
+        steps = [entry['step'] for entry in transformer.memory_report]
+        assert steps == ['input', 'validated', 'compacted', 'derived']
+        assert all(entry['bytes'] > 0 and entry['rows'] == 2 for entry in transformer.memory_report)
+        
+        # Без track_memory звіт не збирається
+        untracked = DataTransformer(compact_dtypes=True)
+        untracked.transform_orders(sample_orders_df)
+        assert untracked.memory_report == []
+    
     def test_transform_orders_removes_duplicates(self):
         """Тест що трансформація видаляє дублікати."""
         df_with_dupes = pd.DataFrame({
@@ -201,6 +251,58 @@ class TestDataTransformer:
         
         assert len(result) == 1
     
+    def test_transform_orders_stream(self, sample_orders_df):
+        """Тест потокової трансформації замовлень."""
+        transformer = DataTransformer()
+        chunks = [sample_orders_df.iloc[:1], sample_orders_df.iloc[:0], sample_orders_df.iloc[1:]]
+        
+        result = list(transformer.transform_orders_stream(iter(chunks)))
+        
+        # Порожній чанк пропускається
+        assert len(result) == 2
+        assert [len(chunk) for chunk in result] == [1, 1]
+        assert result[1]['date_key'].tolist() == [20240102]
+    
+    def test_transform_orders_pushdown_matches_regular(self, sample_orders_df):
+        """Тест що pushdown (похідні поля з SQL) дає ті самі значення."""
+        regular = DataTransformer().transform_orders(sample_orders_df)
+        
+        # Так повертає рядки запит з pushdown виразами: DECIMAL як Decimal
+        revenue = [Decimal('200.00'), Decimal('450.00')]
+        extracted = pd.DataFrame({
+            'order_id': ['order1', 'order2'],
+            'order_item_id': ['item1', 'item2'],
+            'date_key': [20240101, 20240102],
+            'product_id': ['prod1', 'prod2'],
+            'customer_id': ['cust1', 'cust2'],
+            'employee_id': ['emp1', 'emp2'],
+            'region_id': ['reg1', 'reg2'],
+            'quantity': [2, 3],
+            'revenue': revenue,
+            'discount_amount': [Decimal('10.00'), Decimal('0.00')],
+            'cost': [Decimal('120.000'), Decimal('270.000')],
+            'margin': [Decimal('70.000'), Decimal('180.000')]
+        })
+        pushdown = DataTransformer(pushdown=True).transform_orders(extracted)
+        
+        assert extracted['revenue'].tolist() == revenue
+        pd.testing.assert_frame_equal(pushdown, regular[extracted.columns])
+    
+    def test_transform_customers_pushdown(self):
+        """Тест що в режимі pushdown клієнти лише приводяться до типів."""
+        extracted = pd.DataFrame({
+            'customer_id': ['cust1'],
+            'first_name': ['John'],
+            'last_name': ['Doe'],
+            'email': ['john@example.com'],
+            'updated_at': ['2024-01-01 10:00:00']
+        })
+        
+        result = DataTransformer(pushdown=True).transform_customers(extracted)
+        
+        assert list(result.columns) == list(extracted.columns)
+        assert result.loc[0, 'updated_at'] == pd.Timestamp('2024-01-01 10:00:00')
+    
     def test_transform_customers(self, sample_customers_df):
         """Тест трансформації клієнтів."""
         transformer = DataTransformer()
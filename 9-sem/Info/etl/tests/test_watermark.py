@@ -0,0 +1,77 @@
+"""
+Тести для Watermark модуля.
+
+Перевіряє збереження та читання watermark'ів інкрементального витягування.
+"""
+
+import pytest
+import pandas as pd
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from etl.watermark import WatermarkStore, WATERMARK_TABLE
+
+
+@pytest.fixture
+def mock_loader():
+    """Фікстура з лоадером, engine якого замокано."""
+    loader = MagicMock()
+    return loader
+
+
+class TestWatermarkStore:
+    """Тести для WatermarkStore."""
+    
+    def test_get_existing(self, mock_loader):
+        """Тест читання збереженого watermark."""
+        expected = datetime(2024, 1, 31, 12, 0)
+        conn = mock_loader.engine.connect.return_value.__enter__.return_value
+        conn.execute.return_value.scalar.return_value = expected
+        
+        store = WatermarkStore(mock_loader)
+        result = store.get('dim_customer')
+        
+        assert result == expected
+        args = conn.execute.call_args.args
+        assert WATERMARK_TABLE in str(args[0])
+        assert args[1] == {"source": "dim_customer"}
+    
+    def test_get_missing(self, mock_loader):
+        """Тест читання watermark для нового джерела."""
+        conn = mock_loader.engine.connect.return_value.__enter__.return_value
+        conn.execute.return_value.scalar.return_value = None
+        
+        store = WatermarkStore(mock_loader)
+        
+        assert store.get('fact_sales') is None
+    
+    def test_table_created_once(self, mock_loader):
+        """Тест що контрольна таблиця створюється один раз."""
+        conn = mock_loader.engine.begin.return_value.__enter__.return_value
+        
+        store = WatermarkStore(mock_loader)
+        store.get('dim_customer')
+        store.get('dim_product')
+        
+        create_calls = [c for c in conn.execute.call_args_list if 'CREATE TABLE' in str(c.args[0])]
+        assert len(create_calls) == 1
+    
+    def test_set_uses_greatest(self, mock_loader):
+        """Тест що watermark не може зсунутися назад."""
+        conn = mock_loader.engine.begin.return_value.__enter__.return_value
+        
+        store = WatermarkStore(mock_loader)
+        store.set('dim_customer', pd.Timestamp('2024-02-01 10:00:00'))
+        
+        sql, params = conn.execute.call_args.args
+        assert 'ON CONFLICT ("source")' in str(sql)
+        assert 'GREATEST' in str(sql)
+        assert params == {"source": "dim_customer", "watermark": datetime(2024, 2, 1, 10, 0)}
+    
+    @pytest.mark.parametrize('value', [None, pd.NaT])
+    def test_set_ignores_empty(self, mock_loader, value):
+        """Тест що порожній watermark не зберігається."""
+        store = WatermarkStore(mock_loader)
+        store.set('dim_customer', value)
+        
+        mock_loader.engine.begin.assert_not_called()
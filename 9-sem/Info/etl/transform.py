@@ -9,19 +9,85 @@ Transform модуль для очищення та трансформації 
 """
 
 import logging
-from typing import Optional
+from typing import Any, Generator, Iterable, Optional
 from datetime import datetime
 import pandas as pd
 import numpy as np
 
+from .frame_engines import PandasEngine, get_frame_engine
+
 logger = logging.getLogger(__name__)
 
+# Текстові колонки замовлень, що зберігаються в compact режимі як category
+# або Arrow strings (UUID char(36) ідентифікатори та статус)
+ORDER_ID_COLUMNS = (
+    'order_id', 'order_item_id', 'customer_id', 'employee_id',
+    'region_id', 'product_id', 'status'
+)
+
+# Частка унікальних значень, нижче якої колонка стає category
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Частка собівартості у виручці позиції (і для pushdown виразів, etl.pushdown)
+COST_RATIO = 0.6
+
+
+def _arrow_string_dtype() -> Optional[pd.StringDtype]:
+    """Повертає Arrow string dtype, якщо pyarrow встановлено."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return pd.StringDtype('pyarrow')
+
+
+def compact_text_column(series: pd.Series) -> pd.Series:
+    """Перетворює текстову колонку на компактний dtype.
+    
+    Колонки з частими повтореннями (status, customer_id, product_id)
+    стають category: кожне значення зберігається один раз, а рядки - як
+    коди int8/int16/int32. Майже унікальні колонки (order_item_id)
+    переводяться в Arrow strings без окремого Python об'єкта на рядок.
+    
+    Args:
+        series: Колонка з Python рядками
+        
+    Returns:
+        Колонка компактного dtype (або без змін, якщо вигоди немає)
+    """
+    if len(series) == 0 or series.dtype != object:
+        return series
+    
+    if series.nunique(dropna=True) <= len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+        return series.astype('category')
+    
+    string_dtype = _arrow_string_dtype()
+    if string_dtype is None:
+        return series
+    return series.astype(string_dtype)
+
+
+def frame_memory(df: pd.DataFrame) -> int:
+    """Повертає фактичний обсяг пам'яті DataFrame в байтах (з урахуванням рядків)."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
 
 class DataCleaner:
-    """Клас для очищення даних."""
+    """Клас для очищення даних.
     
-    @staticmethod
-    def remove_duplicates(df: pd.DataFrame, subset: Optional[list[str]] = None) -> pd.DataFrame:
+    Attributes:
+        engine: Рушій обчислень (etl.frame_engines), за замовчуванням pandas
+    """
+    
+    def __init__(self, engine: Optional[PandasEngine] = None):
+        """Ініціалізує очищувач.
+        
+        Args:
+            engine: Рушій для дублікатів та пропущених значень (None - pandas)
+        """
+        self.engine = engine or PandasEngine()
+    
+    def remove_duplicates(self, df: pd.DataFrame, subset: Optional[list[str]] = None) -> pd.DataFrame:
         """Видаляє дублікати з DataFrame.
         
         Args:
@@ -32,7 +98,7 @@ class DataCleaner:
             DataFrame без дублікатів
         """
         initial_count = len(df)
-        df_clean = df.drop_duplicates(subset=subset, keep='first')
+        df_clean = self.engine.drop_duplicates(df, subset=subset)
         removed_count = initial_count - len(df_clean)
         
         if removed_count > 0:
@@ -40,8 +106,8 @@ class DataCleaner:
         
         return df_clean
     
-    @staticmethod
     def handle_missing_values(
+        self,
         df: pd.DataFrame,
         strategy: str = 'drop',
         fill_value: Optional[dict[str, any]] = None
@@ -56,7 +122,7 @@ class DataCleaner:
         Returns:
             DataFrame з обробленими пропущеними значеннями
         """
-        missing_count = df.isnull().sum().sum()
+        missing_count = self.engine.count_missing(df)
         
         if missing_count == 0:
             logger.info("Пропущені значення відсутні")
@@ -65,7 +131,7 @@ class DataCleaner:
         logger.info(f"Знайдено {missing_count} пропущених значень")
         
         if strategy == 'drop':
-            df_clean = df.dropna()
+            df_clean = self.engine.drop_missing(df)
             logger.info(f"Видалено {len(df) - len(df_clean)} рядків з пропущеними значеннями")
         elif strategy == 'fill' and fill_value:
             df_clean = df.fillna(fill_value)
@@ -80,17 +146,23 @@ class DataCleaner:
         return df_clean
     
     @staticmethod
-    def validate_data_types(df: pd.DataFrame, schema: dict[str, str]) -> pd.DataFrame:
+    def validate_data_types(
+        df: pd.DataFrame,
+        schema: dict[str, str],
+        inplace: bool = False
+    ) -> pd.DataFrame:
         """Валідує та приводить типи даних до потрібного формату.
         
         Args:
             df: Вхідний DataFrame
             schema: Словник з описом типів (колонка: тип)
+            inplace: Змінювати колонки df без копіювання всього DataFrame
+                (лише якщо df не використовується ніде інде)
             
         Returns:
             DataFrame з валідованими типами
         """
-        df_validated = df.copy()
+        df_validated = df if inplace else df.copy()
         
         for column, dtype in schema.items():
             if column in df_validated.columns:
@@ -110,11 +182,67 @@ class DataCleaner:
 
 
 class DataTransformer:
-    """Клас для трансформації та агрегації даних."""
+    """Клас для трансформації та агрегації даних.
     
-    def __init__(self):
-        """Ініціалізує трансформер."""
-        self.cleaner = DataCleaner()
+    Attributes:
+        cleaner: Очищувач даних
+        compact_dtypes: Чи зберігати замовлення в компактних dtype
+            (category/Arrow strings для id, знижені цілі типи)
+        track_memory: Чи вимірювати пам'ять DataFrame на кожному кроці
+        pushdown: Чи дані витягнуто в режимі pushdown (etl.pushdown): похідні
+            поля, очищення та видалення дублікатів уже виконано в SQL
+        frame_engine: Рушій обчислень: pandas, polars або duckdb (etl.frame_engines)
+        memory_report: Виміри пам'яті (крок, рядки, байти)
+    """
+    
+    def __init__(
+        self,
+        compact_dtypes: bool = False,
+        track_memory: bool = False,
+        pushdown: bool = False,
+        frame_engine: str = 'pandas'
+    ):
+        """Ініціалізує трансформер.
+        
+        Args:
+            compact_dtypes: Увімкнути компактні dtype для замовлень
+            track_memory: Збирати звіт про пам'ять по кроках трансформації
+            pushdown: Дані витягнуто з pushdown трансформаціями
+            frame_engine: Назва рушія обчислень
+        """
+        self.frame_engine = get_frame_engine(frame_engine)
+        self.cleaner = DataCleaner(self.frame_engine)
+        self.compact_dtypes = compact_dtypes
+        self.track_memory = track_memory
+        self.pushdown = pushdown
+        self.memory_report: list[dict[str, Any]] = []
+    
+    def _record_memory(self, step: str, df: pd.DataFrame) -> None:
+        """Зберігає та логує обсяг пам'яті DataFrame після кроку трансформації.
+        
+        Args:
+            step: Назва кроку
+            df: DataFrame після кроку
+        """
+        if not self.track_memory:
+            return
+        
+        size = frame_memory(df)
+        self.memory_report.append({'step': step, 'rows': len(df), 'bytes': size})
+        logger.info(f"Пам'ять після кроку {step}: {size / 1024 ** 2:.2f} MB ({len(df)} рядків)")
+    
+    def _compact_orders(self, orders_df: pd.DataFrame) -> pd.DataFrame:
+        """Переводить колонки замовлень у компактні dtype (на місці).
+        
+        Грошові колонки залишаються float64: float32 має лише ~7 значущих
+        цифр і спотворив би суми.
+        """
+        for column in ORDER_ID_COLUMNS:
+            if column in orders_df.columns:
+                orders_df[column] = compact_text_column(orders_df[column])
+        
+        orders_df['quantity'] = pd.to_numeric(orders_df['quantity'], downcast='integer')
+        return orders_df
     
     def transform_orders(self, orders_df: pd.DataFrame) -> pd.DataFrame:
         """Трансформує дані замовлень для DWH.
@@ -126,12 +254,18 @@ class DataTransformer:
             Трансформований DataFrame
         """
         logger.info("Трансформація даних замовлень")
+        self._record_memory('input', orders_df)
         
-        # Видаляємо дублікати
+        if self.pushdown:
+            return self._transform_pushdown_orders(orders_df)
+        
+        # Видаляємо дублікати. drop_duplicates повертає новий DataFrame, тож
+        # далі колонки замінюються на місці; поверхнева копія лише знімає
+        # позначку "зріз" (SettingWithCopyWarning) без копіювання даних
         orders_df = self.cleaner.remove_duplicates(
             orders_df,
             subset=['order_id', 'order_item_id']
-        )
+        ).copy(deep=False)
         
         # Валідуємо типи даних
         schema = {
@@ -142,20 +276,73 @@ class DataTransformer:
             'discount': 'float',
             'total_amount': 'float'
         }
-        orders_df = self.cleaner.validate_data_types(orders_df, schema)
+        orders_df = self.cleaner.validate_data_types(orders_df, schema, inplace=True)
+        self._record_memory('validated', orders_df)
+        
+        # Стискаємо до обчислення похідних полів, щоб далі (resolve, load,
+        # наступні чанки) йшов уже компактний DataFrame
+        if self.compact_dtypes:
+            orders_df = self._compact_orders(orders_df)
+            self._record_memory('compacted', orders_df)
+        
+        # Обчислюємо додаткові поля та date_key для зв'язку з dim_date
+        # (цілочисельно, без рядків)
+        metrics = self.frame_engine.order_metrics(orders_df, COST_RATIO)
+        for column in ('revenue', 'discount_amount', 'cost', 'margin'):
+            orders_df[column] = metrics[column]
+        orders_df['date_key'] = pd.Series(metrics['date_key'], index=orders_df.index).astype(
+            np.int32 if self.compact_dtypes else np.int64
+        )
+        self._record_memory('derived', orders_df)
         
-        # Обчислюємо додаткові поля
-        orders_df['revenue'] = orders_df['unit_price'] * orders_df['quantity']
-        orders_df['discount_amount'] = orders_df['discount'].fillna(0)
-        orders_df['cost'] = orders_df['revenue'] * 0.6  # Припускаємо 60% собівартість
-        orders_df['margin'] = orders_df['revenue'] - orders_df['discount_amount'] - orders_df['cost']
+        logger.info(f"Трансформовано {len(orders_df)} записів замовлень")
+        return orders_df
+    
+    def _transform_pushdown_orders(self, orders_df: pd.DataFrame) -> pd.DataFrame:
+        """Приводить типи замовлень, витягнутих з pushdown виразами.
         
-        # Додаємо date_key для зв'язку з dim_date
-        orders_df['date_key'] = orders_df['order_date'].dt.strftime('%Y%m%d').astype(int)
+        Рядки унікальні за order_item_id (первинний ключ order_items), а
+        похідні поля та date_key обчислено в MySQL, тож лишається привести
+        DECIMAL та цілі колонки до типів, які дає звичайна трансформація.
+        """
+        schema = {
+            'quantity': 'int',
+            'revenue': 'float',
+            'discount_amount': 'float',
+            'cost': 'float',
+            'margin': 'float',
+            'date_key': np.int32 if self.compact_dtypes else np.int64
+        }
+        # Поверхнева копія: колонки замінюються, вхідний DataFrame не змінюється
+        orders_df = self.cleaner.validate_data_types(orders_df.copy(deep=False), schema, inplace=True)
+        if self.compact_dtypes:
+            orders_df = self._compact_orders(orders_df)
+        self._record_memory('derived', orders_df)
         
-        logger.info(f"Трансформовано {len(orders_df)} записів замовлень")
+        logger.info(f"Трансформовано {len(orders_df)} записів замовлень (pushdown)")
         return orders_df
     
+    def transform_orders_stream(
+        self,
+        chunks: Iterable[pd.DataFrame]
+    ) -> Generator[pd.DataFrame, None, None]:
+        """Трансформує замовлення по чанках, не збираючи їх у пам'яті.
+        
+        Дублікати видаляються в межах чанку: запит extract_orders дає
+        один рядок на order_item, тож результат не залежить від порядку
+        чанків (ordered=False).
+        
+        Args:
+            chunks: Ітератор DataFrame'ів з витягнутими замовленнями
+            
+        Yields:
+            Трансформовані чанки
+        """
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            yield self.transform_orders(chunk)
+    
     def transform_customers(self, customers_df: pd.DataFrame) -> pd.DataFrame:
         """Трансформує дані клієнтів для DWH.
         
@@ -167,6 +354,10 @@ class DataTransformer:
         """
         logger.info("Трансформація даних клієнтів")
         
+        if self.pushdown:
+            # Дублікати email видалено, а email нормалізовано в SQL витягування
+            return self.cleaner.validate_data_types(customers_df, {'updated_at': 'datetime'})
+        
         # Видаляємо дублікати по email
         customers_df = self.cleaner.remove_duplicates(
             customers_df,
@@ -250,13 +441,13 @@ class DataTransformer:
         
         orders_df['order_date'] = pd.to_datetime(orders_df['order_date'])
         
-        agg_df = orders_df.groupby(pd.Grouper(key='order_date', freq=period)).agg({
+        agg_df = self.frame_engine.aggregate_by_period(orders_df, 'order_date', period, {
             'order_id': 'nunique',
             'quantity': 'sum',
             'revenue': 'sum',
             'discount_amount': 'sum',
             'margin': 'sum'
-        }).reset_index()
+        })
         
         agg_df.columns = [
             'period_date',
@@ -281,12 +472,12 @@ class DataTransformer:
         """
         logger.info("Агрегація продажів за товаром")
         
-        agg_df = orders_df.groupby('product_id').agg({
+        agg_df = self.frame_engine.aggregate(orders_df, 'product_id', {
             'order_id': 'nunique',
             'quantity': 'sum',
             'revenue': 'sum',
             'margin': 'sum'
-        }).reset_index()
+        })
         
         agg_df.columns = [
             'product_id',
@@ -313,12 +504,12 @@ class DataTransformer:
         """
         logger.info("Агрегація продажів за співробітником")
         
-        agg_df = orders_df.groupby('employee_id').agg({
+        agg_df = self.frame_engine.aggregate(orders_df, 'employee_id', {
             'order_id': 'nunique',
             'quantity': 'sum',
             'revenue': 'sum',
             'margin': 'sum'
-        }).reset_index()
+        })
         
         agg_df.columns = [
             'employee_id',
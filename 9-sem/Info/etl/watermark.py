@@ -0,0 +1,107 @@
+"""
+Watermark модуль для інкрементального витягування.
+
+Зберігає в DWH позначку (watermark) останнього обробленого значення
+updated_at/created_at для кожного джерела, щоб наступний запуск витягував
+лише нові та змінені записи.
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .load import Loader
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_TABLE = 'etl_watermarks'
+
+
+class WatermarkStore:
+    """Сховище watermark'ів у контрольній таблиці DWH.
+    
+    Attributes:
+        loader: Лоадер, через engine якого виконуються запити до DWH
+    """
+    
+    def __init__(self, loader: Loader):
+        """Ініціалізує сховище.
+        
+        Args:
+            loader: Лоадер з підключенням до DWH
+        """
+        self.loader = loader
+        self._table_ready = False
+    
+    def _ensure_table(self) -> None:
+        """Створює контрольну таблицю, якщо її ще немає."""
+        if self._table_ready:
+            return
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{WATERMARK_TABLE}" ('
+                '"source" varchar(100) PRIMARY KEY, '
+                '"watermark" timestamp NOT NULL, '
+                '"updated_at" timestamp NOT NULL DEFAULT now())'
+            ))
+        self._table_ready = True
+    
+    def get(self, source: str) -> Optional[datetime]:
+        """Повертає watermark джерела.
+        
+        Args:
+            source: Назва джерела (наприклад, 'dim_customer')
+        
+        Returns:
+            Watermark або None, якщо джерело ще не завантажувалось
+        """
+        try:
+            self._ensure_table()
+            with self.loader.engine.connect() as conn:
+                value = conn.execute(
+                    text(f'SELECT "watermark" FROM "{WATERMARK_TABLE}" WHERE "source" = :source'),
+                    {"source": source}
+                ).scalar()
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка читання watermark для {source}: {e}")
+            raise
+        
+        logger.info(f"Watermark {source}: {value}")
+        return value
+    
+    def set(self, source: str, value: Optional[datetime]) -> None:
+        """Зберігає watermark джерела.
+        
+        Watermark ніколи не зсувається назад: зберігається максимум
+        з поточного та нового значення.
+        
+        Args:
+            source: Назва джерела
+            value: Нове значення (None або NaT ігноруються)
+        """
+        if value is None or pd.isna(value):
+            return
+        
+        value = pd.Timestamp(value).to_pydatetime()
+        try:
+            self._ensure_table()
+            with self.loader.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        f'INSERT INTO "{WATERMARK_TABLE}" ("source", "watermark", "updated_at") '
+                        'VALUES (:source, :watermark, now()) '
+                        'ON CONFLICT ("source") DO UPDATE SET '
+                        f'"watermark" = GREATEST("{WATERMARK_TABLE}"."watermark", EXCLUDED."watermark"), '
+                        '"updated_at" = now()'
+                    ),
+                    {"source": source, "watermark": value}
+                )
+        except SQLAlchemyError as e:
+            logger.error(f"Помилка збереження watermark для {source}: {e}")
+            raise
+        
+        logger.info(f"Watermark {source} оновлено: {value}")
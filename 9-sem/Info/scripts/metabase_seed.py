@@ -17,21 +17,37 @@ Usage:
     export DWH_USER=dwh_user
     export DWH_PASS=dwh_pass
     python scripts/metabase_seed.py
+    # Idempotent re-seed: only changed cards/dashboard are written, ids are kept
+    python scripts/metabase_seed.py --sync --workers 8
 
 The script will:
 1) Log in to Metabase and obtain a session
 2) Create (or reuse) a PostgreSQL database connection
 3) Create Saved Questions for key KPIs
 4) Create a dashboard and wire filters (start/end date, region)
+
+In --sync mode existing objects are matched by name and compared with the
+desired definition field by field (query, display, visualization settings;
+dashboard parameters and cards), so edits made in the UI are reverted too.
+Only objects that differ are created, updated or deleted; a marker in the
+description tells objects managed by this script from hand-made ones.
+Requests run concurrently over a pooled keep-alive session.
+scripts/metabase_stub.py serves the same API in memory for local runs.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import os
+import re
 import sys
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
 
@@ -59,19 +75,37 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Bootstrap Metabase with TechMarket DWH, KPI questions, and dashboard."
     )
-    parser.add_argument(
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
         "-c",
         "--clear",
         action="store_true",
         help="Delete existing 'TechMarket KPI Dashboard' before creating a new one.",
     )
+    mode.add_argument(
+        "-s",
+        "--sync",
+        action="store_true",
+        help="Update existing cards and dashboard in place; only changed definitions are written.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=int(os.getenv("METABASE_WORKERS", "4")),
+        help="Concurrent requests in --sync mode (default: 4).",
+    )
     return parser.parse_args()
 
 
 class MetabaseClient:
-    def __init__(self, base_url: str, user: str, password: str):
+    def __init__(self, base_url: str, user: str, password: str, pool_size: int = 4):
         self.base_url = base_url.rstrip("/")
         self.session = requests.Session()
+        # Keep-alive connections shared by concurrent requests in --sync mode
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         resp = self.session.post(
             f"{self.base_url}/api/session",
             json={"username": user, "password": password},
@@ -122,6 +156,10 @@ class MetabaseClient:
         payload = self._get("/api/dashboard")
         return payload if isinstance(payload, list) else payload.get("data", [])
 
+    def get_dashboard(self, dashboard_id: int) -> dict:
+        """Dashboard with its cards (the list endpoint omits them)."""
+        return self._get(f"/api/dashboard/{dashboard_id}")
+
     def delete_dashboard(self, dashboard_id: int) -> None:
         self.session.delete(f"{self.base_url}/api/dashboard/{dashboard_id}", timeout=30).raise_for_status()
 
@@ -167,6 +205,13 @@ class MetabaseClient:
         card = self._post("/api/card", payload)
         return card.get("id")
 
+    def save_card(self, payload: dict, card_id: int | None = None) -> int:
+        """Create a card, or update card_id in place (its id stays the same)."""
+        if card_id is None:
+            return self._post("/api/card", payload).get("id")
+        self._put(f"/api/card/{card_id}", payload)
+        return card_id
+
     def create_dashboard(self, name: str, description: str = "") -> int:
         dashboard = self._post(
             "/api/dashboard",
@@ -177,6 +222,9 @@ class MetabaseClient:
     def update_dashboard_parameters(self, dashboard_id: int, parameters: list[dict]):
         self._put(f"/api/dashboard/{dashboard_id}", {"parameters": parameters})
 
+    def update_dashboard(self, dashboard_id: int, payload: dict):
+        self._put(f"/api/dashboard/{dashboard_id}", payload)
+
     def add_card_to_dashboard(
         self,
         dashboard_id: int,
@@ -187,19 +235,28 @@ class MetabaseClient:
         self._put(f"/api/dashboard/{dashboard_id}/cards", payload)
 
 
+def stable_id(slug: str) -> str:
+    # Metabase assigns ids to template tags and filters that lack one; fixed
+    # ids keep the stored definition equal to the desired one between runs
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"techmarket-kpi/{slug}"))
+
+
 def template_tags():
     return {
         "start_date": {
+            "id": stable_id("tag/start_date"),
             "name": "start_date",
             "display-name": "Start Date",
             "type": "date",
         },
         "end_date": {
+            "id": stable_id("tag/end_date"),
             "name": "end_date",
             "display-name": "End Date",
             "type": "date",
         },
         "region": {
+            "id": stable_id("tag/region"),
             "name": "region",
             "display-name": "Region",
             "type": "text",
@@ -218,12 +275,12 @@ SELECT
   d.year,
   d.month,
   to_char(d.date, 'Mon') AS month_name,
-  SUM(f.revenue)          AS revenue,
-  SUM(f.discount_amount)  AS discount,
-  SUM(f.margin)           AS margin
-FROM fact_sales f
-JOIN dim_date d ON f.date_key = d.date_key
-LEFT JOIN dim_region r ON f.region_key = r.region_key
+  SUM(a.total_revenue)    AS revenue,
+  SUM(a.total_discount)   AS discount,
+  SUM(a.total_margin)     AS margin
+FROM agg_sales_daily a
+JOIN dim_date d ON a.date_key = d.date_key
+LEFT JOIN dim_region r ON a.region_key = r.region_key
 WHERE 1=1
 [[AND d.date >= {{start_date}}]]
 [[AND d.date <= {{end_date}}]]
@@ -239,13 +296,13 @@ ORDER BY d.year, d.month;
             "query": """
 SELECT
   r.name AS region_name,
-  COUNT(DISTINCT f.order_id) AS orders_count,
-  SUM(f.revenue)             AS revenue
-FROM fact_sales f
-JOIN dim_region r ON f.region_key = r.region_key
+  SUM(a.orders_count)  AS orders_count,
+  SUM(a.total_revenue) AS revenue
+FROM agg_sales_daily a
+JOIN dim_region r ON a.region_key = r.region_key
 WHERE 1=1
-[[AND f.date_key >= (SELECT MIN(date_key) FROM dim_date WHERE date >= {{start_date}})]]
-[[AND f.date_key <= (SELECT MAX(date_key) FROM dim_date WHERE date <= {{end_date}})]]
+[[AND a.date_key >= (SELECT MIN(date_key) FROM dim_date WHERE date >= {{start_date}})]]
+[[AND a.date_key <= (SELECT MAX(date_key) FROM dim_date WHERE date <= {{end_date}})]]
 [[AND r.name = {{region}}]]
 GROUP BY r.name
 ORDER BY orders_count DESC;
@@ -257,10 +314,10 @@ ORDER BY orders_count DESC;
             "display": "scalar",
             "query": """
 SELECT
-  SUM(f.revenue) / NULLIF(COUNT(DISTINCT f.order_id), 0) AS avg_order_value
-FROM fact_sales f
-LEFT JOIN dim_region r ON f.region_key = r.region_key
-JOIN dim_date d ON f.date_key = d.date_key
+  SUM(a.total_revenue) / NULLIF(SUM(a.orders_count), 0) AS avg_order_value
+FROM agg_sales_daily a
+LEFT JOIN dim_region r ON a.region_key = r.region_key
+JOIN dim_date d ON a.date_key = d.date_key
 WHERE 1=1
 [[AND d.date >= {{start_date}}]]
 [[AND d.date <= {{end_date}}]]
@@ -273,10 +330,10 @@ WHERE 1=1
             "display": "scalar",
             "query": """
 SELECT
-  (SUM(f.margin) / NULLIF(SUM(f.revenue), 0))::numeric(12,4) AS margin_pct
-FROM fact_sales f
-LEFT JOIN dim_region r ON f.region_key = r.region_key
-JOIN dim_date d ON f.date_key = d.date_key
+  (SUM(a.total_margin) / NULLIF(SUM(a.total_revenue), 0))::numeric(12,4) AS margin_pct
+FROM agg_sales_daily a
+LEFT JOIN dim_region r ON a.region_key = r.region_key
+JOIN dim_date d ON a.date_key = d.date_key
 WHERE 1=1
 [[AND d.date >= {{start_date}}]]
 [[AND d.date <= {{end_date}}]]
@@ -290,13 +347,13 @@ WHERE 1=1
             "query": """
 SELECT
   p.name AS product_name,
-  SUM(f.revenue) AS revenue,
-  SUM(f.quantity) AS qty,
-  SUM(f.margin) AS margin
-FROM fact_sales f
-JOIN dim_product p ON f.product_key = p.product_key
-LEFT JOIN dim_region r ON f.region_key = r.region_key
-JOIN dim_date d ON f.date_key = d.date_key
+  SUM(a.total_revenue) AS revenue,
+  SUM(a.total_quantity) AS qty,
+  SUM(a.total_margin) AS margin
+FROM agg_sales_product a
+JOIN dim_product p ON a.product_key = p.product_key
+LEFT JOIN dim_region r ON a.region_key = r.region_key
+JOIN dim_date d ON a.date_key = d.date_key
 WHERE 1=1
 [[AND d.date >= {{start_date}}]]
 [[AND d.date <= {{end_date}}]]
@@ -319,6 +376,243 @@ def make_dataset_query(db_id: int, sql: str, tags: dict) -> dict:
     }
 
 
+DASHBOARD_NAME = "TechMarket KPI Dashboard"
+DASHBOARD_DESCRIPTION = "Key metrics: revenue trend, orders by region, AOV, margin %, top products."
+CARD_DESCRIPTION = "TechMarket KPI question.\n\nseed-managed: scripts/metabase_seed.py"
+DASHBOARD_SYNC_DESCRIPTION = f"{DASHBOARD_DESCRIPTION}\n\nseed-managed: scripts/metabase_seed.py"
+
+# Layout (col, row, sizeX, sizeY)
+LAYOUT = {
+    "Revenue by Month": (0, 0, 12, 6),
+    "Orders by Region": (0, 6, 6, 6),
+    "Average Order Value": (6, 6, 3, 3),
+    "Margin Percentage": (9, 6, 3, 3),
+    "Top Products by Revenue": (0, 12, 12, 6),
+}
+
+FILTERS = [
+    ("Start Date", "start_date", "date/single"),
+    ("End Date", "end_date", "date/single"),
+    ("Region", "region", "string/="),
+]
+
+
+def dashboard_parameters() -> list[dict]:
+    # Stable ids keep card mappings (and the compared dashboard definition) the same between runs
+    return [
+        {
+            "name": name,
+            "slug": slug,
+            "id": stable_id(slug),
+            "type": param_type,
+        }
+        for name, slug, param_type in FILTERS
+    ]
+
+
+def parameter_mappings(card_id: int, tags: dict, params: list[dict]) -> list[dict]:
+    """Map dashboard filters to the card's template tags of the same name."""
+    return [
+        {
+            "parameter_id": p["id"],
+            "card_id": card_id,
+            "target": ["variable", ["template-tag", p["slug"]]],
+        }
+        for p in params
+        if p["slug"] in tags
+    ]
+
+
+def dashboard_cards(db_id: int, question_ids: dict[str, int], params: list[dict]) -> list[dict]:
+    """Dashboard cards for PUT /api/dashboard/:id/cards (negative ids create new dashcards)."""
+    cards = []
+    for next_id, q in enumerate(build_questions(db_id), start=1):
+        card_id = question_ids[q["name"]]
+        col, row, sx, sy = LAYOUT[q["name"]]
+        cards.append(
+            {
+                "id": -next_id,
+                "card_id": card_id,
+                "row": row,
+                "col": col,
+                "size_x": sx,
+                "size_y": sy,
+                "parameter_mappings": parameter_mappings(card_id, q["tags"], params),
+                "visualization_settings": {},
+                "series": [],
+            }
+        )
+    return cards
+
+
+# Descriptions written by earlier --sync runs carry "seed-fingerprint: <hash>"
+MANAGED_PATTERN = re.compile(r"seed-(?:managed|fingerprint):")
+
+CARD_FIELDS = ("name", "description", "dataset_query", "display", "visualization_settings")
+DASHBOARD_FIELDS = ("name", "description")
+PARAMETER_FIELDS = ("id", "name", "slug", "type")
+DASHCARD_FIELDS = (
+    "card_id", "row", "col", "size_x", "size_y", "parameter_mappings", "visualization_settings", "series"
+)
+
+
+def fingerprint(definition: dict) -> str:
+    canonical = json.dumps(definition, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def is_managed(obj: dict) -> bool:
+    return MANAGED_PATTERN.search(obj.get("description") or "") is not None
+
+
+def pick(obj: dict, fields: tuple[str, ...]) -> dict:
+    return {name: obj.get(name) for name in fields}
+
+
+def card_content(card: dict) -> dict:
+    """Fields of a card that --sync manages (same shape for desired and existing cards)."""
+    return pick(card, CARD_FIELDS)
+
+
+def dashboard_content(dashboard: dict) -> dict:
+    """Fields of a dashboard that --sync manages, with its parameters and cards.
+
+    Server-side fields (dashcard ids, timestamps, nested card objects) are
+    left out; cards are ordered by position, as Metabase may return them in
+    any order. Older Metabase versions return cards as "ordered_cards".
+    """
+    dashcards = dashboard.get("dashcards", dashboard.get("ordered_cards")) or []
+    return {
+        **pick(dashboard, DASHBOARD_FIELDS),
+        "parameters": [pick(p, PARAMETER_FIELDS) for p in dashboard.get("parameters") or []],
+        "dashcards": sorted(
+            (pick(card, DASHCARD_FIELDS) for card in dashcards),
+            key=lambda card: (card["row"] or 0, card["col"] or 0, card["card_id"] or 0),
+        ),
+    }
+
+
+@dataclass
+class SyncPlan:
+    create: list[str] = field(default_factory=list)
+    update: dict[str, int] = field(default_factory=dict)
+    unchanged: dict[str, int] = field(default_factory=dict)
+    delete: list[int] = field(default_factory=list)
+
+
+def plan_sync(desired: dict[str, dict], existing: list[dict], content) -> SyncPlan:
+    """Diff desired definitions (keyed by name) against existing Metabase objects.
+
+    An object with the same name is kept (a managed one first, then the
+    oldest) and updated only if content(object) differs from its desired
+    definition, so edits made in the UI are detected as well. Other objects
+    with that name, and managed objects that are no longer desired, are
+    deleted. Objects created by hand under other names are never touched.
+    """
+    plan = SyncPlan()
+    by_name: dict[str, list[dict]] = {}
+    for obj in existing:
+        if not obj.get("archived"):
+            by_name.setdefault(obj.get("name"), []).append(obj)
+
+    for name, definition in desired.items():
+        candidates = sorted(
+            by_name.pop(name, []),
+            key=lambda obj: (not is_managed(obj), obj.get("id")),
+        )
+        if not candidates:
+            plan.create.append(name)
+            continue
+        keep, *duplicates = candidates
+        plan.delete += [obj["id"] for obj in duplicates]
+        if fingerprint(content(keep)) == fingerprint(definition):
+            plan.unchanged[name] = keep["id"]
+        else:
+            plan.update[name] = keep["id"]
+
+    for objs in by_name.values():
+        plan.delete += [obj["id"] for obj in objs if is_managed(obj)]
+    return plan
+
+
+def run_concurrently(func, items, workers: int) -> list:
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="metabase-sync") as pool:
+        return list(pool.map(func, items))
+
+
+def sync_cards(client: MetabaseClient, db_id: int, workers: int) -> tuple[dict[str, int], list[int]]:
+    """Create or update KPI cards in place.
+
+    Returns:
+        (card id by question name, ids of stale cards to delete once the
+        dashboard no longer references them)
+    """
+    desired = {
+        q["name"]: {
+            "name": q["name"],
+            "description": CARD_DESCRIPTION,
+            "dataset_query": make_dataset_query(db_id, q["query"], q["tags"]),
+            "display": q["display"],
+            "visualization_settings": {},
+        }
+        for q in build_questions(db_id)
+    }
+    plan = plan_sync(desired, client.list_cards(), card_content)
+
+    def save(name: str) -> tuple[str, int]:
+        return name, client.save_card(desired[name], plan.update.get(name))
+
+    saved = dict(run_concurrently(save, plan.create + list(plan.update), workers))
+    print(
+        f"Cards: {len(plan.create)} created, {len(plan.update)} updated, "
+        f"{len(plan.unchanged)} unchanged, {len(plan.delete)} to delete"
+    )
+    return {**plan.unchanged, **saved}, plan.delete
+
+
+def sync_dashboard(client: MetabaseClient, db_id: int, question_ids: dict[str, int], workers: int) -> int:
+    params = dashboard_parameters()
+    cards = dashboard_cards(db_id, question_ids, params)
+    definition = dashboard_content(
+        {"name": DASHBOARD_NAME, "description": DASHBOARD_SYNC_DESCRIPTION, "parameters": params, "dashcards": cards}
+    )
+    existing = run_concurrently(
+        client.get_dashboard,
+        [d["id"] for d in client.list_dashboards() if d.get("name") == DASHBOARD_NAME and not d.get("archived")],
+        workers,
+    )
+    plan = plan_sync({DASHBOARD_NAME: definition}, existing, dashboard_content)
+    run_concurrently(client.delete_dashboard, plan.delete, workers)
+
+    if DASHBOARD_NAME in plan.unchanged:
+        dashboard_id = plan.unchanged[DASHBOARD_NAME]
+        print(f"Dashboard unchanged (id={dashboard_id})")
+        return dashboard_id
+
+    dashboard_id = plan.update.get(DASHBOARD_NAME)
+    if dashboard_id is None:
+        dashboard_id = client.create_dashboard(DASHBOARD_NAME, DASHBOARD_SYNC_DESCRIPTION)
+        print(f"Created dashboard id={dashboard_id}")
+    else:
+        print(f"Updating dashboard id={dashboard_id}")
+        client.update_dashboard(dashboard_id, {"name": DASHBOARD_NAME, "description": DASHBOARD_SYNC_DESCRIPTION})
+    # An interrupted sync leaves a definition that differs and is redone on the next run
+    client.update_dashboard_parameters(dashboard_id, params)
+    client.add_card_to_dashboard(dashboard_id, [{**card, "dashboard_id": dashboard_id} for card in cards])
+    return dashboard_id
+
+
+def sync(client: MetabaseClient, db_id: int, workers: int) -> int:
+    """Bring the KPI cards and dashboard in line with their definitions; returns the dashboard id."""
+    question_ids, stale_cards = sync_cards(client, db_id, workers)
+    dashboard_id = sync_dashboard(client, db_id, question_ids, workers)
+    run_concurrently(client.delete_card, stale_cards, workers)
+    return dashboard_id
+
+
 def main() -> int:
     # Try to load .env if present
     load_env_file()
@@ -335,7 +629,7 @@ def main() -> int:
     dwh_user = getenv("DWH_USER", "dwh_user")
     dwh_pass = getenv("DWH_PASS", "dwh_pass")
 
-    client = MetabaseClient(base_url, user, password)
+    client = MetabaseClient(base_url, user, password, pool_size=args.workers)
 
     db_name = "TechMarket DWH"
     db_id = client.find_database(db_name)
@@ -348,7 +642,12 @@ def main() -> int:
         )
         print(f"Created database id={db_id}")
 
-    dashboard_name = "TechMarket KPI Dashboard"
+    if args.sync:
+        sync(client, db_id, args.workers)
+        print("Metabase sync completed.")
+        return 0
+
+    dashboard_name = DASHBOARD_NAME
     if purge:
         dashboards = client.list_dashboards()
         to_delete = [d for d in dashboards if d.get("name") == dashboard_name]
@@ -376,79 +675,16 @@ def main() -> int:
         print(f"Created card '{q['name']}' (id={card_id})")
 
     # Create dashboard
-    dashboard_id = client.create_dashboard(
-        dashboard_name,
-        "Key metrics: revenue trend, orders by region, AOV, margin %, top products.",
-    )
+    dashboard_id = client.create_dashboard(dashboard_name, DASHBOARD_DESCRIPTION)
     print(f"Created dashboard id={dashboard_id}")
 
     # Dashboard parameters
-    params = [
-        {"name": "Start Date", "slug": "start_date", "id": str(uuid.uuid4()), "type": "date/single"},
-        {"name": "End Date", "slug": "end_date", "id": str(uuid.uuid4()), "type": "date/single"},
-        {"name": "Region", "slug": "region", "id": str(uuid.uuid4()), "type": "string/="},
-    ]
+    params = dashboard_parameters()
     client.update_dashboard_parameters(dashboard_id, params)
 
-    # Helper to map dashboard params to template tags
-    def mappings_for(card_id: int, tags: dict) -> list[dict]:
-        param_lookup = {p["slug"]: p["id"] for p in params}
-        mappings = []
-        if "start_date" in tags:
-            mappings.append(
-                {
-                    "parameter_id": param_lookup["start_date"],
-                    "card_id": card_id,
-                    "target": ["variable", ["template-tag", "start_date"]],
-                }
-            )
-        if "end_date" in tags:
-            mappings.append(
-                {
-                    "parameter_id": param_lookup["end_date"],
-                    "card_id": card_id,
-                    "target": ["variable", ["template-tag", "end_date"]],
-                }
-            )
-        if "region" in tags:
-            mappings.append(
-                {
-                    "parameter_id": param_lookup["region"],
-                    "card_id": card_id,
-                    "target": ["variable", ["template-tag", "region"]],
-                }
-            )
-        return mappings
-
-    # Layout (col, row, sizeX, sizeY)
-    layout = {
-        "Revenue by Month": (0, 0, 12, 6),
-        "Orders by Region": (0, 6, 6, 6),
-        "Average Order Value": (6, 6, 3, 3),
-        "Margin Percentage": (9, 6, 3, 3),
-        "Top Products by Revenue": (0, 12, 12, 6),
-    }
-
-    cards_payload = []
-    next_id = -1
-    for q in build_questions(db_id):
-        card_id = question_ids[q["name"]]
-        col, row, sx, sy = layout[q["name"]]
-        cards_payload.append(
-            {
-                "id": next_id,
-                "card_id": card_id,
-                "dashboard_id": dashboard_id,
-                "row": row,
-                "col": col,
-                "size_x": sx,
-                "size_y": sy,
-                "parameter_mappings": mappings_for(card_id, q["tags"]),
-                "visualization_settings": {},
-                "series": [],
-            }
-        )
-        next_id -= 1
+    cards_payload = [
+        {**card, "dashboard_id": dashboard_id} for card in dashboard_cards(db_id, question_ids, params)
+    ]
     client.add_card_to_dashboard(dashboard_id, cards_payload)
     print(f"Added {len(cards_payload)} cards to dashboard")
 
@@ -0,0 +1,149 @@
+"""
+In-memory stand-in for the subset of the Metabase API used by metabase_seed.py.
+
+Useful for trying seeding (and --sync re-runs) without a Metabase instance:
+any username/password is accepted and objects live only in memory.
+
+Usage:
+    python scripts/metabase_stub.py --port 3999
+    export METABASE_URL=http://localhost:3999
+    export METABASE_USER=admin@example.com
+    export METABASE_PASS=secret
+    python scripts/metabase_seed.py --sync
+    curl http://localhost:3999/stub/requests   # request counts by method and path
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROUTES = [
+    ("session", re.compile(r"^/api/session$")),
+    ("database", re.compile(r"^/api/database$")),
+    ("card", re.compile(r"^/api/card(?:/(?P<id>\d+))?$")),
+    ("dashboard", re.compile(r"^/api/dashboard(?:/(?P<id>\d+))?$")),
+    ("dashcards", re.compile(r"^/api/dashboard/(?P<id>\d+)/cards$")),
+    ("requests", re.compile(r"^/stub/requests$")),
+]
+
+
+class MetabaseState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.objects: dict[str, dict[int, dict]] = {"database": {}, "card": {}, "dashboard": {}}
+        self.next_id = 1
+        self.requests: Counter[str] = Counter()
+
+    def create(self, kind: str, payload: dict) -> dict:
+        with self.lock:
+            obj = {**payload, "id": self.next_id, "archived": False}
+            self.objects[kind][self.next_id] = obj
+            self.next_id += 1
+            return obj
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: MetabaseState
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, body) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def route(self):
+        for name, pattern in ROUTES:
+            match = pattern.match(self.path)
+            if match:
+                obj_id = match.groupdict().get("id")
+                return name, int(obj_id) if obj_id else None
+        return None, None
+
+    def handle_method(self) -> None:
+        payload = self.read_json() if self.command in ("POST", "PUT") else {}
+        name, obj_id = self.route()
+        if name != "requests":
+            self.state.requests[f"{self.command} {self.path}"] += 1
+        if name is None:
+            return self.send_json(404, {"message": f"Not found: {self.path}"})
+        if name == "requests":
+            return self.send_json(200, dict(self.state.requests))
+        if name == "session":
+            return self.send_json(200, {"id": "stub-session"})
+        if self.headers.get("X-Metabase-Session") != "stub-session":
+            return self.send_json(401, {"message": "Unauthenticated"})
+
+        kind = "dashboard" if name == "dashcards" else name
+        objects = self.state.objects[kind]
+        if obj_id is None:
+            if self.command == "GET":
+                body = list(objects.values())
+                return self.send_json(200, {"data": body} if kind == "database" else body)
+            if self.command == "POST":
+                return self.send_json(200, self.state.create(kind, payload))
+            return self.send_json(405, {"message": "Method not allowed"})
+
+        with self.state.lock:
+            obj = objects.get(obj_id)
+            if obj is None:
+                return self.send_json(404, {"message": f"{kind} {obj_id} not found"})
+            if self.command == "GET":
+                return self.send_json(200, obj)
+            if self.command == "DELETE":
+                del objects[obj_id]
+                self.send_response(204)
+                self.send_header("Content-Length", "0")
+                return self.end_headers()
+            if self.command != "PUT":
+                return self.send_json(405, {"message": "Method not allowed"})
+            if name == "dashcards":
+                obj["dashcards"] = [
+                    {**card, "id": index} for index, card in enumerate(payload.get("cards", []), start=1)
+                ]
+            else:
+                obj.update({k: v for k, v in payload.items() if k != "id"})
+            return self.send_json(200, obj)
+
+    do_GET = do_POST = do_PUT = do_DELETE = handle_method
+
+
+def serve(port: int = 3999, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Create a stub server with fresh state; call serve_forever() to run it."""
+    handler = type("Handler", (StubHandler,), {"state": MetabaseState()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="In-memory Metabase API stub for metabase_seed.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=3999)
+    args = parser.parse_args()
+
+    server = serve(args.port, args.host)
+    print(f"Metabase stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())